@@ -1,4 +1,9 @@
+from IdAllocator import IdAllocator
+
+
 class Address:
+    __slots__ = ("address_id", "user_id", "city", "street", "house", "apartment")
+
     def __init__(self, address_id: int, user_id: int, city: str, street: str, house: int, apartment: int) -> object:
         self.address_id = address_id
         self.user_id = user_id
@@ -30,13 +35,14 @@ class Address:
 
 
 class AddressManager:
-    def __init__(self):
+    def __init__(self, ids: IdAllocator = None):
         self.addresses = {}
+        self.ids = ids or IdAllocator("addresses")
 
     def create_address(self, user_id: int, city: str, street: str, house: int, apartment: int):
         if not all([city, street, house, apartment]):
             raise ValueError("All fields must be provided to create an address.")
-        address_id = len(self.addresses) + 1  # Генерация уникального ID для нового адреса
+        address_id = self.ids.next_id()  # Генерация уникального ID для нового адреса
         address = Address(address_id, user_id, city, street, house, apartment)
         self.addresses[address_id] = address
         return address
@@ -1,6 +1,9 @@
 import json
 from typing import Optional
 from Address import Address
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
 
 
 class AddressExistsError(Exception):
@@ -12,9 +15,11 @@ class AddressNotFoundError(Exception):
 
 
 class AddressJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "addresses", "address_id", journaled, codec)
 
+    @locked
     def create(self, address: Address):
         address_data = {
             "address_id": address.address_id,
@@ -26,8 +31,7 @@ class AddressJSONHandler:
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"addresses": []}
 
@@ -36,13 +40,11 @@ class AddressJSONHandler:
                 raise AddressExistsError(f"Address with ID {address.address_id} already exists.")
 
         data["addresses"].append(address_data)
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[address_data])
 
     def read(self, address_id: int) -> Optional[Address]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for address_data in data.get("addresses", []):
                 if address_data["address_id"] == address_id:
                     return Address(
@@ -56,10 +58,10 @@ class AddressJSONHandler:
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update(self, address_id: int, new_city: str, new_street: str, new_house: int, new_apartment: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for address_data in data.get("addresses", []):
                 if address_data["address_id"] == address_id:
                     if new_city:
@@ -70,8 +72,7 @@ class AddressJSONHandler:
                         address_data["house"] = new_house
                     if new_apartment:
                         address_data["apartment"] = new_apartment
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[address_data])
                     return True
             raise AddressNotFoundError(f"Address with ID {address_id} not found for update.")
         except (FileNotFoundError, json.JSONDecodeError):
@@ -80,18 +81,17 @@ class AddressJSONHandler:
             print(e)
             return False
 
+    @locked
     def delete(self, address_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             original_length = len(data.get("addresses", []))
             data["addresses"] = [address for address in data.get("addresses", []) if address["address_id"] != address_id]
 
             if len(data["addresses"]) == original_length:
                 raise AddressNotFoundError(f"Address with ID {address_id} not found for deletion.")
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[address_id])
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             return False
@@ -101,8 +101,7 @@ class AddressJSONHandler:
 
     def get_all(self):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             return [
                 Address(
                     address_id=address_data["address_id"],
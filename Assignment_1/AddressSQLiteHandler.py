@@ -0,0 +1,58 @@
+import sqlite3
+from typing import Optional
+from Address import Address
+from AddressJSONHandler import AddressExistsError, AddressNotFoundError
+from SQLiteStorage import connect
+
+
+class AddressSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _row_to_address(self, row):
+        return Address(
+            address_id=row["address_id"],
+            user_id=row["user_id"],
+            city=row["city"],
+            street=row["street"],
+            house=row["house"],
+            apartment=row["apartment"],
+        )
+
+    def create(self, address: Address):
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO addresses (address_id, user_id, city, street, house, apartment) VALUES (?, ?, ?, ?, ?, ?)",
+                    (address.address_id, address.user_id, address.city, address.street, address.house, address.apartment)
+                )
+        except sqlite3.IntegrityError:
+            raise AddressExistsError(f"Address with ID {address.address_id} already exists.")
+
+    def read(self, address_id: int) -> Optional[Address]:
+        row = self.connection.execute("SELECT * FROM addresses WHERE address_id = ?", (address_id,)).fetchone()
+        return self._row_to_address(row) if row else None
+
+    def update(self, address_id: int, new_city: str, new_street: str, new_house: int, new_apartment: int):
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE addresses SET city = COALESCE(?, city), street = COALESCE(?, street), "
+                "house = COALESCE(?, house), apartment = COALESCE(?, apartment) WHERE address_id = ?",
+                (new_city or None, new_street or None, new_house or None, new_apartment or None, address_id)
+            )
+        if cursor.rowcount == 0:
+            print(AddressNotFoundError(f"Address with ID {address_id} not found for update."))
+            return False
+        return True
+
+    def delete(self, address_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM addresses WHERE address_id = ?", (address_id,))
+        if cursor.rowcount == 0:
+            print(AddressNotFoundError(f"Address with ID {address_id} not found for deletion."))
+            return False
+        return True
+
+    def get_all(self):
+        return [self._row_to_address(row) for row in self.connection.execute("SELECT * FROM addresses ORDER BY address_id")]
@@ -1,6 +1,7 @@
 import xml.etree.ElementTree as ET
 from typing import Optional
 from Address import Address
+from XMLIndex import IndexedXMLFile
 
 class AddressExistsError(Exception):
     pass
@@ -11,18 +12,18 @@ class AddressNotFoundError(Exception):
 class AddressXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "address", "address_id")
 
     def create(self, address: Address):
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            root = self.document.load()
         except (FileNotFoundError, ET.ParseError):
             root = ET.Element("addresses")
+            self.document.reset(root)
 
         # Check if the address already exists based on the address_id
-        for address_element in root.findall("address"):
-            if address_element.find("address_id").text == str(address.address_id):
-                raise AddressExistsError(f"Address with ID '{address.address_id}' already exists.")
+        if self.document.get(address.address_id) is not None:
+            raise AddressExistsError(f"Address with ID '{address.address_id}' already exists.")
 
         address_element = ET.SubElement(root, "address")
         ET.SubElement(address_element, "address_id").text = str(address.address_id)
@@ -32,39 +33,37 @@ class AddressXMLHandler:
         ET.SubElement(address_element, "house").text = str(address.house)
         ET.SubElement(address_element, "apartment").text = str(address.apartment)
 
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.add(address_element)
+        self.document.save()
 
     def read(self, address_id: int) -> Optional[Address]:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-
-            for address_element in root.findall("address"):
-                if int(address_element.find("address_id").text) == address_id:
-                    user_id = int(address_element.find("user_id").text)
-                    city = address_element.find("city").text
-                    street = address_element.find("street").text
-                    house = int(address_element.find("house").text)
-                    apartment = int(address_element.find("apartment").text)
-                    return Address(address_id, user_id, city, street, house, apartment)
+            self.document.load()
         except (FileNotFoundError, ET.ParseError):
             return None
-        return None
+
+        address_element = self.document.get(address_id)
+        if address_element is None:
+            return None
+        user_id = int(address_element.find("user_id").text)
+        city = address_element.find("city").text
+        street = address_element.find("street").text
+        house = int(address_element.find("house").text)
+        apartment = int(address_element.find("apartment").text)
+        return Address(address_id, user_id, city, street, house, apartment)
 
     def update(self, address_id: int, new_city: str, new_street: str, new_house: int, new_apartment: int) -> bool:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            self.document.load()
 
-            for address_element in root.findall("address"):
-                if int(address_element.find("address_id").text) == address_id:
-                    address_element.find("city").text = new_city
-                    address_element.find("street").text = new_street
-                    address_element.find("house").text = str(new_house)
-                    address_element.find("apartment").text = str(new_apartment)
-                    tree.write(self.filepath)
-                    return True
+            address_element = self.document.get(address_id)
+            if address_element is not None:
+                address_element.find("city").text = new_city
+                address_element.find("street").text = new_street
+                address_element.find("house").text = str(new_house)
+                address_element.find("apartment").text = str(new_apartment)
+                self.document.save()
+                return True
 
             raise AddressNotFoundError(f"Address with ID '{address_id}' not found for update.")
         except (FileNotFoundError, ET.ParseError):
@@ -75,14 +74,12 @@ class AddressXMLHandler:
 
     def delete(self, address_id: int) -> bool:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            self.document.load()
 
-            for address_element in root.findall("address"):
-                if int(address_element.find("address_id").text) == address_id:
-                    root.remove(address_element)
-                    tree.write(self.filepath)
-                    return True
+            if self.document.get(address_id) is not None:
+                self.document.remove(address_id)
+                self.document.save()
+                return True
 
             raise AddressNotFoundError(f"Address with ID '{address_id}' not found for deletion.")
         except (FileNotFoundError, ET.ParseError):
@@ -93,8 +90,7 @@ class AddressXMLHandler:
 
     def get_all_addresses(self):
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            root = self.document.load()
 
             addresses = []
             for address_element in root.findall("address"):
@@ -0,0 +1,88 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+_pending = None
+
+
+def _fsync_directory(directory: str):
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Some platforms (Windows) cannot open a directory; the rename itself is still atomic there.
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def sync_file(file):
+    """Flush ``file`` to disk now, or at the end of the enclosing fsync_batch()."""
+    file.flush()
+    if _pending is None:
+        os.fsync(file.fileno())
+    else:
+        _pending.add(file.name)
+
+
+@contextmanager
+def atomic_write(filepath: str, mode: str = "w"):
+    """Write ``filepath`` through a temp file in the same directory and rename it into place.
+
+    Readers see either the old document or the new one, never a truncated file.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filepath) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, mode) as file:
+            try:
+                os.chmod(temp_path, os.stat(filepath).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(temp_path, 0o644)
+            yield file
+            file.flush()
+            if _pending is None:
+                os.fsync(file.fileno())
+        os.replace(temp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if _pending is None:
+        _fsync_directory(directory)
+    else:
+        _pending.add(filepath)
+
+
+@contextmanager
+def fsync_batch():
+    """Defer the fsyncs of every write inside the block to one pass when it exits.
+
+    Renames still happen immediately, so other processes never see partial files;
+    only durability against power loss is postponed until the batch completes.
+    """
+    global _pending
+    if _pending is not None:
+        yield
+        return
+
+    _pending = set()
+    try:
+        yield
+    finally:
+        paths, _pending = _pending, None
+        for path in paths:
+            try:
+                descriptor = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+        for directory in {os.path.dirname(os.path.abspath(path)) for path in paths}:
+            _fsync_directory(directory)
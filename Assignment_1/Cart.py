@@ -1,14 +1,88 @@
-from Product import Product
+from Product import Product, InsufficientStockError, to_cents
+from Reservation import ReservationNotFoundError, ReservationExpiredError, ReservationMismatchError
+from IdAllocator import IdAllocator
 
 class Cart:
-    def __init__(self, user_id: int, cart_id: int):
+    """Products and quantities of one user's cart.
+
+    Change ``products`` only through the cart's methods: each line's total (in
+    cents), the subtotal and the item count are kept up to date as lines change,
+    and recomputed only after some product price has changed.
+    """
+
+    __slots__ = ("user_id", "cart_id", "products", "reservations", "_line_cents", "_line_prices", "_subtotal_cents",
+                 "_item_count", "_priced_at")
+
+    def __init__(self, user_id: int, cart_id: int, reservations=None, products: dict = None):
         self.user_id = user_id
         self.cart_id = cart_id
         self.products = {}
+        # With a ReservationManager, adding to the cart places a timed hold instead of taking stock.
+        self.reservations = reservations
+        self._line_cents = {}
+        self._line_prices = {}
+        self._subtotal_cents = 0
+        self._item_count = 0
+        self._priced_at = Product.price_generation
+        for product, quantity in (products or {}).items():
+            self.load_item(product, quantity)
+
+    def _set_line(self, product: Product, quantity: int):
+        line_cents = to_cents(product.price) * quantity
+        self._subtotal_cents += line_cents - self._line_cents.get(product, 0)
+        self._item_count += quantity - self.products.get(product, 0)
+        self.products[product] = quantity
+        self._line_cents[product] = line_cents
+        self._line_prices[product] = product.price
+
+    def _drop_line(self, product: Product):
+        self._subtotal_cents -= self._line_cents.pop(product)
+        self._item_count -= self.products.pop(product)
+        del self._line_prices[product]
+
+    def _reprice(self):
+        generation = Product.price_generation
+        if generation == self._priced_at:
+            return
+        # Some price changed somewhere; only lines whose own price moved are recomputed.
+        for product, price in self._line_prices.items():
+            if product.price != price:
+                self._set_line(product, self.products[product])
+        self._priced_at = generation
+
+    def load_item(self, product: Product, quantity: int):
+        """Puts a stored line back into the cart without touching stock or holds."""
+        self._set_line(product, quantity)
+
+    @property
+    def subtotal_cents(self) -> int:
+        self._reprice()
+        return self._subtotal_cents
+
+    @property
+    def subtotal(self) -> float:
+        return self.subtotal_cents / 100
+
+    @property
+    def item_count(self) -> int:
+        self._reprice()
+        return self._item_count
+
+    def line_totals(self) -> dict:
+        """Product -> price * quantity of its line."""
+        self._reprice()
+        return {product: line_cents / 100 for product, line_cents in self._line_cents.items()}
 
     def add_to_cart(self, product: Product, quantity: int):
+        if self.reservations is not None:
+            try:
+                self.reservations.reserve(self.cart_id, {product.product_id: quantity})
+            except InsufficientStockError:
+                return f"Not enough stock for {product.name}."
+            self._set_line(product, self.products.get(product, 0) + quantity)
+            return f"{quantity} units of {product.name} added to cart."
         if product.stock >= quantity:
-            self.products[product] = self.products.get(product, 0) + quantity
+            self._set_line(product, self.products.get(product, 0) + quantity)
             product.stock -= quantity
             return f"{quantity} units of {product.name} added to cart."
         return f"Not enough stock for {product.name}."
@@ -16,18 +90,75 @@ class Cart:
     def remove_from_cart(self, product: Product):
         if product in self.products:
             removed_quantity = self.products[product]
-            product.stock += removed_quantity
-            del self.products[product]
+            if self.reservations is not None:
+                self._release(product.product_id)
+            else:
+                product.stock += removed_quantity
+            self._drop_line(product)
             return f"{product.name} removed from cart."
         return f"{product.name} is not in the cart."
 
+    def _release(self, product_id: int = None):
+        # A hold that already expired has nothing left to give back.
+        try:
+            self.reservations.release(self.cart_id, product_id)
+        except ReservationNotFoundError:
+            pass
+
+    def checkout(self):
+        """Commits the cart's hold, so the reserved units leave stock.
+
+        Lines whose hold lapsed are reserved again first. Those that cannot be
+        are dropped from the cart and the checkout fails, so nothing is sold
+        without its units being taken from stock.
+        """
+        if self.reservations is None:
+            return "Stock was taken when the products were added."
+        wanted = {product.product_id: quantity for product, quantity in self.products.items()}
+        held = self.reservations.held(self.cart_id)
+        short = {product_id: quantity - held.get(product_id, 0) for product_id, quantity in wanted.items()
+                 if quantity > held.get(product_id, 0)}
+        if short:
+            try:
+                self.reservations.reserve(self.cart_id, short)
+            except InsufficientStockError:
+                dropped = self._drop_unreserved(held)
+                return f"The hold on {', '.join(dropped)} lapsed and the stock is gone; removed from cart."
+        try:
+            self.reservations.commit(self.cart_id, wanted)
+        except (ReservationNotFoundError, ReservationExpiredError, ReservationMismatchError) as e:
+            # Whatever the cart held has been given back; none of its lines are covered any more.
+            self._drop_unreserved({})
+            return str(e)
+        return f"Cart {self.cart_id} checked out."
+
+    def _drop_unreserved(self, held: dict) -> list:
+        """Cuts every line down to the units ``held`` covers; returns the names of the lines that shrank."""
+        dropped = []
+        for product, quantity in list(self.products.items()):
+            covered = min(quantity, held.get(product.product_id, 0))
+            if covered == quantity:
+                continue
+            dropped.append(product.name)
+            if covered:
+                self._set_line(product, covered)
+            else:
+                self._drop_line(product)
+        return dropped
+
     def view_cart(self):
         return {product.name: qty for product, qty in self.products.items()}
 
     def clear_cart(self):
-        for product, qty in self.products.items():
-            product.stock += qty
+        if self.reservations is not None:
+            self._release()
+        else:
+            for product, qty in self.products.items():
+                product.stock += qty
         self.products.clear()
+        self._line_cents.clear()
+        self._line_prices.clear()
+        self._subtotal_cents = self._item_count = 0
         return "Cart cleared"
 
     def __repr__(self):
@@ -35,20 +166,23 @@ class Cart:
 
 
 class CartManager:
-    def __init__(self):
+    def __init__(self, reservations=None, ids: IdAllocator = None):
+        self.reservations = reservations
         self.carts = {}
+        self.carts_by_user = {}
+        self.ids = ids or IdAllocator("carts")
 
     def create_cart(self, user_id: int):
-        cart_id = len(self.carts) + 1
-        cart = Cart(user_id, cart_id)
-        self.carts[cart_id] = cart
+        cart = Cart(user_id, self.ids.next_id(), self.reservations)
+        self.carts[cart.cart_id] = cart
+        self.carts_by_user.setdefault(user_id, {})[cart.cart_id] = cart
         return cart
 
     def get_cart_by_user(self, user_id: int):
-        for cart in self.carts.values():
-            if cart.user_id == user_id:
-                return cart
-        return None
+        user_carts = self.carts_by_user.get(user_id)
+        if not user_carts:
+            return None
+        return next(iter(user_carts.values()))
 
     def update_cart(self, cart_id: int, product: Product, quantity: int, action: str):
         cart = self.carts.get(cart_id)
@@ -67,6 +201,10 @@ class CartManager:
 
     def delete_cart(self, cart_id: int):
         if cart_id in self.carts:
-            del self.carts[cart_id]
+            cart = self.carts.pop(cart_id)
+            user_carts = self.carts_by_user[cart.user_id]
+            del user_carts[cart_id]
+            if not user_carts:
+                del self.carts_by_user[cart.user_id]
             return f"Cart {cart_id} deleted successfully."
         return "Cart not found."
\ No newline at end of file
@@ -2,12 +2,20 @@ import json
 from typing import Optional
 from Product import Product
 from Cart import Cart
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
+from RecordOffsets import RecordOffsets
+from Paging import iter_pages
 
 
 class CartJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "carts", "cart_id", journaled, codec)
+        self.offsets = RecordOffsets(self.storage, "carts", "cart_id")
 
+    @locked
     def create_cart(self, user_id: int, cart_id: int) -> Cart:
         cart_data = {
             "cart_id": cart_id,
@@ -16,36 +24,31 @@ class CartJSONHandler:
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"carts": []}
 
         data["carts"].append(cart_data)
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[cart_data])
 
         return Cart(user_id, cart_id)
 
     def read_cart(self, cart_id: int) -> Optional[Cart]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for cart_data in data.get("carts", []):
                 if cart_data["cart_id"] == cart_id:
-                    cart = Cart(cart_data["user_id"], cart_data["cart_id"])
-                    cart.products = {
+                    return Cart(cart_data["user_id"], cart_data["cart_id"], products={
                         Product(prod["product_id"], prod["name"], prod["price"], prod["stock"]): qty
                         for prod, qty in cart_data.get("products", {}).items()
-                    }
-                    return cart
+                    })
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update_cart(self, cart_id: int, product: Product, quantity: int, action: str):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for cart_data in data.get("carts", []):
                 if cart_data["cart_id"] == cart_id:
@@ -73,17 +76,16 @@ class CartJSONHandler:
                             return f"{product.name} not found in the cart."
 
                     cart_data["products"] = products
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[cart_data])
                     return f"Cart {cart_id} updated successfully."
             return "Cart not found."
         except (FileNotFoundError, json.JSONDecodeError):
             return "Error while accessing the cart."
 
+    @locked
     def delete_cart(self, cart_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             original_length = len(data.get("carts", []))
             data["carts"] = [cart for cart in data.get("carts", []) if cart["cart_id"] != cart_id]
@@ -91,16 +93,18 @@ class CartJSONHandler:
             if len(data["carts"]) == original_length:
                 return f"Cart with ID {cart_id} not found."
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[cart_id])
             return f"Cart {cart_id} deleted successfully."
         except (FileNotFoundError, json.JSONDecodeError):
             return "Error while deleting the cart."
 
-    def get_all_carts(self):
+    def get_all_carts(self, limit: int = None, after_id: int = None):
+        """Every cart, or with ``limit``/``after_id`` one page of them ordered by id."""
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            if limit is None and after_id is None:
+                records = self.storage.load().get("carts", [])
+            else:
+                records = self.offsets.page(after_id, limit)
             return [
                 Cart(
                     cart_data["user_id"],
@@ -110,8 +114,11 @@ class CartJSONHandler:
                         for prod, qty in cart_data.get("products", {}).items()
                     }
                 )
-                for cart_data in data.get("carts", [])
+                for cart_data in records
             ]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
 
+    def iter_carts(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_carts, lambda cart: cart.cart_id, batch_size)
+
@@ -0,0 +1,78 @@
+from typing import Optional
+from Product import Product
+from Cart import Cart
+from SQLiteStorage import connect, page_query
+from Paging import iter_pages
+
+
+class CartSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _fill_cart(self, cart: Cart, rows):
+        for row in rows:
+            product = Product(row["product_id"], row["name"], row["category"], row["price"], row["stock"])
+            cart.load_item(product, row["quantity"])
+        return cart
+
+    def create_cart(self, user_id: int, cart_id: int) -> Cart:
+        with self.connection:
+            self.connection.execute("INSERT INTO carts (cart_id, user_id) VALUES (?, ?)", (cart_id, user_id))
+        return Cart(user_id, cart_id)
+
+    def read_cart(self, cart_id: int) -> Optional[Cart]:
+        row = self.connection.execute("SELECT * FROM carts WHERE cart_id = ?", (cart_id,)).fetchone()
+        if row is None:
+            return None
+        items = self.connection.execute("SELECT * FROM cart_items WHERE cart_id = ?", (cart_id,))
+        return self._fill_cart(Cart(row["user_id"], row["cart_id"]), items)
+
+    def update_cart(self, cart_id: int, product: Product, quantity: int, action: str):
+        if self.connection.execute("SELECT 1 FROM carts WHERE cart_id = ?", (cart_id,)).fetchone() is None:
+            return "Cart not found."
+
+        with self.connection:
+            if action == "add":
+                self.connection.execute(
+                    "INSERT INTO cart_items (cart_id, product_id, name, category, price, stock, quantity) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = quantity + excluded.quantity",
+                    (cart_id, product.product_id, product.name, product.category, product.price, product.stock, quantity)
+                )
+                product.stock -= quantity
+            elif action == "remove":
+                row = self.connection.execute(
+                    "SELECT quantity FROM cart_items WHERE cart_id = ? AND product_id = ?", (cart_id, product.product_id)
+                ).fetchone()
+                if row is None:
+                    return f"{product.name} not found in the cart."
+                product.stock += row["quantity"]
+                self.connection.execute(
+                    "DELETE FROM cart_items WHERE cart_id = ? AND product_id = ?", (cart_id, product.product_id)
+                )
+        return f"Cart {cart_id} updated successfully."
+
+    def delete_cart(self, cart_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM carts WHERE cart_id = ?", (cart_id,))
+            self.connection.execute("DELETE FROM cart_items WHERE cart_id = ?", (cart_id,))
+        if cursor.rowcount == 0:
+            return f"Cart with ID {cart_id} not found."
+        return f"Cart {cart_id} deleted successfully."
+
+    def get_all_carts(self, limit: int = None, after_id: int = None):
+        """Every cart, or with ``limit``/``after_id`` one page of them ordered by id."""
+        carts = {row["cart_id"]: Cart(row["user_id"], row["cart_id"])
+                 for row in self.connection.execute(*page_query("carts", "cart_id", after_id, limit))}
+        if not carts:
+            return []
+        # Items of a page come from one primary-key range instead of the whole cart_items table.
+        for row in self.connection.execute("SELECT * FROM cart_items WHERE cart_id BETWEEN ? AND ?",
+                                           (min(carts), max(carts))):
+            if row["cart_id"] in carts:
+                self._fill_cart(carts[row["cart_id"]], [row])
+        return list(carts.values())
+
+    def iter_carts(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_carts, lambda cart: cart.cart_id, batch_size)
@@ -2,6 +2,7 @@ import xml.etree.ElementTree as ET
 from typing import Optional
 from Product import Product  # Assuming Product class is defined elsewhere
 from Cart import Cart  # Assuming Cart class is defined elsewhere
+from XMLIndex import IndexedXMLFile, iter_elements
 
 class CartExistsError(Exception):
     pass
@@ -12,18 +13,18 @@ class CartNotFoundError(Exception):
 class CartXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "cart", "cart_id")
 
     def create(self, cart: Cart):
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            root = self.document.load()
         except (FileNotFoundError, ET.ParseError):
             root = ET.Element("carts")
+            self.document.reset(root)
 
         # Check if the cart already exists by cart_id
-        for cart_element in root.findall("cart"):
-            if cart_element.find("cart_id").text == str(cart.cart_id):
-                raise CartExistsError(f"Cart with ID '{cart.cart_id}' already exists.")
+        if self.document.get(cart.cart_id) is not None:
+            raise CartExistsError(f"Cart with ID '{cart.cart_id}' already exists.")
 
         cart_element = ET.SubElement(root, "cart")
         ET.SubElement(cart_element, "cart_id").text = str(cart.cart_id)
@@ -31,68 +32,77 @@ class CartXMLHandler:
 
         products_element = ET.SubElement(cart_element, "products")
         for product, quantity in cart.products.items():
-            product_element = ET.SubElement(products_element, "product")
-            ET.SubElement(product_element, "product_id").text = str(product.product_id)
-            ET.SubElement(product_element, "quantity").text = str(quantity)
+            self._add_line(products_element, product, quantity)
 
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.add(cart_element)
+        self.document.save()
 
     def read(self, cart_id: int) -> Optional[Cart]:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-
-            for cart_element in root.findall("cart"):
-                if int(cart_element.find("cart_id").text) == cart_id:
-                    user_id = int(cart_element.find("user_id").text)
-                    cart = Cart(user_id, cart_id)
-
-                    # Load products from XML
-                    for product_element in cart_element.find("products").findall("product"):
-                        product_id = int(product_element.find("product_id").text)
-                        quantity = int(product_element.find("quantity").text)
-                        product = Product.get_product_by_id(product_id)  # Assuming a method in Product class to get products
-                        if product:
-                            cart.products[product] = quantity
-
-                    return cart
+            self.document.load()
         except (FileNotFoundError, ET.ParseError):
             return None
-        return None
+
+        cart_element = self.document.get(cart_id)
+        if cart_element is None:
+            return None
+        return self._element_to_cart(cart_element)
+
+    @staticmethod
+    def _add_line(products_element, product: Product, quantity: int):
+        # Each line keeps the product's name, category and price, so a cart reads back without the catalog.
+        product_element = ET.SubElement(products_element, "product")
+        ET.SubElement(product_element, "product_id").text = str(product.product_id)
+        ET.SubElement(product_element, "name").text = product.name
+        ET.SubElement(product_element, "category").text = product.category
+        ET.SubElement(product_element, "price").text = str(product.price)
+        ET.SubElement(product_element, "quantity").text = str(quantity)
+
+    def _element_to_cart(self, cart_element):
+        cart_id = int(cart_element.find("cart_id").text)
+        user_id = int(cart_element.find("user_id").text)
+        cart = Cart(user_id, cart_id)
+
+        # Load products from XML; lines written before they carried product data come back unnamed and unpriced.
+        for product_element in cart_element.find("products").findall("product"):
+            product = Product(int(product_element.find("product_id").text),
+                              product_element.findtext("name"),
+                              product_element.findtext("category"),
+                              float(product_element.findtext("price", "0")),
+                              0)
+            cart.load_item(product, int(product_element.find("quantity").text))
+
+        return cart
 
     def update(self, cart_id: int, product: Product, quantity: int, action: str) -> bool:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-            for cart_element in root.findall("cart"):
-                if int(cart_element.find("cart_id").text) == cart_id:
-                    products_element = cart_element.find("products")
-
-                    # Perform action based on the request
-                    if action == "add":
-                        # Check if product exists, then update the quantity
-                        for product_element in products_element.findall("product"):
-                            if int(product_element.find("product_id").text) == product.product_id:
-                                current_quantity = int(product_element.find("quantity").text)
-                                product_element.find("quantity").text = str(current_quantity + quantity)
-                                tree.write(self.filepath)
-                                return True
-
-                        # If product is not already in the cart, add it
-                        product_element = ET.SubElement(products_element, "product")
-                        ET.SubElement(product_element, "product_id").text = str(product.product_id)
-                        ET.SubElement(product_element, "quantity").text = str(quantity)
-                        tree.write(self.filepath)
-                        return True
-
-                    elif action == "remove":
-                        # Remove product from the cart
-                        for product_element in products_element.findall("product"):
-                            if int(product_element.find("product_id").text) == product.product_id:
-                                products_element.remove(product_element)
-                                tree.write(self.filepath)
-                                return True
+            self.document.load()
+            cart_element = self.document.get(cart_id)
+            if cart_element is not None:
+                products_element = cart_element.find("products")
+
+                # Perform action based on the request
+                if action == "add":
+                    # Check if product exists, then update the quantity
+                    for product_element in products_element.findall("product"):
+                        if int(product_element.find("product_id").text) == product.product_id:
+                            current_quantity = int(product_element.find("quantity").text)
+                            product_element.find("quantity").text = str(current_quantity + quantity)
+                            self.document.save()
+                            return True
+
+                    # If product is not already in the cart, add it
+                    self._add_line(products_element, product, quantity)
+                    self.document.save()
+                    return True
+
+                elif action == "remove":
+                    # Remove product from the cart
+                    for product_element in products_element.findall("product"):
+                        if int(product_element.find("product_id").text) == product.product_id:
+                            products_element.remove(product_element)
+                            self.document.save()
+                            return True
 
             raise CartNotFoundError(f"Cart with ID '{cart_id}' not found.")
         except (FileNotFoundError, ET.ParseError):
@@ -103,13 +113,11 @@ class CartXMLHandler:
 
     def delete(self, cart_id: int) -> bool:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-            for cart_element in root.findall("cart"):
-                if int(cart_element.find("cart_id").text) == cart_id:
-                    root.remove(cart_element)
-                    tree.write(self.filepath)
-                    return True
+            self.document.load()
+            if self.document.get(cart_id) is not None:
+                self.document.remove(cart_id)
+                self.document.save()
+                return True
 
             raise CartNotFoundError(f"Cart with ID '{cart_id}' not found for deletion.")
         except (FileNotFoundError, ET.ParseError):
@@ -118,27 +126,16 @@ class CartXMLHandler:
             print(e)
             return False
 
-    def get_all_carts(self):
+    def get_all_carts(self, limit: int = None, after_id: int = None):
+        """Every cart, or with ``limit``/``after_id`` one page of them ordered by id."""
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-
-            carts = []
-            for cart_element in root.findall("cart"):
-                cart_id = int(cart_element.find("cart_id").text)
-                user_id = int(cart_element.find("user_id").text)
-                cart = Cart(user_id, cart_id)
-
-                # Load products from XML
-                for product_element in cart_element.find("products").findall("product"):
-                    product_id = int(product_element.find("product_id").text)
-                    quantity = int(product_element.find("quantity").text)
-                    product = Product.get_product_by_id(product_id)  # Assuming a method in Product class to get products
-                    if product:
-                        cart.products[product] = quantity
-
-                carts.append(cart)
-
-            return carts
+            root = self.document.load()
+            if limit is None and after_id is None:
+                return [self._element_to_cart(cart_element) for cart_element in root.findall("cart")]
+            return [self._element_to_cart(cart_element) for cart_element in self.document.page(after_id, limit)]
         except (FileNotFoundError, ET.ParseError):
             return []
+
+    def iter_carts(self):
+        for cart_element in iter_elements(self.filepath, "cart"):
+            yield self._element_to_cart(cart_element)
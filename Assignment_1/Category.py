@@ -1,34 +1,39 @@
 from Product import Product, ProductNotFoundError
+from IdAllocator import IdAllocator
 
 
 class Category:
-    def __init__(self, category_id: int, name: str, description: str):
+    __slots__ = ("category_id", "name", "description", "parent_id", "product_ids")
+
+    def __init__(self, category_id: int, name: str, description: str, parent_id: int = None):
         if not name:
             raise ValueError("Category name cannot be empty.")
         self.category_id = category_id
         self.name = name
         self.description = description
-        self.products = []
+        self.parent_id = parent_id
+        self.product_ids = set()
 
     def __repr__(self):
-        return f"Category(category_id={self.category_id}, name='{self.name}', description='{self.description}')"
+        return (f"Category(category_id={self.category_id}, name='{self.name}', description='{self.description}', "
+                f"parent_id={self.parent_id})")
 
     def add_product_to_category(self, product: Product):
-        if product in self.products:
+        if product.product_id in self.product_ids:
             raise ValueError(f"Product {product.name} is already in category {self.name}.")
-        self.products.append(product)
+        self.product_ids.add(product.product_id)
         return f"Product {product.name} added to category {self.name}."
 
     def remove_product_from_category(self, product: Product):
-        if product not in self.products:
-            raise ProductNotFoundError(product.product_id, self.name)
-        self.products.remove(product)
+        if product.product_id not in self.product_ids:
+            raise ProductNotFoundError(product.product_id)
+        self.product_ids.remove(product.product_id)
         return f"Product {product.name} removed from category {self.name}."
 
     def list_products(self):
-        if not self.products:
+        if not self.product_ids:
             return f"No products in category {self.name}."
-        return [product.name for product in self.products]
+        return sorted(self.product_ids)
 
 
 class CategoryNotFoundError(Exception):
@@ -36,15 +41,130 @@ class CategoryNotFoundError(Exception):
         super().__init__(f"Category with ID {category_id} not found.")
 
 
-class CategoryManager:
+class CategoryTree:
+    """Parent links and product membership for a forest of categories.
+
+    ``ancestors`` is the closure of the parent relation: for every category the
+    ids on its path up to the root, itself first. ``subtree_products`` counts,
+    for every category, how many categories of its subtree hold each product,
+    so adding or removing a product costs O(depth) and listing everything under
+    a category never walks its descendants.
+    """
+
     def __init__(self):
+        self.parents = {}
+        self.children = {}
+        self.ancestors = {}
+        self.members = {}
+        self.subtree_products = {}
+
+    def __contains__(self, category_id: int):
+        return category_id in self.parents
+
+    def add_category(self, category_id: int, parent_id: int = None, product_ids=()):
+        if parent_id is not None and parent_id not in self.parents:
+            raise CategoryNotFoundError(parent_id)
+        self.parents[category_id] = parent_id
+        self.children[category_id] = set()
+        self.members[category_id] = set()
+        self.subtree_products[category_id] = {}
+        if parent_id is not None:
+            self.children[parent_id].add(category_id)
+        self.ancestors[category_id] = (category_id,) + (self.ancestors[parent_id] if parent_id is not None else ())
+        for product_id in product_ids:
+            self.add_product(category_id, product_id)
+
+    def remove_category(self, category_id: int):
+        """Drops the category and its own products; its subcategories move up to its parent."""
+        parent_id = self.parents[category_id]
+        for child_id in list(self.children[category_id]):
+            self.move_category(child_id, parent_id)
+        for product_id in list(self.members[category_id]):
+            self.remove_product(category_id, product_id)
+        if parent_id is not None:
+            self.children[parent_id].discard(category_id)
+        for index in (self.parents, self.children, self.ancestors, self.members, self.subtree_products):
+            del index[category_id]
+
+    def move_category(self, category_id: int, parent_id: int = None):
+        if parent_id is not None:
+            if parent_id not in self.parents:
+                raise CategoryNotFoundError(parent_id)
+            if category_id in self.ancestors[parent_id]:
+                raise ValueError(f"Category {parent_id} is inside category {category_id}; that would make a cycle.")
+
+        counts = self.subtree_products[category_id]
+        self._shift(self.ancestors[category_id][1:], counts, -1)
+        old_parent_id = self.parents[category_id]
+        if old_parent_id is not None:
+            self.children[old_parent_id].discard(category_id)
+        self.parents[category_id] = parent_id
+        if parent_id is not None:
+            self.children[parent_id].add(category_id)
+
+        suffix = self.ancestors[parent_id] if parent_id is not None else ()
+        for descendant_id in self.descendants(category_id):
+            path = self.ancestors[descendant_id]
+            self.ancestors[descendant_id] = path[:path.index(category_id) + 1] + suffix
+        self._shift(self.ancestors[category_id][1:], counts, 1)
+
+    def _shift(self, category_ids: tuple, counts: dict, sign: int):
+        for category_id in category_ids:
+            totals = self.subtree_products[category_id]
+            for product_id, count in counts.items():
+                total = totals.get(product_id, 0) + sign * count
+                if total:
+                    totals[product_id] = total
+                else:
+                    del totals[product_id]
+
+    def add_product(self, category_id: int, product_id: int) -> bool:
+        members = self.members[category_id]
+        if product_id in members:
+            return False
+        members.add(product_id)
+        for ancestor_id in self.ancestors[category_id]:
+            totals = self.subtree_products[ancestor_id]
+            totals[product_id] = totals.get(product_id, 0) + 1
+        return True
+
+    def remove_product(self, category_id: int, product_id: int) -> bool:
+        members = self.members[category_id]
+        if product_id not in members:
+            return False
+        members.remove(product_id)
+        for ancestor_id in self.ancestors[category_id]:
+            totals = self.subtree_products[ancestor_id]
+            if totals[product_id] == 1:
+                del totals[product_id]
+            else:
+                totals[product_id] -= 1
+        return True
+
+    def descendants(self, category_id: int) -> list:
+        """The category and everything below it, parents before children."""
+        found = [category_id]
+        for current in found:
+            found.extend(self.children[current])
+        return found
+
+    def products_under(self, category_id: int) -> list:
+        return list(self.subtree_products[category_id])
+
+
+class CategoryManager:
+    def __init__(self, ids: IdAllocator = None):
         self.categories = {}  # Dictionary to store categories, key is category_id
+        self.tree = CategoryTree()
+        self.products = {}  # Every product added to some category, key is product_id
+        self.ids = ids or IdAllocator("categories")
 
-    def create_category(self, name: str, description: str):
+    def create_category(self, name: str, description: str, parent_id: int = None):
         if not name:
             raise ValueError("Category name cannot be empty.")
-        category_id = len(self.categories) + 1  # Generate a unique ID for the category
-        category = Category(category_id, name, description)
+        category_id = self.ids.next_id()  # Generate a unique ID for the category
+        self.tree.add_category(category_id, parent_id)
+        category = Category(category_id, name, description, parent_id)
         self.categories[category_id] = category
         return category
 
@@ -66,9 +186,21 @@ class CategoryManager:
             category.description = description
         return category
 
+    def move_category(self, category_id: int, parent_id: int = None):
+        try:
+            category = self.read_category_by_id(category_id)
+            self.tree.move_category(category_id, parent_id)
+        except (CategoryNotFoundError, ValueError) as e:
+            return str(e)
+        category.parent_id = parent_id
+        return category
+
     def delete_category(self, category_id: int):
         try:
             category = self.read_category_by_id(category_id)
+            for child_id in self.tree.children[category_id]:
+                self.categories[child_id].parent_id = category.parent_id
+            self.tree.remove_category(category_id)
             del self.categories[category_id]
             return f"Category {category_id} deleted successfully."
         except CategoryNotFoundError as e:
@@ -77,16 +209,30 @@ class CategoryManager:
     def get_all_categories(self):
         return [category for category in self.categories.values()]
 
+    def get_subcategories(self, category_id: int):
+        return [self.categories[child_id] for child_id in self.tree.children.get(category_id, ())]
+
     def add_product_to_category(self, category_id: int, product: Product):
         try:
             category = self.read_category_by_id(category_id)
-            return category.add_product_to_category(product)
+            message = category.add_product_to_category(product)
         except (CategoryNotFoundError, ValueError) as e:
             return str(e)
+        self.tree.add_product(category_id, product.product_id)
+        self.products[product.product_id] = product
+        return message
 
     def remove_product_from_category(self, category_id: int, product: Product):
         try:
             category = self.read_category_by_id(category_id)
-            return category.remove_product_from_category(product)
+            message = category.remove_product_from_category(product)
         except (CategoryNotFoundError, ProductNotFoundError) as e:
             return str(e)
+        self.tree.remove_product(category_id, product.product_id)
+        return message
+
+    def get_products_in_subtree(self, category_id: int):
+        """Every product in the category or any of its subcategories."""
+        if category_id not in self.tree:
+            raise CategoryNotFoundError(category_id)
+        return [self.products[product_id] for product_id in self.tree.products_under(category_id)]
@@ -1,59 +1,124 @@
 import json
 from typing import Optional
 from Product import Product, ProductNotFoundError
-from Category import Category, CategoryNotFoundError
+from Category import Category, CategoryNotFoundError, CategoryTree
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
+from RecordOffsets import RecordOffsets
+from Paging import iter_pages
+from IdAllocator import IdAllocator
+
+
+def _product_ids(category_data: dict) -> list:
+    # Files written before categories stored ids kept whole product dicts under "products".
+    if "product_ids" in category_data:
+        return category_data["product_ids"]
+    return [product_data["product_id"] for product_data in category_data.get("products", [])]
 
 
 class CategoryJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "categories", "category_id", journaled, codec)
+        self.offsets = RecordOffsets(self.storage, "categories", "category_id")
+        self.ids = IdAllocator("categories", filepath + ".ids", seed=self._highest_id)
+        self._tree = None
+        self._tree_version = None
 
-    def create_category(self, name: str, description: str) -> Category:
+    def _highest_id(self) -> int:
+        try:
+            return max((category["category_id"] for category in self.storage.load().get("categories", [])), default=0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+    def _load(self) -> dict:
+        data = self.storage.load()
+        for category_data in data.get("categories", []):
+            if "product_ids" not in category_data:
+                category_data["product_ids"] = _product_ids(category_data)
+                category_data.pop("products", None)
+        return data
+
+    def tree(self) -> CategoryTree:
+        """The hierarchy and membership closure, rebuilt only when the file changed."""
+        version = self.storage.current_version()
+        if self._tree is None or version != self._tree_version:
+            try:
+                categories = self._load().get("categories", [])
+            except (FileNotFoundError, json.JSONDecodeError):
+                categories = []
+            tree = CategoryTree()
+            by_id = {category_data["category_id"]: category_data for category_data in categories}
+
+            def add(category_data):
+                parent_id = category_data.get("parent_id")
+                if parent_id is not None and parent_id not in tree:
+                    add(by_id[parent_id])
+                if category_data["category_id"] not in tree:
+                    tree.add_category(category_data["category_id"], parent_id, category_data["product_ids"])
+            for category_data in categories:
+                add(category_data)
+            self._tree, self._tree_version = tree, version
+        return self._tree
+
+    def _update_tree(self, change):
+        """Applies ``change(tree)`` after one of our saves, or drops the tree if it missed a write."""
+        if self._tree is not None and self._tree_version == self.storage.replaced_version:
+            change(self._tree)
+            self._tree_version = self.storage.current_version()
+        else:
+            self._tree = None
+
+    def _category_from_data(self, category_data: dict) -> Category:
+        category = Category(
+            category_data["category_id"],
+            category_data["name"],
+            category_data["description"],
+            category_data.get("parent_id")
+        )
+        category.product_ids = set(_product_ids(category_data))
+        return category
+
+    @locked
+    def create_category(self, name: str, description: str, parent_id: int = None) -> Category:
         category_data = {
             "name": name,
             "description": description,
-            "products": []  # Empty list to store products initially
+            "parent_id": parent_id,
+            "product_ids": []
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self._load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"categories": []}
 
-        category_id = len(data["categories"]) + 1  # Generate unique ID for new category
+        if parent_id is not None and all(category["category_id"] != parent_id for category in data["categories"]):
+            raise CategoryNotFoundError(parent_id)
+
+        category_id = self.ids.next_id()  # Generate unique ID for new category
         category_data["category_id"] = category_id
         data["categories"].append(category_data)
 
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[category_data])
+        self._update_tree(lambda tree: tree.add_category(category_id, parent_id))
 
-        return Category(category_id, name, description)
+        return Category(category_id, name, description, parent_id)
 
     def read_category_by_id(self, category_id: int) -> Optional[Category]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for category_data in data.get("categories", []):
                 if category_data["category_id"] == category_id:
-                    category = Category(
-                        category_data["category_id"],
-                        category_data["name"],
-                        category_data["description"]
-                    )
-                    # Rebuild the product objects from the stored data
-                    category.products = [
-                        Product(prod["product_id"], prod["name"], prod["price"], prod["stock"])
-                        for prod in category_data.get("products", [])
-                    ]
-                    return category
+                    return self._category_from_data(category_data)
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update_category(self, category_id: int, name: str = None, description: str = None) -> str:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self._load()
 
             for category_data in data["categories"]:
                 if category_data["category_id"] == category_id:
@@ -62,26 +127,52 @@ class CategoryJSONHandler:
                     if description:
                         category_data["description"] = description
 
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[category_data])
+                    self._update_tree(lambda tree: None)
                     return f"Category {category_id} updated successfully."
             raise CategoryNotFoundError(category_id)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             return str(e)
 
-    def delete_category(self, category_id: int) -> str:
+    @locked
+    def move_category(self, category_id: int, parent_id: int = None) -> str:
+        """Re-parents a category (None makes it a root); refuses moves that would create a cycle."""
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self._load()
+            tree = self.tree()
+            if category_id not in tree:
+                raise CategoryNotFoundError(category_id)
+            if parent_id is not None and parent_id not in tree:
+                raise CategoryNotFoundError(parent_id)
+            if parent_id is not None and category_id in tree.ancestors[parent_id]:
+                return f"Category {parent_id} is inside category {category_id}; that would make a cycle."
+
+            category_data = next(category for category in data["categories"] if category["category_id"] == category_id)
+            category_data["parent_id"] = parent_id
+            self.storage.save(data, changed=[category_data])
+            self._update_tree(lambda tree: tree.move_category(category_id, parent_id))
+            return f"Category {category_id} moved under {parent_id}."
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            return str(e)
+        except CategoryNotFoundError as e:
+            return str(e)
 
-            original_length = len(data["categories"])
-            data["categories"] = [cat for cat in data["categories"] if cat["category_id"] != category_id]
+    @locked
+    def delete_category(self, category_id: int) -> str:
+        """Deletes a category; its subcategories move up to its parent."""
+        try:
+            data = self._load()
 
-            if len(data["categories"]) == original_length:
+            deleted = next((cat for cat in data["categories"] if cat["category_id"] == category_id), None)
+            if deleted is None:
                 raise CategoryNotFoundError(category_id)
+            data["categories"].remove(deleted)
+            children = [cat for cat in data["categories"] if cat.get("parent_id") == category_id]
+            for category_data in children:
+                category_data["parent_id"] = deleted.get("parent_id")
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, changed=children, deleted=[category_id])
+            self._update_tree(lambda tree: tree.remove_category(category_id))
 
             return f"Category {category_id} deleted successfully."
         except (FileNotFoundError, json.JSONDecodeError) as e:
@@ -89,49 +180,38 @@ class CategoryJSONHandler:
         except CategoryNotFoundError as e:
             return str(e)
 
+    @locked
     def add_product_to_category(self, category_id: int, product: Product) -> str:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self._load()
+            tree = self.tree()
 
             for category_data in data["categories"]:
                 if category_data["category_id"] == category_id:
-                    product_data = {
-                        "product_id": product.product_id,
-                        "name": product.name,
-                        "price": product.price,
-                        "stock": product.stock
-                    }
-                    if product_data not in category_data["products"]:
-                        category_data["products"].append(product_data)
-                    else:
+                    if product.product_id in tree.members[category_id]:
                         return f"Product {product.name} already in category {category_data['name']}."
+                    category_data["product_ids"].append(product.product_id)
 
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[category_data])
+                    self._update_tree(lambda tree: tree.add_product(category_id, product.product_id))
                     return f"Product {product.name} added to category {category_data['name']}."
             raise CategoryNotFoundError(category_id)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             return str(e)
 
+    @locked
     def remove_product_from_category(self, category_id: int, product: Product) -> str:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self._load()
+            tree = self.tree()
 
             for category_data in data["categories"]:
                 if category_data["category_id"] == category_id:
-                    product_data = {
-                        "product_id": product.product_id,
-                        "name": product.name,
-                        "price": product.price,
-                        "stock": product.stock
-                    }
-                    if product_data in category_data["products"]:
-                        category_data["products"].remove(product_data)
-
-                        with open(self.filepath, "w") as file:
-                            json.dump(data, file, indent=4)
+                    if product.product_id in tree.members[category_id]:
+                        category_data["product_ids"].remove(product.product_id)
+
+                        self.storage.save(data, changed=[category_data])
+                        self._update_tree(lambda tree: tree.remove_product(category_id, product.product_id))
                         return f"Product {product.name} removed from category {category_data['name']}."
                     else:
                         return f"Product {product.name} not found in category {category_data['name']}."
@@ -139,16 +219,29 @@ class CategoryJSONHandler:
         except (FileNotFoundError, json.JSONDecodeError) as e:
             return str(e)
 
-    def get_all_categories(self) -> list:
+    def get_all_categories(self, limit: int = None, after_id: int = None) -> list:
+        """Every category, or with ``limit``/``after_id`` one page of them ordered by id."""
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-            return [
-                Category(
-                    category_data["category_id"],
-                    category_data["name"],
-                    category_data["description"]
-                ) for category_data in data.get("categories", [])
-            ]
+            if limit is None and after_id is None:
+                records = self.storage.load().get("categories", [])
+            else:
+                records = self.offsets.page(after_id, limit)
+            return [self._category_from_data(category_data) for category_data in records]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
+
+    def iter_categories(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_categories, lambda category: category.category_id, batch_size)
+
+    def get_subcategories(self, category_id: int) -> list:
+        tree = self.tree()
+        if category_id not in tree:
+            raise CategoryNotFoundError(category_id)
+        return sorted(tree.children[category_id])
+
+    def get_product_ids_in_subtree(self, category_id: int) -> list:
+        """Ids of every product in the category or any category below it."""
+        tree = self.tree()
+        if category_id not in tree:
+            raise CategoryNotFoundError(category_id)
+        return tree.products_under(category_id)
@@ -0,0 +1,153 @@
+import sqlite3
+from typing import Optional
+from Product import Product
+from Category import Category, CategoryNotFoundError, CategoryTree
+from SQLiteStorage import connect, page_query
+from Paging import iter_pages
+
+
+class CategorySQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _read_row(self, category_id: int):
+        row = self.connection.execute("SELECT * FROM categories WHERE category_id = ?", (category_id,)).fetchone()
+        if row is None:
+            raise CategoryNotFoundError(category_id)
+        return row
+
+    def create_category(self, name: str, description: str, parent_id: int = None) -> Category:
+        with self.connection:
+            if parent_id is not None:
+                self._read_row(parent_id)
+            cursor = self.connection.execute(
+                "INSERT INTO categories (name, description, parent_id) VALUES (?, ?, ?)", (name, description, parent_id)
+            )
+        return Category(cursor.lastrowid, name, description, parent_id)
+
+    def read_category_by_id(self, category_id: int) -> Optional[Category]:
+        row = self.connection.execute("SELECT * FROM categories WHERE category_id = ?", (category_id,)).fetchone()
+        if row is None:
+            return None
+        category = Category(row["category_id"], row["name"], row["description"], row["parent_id"])
+        category.product_ids = {
+            item["product_id"]
+            for item in self.connection.execute(
+                "SELECT product_id FROM category_products WHERE category_id = ?", (category_id,)
+            )
+        }
+        return category
+
+    def update_category(self, category_id: int, name: str = None, description: str = None) -> str:
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE categories SET name = COALESCE(?, name), description = COALESCE(?, description) "
+                "WHERE category_id = ?",
+                (name or None, description or None, category_id)
+            )
+        if cursor.rowcount == 0:
+            raise CategoryNotFoundError(category_id)
+        return f"Category {category_id} updated successfully."
+
+    def move_category(self, category_id: int, parent_id: int = None) -> str:
+        """Re-parents a category (None makes it a root); refuses moves that would create a cycle."""
+        try:
+            with self.connection:
+                self.connection.execute("BEGIN IMMEDIATE")
+                self._read_row(category_id)
+                if parent_id is not None:
+                    self._read_row(parent_id)
+                    if category_id in self._ancestor_ids(parent_id):
+                        return f"Category {parent_id} is inside category {category_id}; that would make a cycle."
+                self.connection.execute("UPDATE categories SET parent_id = ? WHERE category_id = ?",
+                                        (parent_id, category_id))
+        except CategoryNotFoundError as e:
+            return str(e)
+        return f"Category {category_id} moved under {parent_id}."
+
+    def delete_category(self, category_id: int) -> str:
+        """Deletes a category; its subcategories move up to its parent."""
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute("SELECT parent_id FROM categories WHERE category_id = ?",
+                                          (category_id,)).fetchone()
+            if row is None:
+                return str(CategoryNotFoundError(category_id))
+            self.connection.execute("UPDATE categories SET parent_id = ? WHERE parent_id = ?",
+                                    (row["parent_id"], category_id))
+            self.connection.execute("DELETE FROM categories WHERE category_id = ?", (category_id,))
+            self.connection.execute("DELETE FROM category_products WHERE category_id = ?", (category_id,))
+        return f"Category {category_id} deleted successfully."
+
+    def add_product_to_category(self, category_id: int, product: Product) -> str:
+        category_name = self._read_row(category_id)["name"]
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO category_products (category_id, product_id, name, category, price, stock) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (category_id, product.product_id, product.name, product.category, product.price, product.stock)
+                )
+        except sqlite3.IntegrityError:
+            return f"Product {product.name} already in category {category_name}."
+        return f"Product {product.name} added to category {category_name}."
+
+    def remove_product_from_category(self, category_id: int, product: Product) -> str:
+        category_name = self._read_row(category_id)["name"]
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM category_products WHERE category_id = ? AND product_id = ?",
+                (category_id, product.product_id)
+            )
+        if cursor.rowcount == 0:
+            return f"Product {product.name} not found in category {category_name}."
+        return f"Product {product.name} removed from category {category_name}."
+
+    def get_all_categories(self, limit: int = None, after_id: int = None) -> list:
+        """Every category, or with ``limit``/``after_id`` one page of them ordered by id."""
+        return [Category(row["category_id"], row["name"], row["description"], row["parent_id"])
+                for row in self.connection.execute(*page_query("categories", "category_id", after_id, limit))]
+
+    def iter_categories(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_categories, lambda category: category.category_id, batch_size)
+
+    def _ancestor_ids(self, category_id: int) -> list:
+        """The category and every category above it, walked with a recursive query."""
+        return [row[0] for row in self.connection.execute(
+            "WITH RECURSIVE path (category_id) AS (SELECT ? UNION "
+            "SELECT categories.parent_id FROM categories JOIN path ON categories.category_id = path.category_id "
+            "WHERE categories.parent_id IS NOT NULL) SELECT category_id FROM path", (category_id,))]
+
+    def tree(self) -> CategoryTree:
+        """The hierarchy and membership as a CategoryTree, built from the tables on every call."""
+        rows = {row["category_id"]: row["parent_id"]
+                for row in self.connection.execute("SELECT category_id, parent_id FROM categories")}
+        members = {}
+        for row in self.connection.execute("SELECT category_id, product_id FROM category_products"):
+            members.setdefault(row["category_id"], []).append(row["product_id"])
+        tree = CategoryTree()
+
+        def add(category_id):
+            parent_id = rows[category_id]
+            if parent_id is not None and parent_id not in tree:
+                add(parent_id)
+            if category_id not in tree:
+                tree.add_category(category_id, parent_id, members.get(category_id, ()))
+        for category_id in rows:
+            add(category_id)
+        return tree
+
+    def get_subcategories(self, category_id: int) -> list:
+        self._read_row(category_id)
+        return [row["category_id"] for row in self.connection.execute(
+            "SELECT category_id FROM categories WHERE parent_id = ? ORDER BY category_id", (category_id,))]
+
+    def get_product_ids_in_subtree(self, category_id: int) -> list:
+        """Ids of every product in the category or any category below it."""
+        self._read_row(category_id)
+        return [row[0] for row in self.connection.execute(
+            "WITH RECURSIVE subtree (category_id) AS (SELECT ? UNION "
+            "SELECT categories.category_id FROM categories JOIN subtree ON categories.parent_id = subtree.category_id) "
+            "SELECT DISTINCT product_id FROM category_products WHERE category_id IN subtree ORDER BY product_id",
+            (category_id,))]
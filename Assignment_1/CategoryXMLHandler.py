@@ -2,6 +2,7 @@ import xml.etree.ElementTree as ET
 from typing import Optional
 from Product import Product, ProductNotFoundError
 from Category import Category, CategoryNotFoundError
+from XMLIndex import IndexedXMLFile, iter_elements
 
 class CategoryExistsError(Exception):
     pass
@@ -9,67 +10,66 @@ class CategoryExistsError(Exception):
 class CategoryXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "category", "category_id")
 
     def create(self, category: Category):
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            root = self.document.load()
         except (FileNotFoundError, ET.ParseError):
             root = ET.Element("categories")
+            self.document.reset(root)
 
         # Check if the category already exists by category_id
-        for category_element in root.findall("category"):
-            if category_element.find("category_id").text == str(category.category_id):
-                raise CategoryExistsError(f"Category with ID '{category.category_id}' already exists.")
+        if self.document.get(category.category_id) is not None:
+            raise CategoryExistsError(f"Category with ID '{category.category_id}' already exists.")
 
         category_element = ET.SubElement(root, "category")
         ET.SubElement(category_element, "category_id").text = str(category.category_id)
         ET.SubElement(category_element, "name").text = category.name
         ET.SubElement(category_element, "description").text = category.description
+        if category.parent_id is not None:
+            ET.SubElement(category_element, "parent_id").text = str(category.parent_id)
 
         products_element = ET.SubElement(category_element, "products")
-        for product in category.products:
+        for product_id in sorted(category.product_ids):
             product_element = ET.SubElement(products_element, "product")
-            ET.SubElement(product_element, "product_id").text = str(product.product_id)
+            ET.SubElement(product_element, "product_id").text = str(product_id)
 
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.add(category_element)
+        self.document.save()
 
     def read(self, category_id: int) -> Optional[Category]:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-
-            for category_element in root.findall("category"):
-                if int(category_element.find("category_id").text) == category_id:
-                    name = category_element.find("name").text
-                    description = category_element.find("description").text
-                    category = Category(category_id, name, description)
-
-                    # Load products from XML
-                    for product_element in category_element.find("products").findall("product"):
-                        product_id = int(product_element.find("product_id").text)
-                        product = Product.get_product_by_id(product_id)  # Assuming a method in Product class
-                        if product:
-                            category.products.append(product)
-
-                    return category
+            self.document.load()
         except (FileNotFoundError, ET.ParseError):
             return None
-        return None
+
+        category_element = self.document.get(category_id)
+        if category_element is None:
+            return None
+        return self._element_to_category(category_element)
+
+    def _element_to_category(self, category_element) -> Category:
+        parent_id = category_element.findtext("parent_id")
+        category = Category(int(category_element.find("category_id").text),
+                            category_element.find("name").text,
+                            category_element.find("description").text,
+                            int(parent_id) if parent_id else None)
+        category.product_ids = {int(product_element.find("product_id").text)
+                                for product_element in category_element.find("products").findall("product")}
+        return category
 
     def update(self, category_id: int, name: str = None, description: str = None) -> bool:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-            for category_element in root.findall("category"):
-                if int(category_element.find("category_id").text) == category_id:
-                    if name:
-                        category_element.find("name").text = name
-                    if description:
-                        category_element.find("description").text = description
-                    tree.write(self.filepath)
-                    return True
+            self.document.load()
+            category_element = self.document.get(category_id)
+            if category_element is not None:
+                if name:
+                    category_element.find("name").text = name
+                if description:
+                    category_element.find("description").text = description
+                self.document.save()
+                return True
             raise CategoryNotFoundError(category_id)
         except (FileNotFoundError, ET.ParseError, CategoryNotFoundError) as e:
             print(e)
@@ -77,68 +77,67 @@ class CategoryXMLHandler:
 
     def delete(self, category_id: int) -> bool:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-            for category_element in root.findall("category"):
-                if int(category_element.find("category_id").text) == category_id:
-                    root.remove(category_element)
-                    tree.write(self.filepath)
-                    return True
+            self.document.load()
+            if self.document.get(category_id) is not None:
+                self.document.remove(category_id)
+                self.document.save()
+                return True
 
             raise CategoryNotFoundError(category_id)
         except (FileNotFoundError, ET.ParseError, CategoryNotFoundError) as e:
             print(e)
             return False
 
-    def get_all_categories(self):
+    def get_all_categories(self, limit: int = None, after_id: int = None):
+        """Every category, or with ``limit``/``after_id`` one page of them ordered by id."""
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-
-            categories = []
-            for category_element in root.findall("category"):
-                category_id = int(category_element.find("category_id").text)
-                name = category_element.find("name").text
-                description = category_element.find("description").text
-                category = Category(category_id, name, description)
-
-                # Load products from XML
-                for product_element in category_element.find("products").findall("product"):
-                    product_id = int(product_element.find("product_id").text)
-                    product = Product.get_product_by_id(product_id)  # Assuming a method in Product class
-                    if product:
-                        category.products.append(product)
-
-                categories.append(category)
-
-            return categories
+            root = self.document.load()
+            if limit is None and after_id is None:
+                return [self._element_to_category(category_element) for category_element in root.findall("category")]
+            return [self._element_to_category(category_element)
+                    for category_element in self.document.page(after_id, limit)]
         except (FileNotFoundError, ET.ParseError):
             return []
 
+    def iter_categories(self):
+        for category_element in iter_elements(self.filepath, "category"):
+            yield self._element_to_category(category_element)
+
+    def _product_element(self, category_element, product_id: int):
+        for product_element in category_element.find("products").findall("product"):
+            if int(product_element.find("product_id").text) == product_id:
+                return product_element
+        return None
+
     def add_product_to_category(self, category_id: int, product: Product) -> str:
         try:
-            category = self.read(category_id)
-            if not category:
+            self.document.load()
+            category_element = self.document.get(category_id)
+            if category_element is None:
                 raise CategoryNotFoundError(category_id)
-            if product in category.products:
-                return f"Product {product.name} is already in category {category.name}."
-            category.add_product_to_category(product)
-
-            # Update XML
-            self.update(category_id, category.name, category.description)
-            return f"Product {product.name} added to category {category.name}."
-        except (CategoryNotFoundError, ValueError) as e:
+            name = category_element.find("name").text
+            if self._product_element(category_element, product.product_id) is not None:
+                return f"Product {product.name} is already in category {name}."
+
+            product_element = ET.SubElement(category_element.find("products"), "product")
+            ET.SubElement(product_element, "product_id").text = str(product.product_id)
+            self.document.save()
+            return f"Product {product.name} added to category {name}."
+        except (FileNotFoundError, ET.ParseError, CategoryNotFoundError) as e:
             return str(e)
 
     def remove_product_from_category(self, category_id: int, product: Product) -> str:
         try:
-            category = self.read(category_id)
-            if not category:
+            self.document.load()
+            category_element = self.document.get(category_id)
+            if category_element is None:
                 raise CategoryNotFoundError(category_id)
-            category.remove_product_from_category(product)
-
-            # Update XML
-            self.update(category_id, category.name, category.description)
-            return f"Product {product.name} removed from category {category.name}."
-        except (CategoryNotFoundError, ProductNotFoundError) as e:
+            product_element = self._product_element(category_element, product.product_id)
+            if product_element is None:
+                raise ProductNotFoundError(product.product_id)
+
+            category_element.find("products").remove(product_element)
+            self.document.save()
+            return f"Product {product.name} removed from category {category_element.find('name').text}."
+        except (FileNotFoundError, ET.ParseError, CategoryNotFoundError, ProductNotFoundError) as e:
             return str(e)
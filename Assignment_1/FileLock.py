@@ -0,0 +1,87 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows: locks still nest correctly but only guard the current process.
+    fcntl = None
+
+
+class FileLock:
+    """Advisory shared/exclusive lock on ``<filepath>.lock`` using ``fcntl.flock``.
+
+    Re-entrant within a process: nested acquisitions are counted, and asking for a
+    shared lock while holding the exclusive one is a no-op. flock does not tell
+    apart threads sharing one open file, so threads are kept apart by an RLock
+    held for as long as a thread holds the file lock; the ``_held`` stack always
+    belongs to that thread.
+
+    Asking for the exclusive lock while holding only the shared one is not atomic:
+    flock releases the shared lock before granting the exclusive one, and another
+    process can write in between. Anything read under the shared lock has to be
+    loaded again after the upgrade; JSONFileStorage.save refuses a stale write
+    with ConcurrentModificationError.
+    """
+
+    def __init__(self, filepath: str):
+        self.path = filepath + ".lock"
+        self._file = None
+        self._held = []
+        self._mutex = threading.RLock()
+
+    def _flock(self, operation: str):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), getattr(fcntl, operation))
+
+    def _acquire(self, exclusive: bool):
+        self._mutex.acquire()
+        try:
+            if not self._held or (exclusive and not any(self._held)):
+                if self._file is None:
+                    self._file = open(self.path, "a+")
+                self._flock("LOCK_EX" if exclusive else "LOCK_SH")
+        except BaseException:
+            self._mutex.release()
+            raise
+        self._held.append(exclusive)
+
+    def _release(self):
+        try:
+            exclusive = self._held.pop()
+            if not self._held:
+                self._flock("LOCK_UN")
+            elif exclusive and not any(self._held):
+                self._flock("LOCK_SH")
+        finally:
+            self._mutex.release()
+
+    @contextmanager
+    def shared(self):
+        self._acquire(False)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def exclusive(self):
+        self._acquire(True)
+        try:
+            yield
+        finally:
+            self._release()
+
+
+def locked(method):
+    """Runs a handler method under the exclusive lock of ``self.storage``.
+
+    Use it on read-modify-write methods so the load and the save happen as one
+    step with respect to other processes.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.storage.lock.exclusive():
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,86 @@
+import os
+import threading
+from AtomicFile import atomic_write
+from FileLock import FileLock
+from JSONCodec import JSONCodec
+
+MARKS_CODEC = JSONCodec(compact=True)
+
+
+class IdAllocator:
+    """Hands out increasing, never reused ids for one sequence (e.g. "orders").
+
+    Without a file the sequence lives in this process only. With ``filepath`` the
+    high-water mark of every sequence is persisted there as ``{sequence: high}``,
+    and each process leases ``block_size`` ids at a time under the file's lock,
+    then serves them from memory. The mark is saved before any id of a block is
+    handed out, so ids left over when a process exits become gaps, never
+    duplicates.
+
+    ``seed`` returns the highest id already in use; it is called once, the first
+    time a sequence is allocated from, so existing data is never collided with.
+    """
+
+    def __init__(self, sequence: str, filepath: str = None, block_size: int = 1000, seed=None):
+        if block_size < 1:
+            raise ValueError("Block size must be positive.")
+        self.sequence = sequence
+        self.filepath = filepath
+        self.block_size = block_size if filepath is not None else 1
+        self.seed = seed
+        self.lock = FileLock(filepath) if filepath is not None else None
+        self._mutex = threading.Lock()
+        self._next = self._end = 0
+        self._owner = None
+        self._high = None
+
+    def next_id(self) -> int:
+        with self._mutex:
+            # A forked child inherits the parent's block; it must lease its own.
+            if self._next >= self._end or self._owner != os.getpid():
+                self._next, self._end = self._lease()
+                self._owner = os.getpid()
+            allocated = self._next
+            self._next += 1
+            return allocated
+
+    def advance_past(self, used_id: int):
+        """Makes sure ids up to ``used_id``, which the caller assigned itself, are never handed out."""
+        with self._mutex:
+            if self._next <= used_id and self._owner == os.getpid():
+                # Ids of our block above ``used_id`` are still ours to hand out.
+                self._next = min(used_id + 1, self._end)
+            self._lease(minimum=used_id, count=0)
+
+    def _lease(self, minimum: int = 0, count: int = None) -> tuple:
+        """Moves the high-water mark past ``minimum`` and ``count`` more ids; returns those ids as a range."""
+        count = self.block_size if count is None else count
+        if self.filepath is None:
+            if self._high is None:
+                self._high = self.seed() if self.seed is not None else 0
+            start = max(self._high, minimum) + 1
+            self._high = start + count - 1
+            return start, start + count
+
+        seed = None
+        while True:
+            with self.lock.exclusive():
+                marks = self._read()
+                high = marks.get(self.sequence)
+                if high is not None or seed is not None or self.seed is None:
+                    start = max(high or 0, seed or 0, minimum) + 1
+                    if high is None or start + count - 1 > high:
+                        marks[self.sequence] = start + count - 1
+                        with atomic_write(self.filepath, "wb") as file:
+                            file.write(MARKS_CODEC.encode(marks))
+                    return start, start + count
+            # Look at the existing data outside our lock: the seed may take the
+            # data file's own lock, which writers hold while they allocate.
+            seed = self.seed() or 0
+
+    def _read(self) -> dict:
+        try:
+            with open(self.filepath, "rb") as file:
+                return MARKS_CODEC.decode(file.read())
+        except FileNotFoundError:
+            return {}
@@ -2,6 +2,8 @@ from Product import Product, ProductNotFoundError
 
 
 class Inventory:
+    __slots__ = ("products",)
+
     def __init__(self):
         self.products = {}
 
@@ -1,35 +1,37 @@
 import json
 from typing import Optional
 from Product import Product, ProductNotFoundError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
 
 class InventoryNotFoundError(Exception):
     pass
 
 class InventoryJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "inventories", "seller_id", journaled, codec)
 
+    @locked
     def create_inventory(self, seller_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"inventories": []}
 
         if any(inventory["seller_id"] == seller_id for inventory in data["inventories"]):
             raise ValueError(f"Inventory for seller ID {seller_id} already exists.")
 
-        data["inventories"].append({"seller_id": seller_id, "products": []})
-
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        inventory = {"seller_id": seller_id, "products": []}
+        data["inventories"].append(inventory)
+        self.storage.save(data, changed=[inventory])
 
         return f"Inventory created for seller ID {seller_id}."
 
     def get_inventory(self, seller_id: int) -> Optional[dict]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for inventory in data.get("inventories", []):
                 if inventory["seller_id"] == seller_id:
                     return inventory
@@ -37,18 +39,17 @@ class InventoryJSONHandler:
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def delete_inventory(self, seller_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             original_length = len(data.get("inventories", []))
             data["inventories"] = [inventory for inventory in data.get("inventories", []) if inventory["seller_id"] != seller_id]
 
             if len(data["inventories"]) == original_length:
                 raise InventoryNotFoundError(f"No inventory found for seller ID {seller_id}.")
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[seller_id])
 
             return f"Inventory for seller ID {seller_id} deleted."
 
@@ -58,10 +59,10 @@ class InventoryJSONHandler:
             print(e)
             return False
 
+    @locked
     def add_product(self, seller_id: int, product: Product):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for inventory in data.get("inventories", []):
                 if inventory["seller_id"] == seller_id:
@@ -76,8 +77,7 @@ class InventoryJSONHandler:
                         "stock": product.stock
                     })
 
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[inventory])
 
                     return f"Product {product.name} added to inventory."
 
@@ -92,10 +92,10 @@ class InventoryJSONHandler:
             print(e)
             return False
 
+    @locked
     def remove_product(self, seller_id: int, product_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for inventory in data.get("inventories", []):
                 if inventory["seller_id"] == seller_id:
@@ -109,8 +109,7 @@ class InventoryJSONHandler:
                     if not product_found:
                         raise ProductNotFoundError(product_id)
 
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[inventory])
 
                     return f"Product with ID {product_id} removed from inventory."
 
@@ -125,10 +124,10 @@ class InventoryJSONHandler:
             print(e)
             return False
 
+    @locked
     def update_stock(self, seller_id: int, product_id: int, new_stock: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for inventory in data.get("inventories", []):
                 if inventory["seller_id"] == seller_id:
@@ -138,8 +137,7 @@ class InventoryJSONHandler:
                                 raise ValueError("Stock cannot be negative.")
                             product["stock"] = new_stock
 
-                            with open(self.filepath, "w") as file:
-                                json.dump(data, file, indent=4)
+                            self.storage.save(data, changed=[inventory])
 
                             return f"Stock for product {product['name']} updated to {new_stock}."
 
@@ -159,10 +157,10 @@ class InventoryJSONHandler:
             print(e)
             return False
 
+    @locked
     def update_price(self, seller_id: int, product_id: int, new_price: float):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for inventory in data.get("inventories", []):
                 if inventory["seller_id"] == seller_id:
@@ -172,8 +170,7 @@ class InventoryJSONHandler:
                                 raise ValueError("Price cannot be negative.")
                             product["price"] = new_price
 
-                            with open(self.filepath, "w") as file:
-                                json.dump(data, file, indent=4)
+                            self.storage.save(data, changed=[inventory])
 
                             return f"Price for product {product['name']} updated to {new_price:.2f}."
 
@@ -193,10 +190,110 @@ class InventoryJSONHandler:
             print(e)
             return False
 
+    def _find_inventory(self, data: dict, seller_id: int) -> dict:
+        for inventory in data.get("inventories", []):
+            if inventory["seller_id"] == seller_id:
+                return inventory
+        raise InventoryNotFoundError(f"No inventory found for seller ID {seller_id}.")
+
+    @locked
+    def add_products(self, seller_id: int, products: list):
+        try:
+            data = self.storage.load()
+            inventory = self._find_inventory(data, seller_id)
+
+            existing_ids = {existing_product["product_id"] for existing_product in inventory["products"]}
+            added = []
+            for product in products:
+                if product.product_id in existing_ids:
+                    raise ValueError(f"Product with ID {product.product_id} already exists.")
+                existing_ids.add(product.product_id)
+                added.append({
+                    "product_id": product.product_id,
+                    "name": product.name,
+                    "price": product.price,
+                    "stock": product.stock
+                })
+
+            inventory["products"].extend(added)
+            self.storage.save(data, changed=[inventory])
+
+            return f"{len(added)} products added to inventory."
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        except InventoryNotFoundError as e:
+            print(e)
+            return False
+        except ValueError as e:
+            print(e)
+            return False
+
+    @locked
+    def update_stock_many(self, seller_id: int, stocks: dict):
+        try:
+            data = self.storage.load()
+            inventory = self._find_inventory(data, seller_id)
+
+            products = {product["product_id"]: product for product in inventory["products"]}
+            for product_id, new_stock in stocks.items():
+                if product_id not in products:
+                    raise ProductNotFoundError(product_id)
+                if new_stock < 0:
+                    raise ValueError("Stock cannot be negative.")
+
+            for product_id, new_stock in stocks.items():
+                products[product_id]["stock"] = new_stock
+            self.storage.save(data, changed=[inventory])
+
+            return f"Stock updated for {len(stocks)} products."
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        except InventoryNotFoundError as e:
+            print(e)
+            return False
+        except ProductNotFoundError as e:
+            print(e)
+            return False
+        except ValueError as e:
+            print(e)
+            return False
+
+    @locked
+    def update_price_many(self, seller_id: int, prices: dict):
+        try:
+            data = self.storage.load()
+            inventory = self._find_inventory(data, seller_id)
+
+            products = {product["product_id"]: product for product in inventory["products"]}
+            for product_id, new_price in prices.items():
+                if product_id not in products:
+                    raise ProductNotFoundError(product_id)
+                if new_price < 0:
+                    raise ValueError("Price cannot be negative.")
+
+            for product_id, new_price in prices.items():
+                products[product_id]["price"] = new_price
+            self.storage.save(data, changed=[inventory])
+
+            return f"Price updated for {len(prices)} products."
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        except InventoryNotFoundError as e:
+            print(e)
+            return False
+        except ProductNotFoundError as e:
+            print(e)
+            return False
+        except ValueError as e:
+            print(e)
+            return False
+
     def list_products(self, seller_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for inventory in data.get("inventories", []):
                 if inventory["seller_id"] == seller_id:
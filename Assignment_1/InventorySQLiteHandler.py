@@ -0,0 +1,162 @@
+import sqlite3
+from typing import Optional
+from Product import Product, ProductNotFoundError
+from InventoryJSONHandler import InventoryNotFoundError
+from SQLiteStorage import connect
+
+
+class InventorySQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _inventory_exists(self, seller_id: int) -> bool:
+        return self.connection.execute("SELECT 1 FROM inventories WHERE seller_id = ?", (seller_id,)).fetchone() is not None
+
+    def create_inventory(self, seller_id: int):
+        try:
+            with self.connection:
+                self.connection.execute("INSERT INTO inventories (seller_id) VALUES (?)", (seller_id,))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Inventory for seller ID {seller_id} already exists.")
+        return f"Inventory created for seller ID {seller_id}."
+
+    def get_inventory(self, seller_id: int) -> Optional[dict]:
+        if not self._inventory_exists(seller_id):
+            return None
+        rows = self.connection.execute(
+            "SELECT product_id, name, price, stock FROM inventory_products WHERE seller_id = ? ORDER BY rowid", (seller_id,)
+        )
+        return {"seller_id": seller_id, "products": [dict(row) for row in rows]}
+
+    def delete_inventory(self, seller_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM inventories WHERE seller_id = ?", (seller_id,))
+            self.connection.execute("DELETE FROM inventory_products WHERE seller_id = ?", (seller_id,))
+        if cursor.rowcount == 0:
+            print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+            return False
+        return f"Inventory for seller ID {seller_id} deleted."
+
+    def add_product(self, seller_id: int, product: Product):
+        if not self._inventory_exists(seller_id):
+            print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+            return False
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO inventory_products (seller_id, product_id, name, price, stock) VALUES (?, ?, ?, ?, ?)",
+                    (seller_id, product.product_id, product.name, product.price, product.stock)
+                )
+        except sqlite3.IntegrityError:
+            print(f"Product with ID {product.product_id} already exists.")
+            return False
+        return f"Product {product.name} added to inventory."
+
+    def add_products(self, seller_id: int, products: list):
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            if not self._inventory_exists(seller_id):
+                print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+                return False
+            added = set()
+            for product in products:
+                if product.product_id in added or self.connection.execute(
+                        "SELECT 1 FROM inventory_products WHERE seller_id = ? AND product_id = ?",
+                        (seller_id, product.product_id)).fetchone():
+                    print(f"Product with ID {product.product_id} already exists.")
+                    return False
+                added.add(product.product_id)
+            self.connection.executemany(
+                "INSERT INTO inventory_products (seller_id, product_id, name, price, stock) VALUES (?, ?, ?, ?, ?)",
+                [(seller_id, product.product_id, product.name, product.price, product.stock) for product in products]
+            )
+        return f"{len(products)} products added to inventory."
+
+    def remove_product(self, seller_id: int, product_id: int):
+        if not self._inventory_exists(seller_id):
+            print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+            return False
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM inventory_products WHERE seller_id = ? AND product_id = ?", (seller_id, product_id)
+            )
+        if cursor.rowcount == 0:
+            print(ProductNotFoundError(product_id))
+            return False
+        return f"Product with ID {product_id} removed from inventory."
+
+    def _update_product_field(self, seller_id: int, product_id: int, field: str, value):
+        if not self._inventory_exists(seller_id):
+            print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+            return None
+        row = self.connection.execute(
+            "SELECT name FROM inventory_products WHERE seller_id = ? AND product_id = ?", (seller_id, product_id)
+        ).fetchone()
+        if row is None:
+            print(ProductNotFoundError(product_id))
+            return None
+        if value < 0:
+            print(f"{field.capitalize()} cannot be negative.")
+            return None
+        with self.connection:
+            self.connection.execute(
+                f"UPDATE inventory_products SET {field} = ? WHERE seller_id = ? AND product_id = ?",
+                (value, seller_id, product_id)
+            )
+        return row["name"]
+
+    def update_stock(self, seller_id: int, product_id: int, new_stock: int):
+        name = self._update_product_field(seller_id, product_id, "stock", new_stock)
+        if name is None:
+            return False
+        return f"Stock for product {name} updated to {new_stock}."
+
+    def update_price(self, seller_id: int, product_id: int, new_price: float):
+        name = self._update_product_field(seller_id, product_id, "price", new_price)
+        if name is None:
+            return False
+        return f"Price for product {name} updated to {new_price:.2f}."
+
+    def _update_products_field(self, seller_id: int, field: str, values: dict) -> bool:
+        """Sets ``field`` for every product in ``values`` in one transaction, or for none of them."""
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            if not self._inventory_exists(seller_id):
+                print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+                return False
+            for product_id, value in values.items():
+                if self.connection.execute("SELECT 1 FROM inventory_products WHERE seller_id = ? AND product_id = ?",
+                                           (seller_id, product_id)).fetchone() is None:
+                    print(ProductNotFoundError(product_id))
+                    return False
+                if value < 0:
+                    print(f"{field.capitalize()} cannot be negative.")
+                    return False
+            self.connection.executemany(
+                f"UPDATE inventory_products SET {field} = ? WHERE seller_id = ? AND product_id = ?",
+                [(value, seller_id, product_id) for product_id, value in values.items()]
+            )
+        return True
+
+    def update_stock_many(self, seller_id: int, stocks: dict):
+        if not self._update_products_field(seller_id, "stock", stocks):
+            return False
+        return f"Stock updated for {len(stocks)} products."
+
+    def update_price_many(self, seller_id: int, prices: dict):
+        if not self._update_products_field(seller_id, "price", prices):
+            return False
+        return f"Price updated for {len(prices)} products."
+
+    def list_products(self, seller_id: int):
+        inventory = self.get_inventory(seller_id)
+        if inventory is None:
+            print(InventoryNotFoundError(f"No inventory found for seller ID {seller_id}."))
+            return False
+        if not inventory["products"]:
+            return "No products in inventory."
+        return "\n".join(
+            [f"{product['name']} (ID: {product['product_id']}, Price: {product['price']:.2f}, Stock: {product['stock']})"
+             for product in inventory["products"]]
+        )
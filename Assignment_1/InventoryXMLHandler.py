@@ -2,6 +2,7 @@ import xml.etree.ElementTree as ET
 from typing import Optional
 from Product import Product, ProductNotFoundError
 from Inventory import Inventory
+from XMLIndex import IndexedXMLFile
 
 class InventoryNotFoundError(Exception):
     pass
@@ -9,54 +10,51 @@ class InventoryNotFoundError(Exception):
 class InventoryXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "inventory", "seller_id")
 
     def create_inventory(self, seller_id: int):
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            root = self.document.load()
         except (FileNotFoundError, ET.ParseError):
             root = ET.Element("inventories")
+            self.document.reset(root)
 
         # Check if inventory already exists
-        for inventory_element in root.findall("inventory"):
-            if inventory_element.find("seller_id").text == str(seller_id):
-                raise ValueError(f"Inventory for seller ID {seller_id} already exists.")
+        if self.document.get(seller_id) is not None:
+            raise ValueError(f"Inventory for seller ID {seller_id} already exists.")
 
         inventory_element = ET.SubElement(root, "inventory")
         ET.SubElement(inventory_element, "seller_id").text = str(seller_id)
         ET.SubElement(inventory_element, "products")
 
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.add(inventory_element)
+        self.document.save()
 
         return f"Inventory created for seller ID {seller_id}."
 
     def get_inventory(self, seller_id: int) -> Optional[Inventory]:
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-
-            for inventory_element in root.findall("inventory"):
-                if int(inventory_element.find("seller_id").text) == seller_id:
-                    inventory = Inventory()
-
-                    # Load products from XML
-                    products_element = inventory_element.find("products")
-                    for product_element in products_element.findall("product"):
-                        product_id = int(product_element.find("product_id").text)
-                        name = product_element.find("name").text
-                        price = float(product_element.find("price").text)
-                        stock = int(product_element.find("stock").text)
+            self.document.load()
+        except (FileNotFoundError, ET.ParseError):
+            return None
 
-                        product = Product(product_id, name, price, stock)
-                        inventory.add_product(product)
+        inventory_element = self.document.get(seller_id)
+        if inventory_element is None:
+            return None
+        inventory = Inventory()
 
-                    return inventory
+        # Load products from XML
+        products_element = inventory_element.find("products")
+        for product_element in products_element.findall("product"):
+            product_id = int(product_element.find("product_id").text)
+            name = product_element.find("name").text
+            price = float(product_element.find("price").text)
+            stock = int(product_element.find("stock").text)
 
-        except (FileNotFoundError, ET.ParseError):
-            return None
+            product = Product(product_id, name, price, stock)
+            inventory.add_product(product)
 
-        return None
+        return inventory
 
     def update_inventory_stock(self, seller_id: int, product_id: int, new_stock: int):
         inventory = self.get_inventory(seller_id)
@@ -116,25 +114,24 @@ class InventoryXMLHandler:
 
     def _update_inventory_xml(self, seller_id: int, inventory: Inventory):
         try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
+            self.document.load()
 
             # Find the inventory by seller_id
-            for inventory_element in root.findall("inventory"):
-                if int(inventory_element.find("seller_id").text) == seller_id:
-                    products_element = inventory_element.find("products")
-                    # Clear existing products in XML
-                    for product_element in products_element.findall("product"):
-                        products_element.remove(product_element)
-
-                    # Add updated products
-                    for product in inventory.products.values():
-                        product_element = ET.SubElement(products_element, "product")
-                        ET.SubElement(product_element, "product_id").text = str(product.product_id)
-                        ET.SubElement(product_element, "name").text = product.name
-                        ET.SubElement(product_element, "price").text = str(product.price)
-                        ET.SubElement(product_element, "stock").text = str(product.stock)
-
-            tree.write(self.filepath)
+            inventory_element = self.document.get(seller_id)
+            if inventory_element is not None:
+                products_element = inventory_element.find("products")
+                # Clear existing products in XML
+                for product_element in products_element.findall("product"):
+                    products_element.remove(product_element)
+
+                # Add updated products
+                for product in inventory.products.values():
+                    product_element = ET.SubElement(products_element, "product")
+                    ET.SubElement(product_element, "product_id").text = str(product.product_id)
+                    ET.SubElement(product_element, "name").text = product.name
+                    ET.SubElement(product_element, "price").text = str(product.price)
+                    ET.SubElement(product_element, "stock").text = str(product.stock)
+
+            self.document.save()
         except (FileNotFoundError, ET.ParseError) as e:
             print(f"Error updating XML: {e}")
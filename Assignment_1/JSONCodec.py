@@ -0,0 +1,80 @@
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class JSONCodec:
+    """How a JSON document is serialized and compressed on disk.
+
+    The default reproduces the historical ``indent=4`` output. ``compact=True`` drops
+    the whitespace and uses orjson or ujson when installed, falling back to the
+    stdlib. ``compression`` is None, "gzip" or "zstd". Reading detects compression
+    from the file's magic bytes, so any codec can read a file written by another.
+    """
+
+    def __init__(self, compact: bool = False, compression: str = None, level: int = None):
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unknown compression '{compression}'.")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package.")
+        self.compact = compact
+        self.compression = compression
+        self.level = level
+
+    def dumps(self, data) -> bytes:
+        if not self.compact:
+            return json.dumps(data, indent=4).encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        if ujson is not None:
+            return ujson.dumps(data, ensure_ascii=False).encode("utf-8")
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def encode(self, data) -> bytes:
+        raw = self.dumps(data)
+        if self.compression == "gzip":
+            return gzip.compress(raw, compresslevel=self.level or 6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(raw)
+        return raw
+
+    def decode(self, raw: bytes):
+        try:
+            if raw.startswith(GZIP_MAGIC):
+                raw = gzip.decompress(raw)
+            elif raw.startswith(ZSTD_MAGIC):
+                if zstandard is None:
+                    raise ImportError("Reading a zstd-compressed file requires the zstandard package.")
+                raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+        except (OSError, EOFError, getattr(zstandard, "ZstdError", OSError)) as e:
+            # Surface a damaged archive the same way the handlers already treat damaged JSON.
+            raise json.JSONDecodeError(f"Corrupt compressed file: {e}", "", 0)
+
+        if orjson is not None:
+            return orjson.loads(raw)
+        if ujson is not None:
+            try:
+                return ujson.loads(raw)
+            except ValueError as e:
+                raise json.JSONDecodeError(str(e), "", 0)
+        return json.loads(raw)
+
+
+DEFAULT_CODEC = JSONCodec()
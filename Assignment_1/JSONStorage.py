@@ -0,0 +1,169 @@
+import json
+import os
+from AtomicFile import atomic_write, sync_file
+from FileLock import FileLock
+from JSONCodec import JSONCodec, DEFAULT_CODEC
+
+
+class ConcurrentModificationError(Exception):
+    pass
+
+
+def _file_version(filepath: str):
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class JSONFileStorage:
+    """Stores the whole document in one JSON file and atomically replaces it on every save.
+
+    ``load`` records the version (inode, mtime, size) it read; ``save`` refuses to
+    overwrite a file that changed since then and raises ConcurrentModificationError.
+    After a save, ``replaced_version`` is the version that save overwrote, which
+    lets in-memory indexes tell their own last write from someone else's, and
+    ``last_changes`` holds its (changed records, deleted keys), or None when the
+    caller did not say what changed.
+    """
+
+    def __init__(self, filepath: str, codec: JSONCodec = None):
+        self.filepath = filepath
+        self.codec = codec or DEFAULT_CODEC
+        self.lock = FileLock(filepath)
+        self.version = None
+        self.replaced_version = None
+        self.last_changes = None
+
+    def current_version(self):
+        return _file_version(self.filepath)
+
+    def load(self) -> dict:
+        with self.lock.shared():
+            self.version = self.current_version()
+            with open(self.filepath, "rb") as file:
+                return self.codec.decode(file.read())
+
+    def save(self, data: dict, changed: list = None, deleted: list = None):
+        with self.lock.exclusive():
+            if self.current_version() != self.version:
+                raise ConcurrentModificationError(f"{self.filepath} was modified by another writer since it was read.")
+            self._write(data, changed, deleted)
+            self.replaced_version = self.version
+            self.version = self.current_version()
+            self.last_changes = None if changed is None and deleted is None else (changed or [], deleted or [])
+
+    def _write(self, data: dict, changed: list = None, deleted: list = None):
+        with atomic_write(self.filepath, "wb") as file:
+            file.write(self.codec.encode(data))
+
+
+class JournaledJSONStorage(JSONFileStorage):
+    """Snapshot file plus an append-only JSON-lines log of record mutations.
+
+    Every save appends one line to ``<filepath>.log``: a single put/delete, or a
+    batch of them when several records change together.
+    Reads replay the log over the snapshot, and once the log grows past
+    ``compact_threshold`` records it is folded back into the snapshot.
+    """
+
+    def __init__(self, filepath: str, collection: str, key: str, compact_threshold: int = 1000,
+                 codec: JSONCodec = None):
+        super().__init__(filepath, codec)
+        self.log_path = filepath + ".log"
+        self.collection = collection
+        self.key = key
+        self.compact_threshold = compact_threshold
+        self._log_records = None
+
+    def current_version(self):
+        return _file_version(self.filepath), _file_version(self.log_path)
+
+    def load(self) -> dict:
+        with self.lock.shared():
+            try:
+                data = super().load()
+            except FileNotFoundError:
+                if not os.path.exists(self.log_path):
+                    raise
+                data = {self.collection: []}
+
+            records = {record[self.key]: record for record in data.get(self.collection, [])}
+            self._log_records = 0
+            for line in self._read_log():
+                for entry in line["entries"] if line["op"] == "batch" else [line]:
+                    if entry["op"] == "put":
+                        records[entry["record"][self.key]] = entry["record"]
+                    elif entry["op"] == "delete":
+                        records.pop(entry["key"], None)
+                    self._log_records += 1
+        data[self.collection] = list(records.values())
+        return data
+
+    def _read_log(self):
+        try:
+            with open(self.log_path, "r") as file:
+                for line in file:
+                    if not line.endswith("\n"):
+                        return
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn tail left by a crash mid-append is not a committed mutation.
+                        return
+        except FileNotFoundError:
+            return
+
+    def _write(self, data: dict, changed: list = None, deleted: list = None):
+        if changed is None and deleted is None:
+            self._compact(data)
+            return
+
+        entries = [{"op": "put", "record": record} for record in changed or []]
+        entries += [{"op": "delete", "key": key} for key in deleted or []]
+        if not entries:
+            return
+        # A multi-record save goes out as one line so a torn append drops the whole batch, not half of it.
+        line = entries[0] if len(entries) == 1 else {"op": "batch", "entries": entries}
+        with open(self.log_path, "a+b") as file:
+            self._drop_torn_tail(file)
+            file.write(json.dumps(line).encode() + b"\n")
+            sync_file(file)
+
+        if self._log_records is None:
+            self._log_records = sum(len(line["entries"]) if line["op"] == "batch" else 1 for line in self._read_log())
+        else:
+            self._log_records += len(entries)
+        if self._log_records >= self.compact_threshold:
+            self._compact(data)
+
+    @staticmethod
+    def _drop_torn_tail(file):
+        """Cuts a partial last line left by a crash mid-append, so the next line is not glued onto it."""
+        end = file.seek(0, os.SEEK_END)
+        if not end:
+            return
+        file.seek(end - 1)
+        if file.read(1) != b"\n":
+            file.seek(0)
+            file.truncate(file.read().rfind(b"\n") + 1)
+
+    def compact(self, data: dict = None):
+        with self.lock.exclusive():
+            if data is None:
+                data = self.load()
+            self.save(data)
+
+    def _compact(self, data: dict):
+        super()._write(data)
+        with open(self.log_path, "w"):
+            pass
+        self._log_records = 0
+
+
+def open_storage(filepath: str, collection: str, key: str, journaled: bool = False,
+                 codec: JSONCodec = None) -> JSONFileStorage:
+    if journaled:
+        return JournaledJSONStorage(filepath, collection, key, codec=codec)
+    return JSONFileStorage(filepath, codec)
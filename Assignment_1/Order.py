@@ -1,5 +1,6 @@
 from Cart import Cart
 from Address import Address
+from IdAllocator import IdAllocator
 
 
 class InvalidOrderStatusError(Exception):
@@ -13,13 +14,15 @@ class OrderNotFoundError(Exception):
 
 
 class Order:
+    __slots__ = ("order_id", "user_id", "cart", "total_amount", "status", "address", "payment_method")
+
     def __init__(self, order_id: int, user_id: int, cart: Cart, address: Address, payment_method: str):
         if not cart.products:
             raise ValueError("Cart is empty. Cannot create an order.")
         self.order_id = order_id
         self.user_id = user_id
         self.cart = cart
-        self.total_amount = sum(p.price * q for p, q in cart.products.items())
+        self.total_amount = cart.subtotal
         if self.total_amount <= 0:
             raise ValueError("Total amount must be greater than zero.")
         self.status = "Pending"
@@ -45,18 +48,17 @@ class Order:
 
 
 class OrderManager:
-    def __init__(self):
+    def __init__(self, ids: IdAllocator = None):
         self.orders = {}
-        self.current_order_id = 1
+        self.ids = ids or IdAllocator("orders")
 
     def create_order(self, user_id: int, cart: Cart, address: Address, payment_method: str):
         if not address:
             raise ValueError("Address cannot be empty.")
         if not payment_method:
             raise ValueError("Payment method is required.")
-        order = Order(self.current_order_id, user_id, cart, address, payment_method)
-        self.orders[self.current_order_id] = order
-        self.current_order_id += 1
+        order = Order(self.ids.next_id(), user_id, cart, address, payment_method)
+        self.orders[order.order_id] = order
         return order
 
     def read_order_by_id(self, order_id: int):
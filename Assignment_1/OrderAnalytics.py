@@ -0,0 +1,134 @@
+import heapq
+from array import array
+from XMLIndex import iter_elements
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GROUP_KEYS = ("user_id", "status", "day")
+
+
+def _encode(labels: dict, value) -> int:
+    code = labels.get(value)
+    if code is None:
+        code = labels[value] = len(labels)
+    return code
+
+
+class OrderAnalytics:
+    """Column-oriented revenue analytics over stored orders.
+
+    Orders are loaded once into flat columns (user id, amount, dictionary-encoded
+    status and day). With NumPy installed every group-by is a ``bincount`` over
+    those columns; without it the same columns are aggregated in one pass each.
+    ``day`` is the date part of ``created_at``; orders stored before that field
+    existed are grouped under None.
+    """
+
+    def __init__(self, user_ids, amounts, status_codes, statuses: list, day_codes, days: list):
+        if np is not None:
+            self.user_ids = np.asarray(user_ids, dtype=np.int64)
+            self.amounts = np.asarray(amounts, dtype=np.float64)
+            self.status_codes = np.asarray(status_codes, dtype=np.int32)
+            self.day_codes = np.asarray(day_codes, dtype=np.int32)
+        else:
+            self.user_ids = array("q", user_ids)
+            self.amounts = array("d", amounts)
+            self.status_codes = array("i", status_codes)
+            self.day_codes = array("i", day_codes)
+        self.statuses = statuses
+        self.days = days
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds the columns from order dicts as stored by OrderJSONHandler."""
+        user_ids, amounts, status_codes, day_codes = array("q"), array("d"), array("i"), array("i")
+        statuses, days = {}, {}
+        for record in records:
+            user_ids.append(record["user_id"])
+            amounts.append(record["total_amount"])
+            status_codes.append(_encode(statuses, record["status"]))
+            created_at = record.get("created_at")
+            day_codes.append(_encode(days, created_at[:10] if created_at else None))
+        return cls(user_ids, amounts, status_codes, list(statuses), day_codes, list(days))
+
+    @classmethod
+    def from_json_handler(cls, handler):
+        return cls.from_records(handler.get_all_orders(fields=["user_id", "total_amount", "status", "created_at"]))
+
+    @classmethod
+    def from_xml_handler(cls, handler):
+        """Streams the handler's file, so the XML tree is never held in memory."""
+        def records():
+            for element in iter_elements(handler.filepath, "order"):
+                yield {
+                    "user_id": int(element.findtext("user_id")),
+                    "total_amount": float(element.findtext("total_amount")),
+                    "status": element.findtext("status"),
+                    "created_at": element.findtext("created_at"),
+                }
+        return cls.from_records(records())
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def _groups(self, key: str):
+        """Returns (labels, codes) so that ``labels[codes[i]]`` is order i's group."""
+        if key == "status":
+            return self.statuses, self.status_codes
+        if key == "day":
+            return self.days, self.day_codes
+        if key != "user_id":
+            raise ValueError(f"Cannot group orders by '{key}', expected one of {GROUP_KEYS}.")
+        if np is not None:
+            labels, codes = np.unique(self.user_ids, return_inverse=True)
+            return labels.tolist(), codes
+        labels = {}
+        return labels, array("i", (_encode(labels, user_id) for user_id in self.user_ids))
+
+    def _sums_and_counts(self, key: str):
+        if key == "user_id" and np is None and len(self.user_ids):
+            # Without NumPy, use the ids themselves as list slots (a hand-rolled bincount)
+            # when they are dense enough; hashing 10M random keys is several times slower.
+            low, high = min(self.user_ids), max(self.user_ids)
+            if low >= 0 and high <= 4 * len(self.user_ids):
+                sums, counts = [0.0] * (high + 1), [0] * (high + 1)
+                for user_id, amount in zip(self.user_ids, self.amounts):
+                    sums[user_id] += amount
+                    counts[user_id] += 1
+                present = [user_id for user_id in range(high + 1) if counts[user_id]]
+                return present, [sums[user_id] for user_id in present], [counts[user_id] for user_id in present]
+
+        labels, codes = self._groups(key)
+        if np is not None:
+            sums = np.bincount(codes, weights=self.amounts, minlength=len(labels)).tolist()
+            counts = np.bincount(codes, minlength=len(labels)).tolist()
+        else:
+            sums, counts = [0.0] * len(labels), [0] * len(labels)
+            for code, amount in zip(codes, self.amounts):
+                sums[code] += amount
+                counts[code] += 1
+        return list(labels), sums, counts
+
+    def total_revenue(self) -> float:
+        return float(self.amounts.sum()) if np is not None else sum(self.amounts)
+
+    def revenue_by(self, key: str) -> dict:
+        labels, sums, _ = self._sums_and_counts(key)
+        return dict(zip(labels, sums))
+
+    def order_count_by(self, key: str) -> dict:
+        labels, _, counts = self._sums_and_counts(key)
+        return dict(zip(labels, counts))
+
+    def average_basket_by(self, key: str) -> dict:
+        """Mean order value per group."""
+        labels, sums, counts = self._sums_and_counts(key)
+        return {label: total / count for label, total, count in zip(labels, sums, counts) if count}
+
+    def top_customers(self, limit: int = 10) -> list:
+        """The ``limit`` users with the highest revenue, as (user_id, revenue) pairs."""
+        revenue = self.revenue_by("user_id")
+        return heapq.nlargest(limit, revenue.items(), key=lambda item: item[1])
@@ -1,22 +1,115 @@
 import json
+from datetime import datetime
 from typing import Optional
 from Cart import Cart
 from Address import Address
+from Product import Product
 from Order import Order, InvalidOrderStatusError, OrderNotFoundError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
+from RecordIndex import RecordIndex
+from RecordOffsets import RecordOffsets
+from Paging import iter_pages
+from IdAllocator import IdAllocator
+
+
+class LazyOrder:
+    """Read-only view over a stored order record.
+
+    Scalar fields and the line items come straight from the record; the Address
+    and the full Order are built only when first accessed, and any other Order
+    attribute is looked up on that Order.
+    """
+
+    __slots__ = ("_data", "_handler", "_address", "_order")
+
+    def __init__(self, order_data: dict, handler: "OrderJSONHandler"):
+        self._data = order_data
+        self._handler = handler
+        self._address = None
+        self._order = None
+
+    @property
+    def order_id(self):
+        return self._data["order_id"]
+
+    @property
+    def user_id(self):
+        return self._data["user_id"]
+
+    @property
+    def total_amount(self):
+        return self._data["total_amount"]
+
+    @property
+    def status(self):
+        return self._data["status"]
+
+    @property
+    def payment_method(self):
+        return self._data["payment_method"]
+
+    @property
+    def created_at(self):
+        return self._data.get("created_at")
+
+    @property
+    def items(self) -> list:
+        """(product_id, unit_price, quantity) per line, prices as they were when the order was placed."""
+        return [tuple(item) for item in self._data.get("items", [])]
+
+    @property
+    def address(self) -> Address:
+        if self._address is None:
+            address_data = self._data["address"]
+            self._address = Address(None, self._data["user_id"], address_data["city"], address_data["street"],
+                                    address_data["house"], address_data["apartment"])
+        return self._address
+
+    @property
+    def order(self) -> Order:
+        if self._order is None:
+            self._order = self._handler._order_from_data(self._data)
+        return self._order
+
+    def __getattr__(self, name):
+        # Anything else (cart, place_order, ...) comes from the full Order, built on first use.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.order, name)
+
+    def __repr__(self):
+        return (f"LazyOrder(order_id={self.order_id}, user_id={self.user_id}, total_amount={self.total_amount}, "
+                f"status='{self.status}')")
+
 
 class OrderJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "orders", "order_id", journaled, codec)
+        # Persisted to <filepath>.idx so user and status lookups skip the document scan.
+        self.index = RecordIndex(self.storage, "orders", "order_id", ("user_id", "status"))
+        self.offsets = RecordOffsets(self.storage, "orders", "order_id")
+        self.ids = IdAllocator("orders", filepath + ".ids", seed=self._highest_id)
 
+    def _highest_id(self) -> int:
+        try:
+            return max((order_data["order_id"] for order_data in self.storage.load().get("orders", [])), default=0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+    @locked
     def create_order(self, user_id: int, cart: Cart, address: Address, payment_method: str) -> Order:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"orders": []}
+        self.index.refresh()
 
-        order = Order(len(data["orders"]) + 1, user_id, cart, address, payment_method)
-        data["orders"].append({
+        order_id = self.ids.next_id()
+        order = Order(order_id, user_id, cart, address, payment_method)
+        order_data = {
             "order_id": order.order_id,
             "user_id": order.user_id,
             "total_amount": order.total_amount,
@@ -27,44 +120,59 @@ class OrderJSONHandler:
                 "house": address.house if address else None,
                 "apartment": address.apartment if address else None,
             },
-            "payment_method": order.payment_method
-        })
+            "payment_method": order.payment_method,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            # Compact [product_id, unit_price, quantity] lines, so reads never need the product catalog.
+            "items": [[product.product_id, product.price, quantity] for product, quantity in cart.products.items()]
+        }
+        data["orders"].append(order_data)
+        self.storage.save(data, changed=[order_data])
+        self.index.update(new_record=order_data)
 
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        return order
 
+    def _order_from_data(self, order_data: dict) -> Order:
+        address_data = order_data["address"]
+        address = Address(None, order_data["user_id"], address_data["city"], address_data["street"],
+                          address_data["house"], address_data["apartment"])
+        # The cart is rebuilt from the price snapshots; stock is not part of an order.
+        cart = Cart(order_data["user_id"], order_data["order_id"])
+        if "items" in order_data:
+            for product_id, unit_price, quantity in order_data["items"]:
+                cart.load_item(Product(product_id, None, None, unit_price, 0), quantity)
+        else:
+            # Orders stored before their lines were kept: one placeholder line carrying the stored total.
+            cart.load_item(Product(None, "Unrecorded items", None, order_data["total_amount"], 0), 1)
+        order = Order(order_data["order_id"], order_data["user_id"], cart, address, order_data["payment_method"])
+        order.status = order_data["status"]
         return order
 
     def read_order_by_id(self, order_id: int) -> Optional[Order]:
+        order_data = self._record(order_id)
+        return self._order_from_data(order_data) if order_data is not None else None
+
+    def get_order_view(self, order_id: int) -> Optional[LazyOrder]:
+        """The stored order as a read-only LazyOrder, without building its cart."""
+        order_data = self._record(order_id)
+        return LazyOrder(order_data, self) if order_data is not None else None
+
+    def _record(self, order_id: int) -> Optional[dict]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-
-            for order_data in data["orders"]:
-                if order_data["order_id"] == order_id:
-                    address = Address(
-                        order_data["address"]["street"],
-                        order_data["address"]["city"],
-                        order_data["address"]["house"],
-                        order_data["address"]["apartment"]
-                    )
-                    cart = Cart()
-                    cart.load_from_json(order_data.get("cart", []))
-                    order = Order(order_data["order_id"], order_data["user_id"], cart, address, order_data["payment_method"])
-                    order.status = order_data["status"]
-                    return order
-            return None
+            return self.offsets.get(order_id)
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update_order(self, order_id: int, status: str = None, address: Address = None, payment_method: str = None) -> Optional[Order]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
+
+            self.index.refresh()
 
             order_data = next((order for order in data["orders"] if order["order_id"] == order_id), None)
             if not order_data:
                 raise OrderNotFoundError(order_id)
+            old_order_data = dict(order_data)
 
             if status:
                 if status not in ["Pending", "Placed", "Cancelled", "Completed"]:
@@ -80,19 +188,11 @@ class OrderJSONHandler:
             if payment_method:
                 order_data["payment_method"] = payment_method
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
-
-            address_obj = Address(
-                order_data["address"]["street"],
-                order_data["address"]["city"],
-                order_data["address"]["house"],
-                order_data["address"]["apartment"]
-            )
-            cart = Cart()
-            cart.load_from_json(order_data.get("cart", []))
-            order = Order(order_data["order_id"], order_data["user_id"], cart, address_obj, order_data["payment_method"])
-            order.status = order_data["status"]
+            # Built before saving, so a record that cannot be hydrated fails the call without writing it.
+            order = self._order_from_data(order_data)
+            self.storage.save(data, changed=[order_data])
+            self.index.update(old_order_data, order_data)
+
             return order
 
         except (FileNotFoundError, json.JSONDecodeError) as e:
@@ -102,19 +202,19 @@ class OrderJSONHandler:
             print(e)
             return None
 
+    @locked
     def delete_order(self, order_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-
-            original_length = len(data["orders"])
-            data["orders"] = [order for order in data["orders"] if order["order_id"] != order_id]
+            data = self.storage.load()
+            self.index.refresh()
 
-            if len(data["orders"]) == original_length:
+            order_data = next((order for order in data["orders"] if order["order_id"] == order_id), None)
+            if not order_data:
                 raise OrderNotFoundError(order_id)
+            data["orders"].remove(order_data)
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[order_id])
+            self.index.update(old_record=order_data)
 
             return f"Order {order_id} deleted."
 
@@ -125,50 +225,43 @@ class OrderJSONHandler:
             print(e)
             return None
 
-    def get_all_orders(self):
+    def get_all_orders(self, lazy: bool = False, fields: list = None, limit: int = None, after_id: int = None):
+        """Returns every order as an Order, a LazyOrder (``lazy=True``), or a dict
+        holding only ``fields`` when a projection is given. ``limit``/``after_id``
+        return one page ordered by id instead."""
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-
-            orders = []
-            for order_data in data["orders"]:
-                address = Address(
-                    order_data["address"]["street"],
-                    order_data["address"]["city"],
-                    order_data["address"]["house"],
-                    order_data["address"]["apartment"]
-                )
-                cart = Cart()
-                cart.load_from_json(order_data.get("cart", []))
-                order = Order(order_data["order_id"], order_data["user_id"], cart, address, order_data["payment_method"])
-                order.status = order_data["status"]
-                orders.append(order)
-            return orders
+            if limit is None and after_id is None:
+                records = self.storage.load()["orders"]
+            else:
+                records = self.offsets.page(after_id, limit)
+
+            if fields is not None:
+                return [{field: order_data.get(field) for field in fields} for order_data in records]
+            if lazy:
+                return [LazyOrder(order_data, self) for order_data in records]
+            return [self._order_from_data(order_data) for order_data in records]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
 
+    def iter_orders(self, lazy: bool = False, batch_size: int = 1000):
+        return iter_pages(lambda limit, after_id: self.get_all_orders(lazy, limit=limit, after_id=after_id),
+                          lambda order: order.order_id, batch_size)
+
+    def get_order_ids_by_user(self, user_id: int) -> list:
+        return self.index.lookup("user_id", user_id)
+
+    def get_order_ids_by_status(self, status: str) -> list:
+        return self.index.lookup("status", status)
+
     def get_orders_by_user(self, user_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-
-            user_orders = [order for order in data["orders"] if order["user_id"] == user_id]
-            if not user_orders:
-                raise ValueError(f"No orders found for user ID {user_id}.")
-            orders = []
-            for order_data in user_orders:
-                address = Address(
-                    order_data["address"]["street"],
-                    order_data["address"]["city"],
-                    order_data["address"]["house"],
-                    order_data["address"]["apartment"]
-                )
-                cart = Cart()
-                cart.load_from_json(order_data.get("cart", []))
-                order = Order(order_data["order_id"], order_data["user_id"], cart, address, order_data["payment_method"])
-                order.status = order_data["status"]
-                orders.append(order)
-            return orders
+            # One shared lock, so the records read are the ones the index pointed at.
+            with self.storage.lock.shared():
+                order_ids = self.get_order_ids_by_user(user_id)
+                if not order_ids:
+                    raise ValueError(f"No orders found for user ID {user_id}.")
+                user_orders = self.offsets.get_many(order_ids)
+            return [self._order_from_data(order_data) for order_data in user_orders]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
         except ValueError as e:
@@ -0,0 +1,155 @@
+from typing import Optional
+from Cart import Cart
+from Address import Address
+from Order import Order, OrderNotFoundError
+from Product import Product
+from OrderJSONHandler import LazyOrder
+from SQLiteStorage import connect, page_query
+from Paging import iter_pages
+
+
+class OrderSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _items_by_order(self, order_ids: list) -> dict:
+        items = {order_id: [] for order_id in order_ids}
+        # Stay below SQLite's bound-parameter limit on big result sets.
+        for start in range(0, len(order_ids), 500):
+            chunk = order_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.connection.execute(
+                    f"SELECT * FROM order_items WHERE order_id IN ({placeholders})", chunk):
+                items[row["order_id"]].append(row)
+        return items
+
+    def _rows_to_orders(self, rows) -> list:
+        rows = list(rows)
+        items = self._items_by_order([row["order_id"] for row in rows])
+        orders = []
+        for row in rows:
+            cart = Cart(row["user_id"], row["order_id"])
+            for item in items[row["order_id"]]:
+                product = Product(item["product_id"], item["name"], item["category"], item["price"], 0)
+                cart.load_item(product, item["quantity"])
+            address = Address(row["address_id"], row["user_id"], row["city"], row["street"], row["house"], row["apartment"])
+            order = Order(row["order_id"], row["user_id"], cart, address, row["payment_method"])
+            order.status = row["status"]
+            orders.append(order)
+        return orders
+
+    def create_order(self, user_id: int, cart: Cart, address: Address, payment_method: str) -> Order:
+        order = Order(None, user_id, cart, address, payment_method)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO orders (user_id, total_amount, status, address_id, city, street, house, apartment, payment_method) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (order.user_id, order.total_amount, order.status,
+                 address.address_id if address else None,
+                 address.city if address else None,
+                 address.street if address else None,
+                 address.house if address else None,
+                 address.apartment if address else None,
+                 order.payment_method)
+            )
+            order.order_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO order_items (order_id, product_id, name, category, price, quantity) VALUES (?, ?, ?, ?, ?, ?)",
+                [(order.order_id, product.product_id, product.name, product.category, product.price, quantity)
+                 for product, quantity in cart.products.items()]
+            )
+        return order
+
+    def read_order_by_id(self, order_id: int) -> Optional[Order]:
+        row = self.connection.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        if row is None:
+            return None
+        return self._rows_to_orders([row])[0]
+
+    def update_order(self, order_id: int, status: str = None, address: Address = None, payment_method: str = None) -> Optional[Order]:
+        if status and status not in ["Pending", "Placed", "Cancelled", "Completed"]:
+            raise ValueError("Invalid status value.")
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE orders SET status = COALESCE(?, status), payment_method = COALESCE(?, payment_method) "
+                "WHERE order_id = ?",
+                (status or None, payment_method or None, order_id)
+            )
+            if address and cursor.rowcount:
+                self.connection.execute(
+                    "UPDATE orders SET address_id = ?, city = ?, street = ?, house = ?, apartment = ? WHERE order_id = ?",
+                    (address.address_id, address.city, address.street, address.house, address.apartment, order_id)
+                )
+        if cursor.rowcount == 0:
+            print(OrderNotFoundError(order_id))
+            return None
+        return self.read_order_by_id(order_id)
+
+    def delete_order(self, order_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
+            self.connection.execute("DELETE FROM order_items WHERE order_id = ?", (order_id,))
+        if cursor.rowcount == 0:
+            print(OrderNotFoundError(order_id))
+            return None
+        return f"Order {order_id} deleted."
+
+    def _rows_to_data(self, rows, with_items: bool = True) -> list:
+        """Orders as the records OrderJSONHandler stores, for LazyOrder views and ``fields`` projections."""
+        rows = list(rows)
+        items = self._items_by_order([row["order_id"] for row in rows]) if with_items else {}
+        return [
+            {
+                "order_id": row["order_id"],
+                "user_id": row["user_id"],
+                "total_amount": row["total_amount"],
+                "status": row["status"],
+                "address": {"city": row["city"], "street": row["street"], "house": row["house"],
+                            "apartment": row["apartment"]},
+                "payment_method": row["payment_method"],
+                "items": [[item["product_id"], item["price"], item["quantity"]] for item in items.get(row["order_id"], [])]
+            }
+            for row in rows
+        ]
+
+    def _order_from_data(self, order_data: dict) -> Order:
+        # LazyOrder.order: the rows still hold the product names the record above leaves out.
+        return self.read_order_by_id(order_data["order_id"])
+
+    def get_order_view(self, order_id: int) -> Optional[LazyOrder]:
+        """The stored order as a read-only LazyOrder, without building its cart."""
+        row = self.connection.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return LazyOrder(self._rows_to_data([row])[0], self) if row is not None else None
+
+    def get_all_orders(self, lazy: bool = False, fields: list = None, limit: int = None, after_id: int = None):
+        """Returns every order as an Order, a LazyOrder (``lazy=True``), or a dict
+        holding only ``fields`` when a projection is given. ``limit``/``after_id``
+        return one page ordered by id instead."""
+        rows = self.connection.execute(*page_query("orders", "order_id", after_id, limit))
+        if fields is not None:
+            records = self._rows_to_data(rows, with_items="items" in fields)
+            return [{field: order_data.get(field) for field in fields} for order_data in records]
+        if lazy:
+            return [LazyOrder(order_data, self) for order_data in self._rows_to_data(rows)]
+        return self._rows_to_orders(rows)
+
+    def iter_orders(self, lazy: bool = False, batch_size: int = 1000):
+        return iter_pages(lambda limit, after_id: self.get_all_orders(lazy, limit=limit, after_id=after_id),
+                          lambda order: order.order_id, batch_size)
+
+    def get_order_ids_by_user(self, user_id: int) -> list:
+        return [row[0] for row in self.connection.execute(
+            "SELECT order_id FROM orders WHERE user_id = ? ORDER BY order_id", (user_id,))]
+
+    def get_order_ids_by_status(self, status: str) -> list:
+        return [row[0] for row in self.connection.execute(
+            "SELECT order_id FROM orders WHERE status = ? ORDER BY order_id", (status,))]
+
+    def get_orders_by_user(self, user_id: int):
+        orders = self._rows_to_orders(
+            self.connection.execute("SELECT * FROM orders WHERE user_id = ? ORDER BY order_id", (user_id,))
+        )
+        if not orders:
+            print(f"No orders found for user ID {user_id}.")
+        return orders
@@ -1,27 +1,33 @@
+import re
 import xml.etree.ElementTree as ET
+from datetime import datetime
 from Cart import Cart
 from Address import Address
 from Order import Order, OrderNotFoundError
 from Product import Product
+from IdAllocator import IdAllocator
+from XMLIndex import IndexedXMLFile, iter_elements
+
+# Orders written before addresses were stored field by field hold repr(Address) as text.
+_ADDRESS_REPR = re.compile(r"Address\(address_id=(.*), user_id=(.*), city=(.*), street=(.*), house=(.*), apartment=(.*)\)")
 
 
 class OrderXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "order", "order_id")
+        self.ids = IdAllocator("orders", filepath + ".ids", seed=lambda: max(self.document.index, default=0))
 
     def _load_orders(self):
         try:
-            tree = ET.parse(self.filepath)
-            return tree.getroot()
+            return self.document.load()
         except (FileNotFoundError, ET.ParseError):
-            root = ET.Element("orders")
-            tree = ET.ElementTree(root)
-            tree.write(self.filepath)
-            return root
+            self.document.reset(ET.Element("orders"))
+            self.document.save()
+            return self.document.root
 
     def _save_orders(self, root):
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.save()
 
     def create_order(self, user_id: int, cart: Cart, address: Address, payment_method: str):
         if not address:
@@ -31,7 +37,7 @@ class OrderXMLHandler:
 
         root = self._load_orders()
 
-        order_id = len(root.findall("order")) + 1
+        order_id = self.ids.next_id()
         order = Order(order_id, user_id, cart, address, payment_method)
 
         # Create new order XML element
@@ -41,7 +47,8 @@ class OrderXMLHandler:
         ET.SubElement(order_element, "total_amount").text = str(order.total_amount)
         ET.SubElement(order_element, "status").text = order.status
         ET.SubElement(order_element, "payment_method").text = order.payment_method
-        ET.SubElement(order_element, "address").text = str(order.address)
+        self._write_address(ET.SubElement(order_element, "address"), order.address)
+        ET.SubElement(order_element, "created_at").text = datetime.now().isoformat(timespec="seconds")
 
         # Adding cart items to the XML
         cart_element = ET.SubElement(order_element, "cart")
@@ -49,84 +56,111 @@ class OrderXMLHandler:
             product_element = ET.SubElement(cart_element, "product")
             ET.SubElement(product_element, "product_id").text = str(product.product_id)
             ET.SubElement(product_element, "name").text = product.name
+            ET.SubElement(product_element, "category").text = product.category
             ET.SubElement(product_element, "price").text = str(product.price)
             ET.SubElement(product_element, "quantity").text = str(quantity)
 
+        self.document.add(order_element)
         self._save_orders(root)
         return order
 
     def read_order_by_id(self, order_id: int):
-        root = self._load_orders()
-
-        for order_element in root.findall("order"):
-            if int(order_element.find("order_id").text) == order_id:
-                user_id = int(order_element.find("user_id").text)
-                total_amount = float(order_element.find("total_amount").text)
-                status = order_element.find("status").text
-                payment_method = order_element.find("payment_method").text
-                address = order_element.find("address").text  # Assuming Address class is properly handled
-
-                # Retrieve cart items
-                cart = Cart(user_id, order_id)
-                cart_element = order_element.find("cart")
-                for product_element in cart_element.findall("product"):
-                    product_id = int(product_element.find("product_id").text)
-                    name = product_element.find("name").text
-                    price = float(product_element.find("price").text)
-                    quantity = int(product_element.find("quantity").text)
+        self._load_orders()
+
+        order_element = self.document.get(order_id)
+        if order_element is None:
+            raise OrderNotFoundError(order_id)
+        return self._element_to_order(order_element)
+
+    @staticmethod
+    def _write_address(address_element, address: Address):
+        address_element.clear()
+        ET.SubElement(address_element, "address_id").text = str(address.address_id)
+        ET.SubElement(address_element, "user_id").text = str(address.user_id)
+        ET.SubElement(address_element, "city").text = address.city
+        ET.SubElement(address_element, "street").text = address.street
+        ET.SubElement(address_element, "house").text = str(address.house)
+        ET.SubElement(address_element, "apartment").text = str(address.apartment)
+
+    @staticmethod
+    def _element_to_address(address_element, user_id: int) -> Address:
+        if address_element.find("city") is not None:
+            fields = [address_element.findtext(tag) for tag in
+                      ("address_id", "user_id", "city", "street", "house", "apartment")]
+        else:
+            match = _ADDRESS_REPR.fullmatch(address_element.text or "")
+            fields = list(match.groups()) if match else [None, None, address_element.text, None, None, None]
+        address_id, _, city, street, house, apartment = [None if value == "None" else value for value in fields]
+
+        def number(value):
+            return int(value) if value is not None and value.isdigit() else value
+        return Address(number(address_id), user_id, city, street, number(house), number(apartment))
+
+    def _element_to_order(self, order_element):
+        order_id = int(order_element.find("order_id").text)
+        user_id = int(order_element.find("user_id").text)
+        status = order_element.find("status").text
+        payment_method = order_element.find("payment_method").text
+        address = self._element_to_address(order_element.find("address"), user_id)
+
+        # Rebuild the cart from the stored lines; loading them must not touch any stock.
+        cart = Cart(user_id, order_id)
+        for product_element in order_element.find("cart").findall("product"):
+            product = Product(int(product_element.find("product_id").text),
+                              product_element.findtext("name"),
+                              product_element.findtext("category"),
+                              float(product_element.find("price").text),
+                              0)
+            cart.load_item(product, int(product_element.find("quantity").text))
 
-                    product = Product(product_id, name, price, quantity)
-                    cart.add_to_cart(product, quantity)
-
-                return Order(order_id, user_id, cart, Address(address), payment_method)
-
-        raise OrderNotFoundError(order_id)
+        order = Order(order_id, user_id, cart, address, payment_method)
+        order.status = status
+        return order
 
     def update_order(self, order_id: int, status: str = None, address: Address = None, payment_method: str = None):
+        if status and status not in ["Pending", "Placed", "Cancelled", "Completed"]:
+            raise ValueError("Invalid status value.")
         root = self._load_orders()
 
-        for order_element in root.findall("order"):
-            if int(order_element.find("order_id").text) == order_id:
-                if status:
-                    if status not in ["Pending", "Placed", "Cancelled", "Completed"]:
-                        raise ValueError("Invalid status value.")
-                    order_element.find("status").text = status
-                if address:
-                    order_element.find("address").text = str(address)
-                if payment_method:
-                    order_element.find("payment_method").text = payment_method
-
-                self._save_orders(root)
-                return self.read_order_by_id(order_id)
+        order_element = self.document.get(order_id)
+        if order_element is None:
+            raise OrderNotFoundError(order_id)
+        if status:
+            order_element.find("status").text = status
+        if address:
+            self._write_address(order_element.find("address"), address)
+        if payment_method:
+            order_element.find("payment_method").text = payment_method
 
-        raise OrderNotFoundError(order_id)
+        self._save_orders(root)
+        return self._element_to_order(order_element)
 
     def delete_order(self, order_id: int):
         root = self._load_orders()
 
-        for order_element in root.findall("order"):
-            if int(order_element.find("order_id").text) == order_id:
-                root.remove(order_element)
-                self._save_orders(root)
-                return f"Order {order_id} deleted."
-
-        raise OrderNotFoundError(order_id)
+        if self.document.get(order_id) is None:
+            raise OrderNotFoundError(order_id)
+        self.document.remove(order_id)
+        self._save_orders(root)
+        return f"Order {order_id} deleted."
 
-    def get_all_orders(self):
+    def get_all_orders(self, limit: int = None, after_id: int = None):
+        """Every order, or with ``limit``/``after_id`` one page of them ordered by id."""
         root = self._load_orders()
-        orders = []
-        for order_element in root.findall("order"):
-            order_id = int(order_element.find("order_id").text)
-            orders.append(self.read_order_by_id(order_id))
-        return orders
+        if limit is None and after_id is None:
+            return [self._element_to_order(order_element) for order_element in root.findall("order")]
+        return [self._element_to_order(order_element) for order_element in self.document.page(after_id, limit)]
+
+    def iter_orders(self):
+        for order_element in iter_elements(self.filepath, "order"):
+            yield self._element_to_order(order_element)
 
     def get_orders_by_user(self, user_id: int):
         root = self._load_orders()
         orders = []
         for order_element in root.findall("order"):
             if int(order_element.find("user_id").text) == user_id:
-                order_id = int(order_element.find("order_id").text)
-                orders.append(self.read_order_by_id(order_id))
+                orders.append(self._element_to_order(order_element))
         if not orders:
             raise ValueError(f"No orders found for user ID {user_id}.")
         return orders
\ No newline at end of file
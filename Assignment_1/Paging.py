@@ -0,0 +1,29 @@
+import heapq
+
+
+def iter_pages(fetch_page, key, batch_size: int = 1000):
+    """Yields every item of a keyset-paginated listing, one page at a time.
+
+    ``fetch_page(limit, after_id)`` returns the items with a key above ``after_id``
+    in key order and ``key(item)`` is the cursor for the next page. Only one page
+    is held in memory, and writes between pages never make the walk repeat an item.
+    """
+    after_id = None
+    while True:
+        page = fetch_page(batch_size, after_id)
+        yield from page
+        if len(page) < batch_size:
+            return
+        after_id = key(page[-1])
+
+
+def page_of(items, key, after=None, limit: int = None) -> list:
+    """The page of ``items`` with ``key(item) > after``, in key order, for data already in memory.
+
+    A bounded page is picked with a heap instead of sorting everything.
+    """
+    if after is not None:
+        items = [item for item in items if key(item) > after]
+    if limit is None:
+        return sorted(items, key=key)
+    return heapq.nsmallest(limit, items, key=key)
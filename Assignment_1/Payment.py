@@ -1,4 +1,5 @@
 from Order import Order
+from IdAllocator import IdAllocator
 
 
 class InvalidPaymentStatusError(Exception):
@@ -12,6 +13,8 @@ class PaymentNotFoundError(Exception):
 
 
 class Payment:
+    __slots__ = ("payment_id", "order", "amount", "payment_method", "status")
+
     def __init__(self, payment_id: int, order: Order, amount: int, payment_method: str):
         if amount <= 0:
             raise ValueError("Payment amount must be greater than zero.")
@@ -45,16 +48,15 @@ class Payment:
 
 
 class PaymentManager:
-    def __init__(self):
+    def __init__(self, ids: IdAllocator = None):
         self.payments = {}
-        self.current_payment_id = 1
+        self.ids = ids or IdAllocator("payments")
 
     def create_payment(self, order: Order, amount: int, payment_method: str):
         if order.total_amount != amount:
             raise ValueError(f"Payment amount {amount} does not match order total {order.total_amount}.")
-        payment = Payment(self.current_payment_id, order, amount, payment_method)
-        self.payments[self.current_payment_id] = payment
-        self.current_payment_id += 1
+        payment = Payment(self.ids.next_id(), order, amount, payment_method)
+        self.payments[payment.payment_id] = payment
         return payment
 
     def read_payment(self, payment_id: int):
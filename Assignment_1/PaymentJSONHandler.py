@@ -1,6 +1,11 @@
 import json
 from typing import Optional
 from Payment import Payment, PaymentNotFoundError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
+from RecordOffsets import RecordOffsets
+from Paging import iter_pages
 
 
 class PaymentExistsError(Exception):
@@ -8,9 +13,12 @@ class PaymentExistsError(Exception):
 
 
 class PaymentJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "payments", "payment_id", journaled, codec)
+        self.offsets = RecordOffsets(self.storage, "payments", "payment_id")
 
+    @locked
     def create(self, payment: Payment):
         payment_data = {
             "payment_id": payment.payment_id,
@@ -21,8 +29,7 @@ class PaymentJSONHandler:
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"payments": []}
 
@@ -31,14 +38,11 @@ class PaymentJSONHandler:
                 raise PaymentExistsError(f"Payment with ID '{payment.payment_id}' already exists.")
 
         data["payments"].append(payment_data)
-
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[payment_data])
 
     def read(self, payment_id: int) -> Optional[Payment]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for payment_data in data.get("payments", []):
                 if payment_data["payment_id"] == payment_id:
                     # Assuming order object is available in another context or can be reconstructed.
@@ -48,11 +52,11 @@ class PaymentJSONHandler:
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update(self, payment_id: int, amount: Optional[int] = None, payment_method: Optional[str] = None,
                status: Optional[str] = None):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for payment_data in data.get("payments", []):
                 if payment_data["payment_id"] == payment_id:
@@ -63,8 +67,7 @@ class PaymentJSONHandler:
                     if status is not None:
                         payment_data["status"] = status
 
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[payment_data])
                     return True
             raise PaymentNotFoundError(payment_id)
         except (FileNotFoundError, json.JSONDecodeError) as e:
@@ -73,18 +76,17 @@ class PaymentJSONHandler:
             print(e)
             return False
 
+    @locked
     def delete(self, payment_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             original_length = len(data.get("payments", []))
             data["payments"] = [payment for payment in data.get("payments", []) if payment["payment_id"] != payment_id]
 
             if len(data["payments"]) == original_length:
                 raise PaymentNotFoundError(payment_id)
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[payment_id])
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             return False
@@ -92,19 +94,24 @@ class PaymentJSONHandler:
             print(e)
             return False
 
-    def get_all_payments(self):
+    def get_all_payments(self, limit: int = None, after_id: int = None):
+        """Every payment, or with ``limit``/``after_id`` one page of them ordered by id."""
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            if limit is None and after_id is None:
+                records = self.storage.load().get("payments", [])
+            else:
+                records = self.offsets.page(after_id, limit)
             return [Payment(payment_data["payment_id"], None, payment_data["amount"], payment_data["payment_method"])
-                    for payment_data in data.get("payments", [])]
+                    for payment_data in records]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
 
+    def iter_payments(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_payments, lambda payment: payment.payment_id, batch_size)
+
     def get_payments_by_order(self, order_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             payments = [
                 Payment(payment_data["payment_id"], None, payment_data["amount"], payment_data["payment_method"])
                 for payment_data in data.get("payments", [])
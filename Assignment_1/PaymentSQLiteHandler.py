@@ -0,0 +1,86 @@
+import sqlite3
+from typing import Optional
+from Payment import Payment, PaymentNotFoundError
+from PaymentJSONHandler import PaymentExistsError
+from OrderSQLiteHandler import OrderSQLiteHandler
+from SQLiteStorage import connect, page_query
+
+
+class PaymentSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+        # Payments reference orders stored in the same database, so they can be rebuilt with a real Order.
+        self.orders = OrderSQLiteHandler(filepath)
+
+    def _row_to_payment(self, row) -> Optional[Payment]:
+        order = self.orders.read_order_by_id(row["order_id"])
+        if order is None:
+            return None
+        payment = Payment(row["payment_id"], order, row["amount"], row["payment_method"])
+        payment.status = row["status"]
+        return payment
+
+    def create(self, payment: Payment):
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO payments (payment_id, order_id, amount, payment_method, status) VALUES (?, ?, ?, ?, ?)",
+                    (payment.payment_id, payment.order.order_id, payment.amount, payment.payment_method, payment.status)
+                )
+        except sqlite3.IntegrityError:
+            raise PaymentExistsError(f"Payment with ID '{payment.payment_id}' already exists.")
+
+    def read(self, payment_id: int) -> Optional[Payment]:
+        row = self.connection.execute("SELECT * FROM payments WHERE payment_id = ?", (payment_id,)).fetchone()
+        return self._row_to_payment(row) if row else None
+
+    def update(self, payment_id: int, amount: Optional[int] = None, payment_method: Optional[str] = None,
+               status: Optional[str] = None):
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE payments SET amount = COALESCE(?, amount), payment_method = COALESCE(?, payment_method), "
+                "status = COALESCE(?, status) WHERE payment_id = ?",
+                (amount, payment_method, status, payment_id)
+            )
+        if cursor.rowcount == 0:
+            print(PaymentNotFoundError(payment_id))
+            return False
+        return True
+
+    def delete(self, payment_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM payments WHERE payment_id = ?", (payment_id,))
+        if cursor.rowcount == 0:
+            print(PaymentNotFoundError(payment_id))
+            return False
+        return True
+
+    def get_all_payments(self, limit: int = None, after_id: int = None):
+        """Every payment, or with ``limit``/``after_id`` one page of them ordered by id.
+
+        Payments whose order is gone are skipped, so a page may come back shorter than ``limit``.
+        """
+        rows = self.connection.execute(*page_query("payments", "payment_id", after_id, limit)).fetchall()
+        payments = (self._row_to_payment(row) for row in rows)
+        return [payment for payment in payments if payment is not None]
+
+    def iter_payments(self, batch_size: int = 1000):
+        # Pages are walked by row, not by returned payment, since orphaned rows are dropped from a page.
+        after_id = None
+        while True:
+            rows = self.connection.execute(*page_query("payments", "payment_id", after_id, batch_size)).fetchall()
+            for row in rows:
+                payment = self._row_to_payment(row)
+                if payment is not None:
+                    yield payment
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1]["payment_id"]
+
+    def get_payments_by_order(self, order_id: int):
+        rows = self.connection.execute("SELECT * FROM payments WHERE order_id = ?", (order_id,)).fetchall()
+        payments = [payment for payment in (self._row_to_payment(row) for row in rows) if payment is not None]
+        if not payments:
+            raise ValueError(f"No payments found for order ID {order_id}.")
+        return payments
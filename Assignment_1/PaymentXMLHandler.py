@@ -1,25 +1,26 @@
 import xml.etree.ElementTree as ET
 from Order import Order
 from Payment import Payment, PaymentNotFoundError, InvalidPaymentStatusError
+from IdAllocator import IdAllocator
+from XMLIndex import IndexedXMLFile, iter_elements
 
 
 class PaymentXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "payment", "payment_id")
+        self.ids = IdAllocator("payments", filepath + ".ids", seed=lambda: max(self.document.index, default=0))
 
     def _load_payments(self):
         try:
-            tree = ET.parse(self.filepath)
-            return tree.getroot()
+            return self.document.load()
         except (FileNotFoundError, ET.ParseError):
-            root = ET.Element("payments")
-            tree = ET.ElementTree(root)
-            tree.write(self.filepath)
-            return root
+            self.document.reset(ET.Element("payments"))
+            self.document.save()
+            return self.document.root
 
     def _save_payments(self, root):
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.save()
 
     def create_payment(self, order: Order, amount: int, payment_method: str):
         if order.total_amount != amount:
@@ -27,7 +28,7 @@ class PaymentXMLHandler:
 
         root = self._load_payments()
 
-        payment_id = len(root.findall("payment")) + 1
+        payment_id = self.ids.next_id()
         payment = Payment(payment_id, order, amount, payment_method)
 
         # Create new payment XML element
@@ -37,63 +38,67 @@ class PaymentXMLHandler:
         ET.SubElement(payment_element, "amount").text = str(payment.amount)
         ET.SubElement(payment_element, "payment_method").text = payment.payment_method
         ET.SubElement(payment_element, "status").text = payment.status
+        self.document.add(payment_element)
 
         self._save_payments(root)
         return payment
 
     def read_payment(self, payment_id: int):
-        root = self._load_payments()
-
-        for payment_element in root.findall("payment"):
-            if int(payment_element.find("payment_id").text) == payment_id:
-                order_id = int(payment_element.find("order_id").text)
-                amount = int(payment_element.find("amount").text)
-                payment_method = payment_element.find("payment_method").text
-                status = payment_element.find("status").text
-
-                # Assuming the Order class is already defined and the order exists
-                order = Order(order_id, 1, None, None, "")  # You'd need to retrieve the actual Order instance
-                payment = Payment(payment_id, order, amount, payment_method)
-                payment.status = status
-                return payment
-
-        raise PaymentNotFoundError(payment_id)
+        self._load_payments()
+
+        payment_element = self.document.get(payment_id)
+        if payment_element is None:
+            raise PaymentNotFoundError(payment_id)
+        return self._element_to_payment(payment_element)
+
+    def _element_to_payment(self, payment_element) -> Payment:
+        payment_id = int(payment_element.find("payment_id").text)
+        order_id = int(payment_element.find("order_id").text)
+        amount = int(payment_element.find("amount").text)
+        payment_method = payment_element.find("payment_method").text
+        status = payment_element.find("status").text
+
+        # Assuming the Order class is already defined and the order exists
+        order = Order(order_id, 1, None, None, "")  # You'd need to retrieve the actual Order instance
+        payment = Payment(payment_id, order, amount, payment_method)
+        payment.status = status
+        return payment
 
     def update_payment(self, payment_id: int, amount: int = None, payment_method: str = None):
+        if amount is not None and amount <= 0:
+            raise ValueError("Payment amount must be greater than zero.")
         root = self._load_payments()
 
-        for payment_element in root.findall("payment"):
-            if int(payment_element.find("payment_id").text) == payment_id:
-                if amount is not None:
-                    if amount <= 0:
-                        raise ValueError("Payment amount must be greater than zero.")
-                    payment_element.find("amount").text = str(amount)
-                if payment_method is not None:
-                    payment_element.find("payment_method").text = payment_method
-
-                self._save_payments(root)
-                return self.read_payment(payment_id)
+        payment_element = self.document.get(payment_id)
+        if payment_element is None:
+            raise PaymentNotFoundError(payment_id)
+        if amount is not None:
+            payment_element.find("amount").text = str(amount)
+        if payment_method is not None:
+            payment_element.find("payment_method").text = payment_method
 
-        raise PaymentNotFoundError(payment_id)
+        self._save_payments(root)
+        return self.read_payment(payment_id)
 
     def delete_payment(self, payment_id: int):
         root = self._load_payments()
 
-        for payment_element in root.findall("payment"):
-            if int(payment_element.find("payment_id").text) == payment_id:
-                root.remove(payment_element)
-                self._save_payments(root)
-                return f"Payment {payment_id} deleted successfully."
-
-        raise PaymentNotFoundError(payment_id)
+        if self.document.get(payment_id) is None:
+            raise PaymentNotFoundError(payment_id)
+        self.document.remove(payment_id)
+        self._save_payments(root)
+        return f"Payment {payment_id} deleted successfully."
 
-    def get_all_payments(self):
+    def get_all_payments(self, limit: int = None, after_id: int = None):
+        """Every payment, or with ``limit``/``after_id`` one page of them ordered by id."""
         root = self._load_payments()
-        payments = []
-        for payment_element in root.findall("payment"):
-            payment_id = int(payment_element.find("payment_id").text)
-            payments.append(self.read_payment(payment_id))
-        return payments
+        if limit is None and after_id is None:
+            return [self._element_to_payment(payment_element) for payment_element in root.findall("payment")]
+        return [self._element_to_payment(payment_element) for payment_element in self.document.page(after_id, limit)]
+
+    def iter_payments(self):
+        for payment_element in iter_elements(self.filepath, "payment"):
+            yield self._element_to_payment(payment_element)
 
     def get_payments_by_order(self, order_id: int):
         root = self._load_payments()
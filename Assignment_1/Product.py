@@ -1,3 +1,20 @@
+import itertools
+from decimal import Decimal, ROUND_HALF_UP
+from IdAllocator import IdAllocator
+
+_price_changes = itertools.count(1)
+
+
+def to_cents(amount: float) -> int:
+    """``amount`` as whole cents, rounding half up on its decimal value (1.005 -> 101)."""
+    return int((Decimal(str(amount)) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def price_changed():
+    """Records that some product price changed, so cached cart totals are recomputed."""
+    Product.price_generation = next(_price_changes)
+
+
 class InsufficientStockError(Exception):
     def __init__(self, product_name: str, current_stock: int, requested_change: int):
         message = (f"Insufficient stock for product '{product_name}'. "
@@ -11,6 +28,10 @@ class ProductNotFoundError(Exception):
 
 
 class Product:
+    __slots__ = ("product_id", "name", "category", "_price", "stock")
+    # Changes whenever any price changes; carts compare it to know their totals are current.
+    price_generation = 0
+
     def __init__(self, product_id: int, name: str, category: str, price: float, stock: int):
         if price < 0:
             raise ValueError("Price cannot be negative.")
@@ -19,9 +40,18 @@ class Product:
         self.product_id = product_id
         self.name = name
         self.category = category
-        self.price = price
+        self._price = price
         self.stock = stock
 
+    @property
+    def price(self) -> float:
+        return self._price
+
+    @price.setter
+    def price(self, value: float):
+        self._price = value
+        price_changed()
+
     def __repr__(self):
         return (f"Product(product_id={self.product_id}, name='{self.name}', category='{self.category}', "
                 f"price={self.price}, stock={self.stock})")
@@ -43,13 +73,14 @@ class Product:
 
 
 class ProductManager:
-    def __init__(self):
+    def __init__(self, ids: IdAllocator = None):
         self.products = {}
+        self.ids = ids or IdAllocator("products")
 
     def create_product(self, name: str, category: str, price: float, stock: int):
         if not name or not category:
             raise ValueError("Name and category cannot be empty.")
-        product_id = len(self.products) + 1
+        product_id = self.ids.next_id()
         product = Product(product_id, name, category, price, stock)
         self.products[product_id] = product
         return product
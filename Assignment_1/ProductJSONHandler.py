@@ -1,5 +1,13 @@
 import json
+import os
+from operator import itemgetter
 from Product import Product, ProductNotFoundError, InsufficientStockError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
+from SortedIndex import SortedIndex
+from RecordOffsets import RecordOffsets
+from Paging import iter_pages, page_of
 
 
 class ProductExistsError(Exception):
@@ -7,9 +15,31 @@ class ProductExistsError(Exception):
 
 
 class ProductJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "products", "product_id", journaled, codec)
+        # Built on the first range query, then patched by every save made through this handler.
+        self.sorted_index = SortedIndex(("price", "stock"), self._sorted_records, self.storage.current_version,
+                                        partition="category")
+        self.search_index = None
+        self.offsets = RecordOffsets(self.storage, "products", "product_id")
 
+    def _sorted_records(self):
+        try:
+            products = self.storage.load().get("products", [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        return [(product_data["product_id"], product_data) for product_data in products]
+
+    def _sync_indexes(self, saved: list = (), deleted: list = (), text: bool = True):
+        """Reports a save to the sorted index and an attached search index; ``text`` is
+        False when only price or stock changed, so nothing needs re-tokenizing."""
+        self.sorted_index.apply(self.storage.replaced_version,
+                                [(product_data["product_id"], product_data) for product_data in saved], deleted)
+        if self.search_index is not None:
+            self.search_index.synced(self, saved if text else (), deleted)
+
+    @locked
     def create(self, product: Product):
         product_data = {
             "product_id": product.product_id,
@@ -20,8 +50,7 @@ class ProductJSONHandler:
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"products": []}
 
@@ -30,14 +59,12 @@ class ProductJSONHandler:
                 raise ProductExistsError(f"Product with ID '{product.product_id}' already exists.")
 
         data["products"].append(product_data)
-
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[product_data])
+        self._sync_indexes([product_data])
 
     def read(self, product_id: int) -> Product:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for product_data in data.get("products", []):
                 if product_data["product_id"] == product_id:
                     return Product(
@@ -52,10 +79,10 @@ class ProductJSONHandler:
 
         raise ProductNotFoundError(product_id)
 
+    @locked
     def update(self, product_id: int, name: str = None, category: str = None, price: float = None, stock: int = None):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for product_data in data.get("products", []):
                 if product_data["product_id"] == product_id:
@@ -68,25 +95,25 @@ class ProductJSONHandler:
                     if stock is not None:
                         product_data["stock"] = stock
 
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[product_data])
+                    self._sync_indexes([product_data])
                     return True
             raise ProductNotFoundError(product_id)
         except (FileNotFoundError, json.JSONDecodeError):
             return False
 
+    @locked
     def delete(self, product_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             original_length = len(data.get("products", []))
             data["products"] = [product for product in data.get("products", []) if product["product_id"] != product_id]
 
             if len(data["products"]) == original_length:
                 raise ProductNotFoundError(product_id)
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[product_id])
+            self._sync_indexes(deleted=[product_id])
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             return False
@@ -94,10 +121,17 @@ class ProductJSONHandler:
             print(e)
             return False
 
-    def get_all_products(self):
+    def get_all_products(self, limit: int = None, after_id: int = None):
+        """Every product, or with ``limit``/``after_id`` one page of them ordered by id.
+
+        Pages are decoded through the offset index, so page 1 of a large catalog
+        does not parse the whole file.
+        """
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            if limit is None and after_id is None:
+                records = self.storage.load().get("products", [])
+            else:
+                records = self.offsets.page(after_id, limit)
             return [
                 Product(
                     product_data["product_id"],
@@ -106,15 +140,18 @@ class ProductJSONHandler:
                     product_data["price"],
                     product_data["stock"]
                 )
-                for product_data in data.get("products", [])
+                for product_data in records
             ]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
 
+    def iter_products(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_products, lambda product: product.product_id, batch_size)
+
+    @locked
     def update_stock(self, product_id: int, quantity: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for product_data in data.get("products", []):
                 if product_data["product_id"] == product_id:
@@ -123,8 +160,8 @@ class ProductJSONHandler:
                             product_data["name"], product_data["stock"], quantity
                         )
                     product_data["stock"] += quantity
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[product_data])
+                    self._sync_indexes([product_data], text=False)
                     return f"Stock updated for product '{product_data['name']}'. New stock: {product_data['stock']}"
             raise ProductNotFoundError(product_id)
         except (FileNotFoundError, json.JSONDecodeError):
@@ -132,21 +169,374 @@ class ProductJSONHandler:
         except InsufficientStockError as e:
             return str(e)
 
+    @locked
     def update_price(self, product_id: int, new_price: float):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
 
             for product_data in data.get("products", []):
                 if product_data["product_id"] == product_id:
                     if new_price < 0:
                         raise ValueError("Price cannot be negative.")
                     product_data["price"] = new_price
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[product_data])
+                    self._sync_indexes([product_data], text=False)
                     return f"Price for product '{product_data['name']}' updated to {new_price}"
             raise ProductNotFoundError(product_id)
         except (FileNotFoundError, json.JSONDecodeError):
             return False
         except ValueError as e:
             return str(e)
+
+
+    @locked
+    def create_many(self, products: list):
+        try:
+            data = self.storage.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {"products": []}
+
+        existing_ids = {product_data["product_id"] for product_data in data.get("products", [])}
+        created = []
+        for product in products:
+            if product.product_id in existing_ids:
+                raise ProductExistsError(f"Product with ID '{product.product_id}' already exists.")
+            existing_ids.add(product.product_id)
+            created.append({
+                "product_id": product.product_id,
+                "name": product.name,
+                "category": product.category,
+                "price": product.price,
+                "stock": product.stock
+            })
+
+        data.setdefault("products", []).extend(created)
+        self.storage.save(data, changed=created)
+        self._sync_indexes(created)
+
+    @locked
+    def update_stock_many(self, quantities: dict):
+        try:
+            data = self.storage.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        index = {product_data["product_id"]: product_data for product_data in data.get("products", [])}
+        for product_id, quantity in quantities.items():
+            product_data = index.get(product_id)
+            if product_data is None:
+                raise ProductNotFoundError(product_id)
+            if product_data["stock"] + quantity < 0:
+                return str(InsufficientStockError(product_data["name"], product_data["stock"], quantity))
+
+        changed = []
+        for product_id, quantity in quantities.items():
+            index[product_id]["stock"] += quantity
+            changed.append(index[product_id])
+        self.storage.save(data, changed=changed)
+        self._sync_indexes(changed, text=False)
+        return f"Stock updated for {len(changed)} products."
+
+    @locked
+    def update_price_many(self, prices: dict):
+        try:
+            data = self.storage.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        index = {product_data["product_id"]: product_data for product_data in data.get("products", [])}
+        for product_id, new_price in prices.items():
+            if product_id not in index:
+                raise ProductNotFoundError(product_id)
+            if new_price < 0:
+                return "Price cannot be negative."
+
+        changed = []
+        for product_id, new_price in prices.items():
+            index[product_id]["price"] = new_price
+            changed.append(index[product_id])
+        self.storage.save(data, changed=changed)
+        self._sync_indexes(changed, text=False)
+        return f"Price updated for {len(changed)} products."
+
+    def _products_by_ids(self, product_ids: list) -> list:
+        try:
+            data = self.storage.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        wanted = dict.fromkeys(product_ids)
+        for product_data in data.get("products", []):
+            if product_data["product_id"] in wanted:
+                wanted[product_data["product_id"]] = product_data
+        return [
+            Product(
+                product_data["product_id"],
+                product_data["name"],
+                product_data["category"],
+                product_data["price"],
+                product_data["stock"]
+            )
+            for product_data in wanted.values() if product_data is not None
+        ]
+
+    def get_products_by_price(self, min_price: float = None, max_price: float = None, category: str = None,
+                              offset: int = 0, limit: int = None, descending: bool = False):
+        """Products priced within [min_price, max_price], optionally in one category, cheapest first."""
+        return self._products_by_ids(self.sorted_index.range("price", min_price, max_price, partition_value=category,
+                                                             offset=offset, limit=limit, descending=descending))
+
+    def get_products_by_stock(self, min_stock: int = None, max_stock: int = None, category: str = None,
+                              offset: int = 0, limit: int = None, descending: bool = False):
+        return self._products_by_ids(self.sorted_index.range("stock", min_stock, max_stock, partition_value=category,
+                                                             offset=offset, limit=limit, descending=descending))
+
+    def get_top_products(self, field: str = "price", limit: int = 10, largest: bool = True, category: str = None):
+        return self._products_by_ids(self.sorted_index.top(field, limit, largest, partition_value=category))
+
+    def get_low_stock_products(self, threshold: int = 5, offset: int = 0, limit: int = None):
+        """Products with fewer than ``threshold`` units left, lowest stock first."""
+        return self._products_by_ids(self.sorted_index.range("stock", below=threshold, offset=offset, limit=limit))
+
+    def count_low_stock(self, threshold: int = 5) -> int:
+        return self.sorted_index.count("stock", below=threshold)
+
+
+class CachedProductJSONHandler(ProductJSONHandler):
+    """Keeps the catalog in memory and reloads it only when the file changes on disk."""
+
+    def __init__(self, filepath: str, codec: JSONCodec = None):
+        super().__init__(filepath, codec=codec)
+        self._data = None
+        self._index = {}
+        self._signature = None
+
+    def _file_signature(self):
+        stat = os.stat(self.filepath)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        signature = self._file_signature()
+        if self._data is None or signature != self._signature:
+            data = self.storage.load()
+            self._data = data
+            self._index = {product_data["product_id"]: product_data for product_data in data.get("products", [])}
+            self._signature = signature
+        return self._data
+
+    def _save(self, saved: list = (), deleted: list = (), text: bool = True):
+        try:
+            self.storage.save(self._data)
+            self._signature = self._file_signature()
+        except BaseException:
+            # The cached catalog already holds the unsaved edit; drop it so the next read sees the file.
+            self.invalidate()
+            raise
+        self._sync_indexes(saved, deleted, text)
+
+    def invalidate(self):
+        self._data = None
+        self._index = {}
+        self._signature = None
+
+    def _products_by_ids(self, product_ids: list) -> list:
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        return [
+            Product(
+                product_data["product_id"],
+                product_data["name"],
+                product_data["category"],
+                product_data["price"],
+                product_data["stock"]
+            )
+            for product_data in map(self._index.get, product_ids) if product_data is not None
+        ]
+
+    @locked
+    def create(self, product: Product):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._data = {"products": []}
+            self._index = {}
+
+        if product.product_id in self._index:
+            raise ProductExistsError(f"Product with ID '{product.product_id}' already exists.")
+
+        product_data = {
+            "product_id": product.product_id,
+            "name": product.name,
+            "category": product.category,
+            "price": product.price,
+            "stock": product.stock
+        }
+        self._data.setdefault("products", []).append(product_data)
+        self._index[product.product_id] = product_data
+        self._save([product_data])
+
+    def read(self, product_id: int) -> Product:
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        product_data = self._index.get(product_id)
+        if product_data is None:
+            raise ProductNotFoundError(product_id)
+        return Product(
+            product_data["product_id"],
+            product_data["name"],
+            product_data["category"],
+            product_data["price"],
+            product_data["stock"]
+        )
+
+    @locked
+    def update(self, product_id: int, name: str = None, category: str = None, price: float = None, stock: int = None):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        product_data = self._index.get(product_id)
+        if product_data is None:
+            raise ProductNotFoundError(product_id)
+        if name:
+            product_data["name"] = name
+        if category:
+            product_data["category"] = category
+        if price is not None:
+            product_data["price"] = price
+        if stock is not None:
+            product_data["stock"] = stock
+        self._save([product_data])
+        return True
+
+    @locked
+    def delete(self, product_id: int):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        product_data = self._index.pop(product_id, None)
+        if product_data is None:
+            print(ProductNotFoundError(product_id))
+            return False
+        self._data["products"] = [product for product in self._data["products"] if product["product_id"] != product_id]
+        self._save(deleted=[product_id])
+        return True
+
+    def get_all_products(self, limit: int = None, after_id: int = None):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        records = self._data.get("products", [])
+        if limit is not None or after_id is not None:
+            records = page_of(self._index.values(), itemgetter("product_id"), after_id, limit)
+        return [
+            Product(
+                product_data["product_id"],
+                product_data["name"],
+                product_data["category"],
+                product_data["price"],
+                product_data["stock"]
+            )
+            for product_data in records
+        ]
+
+    @locked
+    def update_stock(self, product_id: int, quantity: int):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        product_data = self._index.get(product_id)
+        if product_data is None:
+            raise ProductNotFoundError(product_id)
+        if product_data["stock"] + quantity < 0:
+            return str(InsufficientStockError(product_data["name"], product_data["stock"], quantity))
+        product_data["stock"] += quantity
+        self._save([product_data], text=False)
+        return f"Stock updated for product '{product_data['name']}'. New stock: {product_data['stock']}"
+
+    @locked
+    def update_price(self, product_id: int, new_price: float):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        product_data = self._index.get(product_id)
+        if product_data is None:
+            raise ProductNotFoundError(product_id)
+        if new_price < 0:
+            return "Price cannot be negative."
+        product_data["price"] = new_price
+        self._save([product_data], text=False)
+        return f"Price for product '{product_data['name']}' updated to {new_price}"
+
+    @locked
+    def create_many(self, products: list):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._data = {"products": []}
+            self._index = {}
+
+        created = {}
+        for product in products:
+            if product.product_id in self._index or product.product_id in created:
+                raise ProductExistsError(f"Product with ID '{product.product_id}' already exists.")
+            created[product.product_id] = {
+                "product_id": product.product_id,
+                "name": product.name,
+                "category": product.category,
+                "price": product.price,
+                "stock": product.stock
+            }
+
+        self._data.setdefault("products", []).extend(created.values())
+        self._index.update(created)
+        self._save(list(created.values()))
+
+    @locked
+    def update_stock_many(self, quantities: dict):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        for product_id, quantity in quantities.items():
+            product_data = self._index.get(product_id)
+            if product_data is None:
+                raise ProductNotFoundError(product_id)
+            if product_data["stock"] + quantity < 0:
+                return str(InsufficientStockError(product_data["name"], product_data["stock"], quantity))
+
+        for product_id, quantity in quantities.items():
+            self._index[product_id]["stock"] += quantity
+        self._save([self._index[product_id] for product_id in quantities], text=False)
+        return f"Stock updated for {len(quantities)} products."
+
+    @locked
+    def update_price_many(self, prices: dict):
+        try:
+            self._load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        for product_id, new_price in prices.items():
+            if product_id not in self._index:
+                raise ProductNotFoundError(product_id)
+            if new_price < 0:
+                return "Price cannot be negative."
+
+        for product_id, new_price in prices.items():
+            self._index[product_id]["price"] = new_price
+        self._save([self._index[product_id] for product_id in prices], text=False)
+        return f"Price updated for {len(prices)} products."
@@ -0,0 +1,173 @@
+import sqlite3
+from Product import Product, ProductNotFoundError, InsufficientStockError
+from ProductJSONHandler import ProductExistsError
+from SQLiteStorage import connect, page_query
+from Paging import iter_pages
+
+
+class ProductSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _row_to_product(self, row):
+        return Product(row["product_id"], row["name"], row["category"], row["price"], row["stock"])
+
+    def create(self, product: Product):
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO products (product_id, name, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+                    (product.product_id, product.name, product.category, product.price, product.stock)
+                )
+        except sqlite3.IntegrityError:
+            raise ProductExistsError(f"Product with ID '{product.product_id}' already exists.")
+
+    def read(self, product_id: int) -> Product:
+        row = self.connection.execute("SELECT * FROM products WHERE product_id = ?", (product_id,)).fetchone()
+        if row is None:
+            raise ProductNotFoundError(product_id)
+        return self._row_to_product(row)
+
+    def update(self, product_id: int, name: str = None, category: str = None, price: float = None, stock: int = None):
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE products SET name = COALESCE(?, name), category = COALESCE(?, category), "
+                "price = COALESCE(?, price), stock = COALESCE(?, stock) WHERE product_id = ?",
+                (name or None, category or None, price, stock, product_id)
+            )
+        if cursor.rowcount == 0:
+            raise ProductNotFoundError(product_id)
+        return True
+
+    def delete(self, product_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+        if cursor.rowcount == 0:
+            print(ProductNotFoundError(product_id))
+            return False
+        return True
+
+    def get_all_products(self, limit: int = None, after_id: int = None):
+        """Every product, or with ``limit``/``after_id`` one page of them ordered by id."""
+        return [self._row_to_product(row)
+                for row in self.connection.execute(*page_query("products", "product_id", after_id, limit))]
+
+    def iter_products(self, batch_size: int = 1000):
+        return iter_pages(self.get_all_products, lambda product: product.product_id, batch_size)
+
+    def update_stock(self, product_id: int, quantity: int):
+        # A single conditional UPDATE so concurrent writers cannot drive stock below zero.
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE products SET stock = stock + ? WHERE product_id = ? AND stock + ? >= 0",
+                (quantity, product_id, quantity)
+            )
+        row = self.connection.execute("SELECT name, stock FROM products WHERE product_id = ?", (product_id,)).fetchone()
+        if row is None:
+            raise ProductNotFoundError(product_id)
+        if cursor.rowcount == 0:
+            return str(InsufficientStockError(row["name"], row["stock"], quantity))
+        return f"Stock updated for product '{row['name']}'. New stock: {row['stock']}"
+
+    def update_price(self, product_id: int, new_price: float):
+        row = self.connection.execute("SELECT name FROM products WHERE product_id = ?", (product_id,)).fetchone()
+        if row is None:
+            raise ProductNotFoundError(product_id)
+        if new_price < 0:
+            return "Price cannot be negative."
+        with self.connection:
+            self.connection.execute("UPDATE products SET price = ? WHERE product_id = ?", (new_price, product_id))
+        return f"Price for product '{row['name']}' updated to {new_price}"
+
+    def _existing_id(self, products: list):
+        """The first id in ``products`` that is repeated or already stored."""
+        seen = set()
+        for product in products:
+            if product.product_id in seen or self.connection.execute(
+                    "SELECT 1 FROM products WHERE product_id = ?", (product.product_id,)).fetchone():
+                return product.product_id
+            seen.add(product.product_id)
+
+    def create_many(self, products: list):
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO products (product_id, name, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+                    [(product.product_id, product.name, product.category, product.price, product.stock)
+                     for product in products]
+                )
+        except sqlite3.IntegrityError:
+            raise ProductExistsError(f"Product with ID '{self._existing_id(products)}' already exists.")
+
+    def _rows_for_update(self, product_ids) -> dict:
+        rows = {}
+        for product_id in product_ids:
+            row = self.connection.execute("SELECT * FROM products WHERE product_id = ?", (product_id,)).fetchone()
+            if row is None:
+                raise ProductNotFoundError(product_id)
+            rows[product_id] = row
+        return rows
+
+    def update_stock_many(self, quantities: dict):
+        with self.connection:
+            # The write lock is taken before the checks, so no other writer can change a row in between.
+            self.connection.execute("BEGIN IMMEDIATE")
+            rows = self._rows_for_update(quantities)
+            for product_id, quantity in quantities.items():
+                if rows[product_id]["stock"] + quantity < 0:
+                    return str(InsufficientStockError(rows[product_id]["name"], rows[product_id]["stock"], quantity))
+            self.connection.executemany("UPDATE products SET stock = stock + ? WHERE product_id = ?",
+                                        [(quantity, product_id) for product_id, quantity in quantities.items()])
+        return f"Stock updated for {len(quantities)} products."
+
+    def update_price_many(self, prices: dict):
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._rows_for_update(prices)
+            if any(new_price < 0 for new_price in prices.values()):
+                return "Price cannot be negative."
+            self.connection.executemany("UPDATE products SET price = ? WHERE product_id = ?",
+                                        [(new_price, product_id) for product_id, new_price in prices.items()])
+        return f"Price updated for {len(prices)} products."
+
+    def _products_ordered_by(self, field: str, low=None, high=None, below=None, category: str = None,
+                             offset: int = 0, limit: int = None, descending: bool = False) -> list:
+        """The SQL counterpart of ProductJSONHandler's sorted index: ties are broken by id, both served by
+        the index on ``field`` (which ends in the rowid)."""
+        if field not in ("price", "stock"):
+            raise ValueError(f"Products cannot be ordered by '{field}'.")
+        conditions, parameters = [], []
+        for condition, value in ((f"{field} >= ?", low), (f"{field} <= ?", high), (f"{field} < ?", below),
+                                 ("category = ?", category)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT * FROM products"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {field} {direction}, product_id {direction} LIMIT ? OFFSET ?"
+        parameters += [-1 if limit is None else limit, offset]
+        return [self._row_to_product(row) for row in self.connection.execute(sql, parameters)]
+
+    def get_products_by_price(self, min_price: float = None, max_price: float = None, category: str = None,
+                              offset: int = 0, limit: int = None, descending: bool = False):
+        """Products priced within [min_price, max_price], optionally in one category, cheapest first."""
+        return self._products_ordered_by("price", min_price, max_price, category=category, offset=offset,
+                                         limit=limit, descending=descending)
+
+    def get_products_by_stock(self, min_stock: int = None, max_stock: int = None, category: str = None,
+                              offset: int = 0, limit: int = None, descending: bool = False):
+        return self._products_ordered_by("stock", min_stock, max_stock, category=category, offset=offset,
+                                         limit=limit, descending=descending)
+
+    def get_top_products(self, field: str = "price", limit: int = 10, largest: bool = True, category: str = None):
+        return self._products_ordered_by(field, category=category, limit=limit, descending=largest)
+
+    def get_low_stock_products(self, threshold: int = 5, offset: int = 0, limit: int = None):
+        """Products with fewer than ``threshold`` units left, lowest stock first."""
+        return self._products_ordered_by("stock", below=threshold, offset=offset, limit=limit)
+
+    def count_low_stock(self, threshold: int = 5) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM products WHERE stock < ?", (threshold,)).fetchone()[0]
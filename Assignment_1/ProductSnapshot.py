@@ -0,0 +1,161 @@
+import mmap
+import struct
+import sys
+from array import array
+from Product import Product
+from AtomicFile import atomic_write
+
+MAGIC = b"PCOL"
+VERSION = 1
+# magic, version, rows, categories, name bytes, category bytes
+HEADER = struct.Struct("<4sIIIII")
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % 8)
+
+
+def _column_bytes(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _encode_strings(strings) -> tuple:
+    offsets = [0]
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    return _column_bytes("I", offsets), bytes(blob)
+
+
+def write_product_snapshot(filepath: str, products: list):
+    """Writes ``products`` as a little-endian columnar file readable by ProductSnapshot.
+
+    Layout after the header, each section padded to 8 bytes: product_id (int64),
+    price (float64), stock (int64), category code (uint32), name offsets (uint32)
+    and UTF-8 names, then the category dictionary as offsets and UTF-8 strings.
+    """
+    categories = {}
+    for product in products:
+        categories.setdefault(product.category, len(categories))
+
+    name_offsets, names = _encode_strings(product.name for product in products)
+    category_offsets, category_names = _encode_strings(categories)
+    sections = [
+        _column_bytes("q", (product.product_id for product in products)),
+        _column_bytes("d", (product.price for product in products)),
+        _column_bytes("q", (product.stock for product in products)),
+        _column_bytes("I", (categories[product.category] for product in products)),
+        name_offsets,
+        names,
+        category_offsets,
+        category_names,
+    ]
+
+    with atomic_write(filepath, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(products), len(categories), len(names), len(category_names)))
+        for section in sections:
+            file.write(section)
+            file.write(_padding(len(section)))
+
+
+class ProductSnapshot:
+    """Memory-mapped, read-only view of a snapshot written by write_product_snapshot.
+
+    ``product_id``, ``price``, ``stock`` and ``category_code`` are memoryviews over
+    the mapped file, so scans touch plain numbers and build no Product objects.
+    Close the snapshot (or use it as a context manager) to release the mapping.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        with open(filepath, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._views = [self._buffer]
+
+        magic, version, rows, category_count, name_bytes, category_bytes = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{filepath} is not a product snapshot.")
+        self.rows = rows
+
+        self._offset = HEADER.size
+        self.product_id = self._column("q", rows)
+        self.price = self._column("d", rows)
+        self.stock = self._column("q", rows)
+        self.category_code = self._column("I", rows)
+        self._name_offsets = self._column("I", rows + 1)
+        self._names = self._column("B", name_bytes)
+        category_offsets = self._column("I", category_count + 1)
+        category_names = self._column("B", category_bytes)
+
+        self.categories = [bytes(category_names[category_offsets[code]:category_offsets[code + 1]]).decode("utf-8")
+                           for code in range(category_count)]
+        self._category_codes = {category: code for code, category in enumerate(self.categories)}
+
+    def _column(self, typecode: str, count: int):
+        itemsize = array(typecode).itemsize
+        start = self._offset
+        self._offset += count * itemsize + (-(count * itemsize) % 8)
+        raw = self._buffer[start:start + count * itemsize]
+        if sys.byteorder != "little" and itemsize > 1:
+            column = array(typecode, raw.tobytes())
+            column.byteswap()
+            return column
+        view = raw.cast(typecode)
+        self._views.extend([raw, view])
+        return view
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def name(self, row: int) -> str:
+        return bytes(self._names[self._name_offsets[row]:self._name_offsets[row + 1]]).decode("utf-8")
+
+    def category(self, row: int) -> str:
+        return self.categories[self.category_code[row]]
+
+    def product(self, row: int) -> Product:
+        return Product(self.product_id[row], self.name(row), self.category(row), self.price[row], self.stock[row])
+
+    def products(self, rows=None) -> list:
+        return [self.product(row) for row in (range(self.rows) if rows is None else rows)]
+
+    def rows_in_category(self, category: str) -> list:
+        code = self._category_codes.get(category)
+        if code is None:
+            return []
+        return [row for row, value in enumerate(self.category_code) if value == code]
+
+    def rows_in_price_range(self, min_price: float = None, max_price: float = None) -> list:
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
+        return [row for row, price in enumerate(self.price) if low <= price <= high]
+
+
+def export_products(handler, filepath: str):
+    """Snapshots the catalog of a ProductJSONHandler or ProductXMLHandler."""
+    write_product_snapshot(filepath, handler.get_all_products())
+
+
+def import_products(filepath: str, handler):
+    """Loads a snapshot into a ProductJSONHandler or ProductXMLHandler, keeping product ids."""
+    with ProductSnapshot(filepath) as snapshot:
+        products = snapshot.products()
+    handler.create_many(products)
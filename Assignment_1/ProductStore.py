@@ -0,0 +1,342 @@
+import operator
+from array import array
+from Product import Product, ProductNotFoundError, InsufficientStockError, price_changed
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Column name -> array typecode; the NumPy dtypes are the same widths.
+COLUMNS = {"product_id": "q", "price": "d", "stock": "q", "category_code": "i"}
+DTYPES = {"q": "int64", "d": "float64", "i": "int32"}
+
+
+class ProductStore:
+    """In-memory catalog kept as parallel typed columns instead of Product objects.
+
+    ``product_id``, ``price``, ``stock`` and ``category_code`` are NumPy arrays
+    when NumPy is installed and ``array`` columns otherwise; names are a plain
+    list and categories are dictionary-encoded. ``rows`` maps a product id to its
+    row. Bulk operations (repricing, restocking, stock value) run over whole
+    columns through ``select``, and ``get`` hands out ProductProxy objects that
+    behave like a Product but read and write the columns.
+
+    Removing a product moves the last row into its place, so row numbers (and
+    views holding them) are only stable until the next removal.
+    """
+
+    def __init__(self, products=()):
+        self.rows = {}
+        self.names = []
+        self.categories = []
+        self.category_codes = {}
+        self.generation = 0
+        self._size = 0
+        for name, typecode in COLUMNS.items():
+            setattr(self, "_" + name, np.zeros(16, DTYPES[typecode]) if np is not None else array(typecode))
+        self.add_many(products)
+
+    @classmethod
+    def from_columns(cls, product_ids, names: list, categories: list, prices, stocks) -> "ProductStore":
+        """Builds a store from one sequence per field, without creating a Product per row."""
+        store = cls()
+        product_ids = array("q", product_ids)
+        store.rows = {product_id: row for row, product_id in enumerate(product_ids)}
+        if len(store.rows) != len(product_ids):
+            raise ValueError("Product ids must be unique.")
+        if not len(names) == len(categories) == len(prices) == len(stocks) == len(product_ids):
+            raise ValueError("Every column must have one value per product.")
+        columns = {"product_id": product_ids, "price": array("d", prices), "stock": array("q", stocks),
+                   "category_code": array("i", map(store._encode_category, categories))}
+        if len(product_ids) and (min(columns["price"]) < 0 or min(columns["stock"]) < 0):
+            raise ValueError("Price and stock cannot be negative.")
+        for name, column in columns.items():
+            setattr(store, "_" + name, np.array(column) if np is not None else column)
+        store.names = list(names)
+        store._size = len(product_ids)
+        return store
+
+    @classmethod
+    def from_handler(cls, handler) -> "ProductStore":
+        """Loads the catalog of any product handler, streaming it when the handler can."""
+        products = handler.iter_products() if hasattr(handler, "iter_products") else handler.get_all_products()
+        return cls(products)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, product_id: int):
+        return product_id in self.rows
+
+    def column(self, name: str):
+        """The live column of ``name`` (one of COLUMNS) over the current rows."""
+        column = getattr(self, "_" + name)
+        return column[:self._size] if np is not None else column
+
+    def _encode_category(self, category: str) -> int:
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def _grow(self, needed: int):
+        capacity = len(self._price)
+        if np is None or needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in COLUMNS:
+            old = getattr(self, "_" + name)
+            grown = np.zeros(capacity, old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, "_" + name, grown)
+
+    def add(self, product: Product):
+        if product.product_id in self.rows:
+            raise ValueError(f"Product {product.product_id} is already in the store.")
+        if product.price < 0:
+            raise ValueError("Price cannot be negative.")
+        if product.stock < 0:
+            raise ValueError("Stock cannot be negative.")
+        row = self._size
+        values = (product.product_id, product.price, product.stock, self._encode_category(product.category))
+        if np is not None:
+            self._grow(row + 1)
+            for name, value in zip(COLUMNS, values):
+                getattr(self, "_" + name)[row] = value
+        else:
+            for name, value in zip(COLUMNS, values):
+                getattr(self, "_" + name).append(value)
+        self.names.append(product.name)
+        self.rows[product.product_id] = row
+        self._size += 1
+
+    def add_many(self, products):
+        for product in products:
+            self.add(product)
+
+    def remove(self, product_id: int):
+        row = self.rows.pop(product_id, None)
+        if row is None:
+            raise ProductNotFoundError(product_id)
+        last = self._size - 1
+        if row != last:
+            for name in COLUMNS:
+                column = getattr(self, "_" + name)
+                column[row] = column[last]
+            self.names[row] = self.names[last]
+            self.rows[int(self._product_id[row])] = row
+        if np is None:
+            for name in COLUMNS:
+                getattr(self, "_" + name).pop()
+        self.names.pop()
+        self._size = last
+        self.generation += 1
+
+    def get(self, product_id: int) -> "ProductProxy":
+        if product_id not in self.rows:
+            raise ProductNotFoundError(product_id)
+        return ProductProxy(self, product_id)
+
+    def _row(self, product_id: int) -> int:
+        row = self.rows.get(product_id)
+        if row is None:
+            raise ProductNotFoundError(product_id)
+        return row
+
+    def select(self, category: str = None, min_price: float = None, max_price: float = None,
+               min_stock: int = None, max_stock: int = None) -> "ProductView":
+        """A view of the rows matching every given filter (all rows when none are given)."""
+        filters = [(self.column("price"), operator.ge, min_price), (self.column("price"), operator.le, max_price),
+                   (self.column("stock"), operator.ge, min_stock), (self.column("stock"), operator.le, max_stock)]
+        if category is not None:
+            code = self.category_codes.get(category)
+            if code is None:
+                return ProductView(self, [])
+            filters.insert(0, (self.column("category_code"), operator.eq, code))
+        filters = [(column, compare, value) for column, compare, value in filters if value is not None]
+        if not filters:
+            return ProductView(self, None)
+
+        if np is not None:
+            mask = np.ones(self._size, dtype=bool)
+            for column, compare, value in filters:
+                mask &= compare(column, value)
+            return ProductView(self, np.flatnonzero(mask))
+        (column, compare, value), *rest = filters
+        rows = [row for row, cell in enumerate(column) if compare(cell, value)]
+        for column, compare, value in rest:
+            rows = [row for row in rows if compare(column[row], value)]
+        return ProductView(self, rows)
+
+    def products(self) -> list:
+        return self.select().products()
+
+
+class ProductView:
+    """A selection of store rows that bulk operations act on in one pass.
+
+    ``rows`` is None for the whole store, otherwise the selected row numbers.
+    """
+
+    def __init__(self, store: ProductStore, rows):
+        self.store = store
+        self.rows = rows
+        self.generation = store.generation
+
+    def _check(self):
+        if self.generation != self.store.generation:
+            raise RuntimeError("Products were removed from the store after this view was taken; select again.")
+
+    def __len__(self):
+        return len(self.store) if self.rows is None else len(self.rows)
+
+    def _row_numbers(self):
+        return range(len(self.store)) if self.rows is None else self.rows
+
+    def product_ids(self) -> list:
+        self._check()
+        product_ids = self.store.column("product_id")
+        if np is not None:
+            return (product_ids if self.rows is None else product_ids[self.rows]).tolist()
+        return list(product_ids) if self.rows is None else [product_ids[row] for row in self.rows]
+
+    def __iter__(self):
+        return (ProductProxy(self.store, product_id) for product_id in self.product_ids())
+
+    def products(self) -> list:
+        """Detached Product copies of the selected rows."""
+        self._check()
+        store = self.store
+        product_ids, prices, stocks, codes = (store.column(name) for name in COLUMNS)
+        return [Product(int(product_ids[row]), store.names[row], store.categories[codes[row]], float(prices[row]),
+                        int(stocks[row]))
+                for row in self._row_numbers()]
+
+    def scale_prices(self, factor: float, decimals: int = 2) -> int:
+        """Multiplies every selected price by ``factor``, rounded to ``decimals``; returns the row count."""
+        self._check()
+        if factor < 0:
+            raise ValueError("Price cannot be negative.")
+        store = self.store
+        if np is not None:
+            prices = store.column("price")
+            if self.rows is None:
+                np.round(prices * factor, decimals, out=prices)
+            else:
+                prices[self.rows] = np.round(prices[self.rows] * factor, decimals)
+        elif self.rows is None:
+            store._price = array("d", [round(price * factor, decimals) for price in store._price])
+        else:
+            prices = store._price
+            for row in self.rows:
+                prices[row] = round(prices[row] * factor, decimals)
+        price_changed()
+        return len(self)
+
+    def add_stock(self, quantity: int) -> int:
+        """Adds ``quantity`` (negative to take) to every selected stock; all rows or none."""
+        self._check()
+        store = self.store
+        stocks = store.column("stock")
+        if np is not None:
+            selected = stocks if self.rows is None else stocks[self.rows]
+            if quantity < 0 and len(selected) and int(selected.min()) + quantity < 0:
+                row = int(np.argmin(selected)) if self.rows is None else int(self.rows[np.argmin(selected)])
+                raise InsufficientStockError(store.names[row], int(stocks[row]), quantity)
+            if self.rows is None:
+                stocks += quantity
+            else:
+                stocks[self.rows] += quantity
+            return len(self)
+
+        rows = self._row_numbers()
+        if quantity < 0:
+            for row in rows:
+                if stocks[row] + quantity < 0:
+                    raise InsufficientStockError(store.names[row], stocks[row], quantity)
+        if self.rows is None:
+            store._stock = array("q", [stock + quantity for stock in stocks])
+        else:
+            for row in rows:
+                stocks[row] += quantity
+        return len(self)
+
+    def stock_value(self) -> float:
+        """Sum of price * stock over the selection."""
+        self._check()
+        prices, stocks = self.store.column("price"), self.store.column("stock")
+        if np is not None:
+            if self.rows is not None:
+                prices, stocks = prices[self.rows], stocks[self.rows]
+            return float(np.dot(prices, stocks))
+        if self.rows is None:
+            return sum(map(operator.mul, prices, stocks))
+        return sum(prices[row] * stocks[row] for row in self.rows)
+
+
+class ProductProxy(Product):
+    """A Product whose fields live in a ProductStore row.
+
+    Reads and writes go straight to the columns, with the same validation as
+    Product, so the proxy can be passed anywhere a Product is expected. Two
+    proxies for the same product of the same store compare and hash equal.
+    """
+
+    __slots__ = ("_store", "_product_id")
+
+    def __init__(self, store: ProductStore, product_id: int):
+        self._store = store
+        self._product_id = product_id
+
+    def __eq__(self, other):
+        if isinstance(other, ProductProxy):
+            return self._store is other._store and self._product_id == other._product_id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._store), self._product_id))
+
+    @property
+    def product_id(self) -> int:
+        return self._product_id
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._store._row(self._product_id)]
+
+    @name.setter
+    def name(self, value: str):
+        self._store.names[self._store._row(self._product_id)] = value
+
+    @property
+    def category(self) -> str:
+        store = self._store
+        return store.categories[store.column("category_code")[store._row(self._product_id)]]
+
+    @category.setter
+    def category(self, value: str):
+        store = self._store
+        store.column("category_code")[store._row(self._product_id)] = store._encode_category(value)
+
+    @property
+    def price(self) -> float:
+        return float(self._store.column("price")[self._store._row(self._product_id)])
+
+    @price.setter
+    def price(self, value: float):
+        if value < 0:
+            raise ValueError("Price cannot be negative.")
+        self._store.column("price")[self._store._row(self._product_id)] = value
+        price_changed()
+
+    @property
+    def stock(self) -> int:
+        return int(self._store.column("stock")[self._store._row(self._product_id)])
+
+    @stock.setter
+    def stock(self, value: int):
+        if value < 0:
+            raise ValueError("Stock cannot be negative.")
+        self._store.column("stock")[self._store._row(self._product_id)] = value
@@ -1,24 +1,45 @@
 import xml.etree.ElementTree as ET
 from Product import Product, InsufficientStockError, ProductNotFoundError
+from ProductJSONHandler import ProductExistsError
+from IdAllocator import IdAllocator
+from XMLIndex import IndexedXMLFile, iter_elements
+from SortedIndex import SortedIndex
 
 
 class ProductXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "product", "product_id")
+        self.ids = IdAllocator("products", filepath + ".ids", seed=lambda: max(self.document.index, default=0))
+        self.sorted_index = SortedIndex(("price", "stock"), self._sorted_records, self.document.current_signature,
+                                        partition="category")
 
     def _load_products(self):
         try:
-            tree = ET.parse(self.filepath)
-            return tree.getroot()
+            return self.document.load()
         except (FileNotFoundError, ET.ParseError):
-            root = ET.Element("products")
-            tree = ET.ElementTree(root)
-            tree.write(self.filepath)
-            return root
-
-    def _save_products(self, root):
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+            self.document.reset(ET.Element("products"))
+            self.document.save()
+            return self.document.root
+
+    def _save_products(self, root, changed: list = (), deleted: list = ()):
+        """Writes the document and patches the sorted index with the ``changed`` and ``deleted`` product ids."""
+        self.document.save()
+        self.sorted_index.apply(self.document.replaced_signature,
+                                [(product_id, self._sorted_values(self.document.get(product_id)))
+                                 for product_id in changed], deleted)
+
+    def _sorted_values(self, product_element) -> dict:
+        return {
+            "price": float(product_element.find("price").text),
+            "stock": int(product_element.find("stock").text),
+            "category": product_element.find("category").text,
+        }
+
+    def _sorted_records(self):
+        self._load_products()
+        return [(product_id, self._sorted_values(product_element))
+                for product_id, product_element in self.document.index.items()]
 
     def create_product(self, name: str, category: str, price: float, stock: int):
         if not name or not category:
@@ -26,94 +47,151 @@ class ProductXMLHandler:
 
         root = self._load_products()
 
-        product_id = len(root.findall("product")) + 1
+        product_id = self.ids.next_id()
+        # create_many takes caller-chosen ids; never hand out one that is already taken.
+        while product_id in self.document.index:
+            product_id = self.ids.next_id()
         product = Product(product_id, name, category, price, stock)
+        self._add_element(root, product)
+
+        self._save_products(root, changed=[product_id])
+        return product
+
+    def create_many(self, products: list):
+        root = self._load_products()
 
-        # Create new product XML element
+        product_ids = set(self.document.index)
+        for product in products:
+            if product.product_id in product_ids:
+                raise ProductExistsError(f"Product with ID '{product.product_id}' already exists.")
+            product_ids.add(product.product_id)
+
+        for product in products:
+            self._add_element(root, product)
+        self._save_products(root, changed=[product.product_id for product in products])
+        if products:
+            self.ids.advance_past(max(product.product_id for product in products))
+
+    def _add_element(self, root, product: Product):
         product_element = ET.SubElement(root, "product")
         ET.SubElement(product_element, "product_id").text = str(product.product_id)
         ET.SubElement(product_element, "name").text = product.name
         ET.SubElement(product_element, "category").text = product.category
         ET.SubElement(product_element, "price").text = str(product.price)
         ET.SubElement(product_element, "stock").text = str(product.stock)
-
-        self._save_products(root)
-        return product
+        self.document.add(product_element)
 
     def read_product_by_id(self, product_id: int):
-        root = self._load_products()
+        self._load_products()
 
-        for product_element in root.findall("product"):
-            if int(product_element.find("product_id").text) == product_id:
-                name = product_element.find("name").text
-                category = product_element.find("category").text
-                price = float(product_element.find("price").text)
-                stock = int(product_element.find("stock").text)
+        product_element = self.document.get(product_id)
+        if product_element is None:
+            raise ProductNotFoundError(product_id)
+        return self._element_to_product(product_element)
 
-                product = Product(product_id, name, category, price, stock)
-                return product
-
-        raise ProductNotFoundError(product_id)
+    def _element_to_product(self, product_element):
+        return Product(int(product_element.find("product_id").text),
+                       product_element.find("name").text,
+                       product_element.find("category").text,
+                       float(product_element.find("price").text),
+                       int(product_element.find("stock").text))
 
     def update_product(self, product_id: int, name: str = None, category: str = None, price: float = None,
                        stock: int = None):
         root = self._load_products()
 
-        for product_element in root.findall("product"):
-            if int(product_element.find("product_id").text) == product_id:
-                product = Product(product_id,
-                                  product_element.find("name").text,
-                                  product_element.find("category").text,
-                                  float(product_element.find("price").text),
-                                  int(product_element.find("stock").text))
-
-                if name:
-                    product.name = name
-                    product_element.find("name").text = name
-                if category:
-                    product.category = category
-                    product_element.find("category").text = category
-                if price is not None:
-                    product.update_price(price)
-                    product_element.find("price").text = str(price)
-                if stock is not None:
-                    product.update_stock(stock)
-                    product_element.find("stock").text = str(stock)
-
-                self._save_products(root)
-                return product
-
-        raise ProductNotFoundError(product_id)
+        product_element = self.document.get(product_id)
+        if product_element is None:
+            raise ProductNotFoundError(product_id)
+        product = self._element_to_product(product_element)
+
+        # Apply everything to the detached Product first: if any value is rejected,
+        # the cached element (which the next save writes out) is left untouched.
+        if name:
+            product.name = name
+        if category:
+            product.category = category
+        if price is not None:
+            product.update_price(price)
+        if stock is not None:
+            product.update_stock(stock)
+
+        if name:
+            product_element.find("name").text = name
+        if category:
+            product_element.find("category").text = category
+        if price is not None:
+            product_element.find("price").text = str(price)
+        if stock is not None:
+            product_element.find("stock").text = str(stock)
+
+        self._save_products(root, changed=[product_id])
+        return product
 
     def delete_product(self, product_id: int):
         root = self._load_products()
 
-        for product_element in root.findall("product"):
-            if int(product_element.find("product_id").text) == product_id:
-                root.remove(product_element)
-                self._save_products(root)
-                return f"Product {product_id} deleted successfully."
-
-        raise ProductNotFoundError(product_id)
+        if self.document.get(product_id) is None:
+            raise ProductNotFoundError(product_id)
+        self.document.remove(product_id)
+        self._save_products(root, deleted=[product_id])
+        return f"Product {product_id} deleted successfully."
 
-    def get_all_products(self):
+    def get_all_products(self, limit: int = None, after_id: int = None):
+        """Every product, or with ``limit``/``after_id`` one page of them ordered by id."""
         root = self._load_products()
-        products = []
-        for product_element in root.findall("product"):
-            product_id = int(product_element.find("product_id").text)
-            products.append(self.read_product_by_id(product_id))
-        return products
+        if limit is None and after_id is None:
+            return [self._element_to_product(product_element) for product_element in root.findall("product")]
+        return [self._element_to_product(product_element) for product_element in self.document.page(after_id, limit)]
+
+    def iter_products(self):
+        for product_element in iter_elements(self.filepath, "product"):
+            yield self._element_to_product(product_element)
 
     def update_stock(self, product_id: int, quantity: int):
         try:
+            root = self._load_products()
             product = self.read_product_by_id(product_id)
-            return product.update_stock(quantity)
+            message = product.update_stock(quantity)
+            self.document.get(product_id).find("stock").text = str(product.stock)
+            self._save_products(root, changed=[product_id])
+            return message
         except (ProductNotFoundError, InsufficientStockError) as e:
             return str(e)
 
     def update_price(self, product_id: int, new_price: float):
         try:
+            root = self._load_products()
             product = self.read_product_by_id(product_id)
-            return product.update_price(new_price)
+            message = product.update_price(new_price)
+            self.document.get(product_id).find("price").text = str(product.price)
+            self._save_products(root, changed=[product_id])
+            return message
         except (ProductNotFoundError, ValueError) as e:
             return str(e)
+
+    def _products_by_ids(self, product_ids: list) -> list:
+        self._load_products()
+        return [self._element_to_product(self.document.get(product_id)) for product_id in product_ids
+                if self.document.get(product_id) is not None]
+
+    def get_products_by_price(self, min_price: float = None, max_price: float = None, category: str = None,
+                              offset: int = 0, limit: int = None, descending: bool = False):
+        """Products priced within [min_price, max_price], optionally in one category, cheapest first."""
+        return self._products_by_ids(self.sorted_index.range("price", min_price, max_price, partition_value=category,
+                                                             offset=offset, limit=limit, descending=descending))
+
+    def get_products_by_stock(self, min_stock: int = None, max_stock: int = None, category: str = None,
+                              offset: int = 0, limit: int = None, descending: bool = False):
+        return self._products_by_ids(self.sorted_index.range("stock", min_stock, max_stock, partition_value=category,
+                                                             offset=offset, limit=limit, descending=descending))
+
+    def get_top_products(self, field: str = "price", limit: int = 10, largest: bool = True, category: str = None):
+        return self._products_by_ids(self.sorted_index.top(field, limit, largest, partition_value=category))
+
+    def get_low_stock_products(self, threshold: int = 5, offset: int = 0, limit: int = None):
+        """Products with fewer than ``threshold`` units left, lowest stock first."""
+        return self._products_by_ids(self.sorted_index.range("stock", below=threshold, offset=offset, limit=limit))
+
+    def count_low_stock(self, threshold: int = 5) -> int:
+        return self.sorted_index.count("stock", below=threshold)
@@ -7,25 +7,68 @@ class InvalidRatingError(Exception):
 
 
 class Rating:
+    """Aggregate of the star votes for one product.
+
+    Keeps the vote count, their sum and a 1-5 star histogram, so adding, removing
+    or changing a vote is O(1) and never needs the individual reviews.
+    """
+
+    __slots__ = ("product", "total_reviews", "average_rating", "rating_sum", "histogram")
+
     def __init__(self, product: Product):
         if not isinstance(product, Product):
             raise TypeError("Invalid product. Must be an instance of Product.")
         self.product = product
         self.total_reviews = 0
         self.average_rating = 0.0
+        self.rating_sum = 0
+        self.histogram = [0] * 5
 
     def __repr__(self):
         return (f"Rating(product='{self.product.name}', "
                 f"total_reviews={self.total_reviews}, average_rating={self.average_rating:.1f})")
 
+    @staticmethod
+    def _validate(rating_value):
+        if not (1 <= rating_value <= 5) or rating_value != int(rating_value):
+            raise InvalidRatingError(rating_value)
+        return int(rating_value)
+
+    @staticmethod
+    def to_stars(rating_value):
+        """Whole stars for a stored vote, or None for a review without one (stored as null, or 0 in older files).
+
+        Older files also kept averages such as 3.5; those are rounded half up here.
+        """
+        if not rating_value:
+            return None
+        return Rating._validate(int(rating_value + 0.5) if 1 <= rating_value <= 5 else rating_value)
+
+    def _apply(self, rating_value: int, delta: int):
+        self.histogram[rating_value - 1] += delta
+        self.rating_sum += rating_value * delta
+        self.total_reviews += delta
+        self.average_rating = self.rating_sum / self.total_reviews if self.total_reviews else 0.0
+
     def update_rating(self, new_rating: int):
-        if not (1 <= new_rating <= 5):
-            raise InvalidRatingError(new_rating)
-        self.total_reviews += 1
-        self.average_rating = ((self.average_rating * (self.total_reviews - 1)) + new_rating) / self.total_reviews
+        self._apply(self._validate(new_rating), 1)
         return f"New average rating for {self.product.name}: {self.average_rating:.1f}"
 
+    def remove_rating(self, old_rating: int):
+        old_rating = self._validate(old_rating)
+        if not self.histogram[old_rating - 1]:
+            raise ValueError(f"No {old_rating}-star vote recorded for {self.product.name}.")
+        self._apply(old_rating, -1)
+        return f"New average rating for {self.product.name}: {self.average_rating:.1f}"
+
+    def replace_rating(self, old_rating: int, new_rating: int):
+        new_rating = self._validate(new_rating)
+        self.remove_rating(old_rating)
+        return self.update_rating(new_rating)
+
     def reset_rating(self):
         self.total_reviews = 0
         self.average_rating = 0.0
+        self.rating_sum = 0
+        self.histogram = [0] * 5
         return f"Rating for {self.product.name} has been reset."
@@ -1,6 +1,9 @@
 import json
 from Product import Product, ProductNotFoundError, ProductManager
 from Rating import Rating, InvalidRatingError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
 
 
 class RatingNotFoundError(Exception):
@@ -8,19 +11,38 @@ class RatingNotFoundError(Exception):
 
 
 class RatingJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "ratings", "product_id", journaled, codec)
+
+    def _rating_to_data(self, rating: Rating) -> dict:
+        return {
+            "product_id": rating.product.product_id,
+            "product_name": rating.product.name,
+            "product_category": rating.product.category,
+            "total_reviews": rating.total_reviews,
+            "average_rating": rating.average_rating,
+            "rating_sum": rating.rating_sum,
+            "histogram": list(rating.histogram)
+        }
 
+    def _rating_from_data(self, rating_data: dict) -> Rating:
+        product = Product(rating_data["product_id"], rating_data.get("product_name"),
+                          rating_data.get("product_category"), 0.0, 0)
+        rating = Rating(product)
+        rating.total_reviews = rating_data["total_reviews"]
+        rating.average_rating = rating_data["average_rating"]
+        # Records written before the histogram existed carry only the average; rebuild them from reviews.
+        rating.rating_sum = rating_data.get("rating_sum", round(rating.average_rating * rating.total_reviews))
+        rating.histogram = list(rating_data.get("histogram", [0] * 5))
+        return rating
+
+    @locked
     def create(self, product: Product):
-        rating_data = {
-            "product_id": product.product_id,
-            "total_reviews": 0,
-            "average_rating": 0.0
-        }
+        rating_data = self._rating_to_data(Rating(product))
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"ratings": []}
 
@@ -30,56 +52,144 @@ class RatingJSONHandler:
 
         data["ratings"].append(rating_data)
 
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[rating_data])
 
     def read(self, product_id: int) -> Rating:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for rating_data in data.get("ratings", []):
                 if rating_data["product_id"] == product_id:
-                    product = self.get_product_by_id(product_id)
-                    rating = Rating(product)
-                    rating.total_reviews = rating_data["total_reviews"]
-                    rating.average_rating = rating_data["average_rating"]
-                    return rating
+                    return self._rating_from_data(rating_data)
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
         raise RatingNotFoundError(f"Rating for product with ID {product_id} not found.")
 
-    def update(self, product_id: int, new_rating: int):
+    @locked
+    def _change(self, product_id: int, change, product: Product = None, vote: bool = True):
+        """Applies ``change(rating)`` to the stored aggregate and persists it.
+
+        When ``product`` is given a missing aggregate is created first, otherwise
+        RatingNotFoundError is raised. Votes are refused with ValueError on an
+        aggregate whose histogram does not account for its reviews; it has to be
+        rebuilt from the reviews first.
+        """
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            if product is None:
+                raise
+            data = {"ratings": []}
 
-            for rating_data in data.get("ratings", []):
-                if rating_data["product_id"] == product_id:
-                    product = self.get_product_by_id(product_id)
-                    rating = Rating(product)
-                    return rating.update_rating(new_rating)
+        rating_data = next((rating for rating in data["ratings"] if rating["product_id"] == product_id), None)
+        if rating_data is None:
+            if product is None:
+                raise RatingNotFoundError(f"Rating for product with ID {product_id} not found.")
+            rating_data = self._rating_to_data(Rating(product))
+            data["ratings"].append(rating_data)
+
+        rating = self._rating_from_data(rating_data)
+        if vote and sum(rating.histogram) != rating.total_reviews:
+            raise ValueError(f"Rating for product with ID {product_id} predates the star histogram; "
+                             f"rebuild it from the reviews.")
+        message = change(rating)
+        rating_data.update(self._rating_to_data(rating))
+        self.storage.save(data, changed=[rating_data])
+        return message
 
-            raise RatingNotFoundError(f"Rating for product with ID {product_id} not found.")
+    def update(self, product_id: int, new_rating: int):
+        try:
+            return self._change(product_id, lambda rating: rating.update_rating(new_rating))
         except (FileNotFoundError, json.JSONDecodeError):
             return False
-        except InvalidRatingError as e:
+        except (InvalidRatingError, ValueError) as e:
             return str(e)
 
     def reset(self, product_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            return self._change(product_id, lambda rating: rating.reset_rating(), vote=False)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
 
-            for rating_data in data.get("ratings", []):
-                if rating_data["product_id"] == product_id:
-                    product = self.get_product_by_id(product_id)
-                    rating = Rating(product)
-                    return rating.reset_rating()
+    def add_vote(self, product: Product, rating_value: int):
+        return self._change(product.product_id, lambda rating: rating.update_rating(rating_value), product)
+
+    def remove_vote(self, product_id: int, rating_value: int):
+        return self._change(product_id, lambda rating: rating.remove_rating(rating_value))
+
+    def replace_vote(self, product_id: int, old_rating: int, new_rating: int):
+        return self._change(product_id, lambda rating: rating.replace_rating(old_rating, new_rating))
+
+    def _ratings_from_reviews(self, reviews: list) -> dict:
+        ratings = {}
+        for review_data in reviews:
+            stars = Rating.to_stars(review_data["rating"])
+            if stars is None:
+                continue
+            product_data = review_data["product"]
+            rating = ratings.get(product_data["product_id"])
+            if rating is None:
+                product = Product(product_data["product_id"], product_data.get("name"), product_data.get("category"),
+                                  0.0, 0)
+                rating = ratings[product.product_id] = Rating(product)
+            rating.update_rating(stars)
+        return ratings
+
+    def rebuild_from_reviews(self, review_handler) -> int:
+        """Recomputes every aggregate from the reviews file; returns how many products have votes."""
+        # Reviews lock before ratings lock, the order ReviewJSONHandler writes in.
+        with review_handler.storage.lock.shared(), self.storage.lock.exclusive():
+            return self._rebuild_from_reviews(review_handler)
+
+    def _rebuild_from_reviews(self, review_handler) -> int:
+        try:
+            reviews = review_handler.storage.load().get("reviews", [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            reviews = []
+        try:
+            data = self.storage.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {"ratings": []}
 
-            raise RatingNotFoundError(f"Rating for product with ID {product_id} not found.")
+        ratings = self._ratings_from_reviews(reviews)
+        rebuilt = []
+        for rating_data in data["ratings"]:
+            rating = ratings.pop(rating_data["product_id"], None)
+            if rating is None:
+                rating = self._rating_from_data(rating_data)
+                rating.reset_rating()
+            else:
+                rating.product.name = rating_data.get("product_name", rating.product.name)
+                rating.product.category = rating_data.get("product_category", rating.product.category)
+            rebuilt.append(self._rating_to_data(rating))
+        rebuilt.extend(self._rating_to_data(rating) for rating in ratings.values())
+
+        data["ratings"] = rebuilt
+        self.storage.save(data)
+        return sum(1 for rating_data in rebuilt if rating_data["total_reviews"])
+
+    def check_consistency(self, review_handler) -> dict:
+        """Returns {product_id: (stored, expected)} for every aggregate that disagrees with the reviews."""
+        try:
+            reviews = review_handler.storage.load().get("reviews", [])
         except (FileNotFoundError, json.JSONDecodeError):
-            return False
+            reviews = []
+        try:
+            stored = {rating_data["product_id"]: rating_data for rating_data in self.storage.load().get("ratings", [])}
+        except (FileNotFoundError, json.JSONDecodeError):
+            stored = {}
+
+        expected = self._ratings_from_reviews(reviews)
+        mismatches = {}
+        for product_id in set(stored) | set(expected):
+            rating_data = stored.get(product_id)
+            have = (rating_data["total_reviews"], rating_data.get("rating_sum"), rating_data.get("histogram")) \
+                if rating_data else (0, 0, [0] * 5)
+            rating = expected.get(product_id)
+            want = (rating.total_reviews, rating.rating_sum, rating.histogram) if rating else (0, 0, [0] * 5)
+            if have != want:
+                mismatches[product_id] = (have, want)
+        return mismatches
 
     def get_product_by_id(self, product_id: int):
         product_manager = ProductManager()
@@ -87,13 +197,13 @@ class RatingJSONHandler:
 
     def get_all_ratings(self):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             return [
                 {
                     "product_id": rating_data["product_id"],
                     "total_reviews": rating_data["total_reviews"],
-                    "average_rating": rating_data["average_rating"]
+                    "average_rating": rating_data["average_rating"],
+                    "histogram": rating_data.get("histogram", [0] * 5)
                 }
                 for rating_data in data.get("ratings", [])
             ]
@@ -0,0 +1,153 @@
+import sqlite3
+from Product import Product, ProductManager
+from Rating import Rating, InvalidRatingError
+from RatingJSONHandler import RatingNotFoundError
+from SQLiteStorage import connect
+
+VOTE_COLUMNS = ("votes_1", "votes_2", "votes_3", "votes_4", "votes_5")
+
+
+class RatingSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _read_row(self, product_id: int):
+        row = self.connection.execute("SELECT * FROM ratings WHERE product_id = ?", (product_id,)).fetchone()
+        if row is None:
+            raise RatingNotFoundError(f"Rating for product with ID {product_id} not found.")
+        return row
+
+    def _row_to_rating(self, row):
+        rating = Rating(Product(row["product_id"], row["product_name"], row["product_category"], 0.0, 0))
+        rating.total_reviews = row["total_reviews"]
+        rating.average_rating = row["average_rating"]
+        rating.rating_sum = row["rating_sum"]
+        rating.histogram = [row[column] for column in VOTE_COLUMNS]
+        return rating
+
+    def _save_rating(self, rating: Rating):
+        """Inserts or overwrites the whole aggregate; the name and category of an existing row are kept."""
+        self.connection.execute(
+            "INSERT INTO ratings (product_id, product_name, product_category, total_reviews, average_rating, "
+            f"rating_sum, {', '.join(VOTE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (product_id) DO UPDATE SET total_reviews = excluded.total_reviews, "
+            "average_rating = excluded.average_rating, rating_sum = excluded.rating_sum, "
+            + ", ".join(f"{column} = excluded.{column}" for column in VOTE_COLUMNS),
+            (rating.product.product_id, rating.product.name, rating.product.category, rating.total_reviews,
+             rating.average_rating, rating.rating_sum, *rating.histogram)
+        )
+
+    def create(self, product: Product):
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO ratings (product_id, product_name, product_category, total_reviews, average_rating) "
+                    "VALUES (?, ?, ?, 0, 0.0)",
+                    (product.product_id, product.name, product.category)
+                )
+        except sqlite3.IntegrityError:
+            raise RatingNotFoundError(f"Rating for product with ID '{product.product_id}' already exists.")
+
+    def read(self, product_id: int) -> Rating:
+        return self._row_to_rating(self._read_row(product_id))
+
+    def _change(self, product_id: int, change, product: Product = None, vote: bool = True):
+        """Applies ``change(rating)`` to the stored aggregate inside one write transaction.
+
+        Behaves like RatingJSONHandler._change: a missing aggregate is created when
+        ``product`` is given and is otherwise a RatingNotFoundError, and votes are
+        refused with ValueError on a row whose histogram does not account for its
+        reviews. BEGIN IMMEDIATE takes the write lock before the read, so two
+        connections voting at once cannot overwrite each other's vote.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute("SELECT * FROM ratings WHERE product_id = ?", (product_id,)).fetchone()
+            if row is None:
+                if product is None:
+                    raise RatingNotFoundError(f"Rating for product with ID {product_id} not found.")
+                rating = Rating(product)
+            else:
+                rating = self._row_to_rating(row)
+            if vote and sum(rating.histogram) != rating.total_reviews:
+                raise ValueError(f"Rating for product with ID {product_id} predates the star histogram; "
+                                 f"rebuild it from the reviews.")
+            message = change(rating)
+            self._save_rating(rating)
+        return message
+
+    def update(self, product_id: int, new_rating: int):
+        try:
+            return self._change(product_id, lambda rating: rating.update_rating(new_rating))
+        except (InvalidRatingError, ValueError) as e:
+            return str(e)
+
+    def reset(self, product_id: int):
+        return self._change(product_id, lambda rating: rating.reset_rating(), vote=False)
+
+    def add_vote(self, product: Product, rating_value: int):
+        return self._change(product.product_id, lambda rating: rating.update_rating(rating_value), product)
+
+    def remove_vote(self, product_id: int, rating_value: int):
+        return self._change(product_id, lambda rating: rating.remove_rating(rating_value))
+
+    def replace_vote(self, product_id: int, old_rating: int, new_rating: int):
+        return self._change(product_id, lambda rating: rating.replace_rating(old_rating, new_rating))
+
+    def _ratings_from_reviews(self, review_handler) -> dict:
+        ratings = {}
+        for row in review_handler.connection.execute(
+                "SELECT product_id, product_name, product_category, rating FROM reviews"):
+            stars = Rating.to_stars(row["rating"])
+            if stars is None:
+                continue
+            rating = ratings.get(row["product_id"])
+            if rating is None:
+                product = Product(row["product_id"], row["product_name"], row["product_category"], 0.0, 0)
+                rating = ratings[product.product_id] = Rating(product)
+            rating.update_rating(stars)
+        return ratings
+
+    def rebuild_from_reviews(self, review_handler) -> int:
+        """Recomputes every aggregate from a ReviewSQLiteHandler's reviews; returns how many products have votes."""
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            # Read inside the write transaction so no vote lands between the read and the rewrite.
+            ratings = self._ratings_from_reviews(review_handler)
+            self.connection.execute(
+                "UPDATE ratings SET total_reviews = 0, average_rating = 0.0, rating_sum = 0, "
+                + ", ".join(f"{column} = 0" for column in VOTE_COLUMNS)
+            )
+            for rating in ratings.values():
+                self._save_rating(rating)
+        return len(ratings)
+
+    def check_consistency(self, review_handler) -> dict:
+        """Returns {product_id: (stored, expected)} for every aggregate that disagrees with the reviews."""
+        stored = {row["product_id"]: self._row_to_rating(row)
+                  for row in self.connection.execute("SELECT * FROM ratings")}
+        expected = self._ratings_from_reviews(review_handler)
+        mismatches = {}
+        for product_id in set(stored) | set(expected):
+            have, want = stored.get(product_id), expected.get(product_id)
+            have = (have.total_reviews, have.rating_sum, have.histogram) if have else (0, 0, [0] * 5)
+            want = (want.total_reviews, want.rating_sum, want.histogram) if want else (0, 0, [0] * 5)
+            if have != want:
+                mismatches[product_id] = (have, want)
+        return mismatches
+
+    def get_product_by_id(self, product_id: int):
+        product_manager = ProductManager()
+        return product_manager.read_product_by_id(product_id)
+
+    def get_all_ratings(self):
+        return [
+            {
+                "product_id": row["product_id"],
+                "total_reviews": row["total_reviews"],
+                "average_rating": row["average_rating"],
+                "histogram": [row[column] for column in VOTE_COLUMNS]
+            }
+            for row in self.connection.execute("SELECT * FROM ratings ORDER BY product_id")
+        ]
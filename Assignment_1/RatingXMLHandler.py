@@ -1,107 +1,117 @@
 import xml.etree.ElementTree as ET
 from Product import Product
 from Rating import Rating, InvalidRatingError
+from XMLIndex import IndexedXMLFile
 
 
 class RatingXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "rating", "product_id")
 
     def _load_ratings(self):
         try:
-            tree = ET.parse(self.filepath)
-            return tree.getroot()
+            return self.document.load()
         except (FileNotFoundError, ET.ParseError):
-            root = ET.Element("ratings")
-            tree = ET.ElementTree(root)
-            tree.write(self.filepath)
-            return root
+            self.document.reset(ET.Element("ratings"))
+            self.document.save()
+            return self.document.root
 
     def _save_ratings(self, root):
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.save()
+
+    @staticmethod
+    def _write_rating(rating_element, rating: Rating):
+        for tag, value in (("total_reviews", rating.total_reviews), ("average_rating", rating.average_rating),
+                           ("rating_sum", rating.rating_sum)):
+            element = rating_element.find(tag)
+            if element is None:
+                element = ET.SubElement(rating_element, tag)
+            element.text = str(value)
+        histogram_element = rating_element.find("histogram")
+        if histogram_element is None:
+            histogram_element = ET.SubElement(rating_element, "histogram")
+        histogram_element.clear()
+        for stars, votes in enumerate(rating.histogram, start=1):
+            ET.SubElement(histogram_element, f"votes_{stars}").text = str(votes)
+
+    @staticmethod
+    def _read_rating(product_id: int, rating_element) -> Rating:
+        product = Product(product_id, rating_element.findtext("product_name", "Product Name"),
+                          rating_element.findtext("product_category", "Category"), 0.0, 0)
+        rating = Rating(product)
+        rating.total_reviews = int(rating_element.find("total_reviews").text)
+        rating.average_rating = float(rating_element.find("average_rating").text)
+        # Elements written before the sum was stored only carry the average, which the sum follows from.
+        rating_sum = rating_element.findtext("rating_sum")
+        rating.rating_sum = int(rating_sum) if rating_sum is not None else round(
+            rating.average_rating * rating.total_reviews)
+        histogram_element = rating_element.find("histogram")
+        if histogram_element is not None:
+            rating.histogram = [int(histogram_element.findtext(f"votes_{stars}", "0")) for stars in range(1, 6)]
+        return rating
 
     def create_rating(self, product: Product):
         root = self._load_ratings()
 
         # Check if the product already has a rating in XML
-        for rating_element in root.findall("rating"):
-            if int(rating_element.find("product_id").text) == product.product_id:
-                raise ValueError(f"Product '{product.name}' already has a rating.")
+        if self.document.get(product.product_id) is not None:
+            raise ValueError(f"Product '{product.name}' already has a rating.")
 
         # Create a new rating object and corresponding XML element
         rating = Rating(product)
         rating_element = ET.SubElement(root, "rating")
         ET.SubElement(rating_element, "product_id").text = str(product.product_id)
-        ET.SubElement(rating_element, "total_reviews").text = str(rating.total_reviews)
-        ET.SubElement(rating_element, "average_rating").text = str(rating.average_rating)
+        ET.SubElement(rating_element, "product_name").text = product.name
+        ET.SubElement(rating_element, "product_category").text = product.category
+        self._write_rating(rating_element, rating)
+        self.document.add(rating_element)
 
         self._save_ratings(root)
         return rating
 
     def read_rating_by_product_id(self, product_id: int):
-        root = self._load_ratings()
-
-        for rating_element in root.findall("rating"):
-            if int(rating_element.find("product_id").text) == product_id:
-                product_name = rating_element.find("product_name").text
-                total_reviews = int(rating_element.find("total_reviews").text)
-                average_rating = float(rating_element.find("average_rating").text)
+        self._load_ratings()
 
-                product = Product(product_id, product_name, "Category", 0.0, 0)
-                rating = Rating(product)
-                rating.total_reviews = total_reviews
-                rating.average_rating = average_rating
-                return rating
-
-        raise ValueError(f"No rating found for product ID {product_id}.")
+        rating_element = self.document.get(product_id)
+        if rating_element is None:
+            raise ValueError(f"No rating found for product ID {product_id}.")
+        return self._read_rating(product_id, rating_element)
 
     def update_rating(self, product_id: int, new_rating: int):
         root = self._load_ratings()
 
-        for rating_element in root.findall("rating"):
-            if int(rating_element.find("product_id").text) == product_id:
-                rating = Rating(Product(product_id, "Product Name", "Category", 0.0, 0))
-                current_reviews = int(rating_element.find("total_reviews").text)
-                current_average_rating = float(rating_element.find("average_rating").text)
-
-                rating.total_reviews = current_reviews
-                rating.average_rating = current_average_rating
-
-                rating.update_rating(new_rating)
-
-                rating_element.find("total_reviews").text = str(rating.total_reviews)
-                rating_element.find("average_rating").text = str(rating.average_rating)
+        rating_element = self.document.get(product_id)
+        if rating_element is None:
+            raise ValueError(f"No rating found for product ID {product_id}.")
+        rating = self._read_rating(product_id, rating_element)
 
-                self._save_ratings(root)
-                return rating
+        # Adding a vote needs only the count and the sum, so older elements without a histogram still average right.
+        rating.update_rating(new_rating)
+        self._write_rating(rating_element, rating)
 
-        raise ValueError(f"No rating found for product ID {product_id}.")
+        self._save_ratings(root)
+        return rating
 
     def reset_rating(self, product_id: int):
         root = self._load_ratings()
 
-        for rating_element in root.findall("rating"):
-            if int(rating_element.find("product_id").text) == product_id:
-                rating = Rating(Product(product_id, "Product Name", "Category", 0.0, 0))
-
-                rating.reset_rating()
-
-                rating_element.find("total_reviews").text = str(rating.total_reviews)
-                rating_element.find("average_rating").text = str(rating.average_rating)
+        rating_element = self.document.get(product_id)
+        if rating_element is None:
+            raise ValueError(f"No rating found for product ID {product_id}.")
+        rating = self._read_rating(product_id, rating_element)
 
-                self._save_ratings(root)
-                return rating
+        rating.reset_rating()
+        self._write_rating(rating_element, rating)
 
-        raise ValueError(f"No rating found for product ID {product_id}.")
+        self._save_ratings(root)
+        return rating
 
     def delete_rating(self, product_id: int):
         root = self._load_ratings()
 
-        for rating_element in root.findall("rating"):
-            if int(rating_element.find("product_id").text) == product_id:
-                root.remove(rating_element)
-                self._save_ratings(root)
-                return f"Rating for product ID {product_id} deleted."
-
-        raise ValueError(f"No rating found for product ID {product_id}.")
+        if self.document.get(product_id) is None:
+            raise ValueError(f"No rating found for product ID {product_id}.")
+        self.document.remove(product_id)
+        self._save_ratings(root)
+        return f"Rating for product ID {product_id} deleted."
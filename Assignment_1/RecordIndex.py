@@ -0,0 +1,173 @@
+import json
+import os
+from AtomicFile import atomic_write
+from JSONCodec import JSONCodec
+
+INDEX_CODEC = JSONCodec(compact=True)
+
+
+class RecordIndex:
+    """Secondary indexes from field values to primary keys over one JSON collection.
+
+    The index lives in memory and is persisted to ``<filepath>.idx`` together with
+    the version of the data file it describes. Each write appends only its delta,
+    tagged with the data versions before and after it, to ``<filepath>.idx.log``;
+    once the log holds ``compact_threshold`` deltas it is folded into the .idx
+    file. When the data file changes under us, the index is reloaded from the
+    .idx file plus the deltas if they lead to the new version, and rebuilt with
+    one scan otherwise.
+
+    Writers call ``refresh()`` after loading the data and ``update()`` after a
+    successful save, both while holding the storage's exclusive lock.
+    """
+
+    def __init__(self, storage, collection: str, key: str, fields: tuple, compact_threshold: int = 1000):
+        self.storage = storage
+        self.collection = collection
+        self.key = key
+        self.fields = fields
+        self.compact_threshold = compact_threshold
+        self.path = storage.filepath + ".idx"
+        self.log_path = self.path + ".log"
+        self.entries = {field: {} for field in fields}
+        self.version = None
+        self._snapshot = None
+        self._log_deltas = self._log_offset = 0
+
+    def lookup(self, field: str, value) -> list:
+        self.refresh()
+        return list(self.entries[field].get(value, ()))
+
+    def count(self, field: str, value) -> int:
+        self.refresh()
+        return len(self.entries[field].get(value, ()))
+
+    def refresh(self):
+        with self.storage.lock.shared():
+            version = json.dumps(self.storage.current_version())
+            if version != self.version and not self._catch_up(version) and not self._read(version):
+                self._rebuild(version)
+
+    def update(self, old_record: dict = None, new_record: dict = None):
+        delta = {"from": self.version, "to": json.dumps(self.storage.current_version()), "remove": [], "add": []}
+        for field in self.fields:
+            if old_record is not None:
+                delta["remove"].append([field, old_record[field], old_record[self.key]])
+            if new_record is not None:
+                delta["add"].append([field, new_record[field], new_record[self.key]])
+        self._apply(delta)
+        if delta["from"] is None:
+            self._write(delta["to"])
+        else:
+            self._append(delta)
+
+    def _apply(self, delta: dict):
+        for field, value, key in delta["remove"]:
+            keys = self.entries[field].get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self.entries[field][value]
+        for field, value, key in delta["add"]:
+            self.entries[field].setdefault(value, {})[key] = None
+        self.version = delta["to"]
+
+    def _append(self, delta: dict):
+        # The index can always be rebuilt from the data, so the append is not fsynced.
+        with open(self.log_path, "ab") as file:
+            file.write(json.dumps(delta).encode() + b"\n")
+            self._log_offset = file.tell()
+        self._log_deltas += 1
+        if self._log_deltas >= self.compact_threshold:
+            self._write(self.version)
+
+    def _replay(self, offset: int):
+        """Applies the logged deltas from byte ``offset`` on that continue from the current version."""
+        try:
+            with open(self.log_path, "rb") as file:
+                file.seek(offset)
+                for line in file:
+                    # A torn tail from a crash mid-append ends the log; a rebuild covers whatever it held.
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        break
+                    offset += len(line)
+                    self._log_deltas += 1
+                    # Deltas left over from before the snapshot was written do not continue from it.
+                    if delta["from"] == self.version:
+                        self._apply(delta)
+        except FileNotFoundError:
+            pass
+        self._log_offset = offset
+
+    def _snapshot_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _catch_up(self, version: str) -> bool:
+        """Moves the in-memory index forward with the deltas other writers appended since we last looked."""
+        if self.version is None or self._snapshot is None or self._snapshot != self._snapshot_stat():
+            return False
+        self._replay(self._log_offset)
+        return self.version == version
+
+    def _read(self, version: str) -> bool:
+        snapshot = self._snapshot_stat()
+        try:
+            with open(self.path, "rb") as file:
+                stored = INDEX_CODEC.decode(file.read())
+        except (FileNotFoundError, ValueError):
+            return False
+        if set(stored.get("entries", {})) != set(self.fields):
+            return False
+
+        self.entries = {
+            field: {value: dict.fromkeys(keys) for value, keys in stored["entries"][field]}
+            for field in self.fields
+        }
+        self.version = stored.get("version")
+        self._snapshot = snapshot
+        self._log_deltas = 0
+        self._replay(0)
+        if self.version != version:
+            self.invalidate()
+            return False
+        return True
+
+    def _rebuild(self, version: str):
+        self.entries = {field: {} for field in self.fields}
+        try:
+            records = self.storage.load().get(self.collection, [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.version = version
+            return
+
+        for record in records:
+            for field in self.fields:
+                self.entries[field].setdefault(record[field], {})[record[self.key]] = None
+        self._write(version)
+
+    def _write(self, version: str):
+        stored = {
+            "version": version,
+            "entries": {field: [[value, list(keys)] for value, keys in entries.items()]
+                        for field, entries in self.entries.items()},
+        }
+        with atomic_write(self.path, "wb") as file:
+            file.write(INDEX_CODEC.encode(stored))
+        with open(self.log_path, "wb"):
+            pass
+        self._snapshot = self._snapshot_stat()
+        self._log_deltas = self._log_offset = 0
+        self.version = version
+
+    def invalidate(self):
+        self.entries = {field: {} for field in self.fields}
+        self.version = None
+        self._snapshot = None
@@ -0,0 +1,232 @@
+import json
+import re
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from AtomicFile import atomic_write
+from JSONCodec import GZIP_MAGIC, ZSTD_MAGIC
+from JSONStorage import JournaledJSONStorage
+from Paging import page_of
+from RecordIndex import INDEX_CODEC
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def _expect(text: str, position: int, character: str) -> int:
+    position = _WHITESPACE.match(text, position).end()
+    if text[position:position + 1] != character:
+        raise json.JSONDecodeError(f"Expecting '{character}'", text, position)
+    return _WHITESPACE.match(text, position + 1).end()
+
+
+def _scan_array(text: str, position: int, key: str) -> list:
+    # The hot loop of an index build: one C-level scan per record and as few regex calls as possible.
+    scan_once, skip, spans = _DECODER.scan_once, _WHITESPACE.match, []
+    if text[position:position + 1] == "]":
+        return spans
+    while True:
+        try:
+            record, end = scan_once(text, position)
+        except StopIteration as e:
+            raise json.JSONDecodeError("Expecting value", text, e.value) from None
+        spans.append((record[key], position, end))
+        position = skip(text, end).end()
+        separator = text[position:position + 1]
+        if separator == ",":
+            position = skip(text, position + 1).end()
+        elif separator == "]":
+            return spans
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, position)
+
+
+def scan_records(text: str, collection: str, key: str) -> list:
+    """(key, start, end) character spans of the records in ``collection``, in file order."""
+    position = _expect(text, 0, "{")
+    while text[position:position + 1] != "}":
+        name, position = _DECODER.raw_decode(text, position)
+        position = _expect(text, position, ":")
+        if name != collection:
+            _, position = _DECODER.raw_decode(text, position)
+        else:
+            return _scan_array(text, _expect(text, position, "["), key)
+        position = _WHITESPACE.match(text, position).end()
+        if text[position:position + 1] == ",":
+            position = _WHITESPACE.match(text, position + 1).end()
+    return []
+
+
+class RecordOffsets:
+    """Byte spans of every record in one JSON collection, ordered by primary key.
+
+    A page of records is read by seeking to its spans and decoding only those,
+    instead of parsing the whole document. The spans come from one scan of the
+    file and are persisted to ``<filepath>.offsets`` with the version of the data
+    file they describe, so they are rebuilt only after the file changed.
+
+    After a save made through the same storage object that lists what it changed,
+    only the records from the one before the first changed record to the end of
+    the file are scanned again: unchanged records encode to the same bytes, so
+    every span ahead of that point still holds. Appends rescan the last old record
+    and the new ones, while an edit near the start of the file still rescans most
+    of it. Saves made elsewhere, or without ``changed``/``deleted``, rescan
+    everything.
+
+    Journaled storage keeps part of its records in the log and compressed files
+    cannot be seeked into; for those a page falls back to loading the document.
+    """
+
+    def __init__(self, storage, collection: str, key: str):
+        self.storage = storage
+        self.collection = collection
+        self.key = key
+        self.path = storage.filepath + ".offsets"
+        self.keys = []
+        self.starts = []
+        self.ends = []
+        self.seekable = True
+        self.version = None
+
+    def page(self, after=None, limit: int = None) -> list:
+        """Records with a key above ``after``, in key order, at most ``limit`` of them."""
+        with self.storage.lock.shared():
+            if isinstance(self.storage, JournaledJSONStorage):
+                return self._page_loaded(after, limit)
+            self.refresh()
+            if not self.seekable:
+                return self._page_loaded(after, limit)
+
+            start = 0 if after is None else bisect_right(self.keys, after)
+            stop = len(self.keys) if limit is None else min(start + limit, len(self.keys))
+            return self._decode_spans(start, stop)
+
+    def get(self, key):
+        """The record with primary key ``key``, or None, reading only its span."""
+        records = self.get_many([key])
+        return records[0] if records else None
+
+    def get_many(self, keys) -> list:
+        """The records whose primary key is in ``keys``, in key order, reading only their spans."""
+        with self.storage.lock.shared():
+            if not isinstance(self.storage, JournaledJSONStorage):
+                self.refresh()
+            if isinstance(self.storage, JournaledJSONStorage) or not self.seekable:
+                wanted = set(keys)
+                records = self.storage.load().get(self.collection, [])
+                return sorted((record for record in records if record[self.key] in wanted), key=itemgetter(self.key))
+
+            positions = []
+            for key in sorted(set(keys)):
+                position = bisect_left(self.keys, key)
+                if position < len(self.keys) and self.keys[position] == key:
+                    positions.append(position)
+            return self._decode_positions(positions)
+
+    def _decode_spans(self, start: int, stop: int) -> list:
+        return self._decode_positions(range(start, stop))
+
+    def _decode_positions(self, positions) -> list:
+        if not positions:
+            return []
+        decode = self.storage.codec.decode
+        with open(self.storage.filepath, "rb") as file:
+            records = []
+            for position in positions:
+                file.seek(self.starts[position])
+                records.append(decode(file.read(self.ends[position] - self.starts[position])))
+            return records
+
+    def _page_loaded(self, after, limit) -> list:
+        return page_of(self.storage.load().get(self.collection, []), itemgetter(self.key), after, limit)
+
+    def refresh(self):
+        with self.storage.lock.shared():
+            version = json.dumps(self.storage.current_version())
+            if version != self.version and not self._update(version) and not self._read(version):
+                self._rebuild(version)
+
+    def _update(self, version: str) -> bool:
+        """Patches the spans after our storage's last save; False when they have to be read or rebuilt."""
+        changes = self.storage.last_changes
+        if (changes is None or not self.seekable or not self.keys
+                or self.version != json.dumps(self.storage.replaced_version)
+                or version != json.dumps(self.storage.version)):
+            return False
+        changed, deleted = changes
+        affected = {record[self.key] for record in changed} | set(deleted)
+        old_keys = set(self.keys)
+        touched = [self.starts[bisect_left(self.keys, key)] for key in affected if key in old_keys]
+        if touched:
+            # Start one record early: the separator after it changes when the record behind it is deleted.
+            restart = max((start for start in self.starts if start < min(touched)), default=min(touched))
+        else:
+            # Only new records, appended behind the last old one.
+            restart = max(self.starts)
+
+        kept = [(key, start, end) for key, start, end in zip(self.keys, self.starts, self.ends) if start < restart]
+        with open(self.storage.filepath, "rb") as file:
+            file.seek(restart)
+            tail = file.read().decode("latin-1")
+        try:
+            scanned = _scan_array(tail, 0, self.key)
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return False
+        if scanned and isinstance(scanned[0][0], str):
+            scanned = [(record_key.encode("latin-1").decode("utf-8"), start, end) for record_key, start, end in scanned]
+        expected = len(old_keys - affected) + len(affected - set(deleted))
+        restart_key = self.keys[self.starts.index(restart)]
+        if len(kept) + len(scanned) != expected or (
+                scanned and restart_key not in affected and scanned[0][0] != restart_key):
+            return False
+
+        spans = kept + [(record_key, start + restart, end + restart) for record_key, start, end in scanned]
+        spans.sort(key=itemgetter(0))
+        self.keys = [record_key for record_key, _, _ in spans]
+        self.starts = [start for _, start, _ in spans]
+        self.ends = [end for _, _, end in spans]
+        self.version = version
+        self._write(version)
+        return True
+
+    def _read(self, version: str) -> bool:
+        try:
+            with open(self.path, "rb") as file:
+                stored = INDEX_CODEC.decode(file.read())
+        except (FileNotFoundError, ValueError):
+            return False
+        if stored.get("version") != version or stored.get("collection") != self.collection:
+            return False
+        self.keys, self.starts, self.ends = stored["keys"], stored["starts"], stored["ends"]
+        self.seekable = True
+        self.version = version
+        return True
+
+    def _rebuild(self, version: str):
+        self.keys, self.starts, self.ends = [], [], []
+        self.seekable = True
+        self.version = version
+        try:
+            with open(self.storage.filepath, "rb") as file:
+                raw = file.read()
+        except FileNotFoundError:
+            return
+        if raw.startswith(GZIP_MAGIC) or raw.startswith(ZSTD_MAGIC):
+            self.seekable = False
+            return
+
+        # Latin-1 maps every byte to one character, so string positions are byte offsets. JSON syntax
+        # is ASCII and UTF-8 continuation bytes are legal string content, so the scan is unaffected.
+        spans = scan_records(raw.decode("latin-1"), self.collection, self.key)
+        if spans and isinstance(spans[0][0], str):
+            spans = [(record_key.encode("latin-1").decode("utf-8"), start, end) for record_key, start, end in spans]
+        spans.sort(key=itemgetter(0))
+        self.keys = [record_key for record_key, _, _ in spans]
+        self.starts = [start for _, start, _ in spans]
+        self.ends = [end for _, _, end in spans]
+        self._write(version)
+
+    def _write(self, version: str):
+        stored = {"version": version, "collection": self.collection,
+                  "keys": self.keys, "starts": self.starts, "ends": self.ends}
+        with atomic_write(self.path, "wb") as file:
+            file.write(INDEX_CODEC.encode(stored))
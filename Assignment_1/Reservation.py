@@ -0,0 +1,197 @@
+import threading
+import time
+from Product import InsufficientStockError, ProductNotFoundError
+
+
+class ReservationNotFoundError(Exception):
+    def __init__(self, cart_id: int):
+        super().__init__(f"No active reservation for cart {cart_id}.")
+
+
+class ReservationExpiredError(Exception):
+    def __init__(self, cart_id: int):
+        super().__init__(f"The reservation for cart {cart_id} has expired.")
+
+
+class ReservationMismatchError(Exception):
+    def __init__(self, cart_id: int):
+        super().__init__(f"The reservation for cart {cart_id} does not cover the cart's contents.")
+
+
+class Hold:
+    """Units one cart has reserved, and when the hold lapses."""
+
+    __slots__ = ("cart_id", "items", "expires_at")
+
+    def __init__(self, cart_id: int, expires_at: float):
+        self.cart_id = cart_id
+        self.items = {}
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"Hold(cart_id={self.cart_id}, items={self.items}, expires_at={self.expires_at:.1f})"
+
+
+class ReservationManager:
+    """Time-limited stock holds per cart, safe to share between checkout threads.
+
+    ``product.stock`` stays the units on hand; a hold only lowers what is
+    available to other carts (stock minus everything reserved) until it is
+    committed, which takes the units out of stock, or released or expired,
+    which gives them back.
+
+    Each product is guarded by one of ``stripes`` locks. A multi-product call
+    takes its stripes in index order, so it is all-or-nothing without a global
+    lock and without deadlocks; carts buying different products rarely wait on
+    each other. The table of holds has its own short-lived lock, and whoever
+    pops a hold from it (commit, release or the sweeper) owns the units in it.
+    """
+
+    def __init__(self, products: dict, hold_seconds: float = 900, stripes: int = 64, clock=time.monotonic):
+        self.products = products
+        self.hold_seconds = hold_seconds
+        self.clock = clock
+        self.reserved = {}
+        self.holds = {}
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._holds_lock = threading.Lock()
+
+    def _locks_for(self, product_ids) -> list:
+        return [self._stripes[index] for index in sorted({hash(product_id) % len(self._stripes)
+                                                         for product_id in product_ids})]
+
+    def _acquire(self, product_ids) -> list:
+        locks = self._locks_for(product_ids)
+        for lock in locks:
+            lock.acquire()
+        return locks
+
+    @staticmethod
+    def _release_locks(locks: list):
+        for lock in reversed(locks):
+            lock.release()
+
+    def available(self, product_id: int) -> int:
+        product = self.products.get(product_id)
+        if product is None:
+            raise ProductNotFoundError(product_id)
+        return product.stock - self.reserved.get(product_id, 0)
+
+    def reserve(self, cart_id: int, items: dict) -> Hold:
+        """Holds ``items`` ({product_id: quantity}) for the cart, all of them or none.
+
+        Adds to the cart's existing hold and restarts its timer. When stock is
+        short, expired holds are swept once before giving up with
+        InsufficientStockError.
+        """
+        for quantity in items.values():
+            if quantity <= 0:
+                raise ValueError("Quantity must be positive.")
+        try:
+            return self._try_reserve(cart_id, items)
+        except InsufficientStockError:
+            if not self.sweep_expired():
+                raise
+        return self._try_reserve(cart_id, items)
+
+    def _try_reserve(self, cart_id: int, items: dict) -> Hold:
+        locks = self._acquire(items)
+        try:
+            for product_id, quantity in items.items():
+                if self.available(product_id) < quantity:
+                    product = self.products[product_id]
+                    raise InsufficientStockError(product.name, self.available(product_id), -quantity)
+            for product_id, quantity in items.items():
+                self.reserved[product_id] = self.reserved.get(product_id, 0) + quantity
+            with self._holds_lock:
+                hold = self.holds.get(cart_id)
+                if hold is None:
+                    hold = self.holds[cart_id] = Hold(cart_id, 0)
+                for product_id, quantity in items.items():
+                    hold.items[product_id] = hold.items.get(product_id, 0) + quantity
+                hold.expires_at = self.clock() + self.hold_seconds
+                return hold
+        finally:
+            self._release_locks(locks)
+
+    def _return(self, items: dict, take_from_stock: bool):
+        locks = self._acquire(items)
+        try:
+            for product_id, quantity in items.items():
+                left = self.reserved[product_id] - quantity
+                if left:
+                    self.reserved[product_id] = left
+                else:
+                    del self.reserved[product_id]
+                if take_from_stock:
+                    self.products[product_id].stock -= quantity
+        finally:
+            self._release_locks(locks)
+
+    def held(self, cart_id: int) -> dict:
+        """A copy of the items the cart currently holds ({} when it holds nothing)."""
+        with self._holds_lock:
+            hold = self.holds.get(cart_id)
+            return dict(hold.items) if hold is not None else {}
+
+    def _pop_hold(self, cart_id: int) -> Hold:
+        with self._holds_lock:
+            hold = self.holds.pop(cart_id, None)
+        if hold is None:
+            raise ReservationNotFoundError(cart_id)
+        return hold
+
+    def commit(self, cart_id: int, expected: dict = None) -> dict:
+        """Turns the cart's hold into a sale: the units leave stock. Returns the items committed.
+
+        With ``expected`` ({product_id: quantity}) the hold must match it exactly;
+        otherwise it is released and ReservationMismatchError raised, so a sale
+        never goes through for units that were not held.
+        """
+        hold = self._pop_hold(cart_id)
+        if hold.expires_at <= self.clock():
+            self._return(hold.items, take_from_stock=False)
+            raise ReservationExpiredError(cart_id)
+        if expected is not None and hold.items != expected:
+            self._return(hold.items, take_from_stock=False)
+            raise ReservationMismatchError(cart_id)
+        self._return(hold.items, take_from_stock=True)
+        return hold.items
+
+    def release(self, cart_id: int, product_id: int = None) -> dict:
+        """Gives back the whole hold, or just one product of it. Returns the items released."""
+        if product_id is None:
+            hold = self._pop_hold(cart_id)
+            self._return(hold.items, take_from_stock=False)
+            return hold.items
+
+        with self._holds_lock:
+            hold = self.holds.get(cart_id)
+            quantity = hold.items.pop(product_id, None) if hold is not None else None
+            if hold is not None and not hold.items:
+                del self.holds[cart_id]
+        if quantity is None:
+            raise ReservationNotFoundError(cart_id)
+        self._return({product_id: quantity}, take_from_stock=False)
+        return {product_id: quantity}
+
+    def sweep_expired(self) -> int:
+        """Releases every hold past its deadline; returns how many were dropped."""
+        now = self.clock()
+        with self._holds_lock:
+            expired = [hold for hold in self.holds.values() if hold.expires_at <= now]
+            for hold in expired:
+                del self.holds[hold.cart_id]
+        for hold in expired:
+            self._return(hold.items, take_from_stock=False)
+        return len(expired)
+
+    def start_sweeper(self, interval: float = 30) -> threading.Event:
+        """Sweeps expired holds from a daemon thread every ``interval`` seconds; set the returned event to stop."""
+        stopped = threading.Event()
+
+        def run():
+            while not stopped.wait(interval):
+                self.sweep_expired()
+        threading.Thread(target=run, name="reservation-sweeper", daemon=True).start()
+        return stopped
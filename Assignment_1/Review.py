@@ -1,5 +1,6 @@
 from Product import Product
 from Rating import Rating, InvalidRatingError
+from IdAllocator import IdAllocator
 
 
 class ReviewNotFoundError(Exception):
@@ -7,8 +8,15 @@ class ReviewNotFoundError(Exception):
         super().__init__(f"Review with ID {review_id} not found.")
 
 
+def _stars_of(rating: Rating):
+    return Rating.to_stars(rating.average_rating)
+
+
 class Review:
-    def __init__(self, review_id: int, user_id: int, product: Product, rating: Rating, comment: str):
+    __slots__ = ("review_id", "user_id", "product", "rating", "comment", "stars")
+
+    def __init__(self, review_id: int, user_id: int, product: Product, rating: Rating, comment: str,
+                 stars: int = None):
         if not comment:
             raise ValueError("Comment cannot be empty.")
         if not isinstance(product, Product):
@@ -20,6 +28,8 @@ class Review:
         self.product = product
         self.rating = rating
         self.comment = comment
+        # The reviewer's own vote; the product aggregate is changed by exactly this many stars.
+        self.stars = stars if stars is not None else _stars_of(rating)
 
     def __repr__(self):
         return (f"Review(review_id={self.review_id}, user_id={self.user_id}, "
@@ -32,6 +42,7 @@ class Review:
             raise TypeError("Invalid rating. Must be an instance of Rating.")
         self.comment = new_comment
         self.rating = new_rating
+        self.stars = _stars_of(new_rating)
         return f"Review for {self.product.name} updated."
 
     def delete_review(self):
@@ -39,18 +50,23 @@ class Review:
 
 
 class ReviewManager:
-    def __init__(self):
+    def __init__(self, ids: IdAllocator = None):
         self.reviews = {}
-        self.current_review_id = 1
+        self.reviews_by_product = {}
+        self.reviews_by_user = {}
+        self.ratings = {}
+        self.ids = ids or IdAllocator("reviews")
 
     def add_review(self, user_id: int, product: Product, rating_value: int, comment: str):
         if rating_value < 1 or rating_value > 5:
             raise InvalidRatingError(rating_value)
         rating = Rating(product)
         rating.update_rating(rating_value)
-        review = Review(self.current_review_id, user_id, product, rating, comment)
-        self.reviews[self.current_review_id] = review
-        self.current_review_id += 1
+        review = Review(self.ids.next_id(), user_id, product, rating, comment, rating_value)
+        self.reviews[review.review_id] = review
+        self.reviews_by_product.setdefault(product.product_id, {})[review.review_id] = review
+        self.reviews_by_user.setdefault(user_id, {})[review.review_id] = review
+        self.ratings.setdefault(product.product_id, Rating(product)).update_rating(rating_value)
         return review
 
     def get_review(self, review_id: int):
@@ -62,10 +78,16 @@ class ReviewManager:
     def get_reviews_for_product(self, product: Product):
         if not isinstance(product, Product):
             raise TypeError("Invalid product. Must be an instance of Product.")
-        return [review for review in self.reviews.values() if review.product == product]
+        return list(self.reviews_by_product.get(product.product_id, {}).values())
 
     def get_reviews_by_user(self, user_id: int):
-        return [review for review in self.reviews.values() if review.user_id == user_id]
+        return list(self.reviews_by_user.get(user_id, {}).values())
+
+    def get_product_rating(self, product: Product) -> Rating:
+        """The running aggregate of every review's stars for ``product``."""
+        if not isinstance(product, Product):
+            raise TypeError("Invalid product. Must be an instance of Product.")
+        return self.ratings.get(product.product_id) or Rating(product)
 
     def update_review(self, review_id: int, new_comment: str = None, new_rating_value: int = None):
         try:
@@ -80,16 +102,29 @@ class ReviewManager:
         if new_rating_value is not None:
             if new_rating_value < 1 or new_rating_value > 5:
                 raise InvalidRatingError(new_rating_value)
+            self.ratings[review.product.product_id].replace_rating(review.stars, new_rating_value)
+            review.rating.reset_rating()
             review.rating.update_rating(new_rating_value)
+            review.stars = new_rating_value
         return review
 
     def delete_review(self, review_id: int):
         try:
             review = self.get_review(review_id)
             del self.reviews[review_id]
+            self._unindex(self.reviews_by_product, review.product.product_id, review_id)
+            self._unindex(self.reviews_by_user, review.user_id, review_id)
+            self.ratings[review.product.product_id].remove_rating(review.stars)
             return f"Review {review_id} for product {review.product.name} deleted."
         except ReviewNotFoundError as e:
             return str(e)
 
     def list_all_reviews(self):
         return list(self.reviews.values())
+
+    @staticmethod
+    def _unindex(index: dict, key, review_id: int):
+        reviews = index[key]
+        del reviews[review_id]
+        if not reviews:
+            del index[key]
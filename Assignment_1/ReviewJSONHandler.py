@@ -2,7 +2,11 @@ import json
 from typing import Optional
 from Review import Review
 from Product import Product
-from Rating import Rating
+from Rating import Rating, InvalidRatingError
+from RatingJSONHandler import RatingNotFoundError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
 
 
 class ReviewExistsError(Exception):
@@ -14,26 +18,63 @@ class ReviewNotFoundError(Exception):
 
 
 class ReviewJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None, ratings=None):
+        """``ratings`` is an optional RatingJSONHandler whose per-product aggregates are
+        kept in step with every review written, edited or deleted here."""
         self.filepath = filepath
+        self.storage = open_storage(filepath, "reviews", "review_id", journaled, codec)
+        self.ratings = ratings
+        self.search_index = None
 
+    def _sync_search_index(self, saved: list = (), deleted: list = ()):
+        if self.search_index is not None:
+            self.search_index.synced(self, saved, deleted)
+
+    def _sync_rating(self, change):
+        """Applies ``change(ratings)`` to the rating aggregates once the reviews are saved.
+
+        An aggregate the change cannot apply to (missing, or written before the
+        histogram existed) is recomputed from the reviews instead, so a saved review
+        is never followed by an error. Called under our exclusive lock, which is
+        always taken before the ratings lock.
+        """
+        if self.ratings is None:
+            return
+        try:
+            change(self.ratings)
+        except (ValueError, InvalidRatingError, RatingNotFoundError, FileNotFoundError):
+            self.ratings.rebuild_from_reviews(self)
+
+    @staticmethod
+    def _product_from_data(product_data: dict) -> Product:
+        return Product(
+            product_id=product_data["product_id"],
+            name=product_data["name"],
+            category=product_data.get("category"),
+            price=product_data["price"],
+            stock=product_data["stock"],
+        )
+
+    @locked
     def create(self, review: Review):
+        # A review may carry no vote (stars None); any vote it does carry is checked before anything is written.
+        stars = review.stars if review.stars is None else Rating._validate(review.stars)
         review_data = {
             "review_id": review.review_id,
             "user_id": review.user_id,
             "product": {
                 "product_id": review.product.product_id,
                 "name": review.product.name,
+                "category": review.product.category,
                 "price": review.product.price,
                 "stock": review.product.stock,
             },
-            "rating": review.rating.average_rating,
+            "rating": stars,
             "comment": review.comment,
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"reviews": []}
 
@@ -42,69 +83,78 @@ class ReviewJSONHandler:
                 raise ReviewExistsError(f"Review with ID {review.review_id} already exists.")
 
         data["reviews"].append(review_data)
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[review_data])
+        self._sync_search_index([review_data])
+        if stars is not None:
+            self._sync_rating(lambda ratings: ratings.add_vote(review.product, stars))
 
     def read(self, review_id: int) -> Optional[Review]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for review_data in data.get("reviews", []):
                 if review_data["review_id"] == review_id:
-                    product_data = review_data["product"]
-                    product = Product(
-                        product_id=product_data["product_id"],
-                        name=product_data["name"],
-                        price=product_data["price"],
-                        stock=product_data["stock"],
-                    )
+                    product = self._product_from_data(review_data["product"])
+                    stars = Rating.to_stars(review_data["rating"])
                     rating = Rating(product)
-                    rating.average_rating = review_data["rating"]
+                    if stars is not None:
+                        rating.update_rating(stars)
                     return Review(
                         review_id=review_data["review_id"],
                         user_id=review_data["user_id"],
                         product=product,
                         rating=rating,
                         comment=review_data["comment"],
+                        stars=stars,
                     )
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update(self, review_id: int, new_comment: str = None, new_rating: float = None):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for review_data in data.get("reviews", []):
                 if review_data["review_id"] == review_id:
+                    old_stars = Rating.to_stars(review_data["rating"])
+                    new_stars = old_stars if new_rating is None else Rating._validate(new_rating)
                     if new_comment:
                         review_data["comment"] = new_comment
                     if new_rating is not None:
-                        review_data["rating"] = new_rating
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                        review_data["rating"] = new_stars
+                    self.storage.save(data, changed=[review_data])
+                    self._sync_search_index([review_data])
+                    if old_stars is None and new_stars is not None:
+                        product = self._product_from_data(review_data["product"])
+                        self._sync_rating(lambda ratings: ratings.add_vote(product, new_stars))
+                    elif new_stars != old_stars:
+                        self._sync_rating(lambda ratings: ratings.replace_vote(
+                            review_data["product"]["product_id"], old_stars, new_stars))
                     return True
             raise ReviewNotFoundError(f"Review with ID {review_id} not found for update.")
         except (FileNotFoundError, json.JSONDecodeError):
             return False
-        except ReviewNotFoundError as e:
+        except (ReviewNotFoundError, InvalidRatingError) as e:
             print(e)
             return False
 
+    @locked
     def delete(self, review_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-            original_length = len(data.get("reviews", []))
+            data = self.storage.load()
+            removed = [review for review in data.get("reviews", []) if review["review_id"] == review_id]
             data["reviews"] = [review for review in data.get("reviews", []) if review["review_id"] != review_id]
 
-            if len(data["reviews"]) == original_length:
+            if not removed:
                 raise ReviewNotFoundError(f"Review with ID {review_id} not found for deletion.")
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            stars = Rating.to_stars(removed[0]["rating"])
+            self.storage.save(data, deleted=[review_id])
+            self._sync_search_index(deleted=[review_id])
+            if stars is not None:
+                self._sync_rating(lambda ratings: ratings.remove_vote(removed[0]["product"]["product_id"], stars))
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             return False
-        except ReviewNotFoundError as e:
+        except (ReviewNotFoundError, InvalidRatingError) as e:
             print(e)
             return False
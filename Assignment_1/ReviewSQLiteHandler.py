@@ -0,0 +1,112 @@
+import sqlite3
+from typing import Optional
+from Review import Review
+from Product import Product
+from Rating import Rating, InvalidRatingError
+from RatingJSONHandler import RatingNotFoundError
+from ReviewJSONHandler import ReviewExistsError, ReviewNotFoundError
+from SQLiteStorage import connect
+
+
+class ReviewSQLiteHandler:
+    def __init__(self, filepath: str, ratings=None):
+        """``ratings`` is an optional RatingSQLiteHandler kept in step with the votes written here,
+        as ReviewJSONHandler does for RatingJSONHandler."""
+        self.filepath = filepath
+        self.connection = connect(filepath)
+        self.ratings = ratings
+
+    def _row_to_review(self, row):
+        product = Product(row["product_id"], row["product_name"], row["product_category"],
+                          row["product_price"], row["product_stock"])
+        stars = Rating.to_stars(row["rating"])
+        rating = Rating(product)
+        if stars is not None:
+            rating.update_rating(stars)
+        return Review(
+            review_id=row["review_id"],
+            user_id=row["user_id"],
+            product=product,
+            rating=rating,
+            comment=row["comment"],
+            stars=stars,
+        )
+
+    def _sync_rating(self, change):
+        """Applies ``change(ratings)`` once the review is committed; rebuilds the aggregates if it cannot apply."""
+        if self.ratings is None:
+            return
+        try:
+            change(self.ratings)
+        except (ValueError, InvalidRatingError, RatingNotFoundError):
+            self.ratings.rebuild_from_reviews(self)
+
+    def create(self, review: Review):
+        # A review may carry no vote (stars None); any vote it does carry is checked before anything is written.
+        stars = review.stars if review.stars is None else Rating._validate(review.stars)
+        product = review.product
+        try:
+            with self.connection:
+                # The column predates reviews without a vote and is NOT NULL, so "no vote" is stored as 0.
+                self.connection.execute(
+                    "INSERT INTO reviews (review_id, user_id, product_id, product_name, product_category, product_price, "
+                    "product_stock, rating, comment) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (review.review_id, review.user_id, product.product_id, product.name, product.category,
+                     product.price, product.stock, stars or 0, review.comment)
+                )
+        except sqlite3.IntegrityError:
+            raise ReviewExistsError(f"Review with ID {review.review_id} already exists.")
+        if stars is not None:
+            self._sync_rating(lambda ratings: ratings.add_vote(product, stars))
+
+    def read(self, review_id: int) -> Optional[Review]:
+        row = self.connection.execute("SELECT * FROM reviews WHERE review_id = ?", (review_id,)).fetchone()
+        return self._row_to_review(row) if row else None
+
+    def update(self, review_id: int, new_comment: str = None, new_rating: float = None):
+        try:
+            new_stars = None if new_rating is None else Rating._validate(new_rating)
+            with self.connection:
+                # Take the write lock before reading the old vote, so the aggregate is changed by what was replaced.
+                self.connection.execute("BEGIN IMMEDIATE")
+                row = self.connection.execute("SELECT * FROM reviews WHERE review_id = ?", (review_id,)).fetchone()
+                if row is None:
+                    raise ReviewNotFoundError(f"Review with ID {review_id} not found for update.")
+                old_stars = Rating.to_stars(row["rating"])
+                self.connection.execute(
+                    "UPDATE reviews SET comment = COALESCE(?, comment), rating = COALESCE(?, rating) WHERE review_id = ?",
+                    (new_comment or None, new_stars, review_id)
+                )
+        except (ReviewNotFoundError, InvalidRatingError) as e:
+            print(e)
+            return False
+        if new_stars is not None and old_stars is None:
+            product = self._row_to_review(row).product
+            self._sync_rating(lambda ratings: ratings.add_vote(product, new_stars))
+        elif new_stars is not None and new_stars != old_stars:
+            self._sync_rating(lambda ratings: ratings.replace_vote(row["product_id"], old_stars, new_stars))
+        return True
+
+    def delete(self, review_id: int):
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute("SELECT * FROM reviews WHERE review_id = ?", (review_id,)).fetchone()
+            self.connection.execute("DELETE FROM reviews WHERE review_id = ?", (review_id,))
+        if row is None:
+            print(ReviewNotFoundError(f"Review with ID {review_id} not found for deletion."))
+            return False
+        try:
+            stars = Rating.to_stars(row["rating"])
+        except InvalidRatingError:
+            stars = None
+        if stars is not None:
+            self._sync_rating(lambda ratings: ratings.remove_vote(row["product_id"], stars))
+        return True
+
+    def get_reviews_for_product(self, product_id: int):
+        return [self._row_to_review(row)
+                for row in self.connection.execute("SELECT * FROM reviews WHERE product_id = ?", (product_id,))]
+
+    def get_reviews_by_user(self, user_id: int):
+        return [self._row_to_review(row)
+                for row in self.connection.execute("SELECT * FROM reviews WHERE user_id = ?", (user_id,))]
@@ -2,25 +2,26 @@ import xml.etree.ElementTree as ET
 from Product import Product
 from Rating import Rating, InvalidRatingError
 from Review import Review, ReviewNotFoundError
+from IdAllocator import IdAllocator
+from XMLIndex import IndexedXMLFile, iter_elements
 
 
 class ReviewXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "review", "review_id")
+        self.ids = IdAllocator("reviews", filepath + ".ids", seed=lambda: max(self.document.index, default=0))
 
     def _load_reviews(self):
         try:
-            tree = ET.parse(self.filepath)
-            return tree.getroot()
+            return self.document.load()
         except (FileNotFoundError, ET.ParseError):
-            root = ET.Element("reviews")
-            tree = ET.ElementTree(root)
-            tree.write(self.filepath)
-            return root
+            self.document.reset(ET.Element("reviews"))
+            self.document.save()
+            return self.document.root
 
     def _save_reviews(self, root):
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.save()
 
     def create_review(self, user_id: int, product: Product, rating_value: int, comment: str):
         if rating_value < 1 or rating_value > 5:
@@ -30,7 +31,7 @@ class ReviewXMLHandler:
         rating.update_rating(rating_value)
 
         root = self._load_reviews()
-        review_id = len(root.findall("review")) + 1
+        review_id = self.ids.next_id()
         review = Review(review_id, user_id, product, rating, comment)
 
         review_element = ET.SubElement(root, "review")
@@ -39,26 +40,30 @@ class ReviewXMLHandler:
         ET.SubElement(review_element, "product_id").text = str(product.product_id)
         ET.SubElement(review_element, "rating").text = str(rating_value)
         ET.SubElement(review_element, "comment").text = comment
+        self.document.add(review_element)
 
         self._save_reviews(root)
         return review
 
     def get_review(self, review_id: int):
-        root = self._load_reviews()
-
-        for review_element in root.findall("review"):
-            if int(review_element.find("review_id").text) == review_id:
-                product_id = int(review_element.find("product_id").text)
-                product = Product(product_id, "Placeholder Product", "Category", 0.0, 0)
-                user_id = int(review_element.find("user_id").text)
-                rating_value = int(review_element.find("rating").text)
-                comment = review_element.find("comment").text
-                rating = Rating(product)
-                rating.update_rating(rating_value)
-
-                return Review(review_id, user_id, product, rating, comment)
+        self._load_reviews()
+
+        review_element = self.document.get(review_id)
+        if review_element is None:
+            raise ReviewNotFoundError(review_id)
+        return self._element_to_review(review_element)
+
+    def _element_to_review(self, review_element):
+        review_id = int(review_element.find("review_id").text)
+        user_id = int(review_element.find("user_id").text)
+        product_id = int(review_element.find("product_id").text)
+        product = Product(product_id, "Placeholder Product", "Category", 0.0, 0)
+        rating_value = int(review_element.find("rating").text)
+        comment = review_element.find("comment").text
+        rating = Rating(product)
+        rating.update_rating(rating_value)
 
-        raise ReviewNotFoundError(review_id)
+        return Review(review_id, user_id, product, rating, comment)
 
     def get_reviews_for_product(self, product: Product):
         if not isinstance(product, Product):
@@ -98,44 +103,34 @@ class ReviewXMLHandler:
         return reviews
 
     def update_review(self, review_id: int, new_comment: str = None, new_rating_value: int = None):
+        if new_rating_value is not None and not 1 <= new_rating_value <= 5:
+            raise InvalidRatingError(new_rating_value)
         root = self._load_reviews()
 
-        for review_element in root.findall("review"):
-            if int(review_element.find("review_id").text) == review_id:
-                if new_comment:
-                    review_element.find("comment").text = new_comment
-                if new_rating_value is not None:
-                    review_element.find("rating").text = str(new_rating_value)
-
-                self._save_reviews(root)
-                return f"Review {review_id} updated."
+        review_element = self.document.get(review_id)
+        if review_element is None:
+            raise ReviewNotFoundError(review_id)
+        if new_comment:
+            review_element.find("comment").text = new_comment
+        if new_rating_value is not None:
+            review_element.find("rating").text = str(new_rating_value)
 
-        raise ReviewNotFoundError(review_id)
+        self._save_reviews(root)
+        return f"Review {review_id} updated."
 
     def delete_review(self, review_id: int):
         root = self._load_reviews()
 
-        for review_element in root.findall("review"):
-            if int(review_element.find("review_id").text) == review_id:
-                root.remove(review_element)
-                self._save_reviews(root)
-                return f"Review {review_id} deleted."
-
-        raise ReviewNotFoundError(review_id)
+        if self.document.get(review_id) is None:
+            raise ReviewNotFoundError(review_id)
+        self.document.remove(review_id)
+        self._save_reviews(root)
+        return f"Review {review_id} deleted."
 
     def list_all_reviews(self):
         root = self._load_reviews()
-        reviews = []
-        for review_element in root.findall("review"):
-            review_id = int(review_element.find("review_id").text)
-            user_id = int(review_element.find("user_id").text)
-            product_id = int(review_element.find("product_id").text)
-            product = Product(product_id, "Placeholder Product", "Category", 0.0, 0)
-            rating_value = int(review_element.find("rating").text)
-            comment = review_element.find("comment").text
-            rating = Rating(product)
-            rating.update_rating(rating_value)
+        return [self._element_to_review(review_element) for review_element in root.findall("review")]
 
-            reviews.append(Review(review_id, user_id, product, rating, comment))
-
-        return reviews
+    def iter_reviews(self):
+        for review_element in iter_elements(self.filepath, "review"):
+            yield self._element_to_review(review_element)
@@ -0,0 +1,230 @@
+import sqlite3
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    price REAL NOT NULL,
+    stock INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+CREATE INDEX IF NOT EXISTS idx_products_stock ON products (stock);
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT,
+    phone TEXT,
+    address_id INTEGER,
+    city TEXT,
+    street TEXT,
+    house INTEGER,
+    apartment INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS addresses (
+    address_id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    city TEXT,
+    street TEXT,
+    house INTEGER,
+    apartment INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_addresses_user ON addresses (user_id);
+
+CREATE TABLE IF NOT EXISTS carts (
+    cart_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_carts_user ON carts (user_id);
+
+CREATE TABLE IF NOT EXISTS cart_items (
+    cart_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT,
+    category TEXT,
+    price REAL,
+    stock INTEGER,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (cart_id, product_id)
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    total_amount REAL NOT NULL,
+    status TEXT NOT NULL,
+    address_id INTEGER,
+    city TEXT,
+    street TEXT,
+    house INTEGER,
+    apartment INTEGER,
+    payment_method TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status);
+
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT,
+    category TEXT,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (order_id, product_id)
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id INTEGER PRIMARY KEY,
+    order_id INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    payment_method TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_payments_order ON payments (order_id);
+
+CREATE TABLE IF NOT EXISTS inventories (
+    seller_id INTEGER PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS inventory_products (
+    seller_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT,
+    price REAL NOT NULL,
+    stock INTEGER NOT NULL,
+    PRIMARY KEY (seller_id, product_id)
+);
+
+CREATE TABLE IF NOT EXISTS sellers (
+    seller_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS seller_products (
+    seller_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT,
+    category TEXT,
+    price REAL,
+    stock INTEGER,
+    PRIMARY KEY (seller_id, product_id)
+);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    product_name TEXT,
+    product_category TEXT,
+    product_price REAL,
+    product_stock INTEGER,
+    rating REAL NOT NULL,
+    comment TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_product ON reviews (product_id);
+CREATE INDEX IF NOT EXISTS idx_reviews_user ON reviews (user_id);
+
+CREATE TABLE IF NOT EXISTS ratings (
+    product_id INTEGER PRIMARY KEY,
+    product_name TEXT,
+    product_category TEXT,
+    total_reviews INTEGER NOT NULL,
+    average_rating REAL NOT NULL,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    votes_1 INTEGER NOT NULL DEFAULT 0,
+    votes_2 INTEGER NOT NULL DEFAULT 0,
+    votes_3 INTEGER NOT NULL DEFAULT 0,
+    votes_4 INTEGER NOT NULL DEFAULT 0,
+    votes_5 INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    category_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    parent_id INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS category_products (
+    category_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT,
+    category TEXT,
+    price REAL,
+    stock INTEGER,
+    PRIMARY KEY (category_id, product_id)
+);
+"""
+
+
+def connect(filepath: str) -> sqlite3.Connection:
+    """Opens the shop database in WAL mode and creates any missing tables.
+
+    All SQLite handlers can point at the same file; each one keeps its own
+    connection, and queries are parameterised so sqlite3 reuses the prepared
+    statements from its per-connection cache.
+    """
+    connection = sqlite3.connect(filepath, cached_statements=256)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    _migrate(connection)
+    return connection
+
+
+# Columns added after a table was first shipped, with the UPDATE that fills them in for existing rows.
+MIGRATIONS = [
+    ("ratings", "rating_sum", "INTEGER NOT NULL DEFAULT 0",
+     # The sum follows from the stored average; the histogram stays empty until rebuilt from the reviews.
+     "UPDATE ratings SET rating_sum = CAST(ROUND(average_rating * total_reviews) AS INTEGER)"),
+    ("ratings", "votes_1", "INTEGER NOT NULL DEFAULT 0", None),
+    ("ratings", "votes_2", "INTEGER NOT NULL DEFAULT 0", None),
+    ("ratings", "votes_3", "INTEGER NOT NULL DEFAULT 0", None),
+    ("ratings", "votes_4", "INTEGER NOT NULL DEFAULT 0", None),
+    ("ratings", "votes_5", "INTEGER NOT NULL DEFAULT 0", None),
+    ("categories", "parent_id", "INTEGER", None),
+]
+
+# Indexes on migrated columns, created once the columns exist.
+MIGRATED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories (parent_id);
+"""
+
+
+def _migrate(connection: sqlite3.Connection):
+    """Adds the columns newer code expects to tables created before they existed."""
+    if any(column not in _columns(connection, table) for table, column, _, _ in MIGRATIONS):
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            # Another connection may have migrated the file while this one waited for the write lock.
+            for table, column, definition, backfill in MIGRATIONS:
+                if column not in _columns(connection, table):
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                    if backfill:
+                        connection.execute(backfill)
+    connection.executescript(MIGRATED_INDEXES)
+
+
+def _columns(connection: sqlite3.Connection, table: str) -> set:
+    return {row["name"] for row in connection.execute(f"PRAGMA table_info({table})")}
+
+
+def page_query(table: str, key: str, after_id: int = None, limit: int = None) -> tuple:
+    """SQL and parameters selecting one keyset page of ``table``: rows with ``key > after_id`` in key order.
+
+    The primary-key index serves the WHERE and ORDER BY, so a page costs its own
+    size however deep into the table it starts, unlike LIMIT/OFFSET.
+    """
+    sql, parameters = f"SELECT * FROM {table}", []
+    if after_id is not None:
+        sql += f" WHERE {key} > ?"
+        parameters.append(after_id)
+    sql += f" ORDER BY {key}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        parameters.append(limit)
+    return sql, parameters
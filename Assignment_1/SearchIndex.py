@@ -0,0 +1,276 @@
+import heapq
+import json
+import math
+import re
+import sys
+
+TOKEN = re.compile(r"[0-9a-zа-я]+")
+STOP_WORDS = frozenset((
+    "a", "an", "and", "for", "in", "is", "it", "of", "on", "or", "the", "to", "with",
+    "а", "в", "во", "да", "для", "и", "из", "к", "на", "не", "но", "о", "от", "по", "с", "со", "у", "это",
+))
+# Longest first, so "ами" wins over "и".
+RUSSIAN_ENDINGS = sorted((
+    "ого", "его", "ому", "ему", "ыми", "ими", "ами", "ями", "ой", "ей", "ый", "ий", "ая", "яя", "ое", "ее",
+    "ые", "ие", "ую", "юю", "ых", "их", "ым", "им", "ах", "ях", "ам", "ям", "ов", "ев", "ом", "ем", "ия",
+    "ию", "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+), key=len, reverse=True)
+
+
+def _stem(word: str) -> str:
+    if "a" <= word[0] <= "z":
+        if len(word) > 4 and word.endswith("ies"):
+            return word[:-3] + "y"
+        # Not plain "ses": "cases" and "houses" only lose their "s".
+        if len(word) > 4 and word.endswith(("sses", "xes", "ches", "shes")):
+            return word[:-2]
+        if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+            return word[:-1]
+        return word
+    if "а" <= word[0] <= "я":
+        for ending in RUSSIAN_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= 3:
+                return word[:-len(ending)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Lower-cases, folds ё to е, drops stop words and strips common English and Russian endings."""
+    if not text:
+        return []
+    return [_stem(word) for word in TOKEN.findall(text.lower().replace("ё", "е")) if word not in STOP_WORDS]
+
+
+class SearchIndex:
+    """In-memory BM25 index over product names and review comments, ranked by product id.
+
+    A product's document is its name plus the comments of all its reviews. Each
+    term keeps its postings ({product_id: term frequency}) and the same products
+    bucketed by (term frequency, document length): every product in a bucket has
+    the same BM25 contribution, so a query walks buckets from the best down and
+    stops as soon as the top ``limit`` can no longer change, instead of scoring
+    every match.
+
+    The handlers passed in report their own writes through ``synced``; a write
+    made by anyone else is noticed through the storage version and triggers a
+    rebuild on the next query.
+    """
+
+    def __init__(self, product_handler, review_handler=None, k1: float = 1.2, b: float = 0.75):
+        self.product_handler = product_handler
+        self.review_handler = review_handler
+        self.k1 = k1
+        self.b = b
+        product_handler.search_index = self
+        if review_handler is not None:
+            review_handler.search_index = self
+        self.rebuild()
+
+    def _clear(self):
+        self.product_terms = {}
+        self.review_terms = {}
+        self.product_reviews = {}
+        self.postings = {}
+        self.buckets = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.versions = {}
+        # Off while rebuilding: the buckets are then filled in one pass at the end.
+        self.bucketing = False
+
+    def _handlers(self):
+        return [handler for handler in (self.product_handler, self.review_handler) if handler is not None]
+
+    def _load(self, handler, collection: str) -> list:
+        try:
+            return handler.storage.load().get(collection, [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def rebuild(self):
+        self._clear()
+        with self.product_handler.storage.lock.shared():
+            for product_data in self._load(self.product_handler, "products"):
+                self._set_terms(product_data["product_id"], None, tokenize(product_data["name"]))
+            self._stamp(self.product_handler)
+        if self.review_handler is not None:
+            with self.review_handler.storage.lock.shared():
+                for review_data in self._load(self.review_handler, "reviews"):
+                    self._set_terms(review_data["product"]["product_id"], review_data["review_id"],
+                                    tokenize(review_data["comment"]))
+                self._stamp(self.review_handler)
+
+        for term, postings in self.postings.items():
+            buckets = self.buckets[term] = {}
+            for product_id, frequency in postings.items():
+                buckets.setdefault((frequency, self.lengths[product_id]), set()).add(product_id)
+        self.bucketing = True
+
+    def refresh(self):
+        if any(self.versions.get(id(handler)) != handler.storage.current_version() for handler in self._handlers()):
+            self.rebuild()
+
+    def _stamp(self, handler):
+        self.versions[id(handler)] = handler.storage.current_version()
+
+    def _document_terms(self, product_id: int) -> set:
+        terms = set(self.product_terms.get(product_id, ()))
+        for review_id in self.product_reviews.get(product_id, ()):
+            terms.update(self.review_terms[review_id][1])
+        return terms
+
+    def _rebucket(self, product_id: int, add: bool):
+        length = self.lengths.get(product_id)
+        for term in self._document_terms(product_id):
+            key = (self.postings[term][product_id], length)
+            if add:
+                self.buckets.setdefault(term, {}).setdefault(key, set()).add(product_id)
+            else:
+                buckets = self.buckets[term]
+                buckets[key].discard(product_id)
+                if not buckets[key]:
+                    del buckets[key]
+                    if not buckets:
+                        del self.buckets[term]
+
+    def _set_terms(self, product_id: int, review_id, terms):
+        """Replaces the terms of one source: the product's name when ``review_id`` is
+        None, otherwise that review's comment. ``terms`` of None removes the source."""
+        if review_id is not None:
+            old_product_id = self.review_terms.get(review_id, (product_id,))[0]
+            if old_product_id != product_id:
+                self._set_terms(old_product_id, review_id, None)
+        if self.bucketing and product_id in self.lengths:
+            self._rebucket(product_id, add=False)
+
+        if review_id is None:
+            old_terms = self.product_terms.pop(product_id, ())
+        else:
+            old_terms = self.review_terms.pop(review_id, (product_id, ()))[1]
+            reviews = self.product_reviews.get(product_id)
+            if reviews is not None:
+                reviews.pop(review_id, None)
+                if not reviews:
+                    del self.product_reviews[product_id]
+        for term in old_terms:
+            postings = self.postings[term]
+            if postings[product_id] == 1:
+                del postings[product_id]
+                if not postings:
+                    del self.postings[term]
+            else:
+                postings[product_id] -= 1
+
+        # Interned, so the many sources sharing a term share one string.
+        terms = tuple(map(sys.intern, terms)) if terms is not None else None
+        if terms is not None:
+            if review_id is None:
+                self.product_terms[product_id] = terms
+            else:
+                self.review_terms[review_id] = (product_id, terms)
+                self.product_reviews.setdefault(product_id, {})[review_id] = None
+            for term in terms:
+                postings = self.postings.setdefault(term, {})
+                postings[product_id] = postings.get(product_id, 0) + 1
+
+        added = len(terms) if terms is not None else 0
+        self.total_length += added - len(old_terms)
+        if product_id in self.product_terms or product_id in self.product_reviews:
+            self.lengths[product_id] = self.lengths.get(product_id, 0) + added - len(old_terms)
+            if self.bucketing:
+                self._rebucket(product_id, add=True)
+        else:
+            self.lengths.pop(product_id, None)
+
+    def synced(self, handler, saved: list = (), deleted: list = ()):
+        """Applies a handler's own write: ``saved`` records were created or changed and
+        ``deleted`` keys removed. Handlers call this after every save, even one that
+        touches no text, so the new file version is not mistaken for a foreign write.
+        If the write replaced a version this index has not seen, it rebuilds instead."""
+        if self.versions.get(id(handler)) != handler.storage.replaced_version:
+            self.versions[id(handler)] = None
+            return
+        if handler is self.product_handler:
+            for product_data in saved:
+                self._set_terms(product_data["product_id"], None, tokenize(product_data["name"]))
+            for product_id in deleted:
+                self._set_terms(product_id, None, None)
+        else:
+            for review_data in saved:
+                self._set_terms(review_data["product"]["product_id"], review_data["review_id"],
+                                tokenize(review_data["comment"]))
+            for review_id in deleted:
+                if review_id in self.review_terms:
+                    self._set_terms(self.review_terms[review_id][0], review_id, None)
+        self._stamp(handler)
+
+    def search(self, query: str, limit: int = 10, match_all: bool = True) -> list:
+        """Product ids ranked by BM25 for ``query``, best first.
+
+        With ``match_all`` (the default) a product must contain every query term;
+        otherwise any term is enough. Products whose scores tie come back in no
+        particular order.
+        """
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if match_all and any(term not in self.postings for term in terms):
+            return []
+        terms = [term for term in terms if term in self.postings]
+        if not terms or limit <= 0:
+            return []
+
+        documents = len(self.lengths)
+        average_length = self.total_length / documents
+        k1, b, lengths, products = self.k1, self.b, self.lengths, self.product_terms
+
+        def contribution(idf: float, frequency: int, length: int) -> float:
+            return idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / average_length))
+
+        weights, cursors = [], []
+        for term in terms:
+            postings = self.postings[term]
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            weights.append((idf, postings))
+            cursors.append(sorted(((contribution(idf, frequency, length), matches)
+                                   for (frequency, length), matches in self.buckets[term].items()),
+                                  key=lambda bucket: bucket[0], reverse=True))
+        positions = [0] * len(terms)
+
+        top, seen = [], set()
+        while True:
+            # No product left unscored can beat the sum of each term's current bucket.
+            heads = [cursor[position][0] if position < len(cursor) else None
+                     for cursor, position in zip(cursors, positions)]
+            if None in heads and (match_all or heads.count(None) == len(heads)):
+                break
+            bound = sum(head for head in heads if head is not None)
+            if len(top) == limit and top[0][0] >= bound:
+                break
+
+            current = max((index for index, head in enumerate(heads) if head is not None), key=heads.__getitem__)
+            for product_id in cursors[current][positions[current]][1]:
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                if product_id not in products:
+                    continue
+                score, length = 0.0, lengths[product_id]
+                for idf, postings in weights:
+                    frequency = postings.get(product_id)
+                    if frequency:
+                        score += contribution(idf, frequency, length)
+                    elif match_all:
+                        break
+                else:
+                    if len(top) < limit:
+                        heapq.heappush(top, (score, product_id))
+                    elif score > top[0][0]:
+                        heapq.heapreplace(top, (score, product_id))
+                    if len(top) == limit and top[0][0] >= bound:
+                        break
+            else:
+                positions[current] += 1
+                continue
+            break
+
+        return [product_id for _, product_id in sorted(top, reverse=True)]
@@ -1,5 +1,6 @@
 from Inventory import Inventory
 from Product import Product, ProductNotFoundError
+from IdAllocator import IdAllocator
 
 
 class SellerNotFoundError(Exception):
@@ -8,6 +9,8 @@ class SellerNotFoundError(Exception):
 
 
 class Seller:
+    __slots__ = ("seller_id", "name", "inventory")
+
     def __init__(self, seller_id: int, name: str, inventory: Inventory = None):
         if not isinstance(seller_id, int) or seller_id <= 0:
             raise ValueError("Seller ID must be a positive integer.")
@@ -46,16 +49,15 @@ class Seller:
 
 
 class SellerManager:
-    def __init__(self):
+    def __init__(self, ids: IdAllocator = None):
         self.sellers = {}
-        self.current_seller_id = 1
+        self.ids = ids or IdAllocator("sellers")
 
     def add_seller(self, name: str, inventory: Inventory = None):
         if not name:
             raise ValueError("Seller name cannot be empty.")
-        seller = Seller(seller_id=self.current_seller_id, name=name, inventory=inventory or {})
-        self.sellers[self.current_seller_id] = seller
-        self.current_seller_id += 1
+        seller = Seller(seller_id=self.ids.next_id(), name=name, inventory=inventory or {})
+        self.sellers[seller.seller_id] = seller
         return seller
 
     def get_seller(self, seller_id: int):
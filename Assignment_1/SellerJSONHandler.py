@@ -1,12 +1,28 @@
 import json
 from Product import Product, ProductNotFoundError
 from Seller import Seller, SellerNotFoundError
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
+from RecordOffsets import RecordOffsets
+from Paging import iter_pages
+from IdAllocator import IdAllocator
 
 
 class SellerJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "sellers", "seller_id", journaled, codec)
+        self.offsets = RecordOffsets(self.storage, "sellers", "seller_id")
+        self.ids = IdAllocator("sellers", filepath + ".ids", seed=self._highest_id)
 
+    def _highest_id(self) -> int:
+        try:
+            return max((seller["seller_id"] for seller in self.storage.load().get("sellers", [])), default=0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+    @locked
     def create(self, name: str, inventory: dict = None):
         seller_data = {
             "name": name,
@@ -14,8 +30,7 @@ class SellerJSONHandler:
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"sellers": []}
 
@@ -23,18 +38,16 @@ class SellerJSONHandler:
         if any(existing_seller["name"] == name for existing_seller in data["sellers"]):
             raise ValueError(f"Seller with name '{name}' already exists.")
 
-        seller_data["seller_id"] = len(data["sellers"]) + 1
+        seller_data["seller_id"] = self.ids.next_id()
         data["sellers"].append(seller_data)
 
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[seller_data])
 
         return seller_data
 
     def read(self, seller_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for seller_data in data.get("sellers", []):
                 if seller_data["seller_id"] == seller_id:
                     inventory = {int(product_id): Product(**product_data) for product_id, product_data in seller_data["inventory"].items()}
@@ -45,41 +58,40 @@ class SellerJSONHandler:
 
         raise SellerNotFoundError(seller_id)
 
+    @locked
     def update(self, seller_id: int, name: str = None, inventory: dict = None):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for seller_data in data.get("sellers", []):
                 if seller_data["seller_id"] == seller_id:
                     if name:
                         seller_data["name"] = name
                     if inventory:
                         seller_data["inventory"] = {product.product_id: product.__repr__() for product in inventory.values()}
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[seller_data])
                     return seller_data
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
         raise SellerNotFoundError(seller_id)
 
+    @locked
     def delete(self, seller_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             updated_sellers = [seller_data for seller_data in data["sellers"] if seller_data["seller_id"] != seller_id]
             if len(updated_sellers) == len(data["sellers"]):
                 raise SellerNotFoundError(seller_id)
 
             data["sellers"] = updated_sellers
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[seller_id])
 
             return f"Seller with ID {seller_id} deleted."
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def add_product_to_seller(self, seller_id: int, product: Product):
         seller = self.read(seller_id)
         if not seller:
@@ -87,6 +99,7 @@ class SellerJSONHandler:
         seller.add_product(product)
         return self.update(seller_id, inventory=seller.inventory)
 
+    @locked
     def remove_product_from_seller(self, seller_id: int, product_id: int):
         seller = self.read(seller_id)
         if not seller:
@@ -94,6 +107,7 @@ class SellerJSONHandler:
         seller.remove_product(product_id)
         return self.update(seller_id, inventory=seller.inventory)
 
+    @locked
     def update_product_stock_in_seller(self, seller_id: int, product_id: int, new_stock: int):
         seller = self.read(seller_id)
         if not seller:
@@ -101,14 +115,20 @@ class SellerJSONHandler:
         seller.update_stock(product_id, new_stock)
         return self.update(seller_id, inventory=seller.inventory)
 
-    def list_all_sellers(self):
+    def list_all_sellers(self, limit: int = None, after_id: int = None):
+        """Every seller, or with ``limit``/``after_id`` one page of them ordered by id."""
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-            return [Seller(seller_data["seller_id"], seller_data["name"]) for seller_data in data.get("sellers", [])]
+            if limit is None and after_id is None:
+                records = self.storage.load().get("sellers", [])
+            else:
+                records = self.offsets.page(after_id, limit)
+            return [Seller(seller_data["seller_id"], seller_data["name"]) for seller_data in records]
         except (FileNotFoundError, json.JSONDecodeError):
             return []
 
+    def iter_sellers(self, batch_size: int = 1000):
+        return iter_pages(self.list_all_sellers, lambda seller: seller.seller_id, batch_size)
+
     def list_seller_inventory(self, seller_id: int):
         seller = self.read(seller_id)
         if not seller:
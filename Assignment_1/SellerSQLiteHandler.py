@@ -0,0 +1,105 @@
+import sqlite3
+from Product import Product
+from Seller import Seller, SellerNotFoundError
+from SQLiteStorage import connect, page_query
+from Paging import iter_pages
+
+
+class SellerSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def _write_inventory(self, seller_id: int, inventory: dict):
+        self.connection.execute("DELETE FROM seller_products WHERE seller_id = ?", (seller_id,))
+        self.connection.executemany(
+            "INSERT INTO seller_products (seller_id, product_id, name, category, price, stock) VALUES (?, ?, ?, ?, ?, ?)",
+            [(seller_id, product.product_id, product.name, product.category, product.price, product.stock)
+             for product in inventory.values()]
+        )
+
+    def _seller_data(self, seller_id: int) -> dict:
+        row = self.connection.execute("SELECT * FROM sellers WHERE seller_id = ?", (seller_id,)).fetchone()
+        inventory = self.connection.execute(
+            "SELECT * FROM seller_products WHERE seller_id = ? ORDER BY rowid", (seller_id,)
+        )
+        return {
+            "name": row["name"],
+            "inventory": {
+                product.product_id: product.__repr__()
+                for product in (Product(item["product_id"], item["name"], item["category"], item["price"], item["stock"])
+                                for item in inventory)
+            },
+            "seller_id": seller_id
+        }
+
+    def create(self, name: str, inventory: dict = None):
+        try:
+            with self.connection:
+                cursor = self.connection.execute("INSERT INTO sellers (name) VALUES (?)", (name,))
+                self._write_inventory(cursor.lastrowid, inventory or {})
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Seller with name '{name}' already exists.")
+        return self._seller_data(cursor.lastrowid)
+
+    def read(self, seller_id: int):
+        row = self.connection.execute("SELECT * FROM sellers WHERE seller_id = ?", (seller_id,)).fetchone()
+        if row is None:
+            raise SellerNotFoundError(seller_id)
+        inventory = {
+            item["product_id"]: Product(item["product_id"], item["name"], item["category"], item["price"], item["stock"])
+            for item in self.connection.execute(
+                "SELECT * FROM seller_products WHERE seller_id = ? ORDER BY rowid", (seller_id,)
+            )
+        }
+        return Seller(row["seller_id"], row["name"], inventory)
+
+    def update(self, seller_id: int, name: str = None, inventory: dict = None):
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE sellers SET name = COALESCE(?, name) WHERE seller_id = ?", (name or None, seller_id)
+            )
+            if cursor.rowcount == 0:
+                raise SellerNotFoundError(seller_id)
+            if inventory:
+                self._write_inventory(seller_id, inventory)
+        return self._seller_data(seller_id)
+
+    def delete(self, seller_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM sellers WHERE seller_id = ?", (seller_id,))
+            if cursor.rowcount == 0:
+                raise SellerNotFoundError(seller_id)
+            self.connection.execute("DELETE FROM seller_products WHERE seller_id = ?", (seller_id,))
+        return f"Seller with ID {seller_id} deleted."
+
+    def add_product_to_seller(self, seller_id: int, product: Product):
+        seller = self.read(seller_id)
+        seller.add_product(product)
+        return self.update(seller_id, inventory=seller.inventory)
+
+    def remove_product_from_seller(self, seller_id: int, product_id: int):
+        seller = self.read(seller_id)
+        seller.remove_product(product_id)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM seller_products WHERE seller_id = ? AND product_id = ?", (seller_id, product_id)
+            )
+        return self._seller_data(seller_id)
+
+    def update_product_stock_in_seller(self, seller_id: int, product_id: int, new_stock: int):
+        seller = self.read(seller_id)
+        seller.update_stock(product_id, new_stock)
+        return self.update(seller_id, inventory=seller.inventory)
+
+    def list_all_sellers(self, limit: int = None, after_id: int = None):
+        """Every seller, or with ``limit``/``after_id`` one page of them ordered by id."""
+        return [Seller(row["seller_id"], row["name"])
+                for row in self.connection.execute(*page_query("sellers", "seller_id", after_id, limit))]
+
+    def iter_sellers(self, batch_size: int = 1000):
+        return iter_pages(self.list_all_sellers, lambda seller: seller.seller_id, batch_size)
+
+    def list_seller_inventory(self, seller_id: int):
+        seller = self.read(seller_id)
+        return seller.list_inventory()
@@ -2,25 +2,26 @@ import xml.etree.ElementTree as ET
 from Inventory import Inventory
 from Product import Product, ProductNotFoundError
 from Seller import Seller, SellerNotFoundError
+from IdAllocator import IdAllocator
+from XMLIndex import IndexedXMLFile, iter_elements
 
 
 class SellerXMLHandler:
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.document = IndexedXMLFile(filepath, "seller", "seller_id")
+        self.ids = IdAllocator("sellers", filepath + ".ids", seed=lambda: max(self.document.index, default=0))
 
     def _load_sellers(self):
         try:
-            tree = ET.parse(self.filepath)
-            return tree.getroot()
+            return self.document.load()
         except (FileNotFoundError, ET.ParseError):
-            root = ET.Element("sellers")
-            tree = ET.ElementTree(root)
-            tree.write(self.filepath)
-            return root
+            self.document.reset(ET.Element("sellers"))
+            self.document.save()
+            return self.document.root
 
     def _save_sellers(self, root):
-        tree = ET.ElementTree(root)
-        tree.write(self.filepath)
+        self.document.save()
 
     def create_seller(self, name: str, inventory: Inventory = None):
         if not name:
@@ -28,7 +29,7 @@ class SellerXMLHandler:
 
         # Create a new Seller object
         root = self._load_sellers()
-        seller_id = len(root.findall("seller")) + 1  # Generate new seller ID
+        seller_id = self.ids.next_id()  # Generate new seller ID
         seller = Seller(seller_id=seller_id, name=name, inventory=inventory)
 
         # Create XML structure for the seller
@@ -43,33 +44,33 @@ class SellerXMLHandler:
             ET.SubElement(product_element, "name").text = product.name
             ET.SubElement(product_element, "price").text = str(product.price)
             ET.SubElement(product_element, "stock").text = str(product.stock)
+        self.document.add(seller_element)
 
         self._save_sellers(root)
         return seller
 
     def get_seller(self, seller_id: int):
-        root = self._load_sellers()
-
-        for seller_element in root.findall("seller"):
-            if int(seller_element.find("seller_id").text) == seller_id:
-                name = seller_element.find("name").text
-                seller = Seller(seller_id=seller_id, name=name)
-
-                # Load products into the seller's inventory
-                inventory_element = seller_element.find("inventory")
-                for product_element in inventory_element.findall("product"):
-                    product_id = int(product_element.find("product_id").text)
-                    product_name = product_element.find("name").text
-                    price = float(product_element.find("price").text)
-                    stock = int(product_element.find("stock").text)
-
-                    # Create product objects and add them to the seller's inventory
-                    product = Product(product_id=product_id, name=product_name, category="Unknown", price=price, stock=stock)
-                    seller.add_product(product)
+        self._load_sellers()
+
+        seller_element = self.document.get(seller_id)
+        if seller_element is None:
+            raise SellerNotFoundError(seller_id)
+        name = seller_element.find("name").text
+        seller = Seller(seller_id=seller_id, name=name)
+
+        # Load products into the seller's inventory
+        inventory_element = seller_element.find("inventory")
+        for product_element in inventory_element.findall("product"):
+            product_id = int(product_element.find("product_id").text)
+            product_name = product_element.find("name").text
+            price = float(product_element.find("price").text)
+            stock = int(product_element.find("stock").text)
+
+            # Create product objects and add them to the seller's inventory
+            product = Product(product_id=product_id, name=product_name, category="Unknown", price=price, stock=stock)
+            seller.add_product(product)
 
-                return seller
-
-        raise SellerNotFoundError(seller_id)
+        return seller
 
     def update_seller(self, seller_id: int, name: str = None):
         seller = self.get_seller(seller_id)
@@ -78,23 +79,20 @@ class SellerXMLHandler:
 
         # Save updated seller info to XML
         root = self._load_sellers()
-        for seller_element in root.findall("seller"):
-            if int(seller_element.find("seller_id").text) == seller_id:
-                if name:
-                    seller_element.find("name").text = name
-                self._save_sellers(root)
-                return seller
+        seller_element = self.document.get(seller_id)
+        if name:
+            seller_element.find("name").text = name
+        self._save_sellers(root)
+        return seller
 
     def delete_seller(self, seller_id: int):
         root = self._load_sellers()
 
-        for seller_element in root.findall("seller"):
-            if int(seller_element.find("seller_id").text) == seller_id:
-                root.remove(seller_element)
-                self._save_sellers(root)
-                return f"Seller {seller_id} deleted."
-
-        raise SellerNotFoundError(seller_id)
+        if self.document.get(seller_id) is None:
+            raise SellerNotFoundError(seller_id)
+        self.document.remove(seller_id)
+        self._save_sellers(root)
+        return f"Seller {seller_id} deleted."
 
     def add_product_to_seller(self, seller_id: int, product: Product):
         seller = self.get_seller(seller_id)
@@ -102,14 +100,12 @@ class SellerXMLHandler:
 
         # Save updated seller info to XML
         root = self._load_sellers()
-        for seller_element in root.findall("seller"):
-            if int(seller_element.find("seller_id").text) == seller_id:
-                inventory_element = seller_element.find("inventory")
-                product_element = ET.SubElement(inventory_element, "product")
-                ET.SubElement(product_element, "product_id").text = str(product.product_id)
-                ET.SubElement(product_element, "name").text = product.name
-                ET.SubElement(product_element, "price").text = str(product.price)
-                ET.SubElement(product_element, "stock").text = str(product.stock)
+        inventory_element = self.document.get(seller_id).find("inventory")
+        product_element = ET.SubElement(inventory_element, "product")
+        ET.SubElement(product_element, "product_id").text = str(product.product_id)
+        ET.SubElement(product_element, "name").text = product.name
+        ET.SubElement(product_element, "price").text = str(product.price)
+        ET.SubElement(product_element, "stock").text = str(product.stock)
 
         self._save_sellers(root)
         return f"Product {product.name} added to seller {seller.name}."
@@ -120,24 +116,27 @@ class SellerXMLHandler:
 
         # Save updated seller info to XML
         root = self._load_sellers()
-        for seller_element in root.findall("seller"):
-            if int(seller_element.find("seller_id").text) == seller_id:
-                inventory_element = seller_element.find("inventory")
-                for product_element in inventory_element.findall("product"):
-                    if int(product_element.find("product_id").text) == product_id:
-                        inventory_element.remove(product_element)
+        inventory_element = self.document.get(seller_id).find("inventory")
+        for product_element in inventory_element.findall("product"):
+            if int(product_element.find("product_id").text) == product_id:
+                inventory_element.remove(product_element)
 
         self._save_sellers(root)
         return f"Product {product_id} removed from seller {seller.name}."
 
-    def list_all_sellers(self):
+    def _element_to_seller(self, seller_element) -> Seller:
+        return Seller(seller_id=int(seller_element.find("seller_id").text), name=seller_element.find("name").text)
+
+    def list_all_sellers(self, limit: int = None, after_id: int = None):
+        """Every seller, or with ``limit``/``after_id`` one page of them ordered by id."""
         root = self._load_sellers()
-        sellers = []
-        for seller_element in root.findall("seller"):
-            seller_id = int(seller_element.find("seller_id").text)
-            name = seller_element.find("name").text
-            sellers.append(Seller(seller_id=seller_id, name=name))
-        return sellers
+        if limit is None and after_id is None:
+            return [self._element_to_seller(seller_element) for seller_element in root.findall("seller")]
+        return [self._element_to_seller(seller_element) for seller_element in self.document.page(after_id, limit)]
+
+    def iter_sellers(self):
+        for seller_element in iter_elements(self.filepath, "seller"):
+            yield self._element_to_seller(seller_element)
 
     def list_seller_inventory(self, seller_id: int):
         seller = self.get_seller(seller_id)
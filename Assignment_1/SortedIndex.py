@@ -0,0 +1,117 @@
+from bisect import bisect_left, bisect_right, insort
+from math import inf
+from operator import itemgetter
+
+
+class SortedIndex:
+    """Sorted (value, key) lists over numeric fields, for range, top-k and paged queries.
+
+    Every field has one list over all records and, when ``partition`` is given,
+    one more per value of that field (e.g. per category), so a range inside a
+    partition is a bisect too. ``load_records`` yields (key, record) pairs and
+    ``current_version`` identifies the state of the backing file: the lists are
+    built on the first query and rebuilt whenever the file changed behind our back.
+
+    Owners report their own writes through ``apply``, passing the version the
+    write replaced; if that is not the version the lists describe, they are
+    dropped and rebuilt lazily instead of patched.
+    """
+
+    def __init__(self, fields: tuple, load_records, current_version, partition: str = None):
+        self.fields = fields
+        self.partition = partition
+        self.load_records = load_records
+        self.current_version = current_version
+        # Per-record values are stored as one tuple: the fields, then the partition.
+        self.names = fields + ((partition,) if partition else ())
+        self._getter = itemgetter(*self.names) if len(self.names) > 1 else lambda record: (record[self.names[0]],)
+        self.entries = {}
+        self.values = {}
+        self.version = None
+
+    def refresh(self):
+        version = self.current_version()
+        if self.version is None or version != self.version:
+            self._rebuild(version)
+
+    def _rebuild(self, version):
+        self.entries = {(field, None): [] for field in self.fields}
+        self.values = {}
+        for key, record in sorted(self.load_records(), key=itemgetter(0)):
+            values = self.values[key] = self._getter(record)
+            for position, field in enumerate(self.fields):
+                entry = (values[position], key)
+                self.entries[field, None].append(entry)
+                if self.partition:
+                    self.entries.setdefault((field, values[-1]), []).append(entry)
+        # Records were visited in key order and the sort is stable, so equal values stay ordered
+        # by key; sorting on the value alone is several times faster than comparing whole tuples.
+        for entries in self.entries.values():
+            entries.sort(key=itemgetter(0))
+        self.version = version
+
+    def _lists(self, values: tuple):
+        for position, field in enumerate(self.fields):
+            yield (field, None), values[position]
+            if self.partition:
+                yield (field, values[-1]), values[position]
+
+    def apply(self, replaced_version, saved: list = (), deleted: list = ()):
+        """Patches the lists after a write: ``saved`` holds (key, record) pairs, ``deleted`` keys."""
+        if self.version is None:
+            return
+        if replaced_version != self.version:
+            self.version = None
+            return
+        for key in deleted:
+            self._remove(key)
+        for key, record in saved:
+            self._remove(key)
+            values = self.values[key] = self._getter(record)
+            for list_key, value in self._lists(values):
+                insort(self.entries.setdefault(list_key, []), (value, key))
+        self.version = self.current_version()
+
+    def _remove(self, key):
+        values = self.values.pop(key, None)
+        if values is None:
+            return
+        for list_key, value in self._lists(values):
+            entries = self.entries[list_key]
+            del entries[bisect_left(entries, (value, key))]
+            if not entries and list_key[1] is not None:
+                del self.entries[list_key]
+
+    def _slice(self, field: str, low, high, below, partition_value) -> tuple:
+        self.refresh()
+        entries = self.entries.get((field, partition_value), [])
+        start = 0 if low is None else bisect_left(entries, (low,))
+        if below is not None:
+            end = bisect_left(entries, (below,))
+        elif high is not None:
+            end = bisect_right(entries, (high, inf))
+        else:
+            end = len(entries)
+        return entries, start, max(start, end)
+
+    def range(self, field: str, low=None, high=None, below=None, partition_value=None, offset: int = 0,
+              limit: int = None, descending: bool = False) -> list:
+        """Keys with ``low <= value <= high`` (or ``value < below``), ordered by value.
+
+        Costs O(log n) to find the range plus the size of the requested page.
+        """
+        entries, start, end = self._slice(field, low, high, below, partition_value)
+        if descending:
+            stop = end - offset
+            first = stop - limit if limit is not None else start
+            return [key for _, key in reversed(entries[max(start, first):max(start, stop)])]
+        first = start + offset
+        stop = first + limit if limit is not None else end
+        return [key for _, key in entries[min(first, end):min(stop, end)]]
+
+    def count(self, field: str, low=None, high=None, below=None, partition_value=None) -> int:
+        _, start, end = self._slice(field, low, high, below, partition_value)
+        return end - start
+
+    def top(self, field: str, limit: int, largest: bool = True, partition_value=None) -> list:
+        return self.range(field, partition_value=partition_value, limit=limit, descending=largest)
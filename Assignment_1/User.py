@@ -1,4 +1,5 @@
 from Address import Address
+from IdAllocator import IdAllocator
 
 
 class UserNotFoundError(Exception):
@@ -7,6 +8,8 @@ class UserNotFoundError(Exception):
 
 
 class User:
+    __slots__ = ("user_id", "email", "name", "phone", "address")
+
     def __init__(self, user_id: int, email: str, name: str = None, phone: str = None, address: Address = None):
         self.user_id = user_id
         self.email = email
@@ -28,26 +31,37 @@ class User:
 
 
 class UserManager:
-    def __init__(self):
-        self.users_list = []
-        self.current_user_id = 1
+    def __init__(self, ids: IdAllocator = None):
+        self.users = {}
+        self.users_by_email = {}
+        self.ids = ids or IdAllocator("users")
+
+    @property
+    def users_list(self) -> list:
+        """Every user in creation order; a copy, so the indexes can only change through the manager."""
+        return list(self.users.values())
 
     def create(self, email: str, name: str, phone: str, address: Address):
         if not email:
             raise ValueError("Email is required to create a user.")
-        user = User(self.current_user_id, email, name, phone, address)
-        self.users_list.append(user)
-        self.current_user_id += 1
+        if email in self.users_by_email:
+            raise ValueError(f"User with email {email} already exists.")
+        user = User(self.ids.next_id(), email, name, phone, address)
+        self.users[user.user_id] = user
+        self.users_by_email[email] = user
         return user
 
     def read_all(self):
-        return self.users_list
+        return list(self.users.values())
 
     def read_by_id(self, user_id: int):
-        for user in self.users_list:
-            if user.user_id == user_id:
-                return user
-        raise UserNotFoundError(user_id)
+        user = self.users.get(user_id)
+        if user is None:
+            raise UserNotFoundError(user_id)
+        return user
+
+    def read_by_email(self, email: str):
+        return self.users_by_email.get(email)
 
     def update(self, user_id: int, email: str = None, name: str = None, phone: str = None, address: Address = None):
         try:
@@ -55,7 +69,11 @@ class UserManager:
         except UserNotFoundError as e:
             return str(e)
 
-        if email is not None:
+        if email is not None and email != user.email:
+            if email in self.users_by_email:
+                raise ValueError(f"User with email {email} already exists.")
+            del self.users_by_email[user.email]
+            self.users_by_email[email] = user
             user.email = email
         if name is not None:
             user.name = name
@@ -68,7 +86,8 @@ class UserManager:
     def delete(self, user_id: int):
         try:
             user = self.read_by_id(user_id)
-            self.users_list.remove(user)
+            del self.users[user_id]
+            del self.users_by_email[user.email]
             return f"User {user_id} has been deleted."
         except UserNotFoundError as e:
             return str(e)
@@ -2,6 +2,9 @@ import json
 from typing import Optional
 from User import User
 from Address import Address
+from JSONStorage import open_storage
+from JSONCodec import JSONCodec
+from FileLock import locked
 
 
 class UserExistsError(Exception):
@@ -13,9 +16,11 @@ class UserNotFoundError(Exception):
 
 
 class UserJSONHandler:
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, journaled: bool = False, codec: JSONCodec = None):
         self.filepath = filepath
+        self.storage = open_storage(filepath, "users", "user_id", journaled, codec)
 
+    @locked
     def create(self, user: User):
         user_data = {
             "user_id": user.user_id,
@@ -31,8 +36,7 @@ class UserJSONHandler:
         }
 
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"users": []}
 
@@ -41,13 +45,11 @@ class UserJSONHandler:
                 raise UserExistsError(f"User with email '{user.email}' already exists.")
 
         data["users"].append(user_data)
-        with open(self.filepath, "w") as file:
-            json.dump(data, file, indent=4)
+        self.storage.save(data, changed=[user_data])
 
     def read(self, user_id: int) -> Optional[User]:
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for user_data in data.get("users", []):
                 if user_data["user_id"] == user_id:
                     address = None
@@ -68,10 +70,10 @@ class UserJSONHandler:
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
+    @locked
     def update(self, user_id: int, email: str = None, name: str = None, phone: str = None, address: Address = None):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             for user_data in data.get("users", []):
                 if user_data["user_id"] == user_id:
                     if email:
@@ -87,8 +89,7 @@ class UserJSONHandler:
                             "house": address.house,
                             "apartment": address.apartment,
                         }
-                    with open(self.filepath, "w") as file:
-                        json.dump(data, file, indent=4)
+                    self.storage.save(data, changed=[user_data])
                     return True
             raise UserNotFoundError(f"User with ID {user_id} not found for update.")
         except (FileNotFoundError, json.JSONDecodeError):
@@ -97,18 +98,17 @@ class UserJSONHandler:
             print(e)
             return False
 
+    @locked
     def delete(self, user_id: int):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
+            data = self.storage.load()
             original_length = len(data.get("users", []))
             data["users"] = [user for user in data.get("users", []) if user["user_id"] != user_id]
 
             if len(data["users"]) == original_length:
                 raise UserNotFoundError(f"User with ID {user_id} not found for deletion.")
 
-            with open(self.filepath, "w") as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(data, deleted=[user_id])
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             return False
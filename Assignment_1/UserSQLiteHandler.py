@@ -0,0 +1,69 @@
+import sqlite3
+from typing import Optional
+from User import User
+from Address import Address
+from UserJSONHandler import UserExistsError, UserNotFoundError
+from SQLiteStorage import connect
+
+
+class UserSQLiteHandler:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = connect(filepath)
+
+    def create(self, user: User):
+        address = user.address
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO users (user_id, email, name, phone, address_id, city, street, house, apartment) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user.user_id, user.email, user.name, user.phone,
+                     address.address_id if address else None,
+                     address.city if address else None,
+                     address.street if address else None,
+                     address.house if address else None,
+                     address.apartment if address else None)
+                )
+        except sqlite3.IntegrityError:
+            raise UserExistsError(f"User with email '{user.email}' already exists.")
+
+    def read(self, user_id: int) -> Optional[User]:
+        row = self.connection.execute("SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        address = None
+        if row["city"] is not None:
+            address = Address(row["address_id"], row["user_id"], row["city"], row["street"], row["house"], row["apartment"])
+        return User(
+            user_id=row["user_id"],
+            email=row["email"],
+            name=row["name"],
+            phone=row["phone"],
+            address=address,
+        )
+
+    def update(self, user_id: int, email: str = None, name: str = None, phone: str = None, address: Address = None):
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE users SET email = COALESCE(?, email), name = COALESCE(?, name), phone = COALESCE(?, phone) "
+                "WHERE user_id = ?",
+                (email or None, name or None, phone or None, user_id)
+            )
+            if address and cursor.rowcount:
+                self.connection.execute(
+                    "UPDATE users SET address_id = ?, city = ?, street = ?, house = ?, apartment = ? WHERE user_id = ?",
+                    (address.address_id, address.city, address.street, address.house, address.apartment, user_id)
+                )
+        if cursor.rowcount == 0:
+            print(UserNotFoundError(f"User with ID {user_id} not found for update."))
+            return False
+        return True
+
+    def delete(self, user_id: int):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+        if cursor.rowcount == 0:
+            print(UserNotFoundError(f"User with ID {user_id} not found for deletion."))
+            return False
+        return True
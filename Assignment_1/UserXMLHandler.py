@@ -1,31 +1,37 @@
 import xml.etree.ElementTree as ET
 from Address import Address
 from User import User, UserNotFoundError
+from IdAllocator import IdAllocator
+from XMLIndex import IndexedXMLFile
 
 
 class UserXMLHandler:
     def __init__(self, file_path):
         self.file_path = file_path
+        self.document = IndexedXMLFile(file_path, "user", "user_id")
+        self.ids = IdAllocator("users", file_path + ".ids", seed=lambda: max(self.document.index, default=0))
         self.tree = None
         self.root = None
         self._load_xml()
 
     def _load_xml(self):
-        """Загружает XML файл или создаёт новый, если его нет."""
+        """Загружает XML файл или создаёт новый, если его нет. Повторно читает файл только если он изменился."""
         try:
-            self.tree = ET.parse(self.file_path)
-            self.root = self.tree.getroot()
+            self.root = self.document.load()
         except FileNotFoundError:
-            self.root = ET.Element("users")
-            self.tree = ET.ElementTree(self.root)
+            if self.root is None:
+                self.document.reset(ET.Element("users"))
+            self.root = self.document.root
+        self.tree = ET.ElementTree(self.root)
 
     def _save_xml(self):
         """Сохраняет изменения в XML файл."""
-        self.tree.write(self.file_path, encoding="utf-8", xml_declaration=True)
+        self.document.save(encoding="utf-8", xml_declaration=True)
 
     def create(self, email: str, name: str, phone: str, address: Address):
         """Создаёт нового пользователя и сохраняет его в XML."""
-        user_id = len(self.root.findall('user')) + 1
+        self._load_xml()
+        user_id = self.ids.next_id()
         user = User(user_id, email, name, phone, address)
 
         # Создаём элемент <user>
@@ -43,12 +49,14 @@ class UserXMLHandler:
         ET.SubElement(address_element, "street").text = address.street
         ET.SubElement(address_element, "house").text = str(address.house)
         ET.SubElement(address_element, "apartment").text = str(address.apartment)
+        self.document.add(user_element)
 
         self._save_xml()  # Сохраняем изменения в файл
         return user
 
     def read_all(self):
         """Возвращает всех пользователей из XML."""
+        self._load_xml()
         users = []
         for user_element in self.root.findall('user'):
             user_id = int(user_element.find('user_id').text)
@@ -71,32 +79,29 @@ class UserXMLHandler:
 
     def read_by_id(self, user_id: int):
         """Чтение пользователя по ID из XML."""
-        for user_element in self.root.findall('user'):
-            if int(user_element.find('user_id').text) == user_id:
-                email = user_element.find('email').text
-                name = user_element.find('name').text
-                phone = user_element.find('phone').text
-                address_element = user_element.find('address')
-
-                address_id = int(address_element.find('address_id').text)
-                city = address_element.find('city').text
-                street = address_element.find('street').text
-                house = int(address_element.find('house').text)
-                apartment = int(address_element.find('apartment').text)
-
-                address = Address(address_id, user_id, city, street, house, apartment)
-                user = User(user_id, email, name, phone, address)
-                return user
-        raise UserNotFoundError(user_id)
+        self._load_xml()
+        user_element = self.document.get(user_id)
+        if user_element is None:
+            raise UserNotFoundError(user_id)
+        email = user_element.find('email').text
+        name = user_element.find('name').text
+        phone = user_element.find('phone').text
+        address_element = user_element.find('address')
+
+        address_id = int(address_element.find('address_id').text)
+        city = address_element.find('city').text
+        street = address_element.find('street').text
+        house = int(address_element.find('house').text)
+        apartment = int(address_element.find('apartment').text)
+
+        address = Address(address_id, user_id, city, street, house, apartment)
+        user = User(user_id, email, name, phone, address)
+        return user
 
     def update(self, user_id: int, email: str = None, name: str = None, phone: str = None, address: Address = None):
         """Обновляет пользователя в XML."""
-        user_element = None
-        for elem in self.root.findall('user'):
-            if int(elem.find('user_id').text) == user_id:
-                user_element = elem
-                break
-
+        self._load_xml()
+        user_element = self.document.get(user_id)
         if user_element is None:
             raise UserNotFoundError(user_id)
 
@@ -120,16 +125,11 @@ class UserXMLHandler:
 
     def delete(self, user_id: int):
         """Удаляет пользователя из XML."""
-        user_element = None
-        for elem in self.root.findall('user'):
-            if int(elem.find('user_id').text) == user_id:
-                user_element = elem
-                break
-
-        if user_element is None:
+        self._load_xml()
+        if self.document.get(user_id) is None:
             raise UserNotFoundError(user_id)
 
-        self.root.remove(user_element)
+        self.document.remove(user_id)
         self._save_xml()
 
         return f"User {user_id} has been deleted."
@@ -0,0 +1,107 @@
+import os
+from bisect import bisect_right
+import xml.etree.ElementTree as ET
+from AtomicFile import atomic_write
+
+
+class IndexedXMLFile:
+    """Parsed XML file kept in memory with an id -> element index over its records.
+
+    The file is parsed again only when its mtime or size changes, so repeated
+    lookups cost one dictionary access instead of a ``findall`` scan.
+    """
+
+    def __init__(self, filepath: str, item_tag: str, key_tag: str):
+        self.filepath = filepath
+        self.item_tag = item_tag
+        self.key_tag = key_tag
+        self.root = None
+        self.index = {}
+        self._sorted_keys = None
+        self._signature = None
+        self.replaced_signature = None
+
+    def _file_signature(self):
+        stat = os.stat(self.filepath)
+        return stat.st_mtime_ns, stat.st_size
+
+    def current_signature(self):
+        try:
+            return self._file_signature()
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        signature = self._file_signature()
+        if self.root is None or signature != self._signature:
+            self.reset(ET.parse(self.filepath).getroot())
+            self._signature = signature
+        return self.root
+
+    def reset(self, root):
+        self.root = root
+        self.index = {int(element.find(self.key_tag).text): element for element in root.findall(self.item_tag)}
+        self._sorted_keys = None
+
+    def get(self, key: int):
+        return self.index.get(key)
+
+    def page(self, after: int = None, limit: int = None) -> list:
+        """Elements with a key above ``after``, in key order; the document must be loaded."""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.index)
+        start = 0 if after is None else bisect_right(self._sorted_keys, after)
+        stop = None if limit is None else start + limit
+        return [self.index[key] for key in self._sorted_keys[start:stop]]
+
+    def add(self, element):
+        self.index[int(element.find(self.key_tag).text)] = element
+        self._sorted_keys = None
+
+    def remove(self, key: int):
+        element = self.index.pop(key)
+        self._sorted_keys = None
+        self.root.remove(element)
+        return element
+
+    def save(self, **kwargs):
+        try:
+            with atomic_write(self.filepath, "wb") as file:
+                ET.ElementTree(self.root).write(file, **kwargs)
+        except BaseException:
+            # The edits never reached the file; parse it again rather than keep them around.
+            self.invalidate()
+            raise
+        self.replaced_signature = self._signature
+        self._signature = self._file_signature()
+
+    def invalidate(self):
+        self.root = None
+        self.index = {}
+        self._sorted_keys = None
+        self._signature = None
+
+
+def iter_elements(filepath: str, item_tag: str):
+    """Yields the top-level ``item_tag`` elements of a file one at a time.
+
+    Uses ``ET.iterparse`` and clears the root after every record, so memory stays
+    flat no matter how large the file is. Each element is only valid until the
+    generator is advanced.
+    """
+    try:
+        context = ET.iterparse(filepath, events=("start", "end"))
+        _, root = next(context)
+    except (FileNotFoundError, StopIteration):
+        return
+
+    depth = 0
+    for event, element in context:
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0:
+            if element.tag == item_tag:
+                yield element
+            root.clear()
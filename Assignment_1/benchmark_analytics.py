@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from array import array
+import OrderAnalytics
+from OrderAnalytics import OrderAnalytics as Analytics
+from JSONCodec import JSONCodec
+from OrderJSONHandler import OrderJSONHandler
+
+STATUSES = ["Pending", "Placed", "Cancelled", "Completed"]
+
+
+def timed(label: str, operation):
+    start = time.perf_counter()
+    result = operation()
+    print(f"{label:<34}{(time.perf_counter() - start) * 1000:>10.0f} ms")
+    return result
+
+
+def synthetic(count: int, users: int, days: int) -> Analytics:
+    return Analytics(
+        array("q", (random.randint(1, users) for _ in range(count))),
+        array("d", (random.uniform(10, 5000) for _ in range(count))),
+        array("i", (random.randrange(len(STATUSES)) for _ in range(count))),
+        list(STATUSES),
+        array("i", (random.randrange(days) for _ in range(count))),
+        [f"2024-{1 + day // 28:02d}-{1 + day % 28:02d}" for day in range(days)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group-by revenue analytics over order columns.")
+    parser.add_argument("--orders", type=int, default=10_000_000)
+    parser.add_argument("--json-orders", type=int, default=1_000_000,
+                        help="orders to round-trip through orders.json to time the load path")
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"backend: {'numpy' if OrderAnalytics.np is not None else 'stdlib arrays'}")
+    users = max(args.orders // 20, 1)
+    analytics = timed(f"build {args.orders} synthetic orders", lambda: synthetic(args.orders, users, 336))
+    timed("total_revenue", analytics.total_revenue)
+    timed("revenue_by status", lambda: analytics.revenue_by("status"))
+    timed("revenue_by day", lambda: analytics.revenue_by("day"))
+    timed("order_count_by day", lambda: analytics.order_count_by("day"))
+    timed("average_basket_by status", lambda: analytics.average_basket_by("status"))
+    timed("revenue_by user_id", lambda: analytics.revenue_by("user_id"))
+    timed("top_customers(10)", lambda: analytics.top_customers(10))
+
+    with tempfile.TemporaryDirectory() as directory:
+        handler = OrderJSONHandler(os.path.join(directory, "orders.json"), codec=JSONCodec(compact=True))
+        handler.storage.save({"orders": [
+            {"order_id": order_id, "user_id": random.randint(1, users), "total_amount": random.uniform(10, 5000),
+             "status": random.choice(STATUSES), "address": {}, "payment_method": "Card",
+             "created_at": f"2024-05-{1 + order_id % 28:02d}T12:00:00"}
+            for order_id in range(1, args.json_orders + 1)
+        ]})
+        analytics = timed(f"from_json_handler ({args.json_orders})", lambda: Analytics.from_json_handler(handler))
+        timed("revenue_by day", lambda: analytics.revenue_by("day"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from Product import Product
+from ProductJSONHandler import ProductJSONHandler
+from ProductXMLHandler import ProductXMLHandler
+from ProductSQLiteHandler import ProductSQLiteHandler
+
+
+class XMLProductAdapter:
+    # ProductXMLHandler predates the shared method names, so map them for the benchmark.
+    # Its update_stock/update_price only touch the in-memory Product, so those rows measure a lookup, not a write.
+    def __init__(self, filepath: str):
+        self.handler = ProductXMLHandler(filepath)
+
+    def create(self, product: Product):
+        self.handler.create_product(product.name, product.category, product.price, product.stock)
+
+    def read(self, product_id: int):
+        return self.handler.read_product_by_id(product_id)
+
+    def update_stock(self, product_id: int, quantity: int):
+        return self.handler.update_stock(product_id, quantity)
+
+    def update_price(self, product_id: int, new_price: float):
+        return self.handler.update_price(product_id, new_price)
+
+    def get_all_products(self):
+        return self.handler.get_all_products()
+
+
+def time_per_op(operation, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        operation(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1000
+
+
+def bench_products(directory: str, size: int, operations: int):
+    backends = {
+        "json": lambda: ProductJSONHandler(os.path.join(directory, "products.json")),
+        "json-journal": lambda: ProductJSONHandler(os.path.join(directory, "products_journal.json"), journaled=True),
+        "xml": lambda: XMLProductAdapter(os.path.join(directory, "products.xml")),
+        "sqlite": lambda: ProductSQLiteHandler(os.path.join(directory, "shop.db")),
+    }
+    products = [Product(product_id, f"Product {product_id}", f"Category {product_id % 50}",
+                        round(random.uniform(10, 5000), 2), random.randint(10, 1000))
+                for product_id in range(1, size + 1)]
+    ids = [random.randint(1, size) for _ in range(operations)]
+
+    results = {}
+    for label, factory in backends.items():
+        handler = factory()
+        start = time.perf_counter()
+        for product in products:
+            handler.create(product)
+        create_ms = (time.perf_counter() - start) / size * 1000
+        results[label] = {
+            "create": create_ms,
+            "read": time_per_op(handler.read, ids),
+            "update_stock": time_per_op(lambda product_id: handler.update_stock(product_id, 1), ids),
+            "update_price": time_per_op(lambda product_id: handler.update_price(product_id, 99.0), ids),
+            "get_all_products": time_per_op(lambda _: handler.get_all_products(), ids[:5]),
+        }
+    print_table(f"Products: {size} rows, ms per op", results)
+
+
+def print_table(title: str, results: dict):
+    labels = list(results)
+    print(f"\n{title}")
+    print(f"{'operation':<18}" + "".join(f"{label:>14}" for label in labels))
+    for operation in results[labels[0]]:
+        print(f"{operation:<18}" + "".join(f"{results[label][operation]:>14.3f}" for label in labels))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-operation latency of the JSON, XML and SQLite handlers.")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as directory:
+        bench_products(directory, args.size, args.operations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import random
+import time
+from Address import Address
+from Cart import Cart
+from Order import Order
+from Product import Product
+
+
+def timed_us(operation, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cart totals: summing the lines on every view vs the cached subtotal.")
+    parser.add_argument("--lines", type=int, default=200, help="products in the cart")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    products = [Product(product_id, f"Product {product_id}", "Category", round(random.uniform(0.01, 100), 2), 10_000)
+                for product_id in range(1, args.lines + 1)]
+    cart = Cart(1, 1)
+    for product in products:
+        cart.add_to_cart(product, random.randint(1, 5))
+    address = Address(1, 1, "Moscow", "Arbat", 15, 1)
+
+    summed = sum(product.price * quantity for product, quantity in cart.products.items())
+    print(f"{args.lines} lines: float sum {summed!r}, cached subtotal {cart.subtotal!r}")
+    print(f"{'operation':<36}{'summing us':>12}{'cached us':>12}")
+    cases = [
+        ("view cart total",
+         lambda: sum(product.price * quantity for product, quantity in cart.products.items()),
+         lambda: cart.subtotal),
+        ("build an order",
+         lambda: sum(product.price * quantity for product, quantity in cart.products.items()),
+         lambda: Order(1, 1, cart, address, "Card")),
+        ("add one unit, then view the total",
+         lambda: (cart.add_to_cart(products[0], 1),
+                  sum(product.price * quantity for product, quantity in cart.products.items())),
+         lambda: (cart.add_to_cart(products[0], 1), cart.subtotal)),
+        ("change a price, then view the total",
+         lambda: (products[1].update_price(products[1].price),
+                  sum(product.price * quantity for product, quantity in cart.products.items())),
+         lambda: (products[1].update_price(products[1].price), cart.subtotal)),
+    ]
+    for label, summing, cached in cases:
+        print(f"{label:<36}{timed_us(summing, args.repeat):>12.1f}{timed_us(cached, args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import random
+import time
+from Category import CategoryManager
+from Product import Product
+
+
+# The pre-index category: products in a list, membership by equality scan.
+class ListCategory:
+    def __init__(self):
+        self.products = []
+        self.children = []
+
+    def add(self, product: Product):
+        if product in self.products:
+            raise ValueError("already there")
+        self.products.append(product)
+
+    def remove(self, product: Product):
+        self.products.remove(product)
+
+
+def walk_subtree(category: ListCategory) -> set:
+    found = set()
+    stack = [category]
+    while stack:
+        current = stack.pop()
+        found.update(product.product_id for product in current.products)
+        stack.extend(current.children)
+    return found
+
+
+def per_call_ms(operation, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        operation(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Category membership: product lists vs id sets and closure index.")
+    parser.add_argument("--products", type=int, default=500_000)
+    parser.add_argument("--fanout", type=int, default=10, help="children per category, three levels deep")
+    parser.add_argument("--operations", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    manager = CategoryManager()
+    roots = [manager.create_category(f"Root {number}", "") for number in range(args.fanout)]
+    middles = [manager.create_category(f"Middle {number}", "", random.choice(roots).category_id)
+               for number in range(args.fanout ** 2)]
+    leaves = [manager.create_category(f"Leaf {number}", "", random.choice(middles).category_id)
+              for number in range(args.fanout ** 3)]
+
+    lists = {category.category_id: ListCategory() for category in manager.get_all_categories()}
+    for category in manager.get_all_categories():
+        if category.parent_id is not None:
+            lists[category.parent_id].children.append(lists[category.category_id])
+
+    products = [Product(product_id, f"Product {product_id}", "Category", 100.0, 10)
+                for product_id in range(1, args.products + 1)]
+    # Half of the catalog lands in one leaf, so the linear checks face a realistic worst case.
+    big_leaf = leaves[0].category_id
+    start = time.perf_counter()
+    for product in products:
+        leaf = big_leaf if product.product_id % 2 else random.choice(leaves).category_id
+        manager.add_product_to_category(leaf, product)
+        lists[leaf].products.append(product)
+    print(f"filled {len(manager.categories)} categories with {args.products} products in "
+          f"{time.perf_counter() - start:.1f} s")
+
+    extra = [Product(args.products + number, "New", "Category", 1.0, 1) for number in range(1, args.operations + 1)]
+    big_root = leaves[0].category_id
+    while manager.categories[big_root].parent_id is not None:
+        big_root = manager.categories[big_root].parent_id
+
+    cases = [
+        ("add to the big leaf",
+         lambda product: lists[big_leaf].add(product),
+         lambda product: manager.add_product_to_category(big_leaf, product), extra),
+        ("remove from the big leaf",
+         lambda product: lists[big_leaf].remove(product),
+         lambda product: manager.remove_product_from_category(big_leaf, product), extra),
+        ("list products under the root",
+         lambda _: walk_subtree(lists[big_root]),
+         lambda _: manager.tree.products_under(big_root), range(5)),
+    ]
+    print(f"{'operation':<32}{'list ms':>12}{'indexed ms':>14}")
+    for label, old, new, arguments in cases:
+        print(f"{label:<32}{per_call_ms(old, arguments):>12.3f}{per_call_ms(new, arguments):>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from IdAllocator import IdAllocator
+
+
+def allocate(filepath: str, count: int, block_size: int):
+    allocator = IdAllocator("orders", filepath, block_size=block_size)
+    for _ in range(count):
+        allocator.next_id()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Id allocation throughput across processes by lease size.")
+    parser.add_argument("--ids", type=int, default=2_000_000, help="total ids, split across the processes")
+    parser.add_argument("--processes", type=int, default=8)
+    args = parser.parse_args()
+
+    per_process = args.ids // args.processes
+    print(f"{args.ids} ids from {args.processes} processes")
+    print(f"{'block size':>10}{'leases':>10}{'ids/s':>14}")
+    for block_size in (1, 10, 100, 1000, 10_000):
+        count = per_process if block_size >= 100 else per_process // 100
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "orders.json.ids")
+            processes = [multiprocessing.Process(target=allocate, args=(filepath, count, block_size))
+                         for _ in range(args.processes)]
+            start = time.perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - start
+        leases = -(-count // block_size) * args.processes
+        print(f"{block_size:>10}{leases:>10}{count * args.processes / elapsed:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import JSONCodec
+from JSONCodec import JSONCodec as Codec
+from JSONStorage import JSONFileStorage
+
+
+def make_orders(count: int) -> dict:
+    statuses = ["Pending", "Placed", "Cancelled", "Completed"]
+    return {"orders": [
+        {
+            "order_id": order_id,
+            "user_id": random.randint(1, count // 10 + 1),
+            "total_amount": round(random.uniform(10, 5000), 2),
+            "status": random.choice(statuses),
+            "address": {
+                "city": "Moscow",
+                "street": f"Street {order_id % 500}",
+                "house": order_id % 200,
+                "apartment": order_id % 90,
+            },
+            "payment_method": random.choice(["Card", "Cash", "PayPal"]),
+        }
+        for order_id in range(1, count + 1)
+    ]}
+
+
+def serializer_name() -> str:
+    if JSONCodec.orjson is not None:
+        return "orjson"
+    if JSONCodec.ujson is not None:
+        return "ujson"
+    return "json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write throughput and file size of orders.json per codec.")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(42)
+    data = make_orders(args.orders)
+    codecs = {
+        "indent=4 (default)": Codec(),
+        f"compact ({serializer_name()})": Codec(compact=True),
+        "compact + gzip": Codec(compact=True, compression="gzip"),
+    }
+    if JSONCodec.zstandard is not None:
+        codecs["compact + zstd"] = Codec(compact=True, compression="zstd")
+    else:
+        print("zstandard not installed, skipping zstd")
+
+    print(f"{args.orders} orders, best of {args.repeats}")
+    print(f"{'mode':<22}{'size MB':>10}{'write ms':>10}{'read ms':>10}{'k orders/s':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for number, (label, codec) in enumerate(codecs.items()):
+            storage = JSONFileStorage(os.path.join(directory, f"orders_{number}.json"), codec)
+            write_times, read_times = [], []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                storage.save(data)
+                write_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                storage.load()
+                read_times.append(time.perf_counter() - start)
+            size = os.path.getsize(storage.filepath) / 2 ** 20
+            write = min(write_times)
+            print(f"{label:<22}{size:>10.2f}{write * 1000:>10.1f}{min(read_times) * 1000:>10.1f}{args.orders / write / 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+from Address import Address
+from Cart import CartManager
+from Product import Product
+from Review import ReviewManager
+from User import UserManager
+
+
+# The pre-index lookups, kept here so both versions run against the same data.
+def scan_user_by_id(manager: UserManager, user_id: int):
+    for user in manager.users.values():
+        if user.user_id == user_id:
+            return user
+
+
+def scan_cart_by_user(manager: CartManager, user_id: int):
+    for cart in manager.carts.values():
+        if cart.user_id == user_id:
+            return cart
+
+
+def scan_reviews_for_product(manager: ReviewManager, product: Product):
+    return [review for review in manager.reviews.values() if review.product.product_id == product.product_id]
+
+
+def scan_reviews_by_user(manager: ReviewManager, user_id: int):
+    return [review for review in manager.reviews.values() if review.user_id == user_id]
+
+
+def per_lookup_ms(lookup, keys):
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - start) / len(keys) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manager lookups: linear scan vs hash index.")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--reviews", type=int, default=5_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--scan-lookups", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    address = Address(1, 1, "Moscow", "Arbat", 15, 1)
+    users, carts, reviews = UserManager(), CartManager(), ReviewManager()
+    start = time.perf_counter()
+    for number in range(args.users):
+        user = users.create(f"user{number}@example.com", f"User {number}", "+70000000000", address)
+        carts.create_cart(user.user_id)
+    products = [Product(product_id, f"Product {product_id}", "Category", 100.0, 10)
+                for product_id in range(1, args.products + 1)]
+    for _ in range(args.reviews):
+        reviews.add_review(random.randint(1, args.users), random.choice(products), random.randint(1, 5), "Good")
+    print(f"built {args.users} users/carts and {args.reviews} reviews in {time.perf_counter() - start:.1f} s")
+
+    user_ids = [random.randint(1, args.users) for _ in range(args.lookups)]
+    sample_products = [random.choice(products) for _ in range(args.lookups)]
+    cases = [
+        ("UserManager.read_by_id", lambda key: scan_user_by_id(users, key), users.read_by_id, user_ids),
+        ("CartManager.get_cart_by_user", lambda key: scan_cart_by_user(carts, key), carts.get_cart_by_user, user_ids),
+        ("ReviewManager.get_reviews_for_product", lambda key: scan_reviews_for_product(reviews, key),
+         reviews.get_reviews_for_product, sample_products),
+        ("ReviewManager.get_reviews_by_user", lambda key: scan_reviews_by_user(reviews, key),
+         reviews.get_reviews_by_user, user_ids),
+    ]
+
+    print(f"{'lookup':<40}{'scan ms':>12}{'indexed ms':>14}{'speedup':>12}")
+    for label, scan, indexed, keys in cases:
+        scan_ms = per_lookup_ms(scan, keys[:args.scan_lookups])
+        indexed_ms = per_lookup_ms(indexed, keys)
+        print(f"{label:<40}{scan_ms:>12.3f}{indexed_ms:>14.5f}{scan_ms / indexed_ms:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import gc
+import tracemalloc
+from Address import Address
+from Cart import Cart
+from Category import Category
+from Inventory import Inventory
+from Order import Order
+from Payment import Payment
+from Product import Product
+from Rating import Rating
+from Review import Review
+from Seller import Seller
+from User import User
+
+
+def dict_backed(cls):
+    """The same class without ``__slots__``: what every domain object looked like before."""
+    namespace = {name: value for name, value in vars(cls).items()
+                 if name not in ("__slots__", "__dict__", "__weakref__", *cls.__slots__)}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def bytes_per_object(make, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make(number) for number in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding them costs one pointer per object; it is not part of the object.
+    per_object = (after - before) / count - 8
+    del objects
+    return per_object
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-instance memory of domain objects: __dict__ vs __slots__.")
+    parser.add_argument("--objects", type=int, default=200_000)
+    args = parser.parse_args()
+
+    product = Product(1, "Laptop", "Electronics", 1000.0, 10)
+    cart = Cart(1, 1)
+    cart.load_item(product, 1)
+    address = Address(1, 1, "Moscow", "Arbat", 15, 1)
+    order = Order(1, 1, cart, address, "Card")
+    rating = Rating(product)
+    # Apart from the id, attribute values are shared between instances, so the numbers are mostly object overhead.
+    cases = [
+        (Product, lambda cls, number: cls(number, "Laptop", "Electronics", 1000.0, 10)),
+        (Address, lambda cls, number: cls(number, 1, "Moscow", "Arbat", 15, 1)),
+        (User, lambda cls, number: cls(number, "user@example.com", "Ivan", "+7000", address)),
+        (Cart, lambda cls, number: cls(1, number)),
+        (Order, lambda cls, number: cls(number, 1, cart, address, "Card")),
+        (Payment, lambda cls, number: cls(number, order, 100, "Card")),
+        (Rating, lambda cls, number: cls(product)),
+        (Review, lambda cls, number: cls(number, 1, product, rating, "Great")),
+        (Category, lambda cls, number: cls(number, "Electronics", "Gadgets")),
+        (Seller, lambda cls, number: cls(number + 1, "Shop")),
+        (Inventory, lambda cls, number: cls()),
+    ]
+    print(f"{'class':<12}{'__dict__ B':>12}{'__slots__ B':>13}{'saved':>8}")
+    for cls, make in cases:
+        old_cls = dict_backed(cls)
+        dict_bytes = bytes_per_object(lambda number: make(old_cls, number), args.objects)
+        slot_bytes = bytes_per_object(lambda number: make(cls, number), args.objects)
+        print(f"{cls.__name__:<12}{dict_bytes:>12.0f}{slot_bytes:>13.0f}{1 - slot_bytes / dict_bytes:>8.0%}")
+
+    catalog = 5_000_000
+    old_product = dict_backed(Product)
+    saved = (bytes_per_object(lambda number: old_product(number, "Laptop", "Electronics", 1000.0, 10), args.objects)
+             - bytes_per_object(lambda number: Product(number, "Laptop", "Electronics", 1000.0, 10), args.objects))
+    print(f"a {catalog:,}-product get_all_products saves about {saved * catalog / 2 ** 30:.2f} GiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from JSONCodec import JSONCodec
+from OrderJSONHandler import OrderJSONHandler
+
+STATUSES = ["Pending", "Placed", "Cancelled", "Completed"]
+
+
+def write_orders(handler: OrderJSONHandler, count: int, users: int):
+    orders = [
+        {
+            "order_id": order_id,
+            "user_id": random.randint(1, users),
+            "total_amount": round(random.uniform(10, 5000), 2),
+            "status": random.choice(STATUSES),
+            "address": {"city": "Moscow", "street": "Arbat", "house": 15, "apartment": order_id % 90},
+            "payment_method": "Card",
+        }
+        for order_id in range(1, count + 1)
+    ]
+    handler.storage.save({"orders": orders})
+
+
+def timed(operation, repeats: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = operation()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def bench(directory: str, count: int, lookups: int):
+    filepath = os.path.join(directory, f"orders_{count}.json")
+    codec = JSONCodec(compact=True)
+    users = max(count // 10, 1)
+    write_orders(OrderJSONHandler(filepath, codec=codec), count, users)
+    user_ids = [random.randint(1, users) for _ in range(lookups)]
+
+    handler = OrderJSONHandler(filepath, codec=codec)
+    scan_ms, _ = timed(lambda: [order for order in handler.storage.load()["orders"] if order["user_id"] == user_ids[0]])
+    build_ms, _ = timed(lambda: handler.get_order_ids_by_user(user_ids[0]))
+    load_ms, _ = timed(lambda: OrderJSONHandler(filepath, codec=codec).get_order_ids_by_user(user_ids[0]))
+
+    start = time.perf_counter()
+    for user_id in user_ids:
+        handler.get_order_ids_by_user(user_id)
+    user_ms = (time.perf_counter() - start) / lookups * 1000
+    count_ms, _ = timed(lambda: handler.index.count("status", "Placed"), lookups)
+    status_ms, placed = timed(lambda: handler.get_order_ids_by_status("Placed"), 20)
+
+    print(f"{count:>9}{scan_ms:>12.1f}{build_ms:>12.1f}{load_ms:>12.1f}{user_ms:>12.4f}{count_ms:>12.4f}"
+          f"{status_ms:>12.2f}{len(placed):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order lookups by user and status: full scan vs RecordIndex.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print("times in ms; build = first lookup without .idx, load = first lookup in a new handler with .idx")
+    print(f"{'orders':>9}{'scan':>12}{'build':>12}{'load':>12}{'by user':>12}{'count st.':>12}"
+          f"{'by status':>12}{'placed':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            bench(directory, count, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from OrderJSONHandler import OrderJSONHandler
+
+
+def make_order(order_id: int, rng: random.Random) -> dict:
+    items = [[product_id, round(rng.uniform(1, 500), 2), rng.randint(1, 3)]
+             for product_id in rng.sample(range(1, 10_000), rng.randint(1, 6))]
+    return {
+        "order_id": order_id,
+        "user_id": rng.randint(1, 10_000),
+        "total_amount": round(sum(price * quantity for _, price, quantity in items), 2),
+        "status": "Pending",
+        "address": {"city": "Moscow", "street": "Arbat", "house": 15, "apartment": 1},
+        "payment_method": "Card",
+        "created_at": "2024-01-01T00:00:00",
+        "items": items,
+    }
+
+
+def timed_ms(operation, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reading one order: full document scan vs the offsets lookup.")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--reads", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        handler = OrderJSONHandler(os.path.join(directory, "orders.json"))
+        handler.storage.save({"orders": [make_order(order_id, rng) for order_id in range(1, args.orders + 1)]})
+        handler.offsets.refresh()
+        order_ids = [rng.randint(1, args.orders) for _ in range(args.reads)]
+
+        def scan(order_id):
+            return next(order_data for order_data in handler.storage.load()["orders"]
+                        if order_data["order_id"] == order_id)
+
+        print(f"{args.orders} orders, {args.reads} random reads")
+        print(f"{'read':<30}{'ms per order':>14}")
+        for label, read in [("load document and scan", scan),
+                            ("read_order_by_id", handler.read_order_by_id),
+                            ("get_order_view", handler.get_order_view)]:
+            ids = iter(order_ids)
+            print(f"{label:<30}{timed_ms(lambda: read(next(ids)), args.reads):>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+import tempfile
+import time
+from JSONCodec import JSONCodec
+from ProductJSONHandler import ProductJSONHandler
+
+
+def timed_ms(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serving one page of products: full load vs the offset index.")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, codec in [("indent=4", None), ("compact", JSONCodec(compact=True))]:
+            filepath = os.path.join(directory, f"products-{label}.json")
+            handler = ProductJSONHandler(filepath, codec=codec)
+            handler.storage.save({"products": [
+                {"product_id": product_id, "name": f"Товар {product_id}", "category": "Electronics",
+                 "price": 100.0, "stock": 10}
+                for product_id in range(1, args.products + 1)
+            ]})
+
+            print(f"{label}, {os.path.getsize(filepath) / 2 ** 20:.0f} MiB")
+            print(f"  get_all_products, then slice           "
+                  f"{timed_ms(lambda: handler.get_all_products()[:args.page_size]):>10.1f} ms")
+            print(f"  first page, building the offset index  "
+                  f"{timed_ms(lambda: handler.get_all_products(args.page_size)):>10.1f} ms")
+            print(f"  page 1, warm                           "
+                  f"{timed_ms(lambda: handler.get_all_products(args.page_size)):>10.2f} ms")
+            middle = args.products // 2
+            print(f"  page after id {middle:<25}"
+                  f"{timed_ms(lambda: handler.get_all_products(args.page_size, middle)):>10.2f} ms")
+            fresh = ProductJSONHandler(filepath, codec=codec)
+            print(f"  page 1 in a new process (.offsets)     "
+                  f"{timed_ms(lambda: fresh.get_all_products(args.page_size)):>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
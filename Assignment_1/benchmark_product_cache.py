@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from ProductJSONHandler import ProductJSONHandler, CachedProductJSONHandler
+
+
+def generate_catalog(filepath: str, size: int):
+    products = [
+        {
+            "product_id": product_id,
+            "name": f"Product {product_id}",
+            "category": f"Category {product_id % 50}",
+            "price": round(random.uniform(10, 5000), 2),
+            "stock": random.randint(10, 1000)
+        }
+        for product_id in range(1, size + 1)
+    ]
+    with open(filepath, "w") as file:
+        json.dump({"products": products}, file, indent=4)
+
+
+def time_per_op(operation, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        operation()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run(size: int, repeats: int):
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "products.json")
+        generate_catalog(filepath, size)
+        ids = [random.randint(1, size) for _ in range(repeats)]
+
+        results = {}
+        for label, handler in (("plain", ProductJSONHandler(filepath)), ("cached", CachedProductJSONHandler(filepath))):
+            handler.read(1)  # warm up the cache so the first load is not counted
+            lookup = iter(ids * 4)
+            results[label] = {
+                "read": time_per_op(lambda: handler.read(next(lookup)), repeats),
+                "update_stock": time_per_op(lambda: handler.update_stock(next(lookup), -1), repeats),
+                "update_price": time_per_op(lambda: handler.update_price(next(lookup), 99.0), repeats),
+                "get_all_products": time_per_op(handler.get_all_products, max(1, repeats // 10)),
+            }
+
+    print(f"\n{size} products (ms per op)")
+    print(f"{'operation':<18}{'plain':>12}{'cached':>12}{'speedup':>10}")
+    for operation in results["plain"]:
+        plain = results["plain"][operation]
+        cached = results["cached"][operation]
+        print(f"{operation:<18}{plain:>12.3f}{cached:>12.3f}{plain / cached:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-operation latency of ProductJSONHandler vs CachedProductJSONHandler.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    for size in args.sizes:
+        run(size, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import random
+import time
+import ProductStore
+from Product import Product
+from ProductStore import ProductStore as Store
+
+CATEGORIES = [f"Category {number}" for number in range(50)]
+
+
+def timed_ms(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk catalog operations: dict of Products vs ProductStore columns.")
+    parser.add_argument("--products", type=int, default=10_000_000)
+    parser.add_argument("--skip-objects", action="store_true", help="only time the store (saves memory)")
+    args = parser.parse_args()
+
+    random.seed(42)
+    categories = [random.choice(CATEGORIES) for _ in range(args.products)]
+    prices = [round(random.uniform(10, 5000), 2) for _ in range(args.products)]
+    stocks = [random.randint(0, 500) for _ in range(args.products)]
+    product_ids = range(1, args.products + 1)
+    print(f"backend: {'numpy' if ProductStore.np is not None else 'stdlib arrays'}, {args.products} products")
+
+    start = time.perf_counter()
+    store = Store.from_columns(product_ids, [f"Product {product_id}" for product_id in product_ids], categories,
+                               prices, stocks)
+    print(f"store built in {time.perf_counter() - start:.1f} s")
+
+    def reprice_objects(products, category=None):
+        for product in products.values():
+            if category is None or product.category == category:
+                product.price = round(product.price * 1.05, 2)
+
+    cases = [
+        ("raise all prices by 5%",
+         lambda products: reprice_objects(products), lambda: store.select().scale_prices(1.05)),
+        ("raise prices in one category by 5%",
+         lambda products: reprice_objects(products, "Category 7"),
+         lambda: store.select(category="Category 7").scale_prices(1.05)),
+        ("sum stock value",
+         lambda products: sum(product.price * product.stock for product in products.values()),
+         lambda: store.select().stock_value()),
+        ("restock items under 5 units",
+         lambda products: [product.update_stock(10) for product in products.values() if product.stock < 5],
+         lambda: store.select(max_stock=4).add_stock(10)),
+    ]
+
+    products = None
+    if not args.skip_objects:
+        products = {product_id: Product(product_id, f"Product {product_id}", category, price, stock)
+                    for product_id, category, price, stock in zip(product_ids, categories, prices, stocks)}
+    print(f"{'operation':<38}{'Product dict ms':>16}{'store ms':>12}")
+    for label, objects, columns in cases:
+        object_ms = timed_ms(lambda: objects(products)) if products is not None else float("nan")
+        print(f"{label:<38}{object_ms:>16.0f}{timed_ms(columns):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
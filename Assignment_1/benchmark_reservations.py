@@ -0,0 +1,94 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Cart import Cart
+from Product import Product, InsufficientStockError
+from Reservation import ReservationManager
+
+
+def make_products(count: int, stock: int) -> dict:
+    return {product_id: Product(product_id, f"Product {product_id}", "Category", 10.0, stock)
+            for product_id in range(1, count + 1)}
+
+
+def make_plans(carts: int, products: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [(cart_id, {product_id: rng.randint(1, 3) for product_id in rng.sample(range(1, products + 1), 3)},
+             rng.random() < 0.8) for cart_id in range(1, carts + 1)]
+
+
+def run_direct(products: dict, plans: list, threads: int) -> dict:
+    """The pre-reservation flow: Cart.add_to_cart checks and decrements product.stock unguarded."""
+    sold = {product_id: 0 for product_id in products}
+    lock = threading.Lock()
+
+    def checkout(plan):
+        cart_id, items, buys = plan
+        cart = Cart(cart_id, cart_id)
+        for product_id, quantity in items.items():
+            cart.add_to_cart(products[product_id], quantity)
+        if not buys:
+            cart.clear_cart()
+            return
+        with lock:
+            for product, quantity in cart.products.items():
+                sold[product.product_id] += quantity
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(checkout, plans))
+    return sold
+
+
+def run_reserved(products: dict, plans: list, threads: int) -> dict:
+    reservations = ReservationManager(products, hold_seconds=60)
+    sold = {product_id: 0 for product_id in products}
+    lock = threading.Lock()
+
+    def checkout(plan):
+        cart_id, items, buys = plan
+        try:
+            reservations.reserve(cart_id, items)
+        except InsufficientStockError:
+            return
+        if not buys:
+            reservations.release(cart_id)
+            return
+        committed = reservations.commit(cart_id)
+        with lock:
+            for product_id, quantity in committed.items():
+                sold[product_id] += quantity
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(checkout, plans))
+    return sold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent checkout of scarce stock: direct stock vs reservations.")
+    parser.add_argument("--carts", type=int, default=20_000)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=64)
+    args = parser.parse_args()
+
+    # Switch threads as often as possible so check-then-act races actually surface.
+    sys.setswitchinterval(1e-6)
+    plans = make_plans(args.carts, args.products)
+    print(f"{args.carts} carts, {args.threads} threads, {args.products} products x {args.stock} units")
+    print(f"{'flow':<14}{'carts/s':>12}{'units sold':>12}{'oversold':>10}")
+    for label, run in [("direct stock", run_direct), ("reservations", run_reserved)]:
+        products = make_products(args.products, args.stock)
+        start = time.perf_counter()
+        sold = run(products, plans, args.threads)
+        elapsed = time.perf_counter() - start
+        # Units handed out beyond the initial stock, plus any stock accounting that went out of balance.
+        oversold = sum(max(0, sold[product_id] - args.stock) + abs(args.stock - sold[product_id] - product.stock)
+                       for product_id, product in products.items())
+        print(f"{label:<14}{args.carts / elapsed:>12.0f}{sum(sold.values()):>12}{oversold:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from JSONCodec import JSONCodec
+from ProductJSONHandler import ProductJSONHandler
+from ReviewJSONHandler import ReviewJSONHandler
+from SearchIndex import SearchIndex
+
+BRANDS = ["Samsung", "Apple", "Xiaomi", "Huawei", "Sony", "LG", "Lenovo", "Asus", "Acer", "Dell", "HP", "Philips",
+          "Bosch", "JBL", "Logitech", "Canon", "Nikon", "Realme", "Honor", "Poco"]
+KINDS = ["смартфон", "ноутбук", "планшет", "наушники", "телевизор", "монитор", "клавиатура", "мышь", "колонка",
+         "фотоаппарат", "smartphone", "laptop", "tablet", "headphones", "monitor", "keyboard", "speaker", "camera"]
+COLORS = ["черный", "белый", "серый", "синий", "красный", "black", "white", "silver", "blue", "red"]
+WORDS = ["отличный", "быстрая", "доставка", "качество", "звук", "экран", "батарея", "держит", "долго", "great",
+         "sound", "battery", "screen", "fast", "delivery", "quality", "рекомендую", "recommend", "цена", "price"]
+
+
+def product_name(product_id: int) -> str:
+    return (f"{random.choice(BRANDS)} {random.choice(KINDS)} M{random.randint(1, 20000)} "
+            f"{random.choice([64, 128, 256, 512])}GB {random.choice(COLORS)}")
+
+
+def write_catalog(directory: str, products: int, reviews: int):
+    codec = JSONCodec(compact=True)
+    product_handler = ProductJSONHandler(os.path.join(directory, "products.json"), codec=codec)
+    review_handler = ReviewJSONHandler(os.path.join(directory, "reviews.json"), codec=codec)
+    product_handler.storage.save({"products": [
+        {"product_id": product_id, "name": product_name(product_id), "category": "Electronics", "price": 100.0,
+         "stock": 10}
+        for product_id in range(1, products + 1)
+    ]})
+    review_handler.storage.save({"reviews": [
+        {"review_id": review_id, "user_id": 1, "product": {"product_id": random.randint(1, products)},
+         "rating": 5, "comment": " ".join(random.sample(WORDS, 5))}
+        for review_id in range(1, reviews + 1)
+    ]})
+    return product_handler, review_handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 search index build, update and query latency.")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as directory:
+        product_handler, review_handler = write_catalog(directory, args.products, args.reviews)
+
+        start = time.perf_counter()
+        index = SearchIndex(product_handler, review_handler)
+        print(f"build over {args.products} products, {args.reviews} reviews: {time.perf_counter() - start:.1f} s, "
+              f"{len(index.postings)} terms")
+
+        queries = {
+            "rare (model number)": lambda: f"M{random.randint(1, 20000)}",
+            "brand + kind": lambda: f"{random.choice(BRANDS)} {random.choice(KINDS)}",
+            "brand + kind + color": lambda: f"{random.choice(BRANDS)} {random.choice(KINDS)} {random.choice(COLORS)}",
+            "kind, inflected": lambda: random.choice(["смартфоны", "ноутбуки", "наушников", "телевизоры"]),
+            "any of two words": lambda: f"{random.choice(KINDS)} {random.choice(WORDS)}",
+        }
+        print(f"{'query':<24}{'p50 ms':>10}{'p99 ms':>10}")
+        for label, make_query in queries.items():
+            match_all = not label.startswith("any")
+            timings = []
+            for _ in range(args.queries):
+                query = make_query()
+                start = time.perf_counter()
+                index.search(query, 10, match_all)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"{label:<24}{statistics.median(timings):>10.2f}{timings[int(len(timings) * 0.99) - 1]:>10.2f}")
+
+        start = time.perf_counter()
+        index.synced(product_handler, [{"product_id": 1, "name": product_name(1)}])
+        print(f"incremental re-index of one product: {(time.perf_counter() - start) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+from SortedIndex import SortedIndex
+
+CATEGORIES = [f"Category {number}" for number in range(50)]
+
+
+def per_call_ms(operation, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        operation()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sorted price/stock index vs scanning the loaded catalog.")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    records = [{"product_id": product_id, "category": random.choice(CATEGORIES),
+                "price": round(random.uniform(10, 5000), 2), "stock": random.randint(0, 500)}
+               for product_id in range(1, args.products + 1)]
+    index = SortedIndex(("price", "stock"), lambda: [(record["product_id"], record) for record in records],
+                        lambda: "v1", partition="category")
+    start = time.perf_counter()
+    index.refresh()
+    print(f"build over {args.products} products: {time.perf_counter() - start:.2f} s")
+
+    cases = [
+        ("price <= 500 in one category, page 1",
+         lambda: sorted((record for record in records
+                         if record["category"] == "Category 7" and record["price"] <= 500),
+                        key=lambda record: record["price"])[:20],
+         lambda: index.range("price", high=500, partition_value="Category 7", limit=20)),
+        ("price in [1000, 1100], page 5",
+         lambda: sorted((record for record in records if 1000 <= record["price"] <= 1100),
+                        key=lambda record: record["price"])[80:100],
+         lambda: index.range("price", 1000, 1100, offset=80, limit=20)),
+        ("top 10 by price",
+         lambda: sorted(records, key=lambda record: record["price"], reverse=True)[:10],
+         lambda: index.top("price", 10)),
+        ("count stock < 5",
+         lambda: sum(1 for record in records if record["stock"] < 5),
+         lambda: index.count("stock", below=5)),
+    ]
+    print(f"{'query':<40}{'scan ms':>12}{'index ms':>12}")
+    for label, scan, indexed in cases:
+        print(f"{label:<40}{per_call_ms(scan, 3):>12.1f}{per_call_ms(indexed, args.repeats):>12.4f}")
+
+    updates = [(random.randint(1, args.products), random.randint(0, 500)) for _ in range(args.repeats)]
+
+    def apply_updates():
+        for product_id, stock in updates:
+            record = records[product_id - 1]
+            record["stock"] = stock
+            index.apply("v1", [(product_id, record)])
+    print(f"{'update_stock index patch':<40}{'':>12}{per_call_ms(apply_updates, 1) / args.repeats:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from ProductXMLHandler import ProductXMLHandler
+
+
+def generate_catalog(filepath: str, size: int):
+    root = ET.Element("products")
+    for product_id in range(1, size + 1):
+        product_element = ET.SubElement(root, "product")
+        ET.SubElement(product_element, "product_id").text = str(product_id)
+        ET.SubElement(product_element, "name").text = f"Product {product_id}"
+        ET.SubElement(product_element, "category").text = f"Category {product_id % 50}"
+        ET.SubElement(product_element, "price").text = str(round(random.uniform(10, 5000), 2))
+        ET.SubElement(product_element, "stock").text = str(random.randint(10, 1000))
+    ET.ElementTree(root).write(filepath)
+
+
+def scan_lookup(root, product_id: int):
+    # The lookup the XML handlers used before the index: walk every element until the id matches.
+    for product_element in root.findall("product"):
+        if int(product_element.find("product_id").text) == product_id:
+            return product_element
+    return None
+
+
+def time_per_op(operation, ids):
+    start = time.perf_counter()
+    for product_id in ids:
+        operation(product_id)
+    return (time.perf_counter() - start) / len(ids) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lookup latency of indexed XML handlers vs findall scans.")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "products.xml")
+        generate_catalog(filepath, args.size)
+        ids = [random.randint(1, args.size) for _ in range(args.lookups)]
+
+        parsed_root = ET.parse(filepath).getroot()
+        reparse_ids = ids[:max(1, args.lookups // 100)]
+        handler = ProductXMLHandler(filepath)
+        handler.read_product_by_id(1)
+
+        results = {
+            "parse + scan (old read path)": time_per_op(lambda pid: scan_lookup(ET.parse(filepath).getroot(), pid), reparse_ids),
+            "scan of parsed tree": time_per_op(lambda pid: scan_lookup(parsed_root, pid), ids),
+            "indexed read_product_by_id": time_per_op(handler.read_product_by_id, ids),
+        }
+
+    print(f"{args.size} elements, ms per lookup")
+    for label, value in results.items():
+        print(f"{label:<32}{value:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from ProductXMLHandler import ProductXMLHandler
+
+
+def generate_catalog(filepath: str, size: int):
+    # Written as text so generating a large file does not itself need a full tree in memory.
+    with open(filepath, "w") as file:
+        file.write("<products>")
+        for product_id in range(1, size + 1):
+            file.write(f"<product><product_id>{product_id}</product_id><name>Product {product_id}</name>"
+                       f"<category>Category {product_id % 50}</category>"
+                       f"<price>{round(random.uniform(10, 5000), 2)}</price>"
+                       f"<stock>{random.randint(10, 1000)}</stock></product>")
+        file.write("</products>")
+
+
+def scan(filepath: str, mode: str):
+    handler = ProductXMLHandler(filepath)
+    start = time.perf_counter()
+    if mode == "iter":
+        products = handler.iter_products()
+    else:
+        products = handler.get_all_products()
+    total_stock = sum(product.stock for product in products)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode} {elapsed:.3f} {peak_kb} {total_stock}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of get_all_products vs iter_products.")
+    parser.add_argument("--size", type=int, default=500000)
+    parser.add_argument("--scan", nargs=2, metavar=("FILE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scan:
+        scan(*args.scan)
+        return
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "products.xml")
+        generate_catalog(filepath, args.size)
+        size_mb = os.path.getsize(filepath) / 1024 / 1024
+        print(f"{args.size} products, {size_mb:.1f} MB")
+        print(f"{'path':<20}{'seconds':>10}{'peak RSS MB':>14}")
+        # Each path runs in its own process because ru_maxrss never goes down.
+        for mode in ("get_all", "iter"):
+            output = subprocess.run([sys.executable, __file__, "--scan", filepath, mode],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            elapsed, peak_kb = float(output[1]), int(output[2])
+            print(f"{mode:<20}{elapsed:>10.3f}{peak_kb / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
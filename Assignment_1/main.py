@@ -1,21 +1,28 @@
 from User import UserManager, User, UserNotFoundError
 from UserJSONHandler import UserJSONHandler, UserExistsError
+from UserSQLiteHandler import UserSQLiteHandler
 from Address import Address
+import argparse
 import os
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
     # Файлы для хранения данных о пользователях
     json_file = "users.json"
+    sqlite_file = "shop.db"
 
     # Убедимся, что файл существует (или создадим пустой файл)
-    if not os.path.exists(json_file):
+    if args.backend == "json" and not os.path.exists(json_file):
         with open(json_file, "w") as file:
             file.write("{\"users\": []}")
 
     # Инициализация менеджеров
     user_manager = UserManager()
-    json_handler = UserJSONHandler(json_file)
+    handler = UserJSONHandler(json_file) if args.backend == "json" else UserSQLiteHandler(sqlite_file)
 
     # Создание адреса и пользователя
     print("\n--- Creating user in memory ---")
@@ -23,11 +30,11 @@ def main():
     user1 = user_manager.create("user1@example.com", "Alice", "+1234567890", address1)
     print(f"Created user: {user1}")
 
-    # Сохранение пользователя в JSON
-    print("\n--- UserJSONHandler: Saving user to JSON ---")
+    # Сохранение пользователя в выбранное хранилище
+    print(f"\n--- {type(handler).__name__}: Saving user to {args.backend} ---")
     try:
-        json_handler.create(user1)
-        print(f"User {user1.name} saved to JSON.")
+        handler.create(user1)
+        print(f"User {user1.name} saved to {args.backend}.")
     except UserExistsError as e:
         print(e)
 
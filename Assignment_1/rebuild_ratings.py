@@ -0,0 +1,28 @@
+import argparse
+import sys
+from RatingJSONHandler import RatingJSONHandler
+from ReviewJSONHandler import ReviewJSONHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check the per-product rating aggregates from reviews.")
+    parser.add_argument("reviews", help="reviews JSON file")
+    parser.add_argument("ratings", help="ratings JSON file")
+    parser.add_argument("--check", action="store_true", help="only report aggregates that disagree with the reviews")
+    args = parser.parse_args()
+
+    reviews = ReviewJSONHandler(args.reviews)
+    ratings = RatingJSONHandler(args.ratings)
+    if args.check:
+        mismatches = ratings.check_consistency(reviews)
+        for product_id, (stored, expected) in sorted(mismatches.items()):
+            print(f"product {product_id}: stored (count, sum, histogram) {stored}, reviews give {expected}")
+        print(f"{len(mismatches)} inconsistent aggregate(s)")
+        return 1 if mismatches else 0
+
+    print(f"rebuilt aggregates for {ratings.rebuild_from_reviews(reviews)} product(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import AtomicFile
+from AtomicFile import atomic_write, fsync_batch, sync_file
+
+
+class TestAtomicFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def read(self, name: str) -> str:
+        with open(self.path(name)) as file:
+            return file.read()
+
+    def test_a_failed_write_keeps_the_original_and_removes_the_temp_file(self):
+        with open(self.path("data.json"), "w") as file:
+            file.write("original")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path("data.json")) as file:
+                file.write("half a new docu")
+                raise RuntimeError("interrupted")
+        self.assertEqual(self.read("data.json"), "original")
+        self.assertEqual(os.listdir(self.directory.name), ["data.json"])
+
+        # A write that fails before the file ever existed leaves nothing behind either.
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path("new.json")):
+                raise RuntimeError("interrupted")
+        self.assertEqual(os.listdir(self.directory.name), ["data.json"])
+
+    def test_a_successful_write_replaces_the_file_and_keeps_its_mode(self):
+        with open(self.path("data.json"), "w") as file:
+            file.write("original")
+        os.chmod(self.path("data.json"), 0o600)
+        with atomic_write(self.path("data.json")) as file:
+            file.write("replaced")
+        self.assertEqual(self.read("data.json"), "replaced")
+        self.assertEqual(os.stat(self.path("data.json")).st_mode & 0o777, 0o600)
+        self.assertEqual(os.listdir(self.directory.name), ["data.json"])
+
+    def test_a_batch_writes_every_file_and_syncs_each_once_at_the_end(self):
+        names = ["a.json", "b.json", "c.json"]
+        with mock.patch("AtomicFile.os.fsync", wraps=os.fsync) as fsync:
+            with fsync_batch():
+                for name in names:
+                    with atomic_write(self.path(name)) as file:
+                        file.write(name)
+                with atomic_write(self.path("a.json")) as file:
+                    file.write("a again")
+                with open(self.path("log.txt"), "a") as file:
+                    file.write("entry")
+                    sync_file(file)
+                with fsync_batch():
+                    with atomic_write(self.path("d.json")) as file:
+                        file.write("nested")
+                # Renames are not deferred: every file is already in place inside the batch.
+                self.assertEqual(self.read("b.json"), "b.json")
+                self.assertEqual(self.read("d.json"), "nested")
+                self.assertFalse(fsync.called)
+            # One fsync per distinct file, plus the one directory they share.
+            self.assertEqual(fsync.call_count, 6)
+        self.assertEqual([self.read(name) for name in names + ["d.json", "log.txt"]],
+                         ["a again", "b.json", "c.json", "nested", "entry"])
+        self.assertIsNone(AtomicFile._pending)
+
+    def test_a_failing_batch_still_syncs_what_it_wrote(self):
+        with mock.patch("AtomicFile.os.fsync", wraps=os.fsync) as fsync:
+            with self.assertRaises(RuntimeError):
+                with fsync_batch():
+                    with atomic_write(self.path("a.json")) as file:
+                        file.write("kept")
+                    raise RuntimeError("interrupted")
+            self.assertEqual(fsync.call_count, 2)
+        self.assertEqual(self.read("a.json"), "kept")
+        self.assertIsNone(AtomicFile._pending)
+        # Outside a batch every write syncs immediately again.
+        with mock.patch("AtomicFile.os.fsync", wraps=os.fsync) as fsync:
+            with atomic_write(self.path("b.json")) as file:
+                file.write("b")
+            self.assertEqual(fsync.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import os
+import tempfile
+import unittest
+from Address import Address
+from Cart import Cart
+from CategoryJSONHandler import CategoryJSONHandler
+from CategorySQLiteHandler import CategorySQLiteHandler
+from InventoryJSONHandler import InventoryJSONHandler
+from InventorySQLiteHandler import InventorySQLiteHandler
+from OrderJSONHandler import OrderJSONHandler, LazyOrder
+from OrderSQLiteHandler import OrderSQLiteHandler
+from Product import Product, ProductNotFoundError
+from ProductJSONHandler import ProductJSONHandler, ProductExistsError
+from ProductSQLiteHandler import ProductSQLiteHandler
+from RatingJSONHandler import RatingJSONHandler
+from RatingSQLiteHandler import RatingSQLiteHandler
+from Review import Review
+from Rating import Rating
+from ReviewJSONHandler import ReviewJSONHandler
+from ReviewSQLiteHandler import ReviewSQLiteHandler
+
+PRODUCTS = [
+    Product(1, "Laptop", "Electronics", 1000.0, 10),
+    Product(2, "Phone", "Electronics", 500.0, 2),
+    Product(3, "Novel", "Books", 15.0, 0),
+    Product(4, "Atlas", "Books", 45.0, 7),
+    Product(5, "Cable", "Electronics", 15.0, 4),
+]
+
+
+class BackendContract:
+    """Behaviour every storage backend must share; subclasses say how to open each handler."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def ids(self, records: list) -> list:
+        return [record.product_id for record in records]
+
+    def test_product_batches_and_sorted_queries(self):
+        products = self.products()
+        products.create_many(PRODUCTS)
+        with self.assertRaises(ProductExistsError):
+            products.create_many([Product(6, "Mouse", "Electronics", 20.0, 1), PRODUCTS[0]])
+        with self.assertRaises(ProductNotFoundError):
+            products.read(6)
+
+        self.assertEqual(self.ids(products.get_products_by_price(15.0, 500.0)), [3, 5, 4, 2])
+        self.assertEqual(self.ids(products.get_products_by_price(category="Books", descending=True)), [4, 3])
+        self.assertEqual(self.ids(products.get_products_by_stock(min_stock=4, limit=2)), [5, 4])
+        self.assertEqual(self.ids(products.get_top_products("stock", 2)), [1, 4])
+        self.assertEqual(self.ids(products.get_low_stock_products(threshold=5, offset=1)), [2, 5])
+
+        self.assertIn("Insufficient", products.update_stock_many({1: -1, 3: -1}))
+        self.assertEqual(products.read(1).stock, 10)
+        products.update_stock_many({1: -9, 3: 6})
+        self.assertEqual(products.update_price_many({2: 10.0, 3: -1.0}), "Price cannot be negative.")
+        products.update_price_many({2: 10.0})
+        self.assertEqual(self.ids(products.get_low_stock_products(threshold=5)), [1, 2, 5])
+        self.assertEqual(products.count_low_stock(threshold=5), 3)
+        self.assertEqual(self.ids(products.get_products_by_price(max_price=15.0)), [2, 3, 5])
+
+    def test_inventory_batches_apply_all_or_nothing(self):
+        inventories = self.inventories()
+        inventories.create_inventory(1)
+        self.assertTrue(inventories.add_products(1, PRODUCTS[:3]))
+        self.assertFalse(inventories.add_products(1, [PRODUCTS[3], PRODUCTS[0]]))
+        self.assertFalse(inventories.update_stock_many(1, {1: 5, 9: 1}))
+        self.assertFalse(inventories.update_price_many(1, {1: 5.0, 2: -1.0}))
+        self.assertTrue(inventories.update_stock_many(1, {1: 5, 2: 6}))
+        self.assertTrue(inventories.update_price_many(1, {3: 12.5}))
+        stored = {product["product_id"]: (product["price"], product["stock"])
+                  for product in inventories.get_inventory(1)["products"]}
+        self.assertEqual(stored, {1: (1000.0, 5), 2: (500.0, 6), 3: (12.5, 0)})
+
+    def test_review_votes_keep_the_ratings_in_step(self):
+        reviews = self.reviews()
+        laptop, phone = PRODUCTS[0], PRODUCTS[1]
+        for review_id, (product, stars) in enumerate([(laptop, 4), (laptop, 4), (laptop, 5), (phone, 2)], start=1):
+            reviews.create(Review(review_id, review_id, product, Rating(product), "Review", stars=stars))
+        reviews.update(4, new_rating=3)
+        reviews.delete(2)
+
+        ratings = reviews.ratings
+        rating = ratings.read(1)
+        self.assertEqual((rating.total_reviews, rating.rating_sum, rating.histogram), (2, 9, [0, 0, 0, 1, 1]))
+        self.assertEqual(ratings.read(2).histogram, [0, 0, 1, 0, 0])
+        self.assertEqual(ratings.check_consistency(reviews), {})
+        ratings.reset(1)
+        self.assertEqual(set(ratings.check_consistency(reviews)), {1})
+        self.assertEqual(ratings.rebuild_from_reviews(reviews), 2)
+        self.assertEqual(ratings.check_consistency(reviews), {})
+
+    def test_category_hierarchy(self):
+        categories = self.categories()
+        root = categories.create_category("Electronics", "All electronics")
+        phones = categories.create_category("Phones", "Mobile phones", root.category_id)
+        laptops = categories.create_category("Laptops", "Portable computers", root.category_id)
+        categories.add_product_to_category(phones.category_id, PRODUCTS[1])
+        categories.add_product_to_category(laptops.category_id, PRODUCTS[0])
+
+        self.assertEqual(categories.read_category_by_id(phones.category_id).parent_id, root.category_id)
+        self.assertEqual(categories.get_subcategories(root.category_id), [phones.category_id, laptops.category_id])
+        self.assertEqual(sorted(categories.get_product_ids_in_subtree(root.category_id)), [1, 2])
+        self.assertIn("cycle", categories.move_category(root.category_id, laptops.category_id))
+        categories.move_category(laptops.category_id, phones.category_id)
+        self.assertEqual(sorted(categories.tree().products_under(phones.category_id)), [1, 2])
+
+        categories.delete_category(phones.category_id)
+        self.assertEqual(categories.get_subcategories(root.category_id), [laptops.category_id])
+        self.assertEqual(categories.get_product_ids_in_subtree(root.category_id), [1])
+
+    def test_order_views_projections_and_lookups(self):
+        orders = self.orders()
+        address = Address(1, 1, "Moscow", "Arbat", 15, 1)
+        for user_id, product, quantity in ((1, PRODUCTS[0], 1), (2, PRODUCTS[1], 2), (1, PRODUCTS[3], 3)):
+            cart = Cart(user_id, user_id)
+            cart.load_item(product, quantity)
+            orders.create_order(user_id, cart, address, "Card")
+        orders.update_order(2, status="Completed")
+
+        self.assertEqual(orders.get_order_ids_by_user(1), [1, 3])
+        self.assertEqual(orders.get_order_ids_by_status("Completed"), [2])
+        self.assertEqual(orders.get_all_orders(fields=["order_id", "total_amount"], limit=2),
+                         [{"order_id": 1, "total_amount": 1000.0}, {"order_id": 2, "total_amount": 1000.0}])
+
+        views = orders.get_all_orders(lazy=True)
+        self.assertTrue(all(isinstance(view, LazyOrder) for view in views))
+        self.assertEqual([(view.order_id, view.status, view.items) for view in views],
+                         [(1, "Pending", [(1, 1000.0, 1)]), (2, "Completed", [(2, 500.0, 2)]),
+                          (3, "Pending", [(4, 45.0, 3)])])
+        view = orders.get_order_view(3)
+        self.assertEqual((view.address.city, view.order.total_amount), ("Moscow", 135.0))
+        self.assertIsNone(orders.get_order_view(9))
+        self.assertEqual([order.order_id for order in orders.iter_orders(lazy=True, batch_size=2)], [1, 2, 3])
+
+
+class TestJSONBackend(BackendContract, unittest.TestCase):
+
+    def products(self):
+        return ProductJSONHandler(self.path("products.json"))
+
+    def inventories(self):
+        return InventoryJSONHandler(self.path("inventories.json"))
+
+    def reviews(self):
+        return ReviewJSONHandler(self.path("reviews.json"), ratings=RatingJSONHandler(self.path("ratings.json")))
+
+    def categories(self):
+        return CategoryJSONHandler(self.path("categories.json"))
+
+    def orders(self):
+        return OrderJSONHandler(self.path("orders.json"))
+
+
+class TestSQLiteBackend(BackendContract, unittest.TestCase):
+
+    def products(self):
+        return ProductSQLiteHandler(self.path("shop.db"))
+
+    def inventories(self):
+        return InventorySQLiteHandler(self.path("shop.db"))
+
+    def reviews(self):
+        return ReviewSQLiteHandler(self.path("shop.db"), ratings=RatingSQLiteHandler(self.path("shop.db")))
+
+    def categories(self):
+        return CategorySQLiteHandler(self.path("shop.db"))
+
+    def orders(self):
+        return OrderSQLiteHandler(self.path("shop.db"))
+
+
+if __name__ == "__main__":
+    unittest.main()
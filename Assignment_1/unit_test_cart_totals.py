@@ -0,0 +1,57 @@
+import random
+import unittest
+from Address import Address
+from Cart import Cart
+from Order import Order
+from Product import Product, to_cents
+
+
+class TestCartTotals(unittest.TestCase):
+
+    def test_to_cents_rounds_half_up_on_the_decimal_value(self):
+        self.assertEqual([to_cents(amount) for amount in (1.005, 0.1 + 0.2, 2.675, 0, 19.99, 1e-3)],
+                         [101, 30, 268, 0, 1999, 0])
+
+    def test_subtotal_is_exact_in_cents(self):
+        cart = Cart(1, 1)
+        for product_id in range(1, 4):
+            cart.add_to_cart(Product(product_id, f"Item {product_id}", "Category", 0.1, 10), 1)
+        self.assertEqual((cart.subtotal_cents, cart.subtotal, cart.item_count), (30, 0.3, 3))
+
+    def test_totals_follow_every_change_to_the_cart(self):
+        rng = random.Random(1)
+        products = [Product(product_id, f"Item {product_id}", "Category", round(rng.uniform(0.01, 99), 2), 1000)
+                    for product_id in range(1, 21)]
+        cart = Cart(1, 1)
+        for _ in range(300):
+            product = rng.choice(products)
+            operation = rng.random()
+            if operation < 0.6:
+                cart.add_to_cart(product, rng.randint(1, 3))
+            elif operation < 0.8:
+                cart.remove_from_cart(product)
+            elif operation < 0.98:
+                product.update_price(round(rng.uniform(0.01, 99), 2))
+            else:
+                cart.clear_cart()
+            self.assertEqual(cart.subtotal_cents,
+                             sum(to_cents(product.price) * quantity for product, quantity in cart.products.items()))
+            self.assertEqual(cart.item_count, sum(cart.products.values()))
+        self.assertEqual(cart.line_totals(), {product: to_cents(product.price) * quantity / 100
+                                              for product, quantity in cart.products.items()})
+
+    def test_stored_lines_load_without_taking_stock(self):
+        laptop = Product(1, "Laptop", "Electronics", 999.99, 3)
+        cart = Cart(1, 1, products={laptop: 2})
+        self.assertEqual((cart.subtotal, cart.item_count, laptop.stock), (1999.98, 2, 3))
+        cart.load_item(laptop, 1)
+        self.assertEqual((cart.subtotal, laptop.stock), (999.99, 3))
+
+        order = Order(1, 1, cart, Address(1, 1, "Moscow", "Arbat", 15, 1), "Card")
+        self.assertEqual(order.total_amount, 999.99)
+        laptop.price = 10.0
+        self.assertEqual((cart.subtotal, order.total_amount), (10.0, 999.99))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from Category import Category, CategoryTree, CategoryManager, CategoryNotFoundError
+from CategoryJSONHandler import CategoryJSONHandler
+from CategoryXMLHandler import CategoryXMLHandler
+from Product import Product
+
+
+class TestCategoryTree(unittest.TestCase):
+
+    def expected_products(self, tree: CategoryTree, category_id: int) -> set:
+        """Products under ``category_id`` found by walking the parent links, without the closure."""
+        products = set()
+        for other_id in tree.parents:
+            current = other_id
+            while current is not None and current != category_id:
+                current = tree.parents[current]
+            if current == category_id:
+                products |= tree.members[other_id]
+        return products
+
+    def test_closure_matches_a_walk_of_the_hierarchy(self):
+        rng = random.Random(5)
+        tree = CategoryTree()
+        for category_id in range(1, 31):
+            tree.add_category(category_id, rng.choice([None] + list(tree.parents)))
+        for _ in range(400):
+            category_id = rng.choice(list(tree.parents))
+            operation = rng.random()
+            if operation < 0.5:
+                tree.add_product(category_id, rng.randint(1, 40))
+            elif operation < 0.75:
+                tree.remove_product(category_id, rng.choice(list(tree.members[category_id]) or [0]))
+            elif operation < 0.95:
+                parent_id = rng.choice([None] + list(tree.parents))
+                if parent_id is None or category_id not in tree.ancestors[parent_id]:
+                    tree.move_category(category_id, parent_id)
+            elif len(tree.parents) > 5:
+                tree.remove_category(category_id)
+
+        for category_id in tree.parents:
+            self.assertEqual(set(tree.products_under(category_id)), self.expected_products(tree, category_id))
+            path, current = [], category_id
+            while current is not None:
+                path.append(current)
+                current = tree.parents[current]
+            self.assertEqual(tree.ancestors[category_id], tuple(path))
+
+    def test_moves_refuse_cycles_and_deletes_lift_children(self):
+        manager = CategoryManager()
+        electronics = manager.create_category("Electronics", "All electronics")
+        phones = manager.create_category("Phones", "Mobile phones", electronics.category_id)
+        cases = manager.create_category("Cases", "Phone cases", phones.category_id)
+        manager.add_product_to_category(cases.category_id, Product(1, "Case", "Cases", 9.0, 5))
+        manager.add_product_to_category(phones.category_id, Product(2, "Phone", "Phones", 500.0, 5))
+
+        self.assertEqual(sorted(p.product_id for p in manager.get_products_in_subtree(electronics.category_id)), [1, 2])
+        self.assertIn("cycle", manager.move_category(electronics.category_id, cases.category_id))
+        manager.delete_category(phones.category_id)
+        self.assertEqual(manager.read_category_by_id(cases.category_id).parent_id, electronics.category_id)
+        self.assertEqual([p.product_id for p in manager.get_products_in_subtree(electronics.category_id)], [1])
+        with self.assertRaises(CategoryNotFoundError):
+            manager.get_products_in_subtree(phones.category_id)
+
+
+class TestCategoryHandlers(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_json_hierarchy_queries_follow_every_writer(self):
+        handler = CategoryJSONHandler(self.path("categories.json"))
+        root = handler.create_category("Electronics", "All electronics")
+        phones = handler.create_category("Phones", "Mobile phones", root.category_id)
+        laptops = handler.create_category("Laptops", "Portable computers", root.category_id)
+        handler.add_product_to_category(phones.category_id, Product(1, "Phone", "Phones", 500.0, 5))
+        handler.add_product_to_category(laptops.category_id, Product(2, "Laptop", "Laptops", 1000.0, 5))
+        self.assertEqual(sorted(handler.get_product_ids_in_subtree(root.category_id)), [1, 2])
+        self.assertEqual(handler.get_subcategories(root.category_id), [phones.category_id, laptops.category_id])
+
+        other = CategoryJSONHandler(handler.filepath)
+        other.move_category(laptops.category_id, phones.category_id)
+        self.assertIn("cycle", other.move_category(root.category_id, laptops.category_id))
+        self.assertEqual(sorted(handler.get_product_ids_in_subtree(phones.category_id)), [1, 2])
+        handler.delete_category(phones.category_id)
+        self.assertEqual(other.get_subcategories(root.category_id), [laptops.category_id])
+        self.assertEqual(other.get_product_ids_in_subtree(root.category_id), [2])
+        self.assertEqual(other.read_category_by_id(laptops.category_id).product_ids, {2})
+
+    def test_json_files_with_product_dicts_still_load(self):
+        with open(self.path("categories.json"), "w") as file:
+            json.dump({"categories": [{"category_id": 1, "name": "Books", "description": "Paper", "products": [
+                {"product_id": 7, "name": "Novel", "price": 15.0, "stock": 1}]}]}, file)
+        handler = CategoryJSONHandler(self.path("categories.json"))
+
+        self.assertEqual(handler.read_category_by_id(1).product_ids, {7})
+        handler.add_product_to_category(1, Product(8, "Atlas", "Books", 45.0, 1))
+        self.assertEqual(sorted(handler.get_product_ids_in_subtree(1)), [7, 8])
+        self.assertEqual(handler.create_category("Comics", "Drawn", 1).category_id, 2)
+        with open(self.path("categories.json")) as file:
+            self.assertEqual(json.load(file)["categories"][0]["product_ids"], [7, 8])
+
+    def test_xml_categories_store_product_ids(self):
+        handler = CategoryXMLHandler(self.path("categories.xml"))
+        category = Category(1, "Books", "Paper")
+        category.product_ids = {3, 1}
+        handler.create(category)
+        handler.create(Category(2, "Comics", "Drawn", parent_id=1))
+        novel = Product(2, "Novel", "Books", 15.0, 1)
+        self.assertIn("added", handler.add_product_to_category(1, novel))
+        self.assertIn("already", handler.add_product_to_category(1, novel))
+        handler.remove_product_from_category(1, Product(3, "Atlas", "Books", 45.0, 1))
+
+        stored = CategoryXMLHandler(handler.filepath)
+        self.assertEqual(stored.read(1).product_ids, {1, 2})
+        self.assertEqual(stored.read(2).parent_id, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
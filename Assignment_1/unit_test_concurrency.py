@@ -0,0 +1,130 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from Address import Address
+from Cart import Cart
+from Product import Product
+from OrderJSONHandler import OrderJSONHandler
+from ProductJSONHandler import ProductJSONHandler
+from JSONStorage import JSONFileStorage, ConcurrentModificationError
+from FileLock import FileLock
+
+WORKERS = 8
+OPERATIONS = 25
+
+
+def create_orders(filepath: str, user_id: int, journaled: bool):
+    handler = OrderJSONHandler(filepath, journaled=journaled)
+    cart = Cart(user_id, user_id)
+    cart.add_to_cart(Product(1, "Laptop", "Electronics", 1000.0, 10), 1)
+    address = Address(user_id, user_id, "Moscow", "Arbat", 15, 1)
+    for _ in range(OPERATIONS):
+        handler.create_order(user_id, cart, address, "Card")
+
+
+def restock(filepath: str, journaled: bool):
+    handler = ProductJSONHandler(filepath, journaled=journaled)
+    for _ in range(OPERATIONS):
+        handler.update_stock(1, 1)
+
+
+class TestConcurrentHandlers(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_workers(self, target, arguments):
+        processes = [multiprocessing.Process(target=target, args=args) for args in arguments]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+    def check_no_lost_orders(self, journaled: bool):
+        filepath = os.path.join(self.directory.name, "orders.json")
+        self.run_workers(create_orders, [(filepath, user_id, journaled) for user_id in range(1, WORKERS + 1)])
+
+        orders = OrderJSONHandler(filepath, journaled=journaled).storage.load()["orders"]
+        self.assertEqual(len(orders), WORKERS * OPERATIONS)
+        self.assertEqual(len({order["order_id"] for order in orders}), WORKERS * OPERATIONS)
+        handler = OrderJSONHandler(filepath, journaled=journaled)
+        for user_id in range(1, WORKERS + 1):
+            self.assertEqual(sum(order["user_id"] == user_id for order in orders), OPERATIONS)
+            self.assertEqual(len(handler.get_order_ids_by_user(user_id)), OPERATIONS)
+
+    def test_concurrent_create_order(self):
+        self.check_no_lost_orders(journaled=False)
+
+    def test_concurrent_create_order_journaled(self):
+        self.check_no_lost_orders(journaled=True)
+
+    def test_concurrent_update_stock(self):
+        filepath = os.path.join(self.directory.name, "products.json")
+        ProductJSONHandler(filepath).create(Product(1, "Laptop", "Electronics", 1000.0, 0))
+        self.run_workers(restock, [(filepath, False)] * WORKERS)
+
+        self.assertEqual(ProductJSONHandler(filepath).read(1).stock, WORKERS * OPERATIONS)
+
+    def run_threads(self, target, count: int = WORKERS):
+        errors = []
+
+        def run():
+            try:
+                target()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_threads_sharing_a_lock_exclude_each_other(self):
+        lock = FileLock(os.path.join(self.directory.name, "counter"))
+        counter = [0]
+
+        def increment():
+            for _ in range(OPERATIONS):
+                with lock.exclusive(), lock.shared():
+                    value = counter[0]
+                    time.sleep(0)
+                    counter[0] = value + 1
+                with lock.shared():
+                    pass
+        self.run_threads(increment)
+        self.assertEqual(counter[0], WORKERS * OPERATIONS)
+        self.assertEqual(lock._held, [])
+
+    def test_threads_sharing_a_handler_lose_no_updates(self):
+        filepath = os.path.join(self.directory.name, "products.json")
+        handler = ProductJSONHandler(filepath)
+        handler.create(Product(1, "Laptop", "Electronics", 1000.0, 0))
+        self.run_threads(lambda: [handler.update_stock(1, 1) for _ in range(OPERATIONS)])
+
+        self.assertEqual(ProductJSONHandler(filepath).read(1).stock, WORKERS * OPERATIONS)
+
+    def test_stale_save_is_rejected(self):
+        filepath = os.path.join(self.directory.name, "products.json")
+        first, second = JSONFileStorage(filepath), JSONFileStorage(filepath)
+        first.save({"products": []})
+        data = second.load()
+        first.load()
+        first.save({"products": [{"product_id": 1}]})
+
+        with self.assertRaises(ConcurrentModificationError):
+            second.save(data)
+        with open(filepath) as file:
+            self.assertEqual(json.load(file), {"products": [{"product_id": 1}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
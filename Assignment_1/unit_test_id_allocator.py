@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from IdAllocator import IdAllocator
+from Product import Product, ProductManager
+from ProductXMLHandler import ProductXMLHandler
+from SellerJSONHandler import SellerJSONHandler
+
+WORKERS = 8
+IDS_PER_WORKER = 250_000
+
+
+def allocate(filepath: str, count: int, output: str):
+    allocator = IdAllocator("orders", filepath)
+    ids = array("q", (allocator.next_id() for _ in range(count)))
+    with open(output, "wb") as file:
+        ids.tofile(file)
+
+
+class TestIdAllocator(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, "orders.json.ids")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_processes_never_share_an_id(self):
+        outputs = [os.path.join(self.directory.name, f"worker{number}.ids") for number in range(WORKERS)]
+        processes = [multiprocessing.Process(target=allocate, args=(self.filepath, IDS_PER_WORKER, output))
+                     for output in outputs]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        allocated = array("q")
+        for output in outputs:
+            with open(output, "rb") as file:
+                allocated.frombytes(file.read())
+        self.assertEqual(len(allocated), WORKERS * IDS_PER_WORKER)
+        self.assertEqual(len(set(allocated)), len(allocated))
+
+    def test_threads_share_one_allocator(self):
+        allocator = IdAllocator("orders", self.filepath, block_size=10)
+        with ThreadPoolExecutor(16) as pool:
+            allocated = list(pool.map(lambda _: allocator.next_id(), range(5000)))
+        self.assertEqual(sorted(allocated), list(range(1, 5001)))
+
+    def test_unused_lease_becomes_a_gap(self):
+        first = IdAllocator("orders", self.filepath, block_size=100)
+        self.assertEqual([first.next_id(), first.next_id()], [1, 2])
+        # Another process (or a restart) continues after the whole leased block.
+        self.assertEqual(IdAllocator("orders", self.filepath, block_size=100).next_id(), 101)
+        self.assertEqual(IdAllocator("payments", self.filepath).next_id(), 1)
+
+    def test_seed_is_consulted_only_for_a_new_sequence(self):
+        self.assertEqual(IdAllocator("orders", self.filepath, block_size=5, seed=lambda: 41).next_id(), 42)
+        self.assertEqual(IdAllocator("orders", self.filepath, block_size=5, seed=lambda: 1000).next_id(), 47)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_forked_child_leases_its_own_block(self):
+        allocator = IdAllocator("orders", self.filepath)
+        allocator.next_id()
+        output = os.path.join(self.directory.name, "child.ids")
+        child = multiprocessing.get_context("fork").Process(
+            target=lambda: open(output, "w").write(str(allocator.next_id())))
+        child.start()
+        child.join()
+        with open(output) as file:
+            self.assertEqual(int(file.read()), 1001)
+        self.assertEqual(allocator.next_id(), 2)
+
+    def test_ids_are_not_reused_after_deletes(self):
+        products = ProductManager()
+        for number in range(3):
+            products.create_product(f"Product {number}", "Category", 10.0, 1)
+        products.delete_product(3)
+        self.assertEqual(products.create_product("Product 4", "Category", 10.0, 1).product_id, 4)
+
+        handler = SellerJSONHandler(os.path.join(self.directory.name, "sellers.json"))
+        first = handler.create("First")["seller_id"]
+        handler.delete(first)
+        self.assertNotEqual(SellerJSONHandler(handler.filepath).create("Second")["seller_id"], first)
+
+
+    def test_caller_chosen_ids_advance_the_sequence(self):
+        allocator = IdAllocator("orders", self.filepath, block_size=100)
+        self.assertEqual(allocator.next_id(), 1)
+        allocator.advance_past(50)
+        self.assertEqual(allocator.next_id(), 51)
+        self.assertEqual(IdAllocator("orders", self.filepath).next_id(), 101)
+        IdAllocator("orders", self.filepath).advance_past(5000)
+        self.assertEqual(IdAllocator("orders", self.filepath).next_id(), 5001)
+
+    def test_create_product_skips_ids_taken_by_create_many(self):
+        handler = ProductXMLHandler(os.path.join(self.directory.name, "products.xml"))
+        handler.create_product("Laptop", "Electronics", 1000.0, 10)
+        handler.create_many([Product(2, "Phone", "Electronics", 500.0, 10)])
+        handler.create_product("Tablet", "Electronics", 700.0, 10)
+        product_ids = [product.product_id for product in ProductXMLHandler(handler.filepath).get_all_products()]
+        self.assertEqual(len(set(product_ids)), 3)
+        # A handler in another process, with its own lease, must not collide either.
+        ProductXMLHandler(handler.filepath).create_many([Product(4000, "Watch", "Electronics", 200.0, 10)])
+        self.assertGreater(ProductXMLHandler(handler.filepath).create_product("TV", "Electronics", 900.0, 1).product_id,
+                           4000)
+
+
+if __name__ == "__main__":
+    unittest.main()
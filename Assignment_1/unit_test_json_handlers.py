@@ -0,0 +1,221 @@
+import json
+import os
+import tempfile
+import unittest
+from Address import Address
+from Cart import Cart
+from Product import Product
+from OrderJSONHandler import OrderJSONHandler, LazyOrder
+from InventoryJSONHandler import InventoryJSONHandler
+from ProductJSONHandler import ProductJSONHandler, CachedProductJSONHandler, ProductExistsError
+from RatingJSONHandler import RatingJSONHandler
+from Review import ReviewManager
+from ReviewJSONHandler import ReviewJSONHandler
+
+LEGACY_ORDER = {
+    "order_id": 1, "user_id": 7, "total_amount": 2000.0, "status": "Pending",
+    "address": {"city": "Moscow", "street": "Arbat", "house": 15, "apartment": 1},
+    "payment_method": "Card", "created_at": "2024-01-01T00:00:00",
+}
+
+
+class TempDirectoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+
+class TestOrderJSONHandler(TempDirectoryTestCase):
+
+    def create_order(self, handler: OrderJSONHandler, user_id: int):
+        cart = Cart(user_id, user_id)
+        cart.add_to_cart(Product(1, "Laptop", "Electronics", 0.1, 10), 3)
+        cart.add_to_cart(Product(2, "Phone", "Electronics", 19.99, 10), user_id)
+        return handler.create_order(user_id, cart, Address(user_id, user_id, "Moscow", "Arbat", 15, 1), "Card")
+
+    def test_orders_round_trip_with_their_items(self):
+        for journaled in (False, True):
+            handler = OrderJSONHandler(self.path(f"orders{journaled}.json"), journaled=journaled)
+            for user_id in (1, 2, 3):
+                self.create_order(handler, user_id)
+
+            reader = OrderJSONHandler(handler.filepath, journaled=journaled)
+            order = reader.read_order_by_id(2)
+            self.assertEqual((order.user_id, order.total_amount, order.address.street), (2, 40.28, "Arbat"))
+            self.assertEqual(sorted(order.cart.products.values()), [2, 3])
+            view = reader.get_order_view(3)
+            self.assertEqual(view.items, [(1, 0.1, 3), (2, 19.99, 3)])
+            self.assertIsNone(reader.read_order_by_id(99))
+            self.assertEqual([order.order_id for order in reader.get_all_orders(limit=2, after_id=1)], [2, 3])
+            self.assertEqual([order.order_id for order in reader.iter_orders(batch_size=2)], [1, 2, 3])
+            self.assertEqual(reader.update_order(1, status="Placed").status, "Placed")
+            self.assertEqual([order.order_id for order in reader.get_orders_by_user(1)], [1])
+
+    def test_lazy_reads_and_projections(self):
+        handler = OrderJSONHandler(self.path("orders.json"))
+        for user_id in (1, 2):
+            self.create_order(handler, user_id)
+
+        views = OrderJSONHandler(handler.filepath).get_all_orders(lazy=True)
+        self.assertTrue(all(isinstance(view, LazyOrder) for view in views))
+        self.assertEqual([(view.order_id, view.user_id, view.status) for view in views],
+                         [(1, 1, "Pending"), (2, 2, "Pending")])
+        # Attributes LazyOrder does not define itself come from the Order it builds.
+        self.assertEqual(sorted(views[1].cart.products.values()), [2, 3])
+        self.assertEqual(views[1].cart.subtotal, views[1].total_amount)
+        with self.assertRaises(AttributeError):
+            views[0].no_such_field
+
+        self.assertEqual(handler.get_all_orders(fields=["order_id", "total_amount", "missing"]),
+                         [{"order_id": 1, "total_amount": 20.29, "missing": None},
+                          {"order_id": 2, "total_amount": 40.28, "missing": None}])
+        self.assertEqual(handler.get_all_orders(fields=["user_id"], limit=1, after_id=1), [{"user_id": 2}])
+
+    def test_orders_stored_without_items_still_load(self):
+        with open(self.path("orders.json"), "w") as file:
+            json.dump({"orders": [LEGACY_ORDER]}, file)
+        handler = OrderJSONHandler(self.path("orders.json"))
+
+        order = handler.read_order_by_id(1)
+        self.assertEqual((order.total_amount, order.address.city), (2000.0, "Moscow"))
+        self.assertEqual(len(handler.get_all_orders()), 1)
+        self.assertEqual(handler.get_order_view(1).items, [])
+        self.assertEqual(handler.update_order(1, status="Placed").status, "Placed")
+        self.assertEqual(OrderJSONHandler(handler.filepath).read_order_by_id(1).status, "Placed")
+        self.assertEqual(self.create_order(handler, 7).order_id, 2)
+
+    def test_index_writes_append_deltas_and_compact(self):
+        handler = OrderJSONHandler(self.path("orders.json"))
+        handler.index.compact_threshold = 5
+        reader = OrderJSONHandler(handler.filepath)
+        self.create_order(handler, 1)
+        self.assertEqual(reader.get_order_ids_by_user(1), [1])
+        snapshot = os.stat(handler.index.path).st_ino
+
+        self.create_order(handler, 2)
+        self.create_order(handler, 1)
+        handler.update_order(1, status="Placed")
+        # The deltas went to the log; the .idx file was not rewritten.
+        self.assertEqual(os.stat(handler.index.path).st_ino, snapshot)
+        with open(handler.index.log_path) as file:
+            self.assertEqual(len(file.readlines()), 3)
+        self.assertEqual(sorted(reader.get_order_ids_by_user(1)), [1, 3])
+        self.assertEqual(reader.get_order_ids_by_status("Placed"), [1])
+
+        handler.delete_order(3)
+        self.assertEqual(os.path.getsize(handler.index.log_path), 0)
+        for index in (reader, OrderJSONHandler(handler.filepath)):
+            self.assertEqual(index.get_order_ids_by_user(1), [1])
+            self.assertEqual(index.get_order_ids_by_user(2), [2])
+
+    def test_index_survives_a_torn_log(self):
+        handler = OrderJSONHandler(self.path("orders.json"))
+        for user_id in (1, 2, 1):
+            self.create_order(handler, user_id)
+        with open(handler.index.log_path, "ab") as file:
+            file.write(b'{"from": "')
+
+        reader = OrderJSONHandler(handler.filepath)
+        self.assertEqual(sorted(reader.get_order_ids_by_user(1)), [1, 3])
+        self.assertEqual([order.order_id for order in reader.get_orders_by_user(2)], [2])
+        self.assertEqual(reader.get_orders_by_user(9), [])
+
+
+class TestCachedProductJSONHandler(TempDirectoryTestCase):
+
+    def test_failed_save_drops_the_unsaved_edit(self):
+        handler = CachedProductJSONHandler(self.path("products.json"))
+        handler.create(Product(1, "Laptop", "Electronics", 1000.0, 10))
+
+        # Not an OSError: the codec cannot encode a set.
+        with self.assertRaises(TypeError):
+            handler.update(1, name={"not", "serializable"}, price=1.0)
+        product = handler.read(1)
+        self.assertEqual((product.name, product.price), ("Laptop", 1000.0))
+
+
+class TestBatchMutations(TempDirectoryTestCase):
+
+    def product_handler_factories(self):
+        yield lambda: ProductJSONHandler(self.path("plain.json"))
+        yield lambda: ProductJSONHandler(self.path("journaled.json"), journaled=True)
+        yield lambda: CachedProductJSONHandler(self.path("cached.json"))
+
+    def test_product_batches_apply_all_or_nothing(self):
+        for open_handler in self.product_handler_factories():
+            handler = open_handler()
+            handler.create_many([Product(product_id, f"Product {product_id}", "Category", 10.0, 5)
+                                 for product_id in (1, 2, 3)])
+            with self.assertRaises(ProductExistsError):
+                handler.create_many([Product(4, "New", "Category", 1.0, 1), Product(2, "Taken", "Category", 1.0, 1)])
+
+            self.assertEqual(handler.update_stock_many({1: 2, 2: -5}), "Stock updated for 2 products.")
+            self.assertIn("Insufficient stock", handler.update_stock_many({1: 1, 3: -6}))
+            self.assertEqual(handler.update_price_many({3: 7.5}), "Price updated for 1 products.")
+            self.assertEqual(handler.update_price_many({1: 1.0, 2: -1.0}), "Price cannot be negative.")
+
+            products = open_handler().get_all_products()
+            self.assertEqual([(product.product_id, product.price, product.stock) for product in products],
+                             [(1, 10.0, 7), (2, 10.0, 0), (3, 7.5, 5)])
+
+    def test_inventory_batches_apply_all_or_nothing(self):
+        handler = InventoryJSONHandler(self.path("inventories.json"))
+        handler.create_inventory(1)
+        laptop, phone = Product(1, "Laptop", "Electronics", 1000.0, 10), Product(2, "Phone", "Electronics", 500.0, 10)
+        self.assertEqual(handler.add_products(1, [laptop, phone]), "2 products added to inventory.")
+        self.assertFalse(handler.add_products(1, [Product(3, "Tablet", "Electronics", 300.0, 1), laptop]))
+        self.assertEqual(handler.update_stock_many(1, {1: 4, 2: 0}), "Stock updated for 2 products.")
+        self.assertFalse(handler.update_stock_many(1, {1: 9, 5: 1}))
+        self.assertFalse(handler.update_price_many(1, {1: 900.0, 2: -1.0}))
+        self.assertFalse(handler.update_price_many(2, {1: 900.0}))
+
+        products = handler.get_inventory(1)["products"]
+        self.assertEqual([(product["product_id"], product["price"], product["stock"]) for product in products],
+                         [(1, 1000.0, 4), (2, 500.0, 0)])
+
+
+class TestReviewRatings(TempDirectoryTestCase):
+
+    def test_manager_moves_the_aggregate_by_each_reviews_own_vote(self):
+        laptop = Product(1, "Laptop", "Electronics", 1000.0, 10)
+        manager = ReviewManager()
+        first = manager.add_review(1, laptop, 5, "Great")
+        second = manager.add_review(2, laptop, 3, "Fine")
+        manager.update_review(first.review_id, new_rating_value=1)
+        manager.update_review(first.review_id, new_rating_value=2)
+        manager.delete_review(second.review_id)
+
+        rating = manager.get_product_rating(laptop)
+        self.assertEqual((rating.total_reviews, rating.rating_sum, rating.histogram), (1, 2, [0, 1, 0, 0, 0]))
+        self.assertEqual(first.stars, 2)
+
+    def test_legacy_reviews_and_aggregates_stay_in_sync(self):
+        product = {"product_id": 1, "name": "Laptop", "category": "Electronics", "price": 1000.0, "stock": 10}
+        with open(self.path("reviews.json"), "w") as file:
+            json.dump({"reviews": [
+                {"review_id": 1, "user_id": 1, "product": product, "rating": 4.0, "comment": "Good"},
+                {"review_id": 2, "user_id": 2, "product": product, "rating": 3.5, "comment": "Averaged"},
+            ]}, file)
+        with open(self.path("ratings.json"), "w") as file:
+            json.dump({"ratings": [{"product_id": 1, "product_name": "Laptop", "product_category": "Electronics",
+                                    "total_reviews": 2, "average_rating": 3.75}]}, file)
+        ratings = RatingJSONHandler(self.path("ratings.json"))
+        reviews = ReviewJSONHandler(self.path("reviews.json"), ratings=ratings)
+
+        self.assertEqual(reviews.read(2).stars, 4)
+        self.assertTrue(reviews.update(1, new_rating=2))
+        self.assertEqual(ratings.check_consistency(reviews), {})
+        self.assertTrue(reviews.delete(2))
+        rating = ratings.read(1)
+        self.assertEqual((rating.total_reviews, rating.histogram), (1, [0, 1, 0, 0, 0]))
+        self.assertEqual(ratings.check_consistency(reviews), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
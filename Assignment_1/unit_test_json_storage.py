@@ -0,0 +1,132 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+import JSONCodec as json_codec
+from JSONCodec import JSONCodec
+from Product import Product
+from ProductJSONHandler import ProductJSONHandler
+from JSONStorage import JSONFileStorage, JournaledJSONStorage, ConcurrentModificationError
+
+
+class TestJournaledJSONStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, "items.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def storage(self, compact_threshold: int = 1000) -> JournaledJSONStorage:
+        return JournaledJSONStorage(self.filepath, "items", "id", compact_threshold=compact_threshold)
+
+    def put(self, storage: JournaledJSONStorage, record: dict):
+        data = storage.load()
+        data["items"] = [item for item in data["items"] if item["id"] != record["id"]] + [record]
+        storage.save(data, changed=[record])
+
+    def log_lines(self) -> list:
+        with open(self.filepath + ".log", "rb") as file:
+            return file.read().splitlines(keepends=True)
+
+    def test_saves_append_to_the_log_and_replay_over_the_snapshot(self):
+        JSONFileStorage(self.filepath).save({"items": [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]})
+        writer = self.storage()
+        snapshot = os.stat(self.filepath)
+
+        self.put(writer, {"id": 3, "name": "c"})
+        self.put(writer, {"id": 1, "name": "A"})
+        data = writer.load()
+        data["items"] = [item for item in data["items"] if item["id"] != 2]
+        writer.save(data, deleted=[2])
+        changed = [{"id": 4, "name": "d"}, {"id": 5, "name": "e"}]
+        data = writer.load()
+        writer.save({"items": data["items"] + changed}, changed=changed)
+
+        self.assertEqual(os.stat(self.filepath).st_mtime_ns, snapshot.st_mtime_ns)
+        self.assertEqual(len(self.log_lines()), 4)
+        items = sorted(self.storage().load()["items"], key=lambda item: item["id"])
+        self.assertEqual(items, [{"id": 1, "name": "A"}, {"id": 3, "name": "c"},
+                                 {"id": 4, "name": "d"}, {"id": 5, "name": "e"}])
+
+    def test_a_torn_tail_is_ignored_and_cut_before_the_next_append(self):
+        JSONFileStorage(self.filepath).save({"items": []})
+        writer = self.storage()
+        self.put(writer, {"id": 1, "name": "a"})
+        with open(self.filepath + ".log", "ab") as file:
+            file.write(b'{"op": "put", "record": {"id": 2, "na')
+
+        recovered = self.storage()
+        self.assertEqual(recovered.load()["items"], [{"id": 1, "name": "a"}])
+        self.put(recovered, {"id": 3, "name": "c"})
+        self.assertEqual(len(self.log_lines()), 2)
+        self.assertEqual(sorted(item["id"] for item in self.storage().load()["items"]), [1, 3])
+
+    def test_log_is_folded_into_the_snapshot_at_the_threshold(self):
+        JSONFileStorage(self.filepath).save({"items": []})
+        writer = self.storage(compact_threshold=3)
+        self.put(writer, {"id": 1, "name": "a"})
+        self.put(writer, {"id": 2, "name": "b"})
+        self.assertEqual(len(self.log_lines()), 2)
+
+        self.put(writer, {"id": 3, "name": "c"})
+        self.assertEqual(self.log_lines(), [])
+        self.assertEqual(len(JSONFileStorage(self.filepath).load()["items"]), 3)
+        self.assertEqual(len(self.storage().load()["items"]), 3)
+
+    def test_save_refuses_to_overwrite_another_writers_change(self):
+        JSONFileStorage(self.filepath).save({"items": []})
+        for open_storage in (lambda: JSONFileStorage(self.filepath), self.storage):
+            storage = open_storage()
+            data = storage.load()
+            self.put(open_storage(), {"id": 9, "name": "other"})
+            with self.assertRaises(ConcurrentModificationError):
+                storage.save(data, changed=[{"id": 1, "name": "a"}])
+
+
+class TestJSONCodec(unittest.TestCase):
+    DOCUMENT = {"products": [{"product_id": 1, "name": "Ноутбук", "price": 1000.5, "stock": None}]}
+
+    def codecs(self):
+        yield JSONCodec()
+        yield JSONCodec(compact=True)
+        yield JSONCodec(compression="gzip", level=1)
+        if json_codec.zstandard is not None:
+            yield JSONCodec(compact=True, compression="zstd")
+
+    def test_every_codec_reads_what_any_other_wrote(self):
+        for writer in self.codecs():
+            raw = writer.encode(self.DOCUMENT)
+            for reader in self.codecs():
+                self.assertEqual(reader.decode(raw), self.DOCUMENT)
+
+    def test_default_output_matches_the_historical_format(self):
+        self.assertEqual(JSONCodec().encode(self.DOCUMENT), json.dumps(self.DOCUMENT, indent=4).encode("utf-8"))
+        self.assertNotIn(b" ", JSONCodec(compact=True).encode({"a": [1, 2]}))
+        self.assertEqual(gzip.decompress(JSONCodec(compression="gzip").encode([1])), JSONCodec().dumps([1]))
+
+    def test_damaged_files_raise_json_decode_error(self):
+        for raw in (b"{\"products\": [", gzip.compress(b"[1, 2]")[:-6]):
+            with self.assertRaises(json.JSONDecodeError):
+                JSONCodec().decode(raw)
+        with self.assertRaises(ValueError):
+            JSONCodec(compression="lzma")
+
+    def test_handlers_work_on_compressed_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "products.json.gz")
+            handler = ProductJSONHandler(filepath, codec=JSONCodec(compact=True, compression="gzip"))
+            handler.create_many([Product(product_id, f"Product {product_id}", "Category", 10.0, 5)
+                                 for product_id in (1, 2, 3)])
+            with open(filepath, "rb") as file:
+                self.assertTrue(file.read().startswith(json_codec.GZIP_MAGIC))
+
+            reader = ProductJSONHandler(filepath)
+            self.assertEqual(reader.read(2).name, "Product 2")
+            self.assertEqual([product.product_id for product in reader.get_all_products(limit=2, after_id=1)], [2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from Address import Address
+from Cart import CartManager
+from Product import Product
+from Review import ReviewManager, ReviewNotFoundError
+from User import UserManager, UserNotFoundError
+
+ADDRESS = Address(1, 1, "Moscow", "Arbat", 15, 1)
+
+
+class TestUserManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = UserManager()
+        self.alice = self.manager.create("alice@example.com", "Alice", "111", ADDRESS)
+        self.bob = self.manager.create("bob@example.com", "Bob", "222", ADDRESS)
+
+    def test_email_lookup_follows_updates(self):
+        self.assertIs(self.manager.read_by_email("alice@example.com"), self.alice)
+        self.assertIsNone(self.manager.read_by_email("carol@example.com"))
+        self.manager.update(self.alice.user_id, email="alice@new.example.com")
+        self.assertIsNone(self.manager.read_by_email("alice@example.com"))
+        self.assertIs(self.manager.read_by_email("alice@new.example.com"), self.alice)
+        self.assertIs(self.manager.update(self.bob.user_id, email="bob@example.com"), self.bob)
+
+    def test_duplicate_emails_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.manager.create("bob@example.com", "Another Bob", "333", ADDRESS)
+        with self.assertRaises(ValueError):
+            self.manager.update(self.alice.user_id, email="bob@example.com")
+        self.assertEqual((self.alice.email, len(self.manager.users_list)), ("alice@example.com", 2))
+        self.assertIs(self.manager.read_by_email("bob@example.com"), self.bob)
+
+    def test_delete_drops_the_user_from_every_index(self):
+        self.assertIn("deleted", self.manager.delete(self.alice.user_id))
+        with self.assertRaises(UserNotFoundError):
+            self.manager.read_by_id(self.alice.user_id)
+        self.assertIsNone(self.manager.read_by_email("alice@example.com"))
+        self.assertIn("not found", self.manager.delete(self.alice.user_id))
+        # The email is free again, and the new user gets a fresh id.
+        again = self.manager.create("alice@example.com", "Alice", "111", ADDRESS)
+        self.assertNotIn(again.user_id, (self.alice.user_id, self.bob.user_id))
+        self.assertEqual(self.manager.users_list, [self.bob, again])
+
+    def test_users_list_is_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.manager.users_list = []
+        self.manager.users_list.clear()
+        self.assertEqual(self.manager.read_all(), [self.alice, self.bob])
+
+
+class TestCartAndReviewManagers(unittest.TestCase):
+
+    def test_carts_by_user_follow_deletes(self):
+        manager = CartManager()
+        first, second = manager.create_cart(1), manager.create_cart(1)
+        other = manager.create_cart(2)
+        self.assertIs(manager.get_cart_by_user(1), first)
+        manager.delete_cart(first.cart_id)
+        self.assertIs(manager.get_cart_by_user(1), second)
+        manager.delete_cart(second.cart_id)
+        self.assertIsNone(manager.get_cart_by_user(1))
+        self.assertEqual(manager.create_cart(3).cart_id, other.cart_id + 1)
+        self.assertEqual(manager.delete_cart(first.cart_id), "Cart not found.")
+
+    def test_review_indexes_follow_deletes(self):
+        manager = ReviewManager()
+        laptop, phone = Product(1, "Laptop", "Electronics", 1000.0, 5), Product(2, "Phone", "Electronics", 500.0, 5)
+        first = manager.add_review(1, laptop, 5, "Great")
+        second = manager.add_review(2, laptop, 3, "Fine")
+        third = manager.add_review(1, phone, 4, "Good")
+        # Matched on product_id, not on the Product object.
+        self.assertEqual(manager.get_reviews_for_product(Product(1, "Laptop", "Electronics", 1000.0, 5)),
+                         [first, second])
+        self.assertEqual(manager.get_reviews_by_user(1), [first, third])
+
+        manager.delete_review(first.review_id)
+        self.assertEqual(manager.get_reviews_for_product(laptop), [second])
+        self.assertEqual(manager.get_reviews_by_user(1), [third])
+        manager.delete_review(third.review_id)
+        self.assertEqual((manager.get_reviews_by_user(1), manager.get_reviews_for_product(phone)), ([], []))
+        with self.assertRaises(ReviewNotFoundError):
+            manager.get_review(first.review_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from Address import Address
+from Cart import Cart
+from OrderAnalytics import OrderAnalytics, np
+from OrderJSONHandler import OrderJSONHandler
+from OrderXMLHandler import OrderXMLHandler
+from Product import Product
+
+RECORDS = [
+    {"user_id": 1, "total_amount": 10.0, "status": "Pending", "created_at": "2024-05-01T10:00:00"},
+    {"user_id": 2, "total_amount": 25.5, "status": "Completed", "created_at": "2024-05-01T12:30:00"},
+    {"user_id": 1, "total_amount": 4.5, "status": "Completed", "created_at": "2024-05-02T09:00:00"},
+    {"user_id": 3, "total_amount": 60.0, "status": "Cancelled", "created_at": "2024-05-02T18:45:00"},
+    {"user_id": 2, "total_amount": 0.5, "status": "Completed"},
+]
+
+
+class TestOrderAnalytics(unittest.TestCase):
+
+    def without_numpy(self):
+        return mock.patch("OrderAnalytics.np", None)
+
+    def summary(self, analytics: OrderAnalytics) -> tuple:
+        return (len(analytics), analytics.total_revenue(),
+                {key: (analytics.revenue_by(key), analytics.order_count_by(key), analytics.average_basket_by(key))
+                 for key in ("user_id", "status", "day")},
+                analytics.top_customers(2))
+
+    def test_group_bys_give_the_known_totals(self):
+        with self.without_numpy():
+            analytics = OrderAnalytics.from_records(RECORDS)
+            self.assertEqual(analytics.total_revenue(), 100.5)
+            self.assertEqual(analytics.revenue_by("user_id"), {1: 14.5, 2: 26.0, 3: 60.0})
+            self.assertEqual(analytics.order_count_by("user_id"), {1: 2, 2: 2, 3: 1})
+            self.assertEqual(analytics.revenue_by("status"), {"Pending": 10.0, "Completed": 30.5, "Cancelled": 60.0})
+            self.assertEqual(analytics.order_count_by("status"), {"Pending": 1, "Completed": 3, "Cancelled": 1})
+            self.assertEqual(analytics.revenue_by("day"), {"2024-05-01": 35.5, "2024-05-02": 64.5, None: 0.5})
+            self.assertEqual(analytics.average_basket_by("day"), {"2024-05-01": 17.75, "2024-05-02": 32.25, None: 0.5})
+            self.assertEqual(analytics.top_customers(2), [(3, 60.0), (2, 26.0)])
+            with self.assertRaises(ValueError):
+                analytics.revenue_by("payment_method")
+
+    def test_sparse_user_ids_group_like_dense_ones(self):
+        # Ids far above the order count skip the list-slot path and are hashed instead.
+        sparse = [dict(record, user_id=record["user_id"] * 1000) for record in RECORDS]
+        with self.without_numpy():
+            self.assertEqual(OrderAnalytics.from_records(sparse).revenue_by("user_id"),
+                             {1000: 14.5, 2000: 26.0, 3000: 60.0})
+
+    def test_no_orders(self):
+        with self.without_numpy():
+            self.assertEqual(self.summary(OrderAnalytics.from_records([])),
+                             (0, 0, {key: ({}, {}, {}) for key in ("user_id", "status", "day")}, []))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_and_pure_python_paths_agree(self):
+        for records in (RECORDS, []):
+            expected = self.summary(OrderAnalytics.from_records(records))
+            with self.without_numpy():
+                self.assertEqual(self.summary(OrderAnalytics.from_records(records)), expected)
+
+    def test_handlers_feed_the_same_columns(self):
+        with tempfile.TemporaryDirectory() as directory, self.without_numpy():
+            address = Address(1, 1, "Moscow", "Arbat", 15, 1)
+            handlers = (OrderJSONHandler(os.path.join(directory, "orders.json")),
+                        OrderXMLHandler(os.path.join(directory, "orders.xml")))
+            for user_id, price in ((1, 10.0), (2, 25.5), (1, 4.5)):
+                for handler in handlers:
+                    cart = Cart(user_id, user_id)
+                    cart.load_item(Product(1, "Item", "Category", price, 0), 1)
+                    handler.create_order(user_id, cart, address, "Card")
+            for analytics in (OrderAnalytics.from_json_handler(handlers[0]),
+                              OrderAnalytics.from_xml_handler(handlers[1])):
+                self.assertEqual(analytics.revenue_by("user_id"), {1: 14.5, 2: 25.5})
+                self.assertEqual(analytics.order_count_by("status"), {"Pending": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
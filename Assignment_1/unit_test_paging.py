@@ -0,0 +1,151 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from JSONCodec import JSONCodec
+from Paging import iter_pages, page_of
+from Product import Product
+from ProductJSONHandler import ProductJSONHandler
+from ProductSQLiteHandler import ProductSQLiteHandler
+from ProductXMLHandler import ProductXMLHandler
+from RecordOffsets import RecordOffsets, scan_records, _scan_array
+from XMLIndex import iter_elements
+
+
+class TestPagingHelpers(unittest.TestCase):
+
+    def test_page_of_orders_and_bounds_the_page(self):
+        items = [5, 3, 9, 1, 7]
+        self.assertEqual(page_of(items, int), [1, 3, 5, 7, 9])
+        self.assertEqual(page_of(items, int, after=3, limit=2), [5, 7])
+        self.assertEqual(page_of(items, int, after=9), [])
+
+    def test_iter_pages_visits_every_item_once(self):
+        items = list(range(1, 11))
+        for batch_size in (1, 3, 5, 10, 20):
+            pages = iter_pages(lambda limit, after_id: page_of(items, int, after_id, limit), int, batch_size)
+            self.assertEqual(list(pages), items)
+
+
+class TestProductPaging(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        rng = random.Random(2)
+        product_ids = rng.sample(range(1, 1000), 120)
+        # Multi-byte names make character and byte offsets differ.
+        self.products = [Product(product_id, rng.choice(["Чайник", "Mug", "Ноутбук «Про»"]) + f" {product_id}",
+                                 "Category", 1.0, 1) for product_id in product_ids]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def handler_factories(self):
+        yield lambda: ProductJSONHandler(self.path("plain.json"))
+        yield lambda: ProductJSONHandler(self.path("compact.json"), codec=JSONCodec(compact=True))
+        yield lambda: ProductJSONHandler(self.path("journaled.json"), journaled=True)
+        yield lambda: ProductXMLHandler(self.path("products.xml"))
+        yield lambda: ProductSQLiteHandler(self.path("products.db"))
+
+    def names(self, products) -> list:
+        return [(product.product_id, product.name) for product in products]
+
+    def add(self, handler, products: list):
+        if hasattr(handler, "create_many"):
+            handler.create_many(products)
+        else:
+            for product in products:
+                handler.create(product)
+
+    def test_pages_and_streams_match_the_sorted_catalog(self):
+        expected = self.names(sorted(self.products, key=lambda product: product.product_id))
+        for open_handler in self.handler_factories():
+            handler = open_handler()
+            self.add(handler, self.products[:100])
+            first_page = sorted(self.products[:100], key=lambda product: product.product_id)[:10]
+            self.assertEqual(self.names(handler.get_all_products(limit=10)), self.names(first_page))
+
+            # A page read by another handler after a write it did not make.
+            self.add(open_handler(), self.products[100:])
+            reader = open_handler()
+            after_id = expected[30][0]
+            self.assertEqual(self.names(reader.get_all_products(limit=25, after_id=after_id)), expected[31:56])
+            self.assertEqual(self.names(handler.get_all_products(limit=25, after_id=after_id)), expected[31:56])
+            self.assertEqual(reader.get_all_products(limit=5, after_id=expected[-1][0]), [])
+            # XML streams in document order; the others page through in id order.
+            self.assertEqual(sorted(self.names(reader.iter_products())), expected)
+
+    def test_json_offsets_survive_a_new_process(self):
+        handler = ProductJSONHandler(self.path("products.json"))
+        handler.create_many(self.products)
+        handler.get_all_products(limit=1)
+        with open(self.path("products.json.offsets"), "rb") as file:
+            self.assertTrue(file.read())
+
+        expected = sorted(self.products, key=lambda product: product.product_id)
+        reader = ProductJSONHandler(self.path("products.json"))
+        self.assertEqual(self.names(reader.get_all_products(limit=3, after_id=expected[50].product_id)),
+                         self.names(expected[51:54]))
+
+        # The data file replaced without the handlers: the stale spans must not be used.
+        with open(self.path("products.json"), "w") as file:
+            json.dump({"products": [{"product_id": 1, "name": "Only", "category": "C", "price": 1.0, "stock": 1}]},
+                      file)
+        self.assertEqual(self.names(reader.get_all_products(limit=3)), [(1, "Only")])
+
+    def test_writes_rescan_only_the_records_after_the_change(self):
+        for codec in (None, JSONCodec(compact=True)):
+            handler = ProductJSONHandler(self.path(f"products{codec is None}.json"), codec=codec)
+            handler.create_many(self.products[:100])
+            handler.get_all_products(limit=1)
+            rng = random.Random(4)
+            expected = {product.product_id: product.name for product in self.products[:100]}
+            scanned = []
+
+            def counting_scan(text, position, key):
+                spans = _scan_array(text, position, key)
+                scanned.append(len(spans))
+                return spans
+            with mock.patch("RecordOffsets._scan_array", side_effect=counting_scan), \
+                    mock.patch("RecordOffsets.scan_records", wraps=scan_records) as full_scan:
+                for product in self.products[100:]:
+                    handler.create(product)
+                    expected[product.product_id] = product.name
+                    self.assertEqual(self.names(handler.get_all_products(limit=3, after_id=product.product_id - 1))[0],
+                                     (product.product_id, product.name))
+                # Appends rescan the last old record and the new one, never the whole file.
+                self.assertEqual(scanned, [2] * 20)
+
+                for _ in range(30):
+                    product_id = rng.choice(sorted(expected))
+                    if rng.random() < 0.3:
+                        handler.delete(product_id)
+                        del expected[product_id]
+                    else:
+                        handler.update(product_id, name=f"Renamed {product_id} «ё»")
+                        expected[product_id] = f"Renamed {product_id} «ё»"
+                    self.assertEqual(self.names(handler.get_all_products(limit=200, after_id=0)),
+                                     sorted(expected.items()))
+                self.assertFalse(full_scan.called)
+                self.assertLess(sum(scanned), 100 * 30)
+
+            rebuilt = RecordOffsets(handler.storage, "products", "product_id")
+            rebuilt._rebuild(handler.offsets.version)
+            self.assertEqual((handler.offsets.keys, handler.offsets.starts, handler.offsets.ends),
+                             (rebuilt.keys, rebuilt.starts, rebuilt.ends))
+
+    def test_iter_elements_streams_top_level_records(self):
+        handler = ProductXMLHandler(self.path("products.xml"))
+        handler.create_many(self.products[:5])
+        ids = [int(element.findtext("product_id")) for element in iter_elements(handler.filepath, "product")]
+        self.assertEqual(ids, [product.product_id for product in self.products[:5]])
+        self.assertEqual(list(iter_elements(self.path("missing.xml"), "product")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
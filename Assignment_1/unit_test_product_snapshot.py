@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from Product import Product
+from ProductJSONHandler import ProductJSONHandler
+from ProductSnapshot import ProductSnapshot, write_product_snapshot, export_products, import_products
+from ProductXMLHandler import ProductXMLHandler
+
+
+class TestProductSnapshot(unittest.TestCase):
+    PRODUCTS = [
+        Product(10, "Laptop", "Electronics", 1000.0, 10),
+        Product(20, "Чайник", "Кухня", 35.5, 0),
+        Product(30, "Phone", "Electronics", 499.99, 3),
+        Product(40, "Mug", "Кухня", 7.25, 120),
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_snapshot_round_trips_every_column(self):
+        write_product_snapshot(self.path("catalog.pcol"), self.PRODUCTS)
+        with ProductSnapshot(self.path("catalog.pcol")) as snapshot:
+            self.assertEqual(len(snapshot), 4)
+            self.assertEqual(snapshot.categories, ["Electronics", "Кухня"])
+            self.assertEqual([(product.product_id, product.name, product.category, product.price, product.stock)
+                              for product in snapshot.products()],
+                             [(product.product_id, product.name, product.category, product.price, product.stock)
+                              for product in self.PRODUCTS])
+            self.assertEqual(list(snapshot.price), [1000.0, 35.5, 499.99, 7.25])
+
+    def test_scans_return_matching_rows(self):
+        write_product_snapshot(self.path("catalog.pcol"), self.PRODUCTS)
+        with ProductSnapshot(self.path("catalog.pcol")) as snapshot:
+            self.assertEqual(snapshot.rows_in_category("Кухня"), [1, 3])
+            self.assertEqual(snapshot.rows_in_category("Books"), [])
+            self.assertEqual(snapshot.rows_in_price_range(10, 500), [1, 2])
+            self.assertEqual(snapshot.rows_in_price_range(max_price=7.25), [3])
+            self.assertEqual([product.name for product in snapshot.products([2, 0])], ["Phone", "Laptop"])
+
+    def test_empty_catalog_and_foreign_files(self):
+        write_product_snapshot(self.path("empty.pcol"), [])
+        with ProductSnapshot(self.path("empty.pcol")) as snapshot:
+            self.assertEqual((len(snapshot), snapshot.products(), snapshot.rows_in_price_range()), (0, [], []))
+
+        with open(self.path("other.pcol"), "wb") as file:
+            file.write(b"NOPE" + bytes(20))
+        with self.assertRaises(ValueError):
+            ProductSnapshot(self.path("other.pcol"))
+
+    def test_export_and_import_keep_product_ids(self):
+        source = ProductJSONHandler(self.path("products.json"))
+        source.create_many(self.PRODUCTS)
+        export_products(source, self.path("catalog.pcol"))
+
+        target = ProductXMLHandler(self.path("products.xml"))
+        import_products(self.path("catalog.pcol"), target)
+        self.assertEqual(target.read_product_by_id(20).name, "Чайник")
+        self.assertEqual(target.create_product("Lamp", "Home", 20.0, 1).product_id, 41)
+
+
+if __name__ == "__main__":
+    unittest.main()
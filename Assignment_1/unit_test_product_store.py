@@ -0,0 +1,93 @@
+import random
+import unittest
+from Cart import Cart
+from Product import Product, ProductNotFoundError, InsufficientStockError
+from ProductStore import ProductStore
+
+CATEGORIES = ["Books", "Games", "Toys"]
+
+
+class TestProductStore(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.products = [Product(product_id, f"Product {product_id}", rng.choice(CATEGORIES),
+                                 rng.choice([5.0, 9.99, 20.0, 49.5]), rng.randint(0, 9))
+                         for product_id in range(1, 61)]
+        self.store = ProductStore(self.products)
+
+    def fields(self, products) -> list:
+        return sorted((product.product_id, product.name, product.category, product.price, product.stock)
+                      for product in products)
+
+    def test_select_matches_filtering_the_products(self):
+        for category in (None, "Games", "Unknown"):
+            for low, high in ((None, None), (9.99, 20.0), (30.0, None)):
+                view = self.store.select(category, min_price=low, max_price=high, min_stock=2)
+                expected = [product for product in self.products
+                            if (category is None or product.category == category) and product.stock >= 2
+                            and (low is None or product.price >= low) and (high is None or product.price <= high)]
+                self.assertEqual(self.fields(view.products()), self.fields(expected))
+                self.assertEqual(sorted(view.product_ids()), sorted(product.product_id for product in expected))
+                self.assertAlmostEqual(view.stock_value(), sum(product.price * product.stock for product in expected))
+
+    def test_bulk_updates_touch_only_the_selection(self):
+        books = self.store.select("Books")
+        self.assertEqual(books.scale_prices(1.1), len(books))
+        self.store.select("Games").add_stock(3)
+        for product in self.products:
+            stored = self.store.get(product.product_id)
+            expected_price = round(product.price * 1.1, 2) if product.category == "Books" else product.price
+            expected_stock = product.stock + 3 if product.category == "Games" else product.stock
+            self.assertEqual((stored.price, stored.stock), (expected_price, expected_stock))
+
+        before = [product.stock for product in self.store.products()]
+        with self.assertRaises(InsufficientStockError):
+            self.store.select().add_stock(-1)
+        self.assertEqual([product.stock for product in self.store.products()], before)
+
+    def test_removal_moves_the_last_row_and_invalidates_views(self):
+        view = self.store.select()
+        self.store.remove(10)
+        self.assertEqual(len(self.store), 59)
+        self.assertNotIn(10, self.store)
+        self.assertEqual(self.store.get(60).name, "Product 60")
+        self.assertEqual(self.fields(self.store.products()),
+                         self.fields(product for product in self.products if product.product_id != 10))
+        with self.assertRaises(RuntimeError):
+            view.products()
+        with self.assertRaises(ProductNotFoundError):
+            self.store.get(10)
+
+    def test_proxies_read_and_write_the_columns(self):
+        proxy = self.store.get(5)
+        proxy.name = "Renamed"
+        proxy.category = "Garden"
+        proxy.stock = 42
+        with self.assertRaises(ValueError):
+            proxy.price = -1
+        self.assertEqual(proxy, self.store.get(5))
+        self.assertEqual(self.store.select("Garden").product_ids(), [5])
+        self.assertEqual((self.store.get(5).name, self.store.get(5).stock), ("Renamed", 42))
+
+        cart = Cart(1, 1)
+        cart.add_to_cart(proxy, 2)
+        proxy.price = 12.5
+        self.assertEqual(cart.subtotal, 25.0)
+        self.store.select(category="Garden").scale_prices(2)
+        self.assertEqual(cart.subtotal, 50.0)
+
+    def test_from_columns_validates_its_input(self):
+        store = ProductStore.from_columns([3, 1], ["C", "A"], ["Books", "Toys"], [1.5, 2.0], [4, 0])
+        self.assertEqual(self.fields(store.products()), [(1, "A", "Toys", 2.0, 0), (3, "C", "Books", 1.5, 4)])
+        store.add(Product(2, "B", "Books", 3.0, 1))
+        self.assertEqual(store.select("Books").product_ids(), [3, 2])
+        for columns in (([1, 1], ["A", "B"], ["X", "X"], [1.0, 1.0], [1, 1]),
+                        ([1, 2], ["A"], ["X", "X"], [1.0, 1.0], [1, 1]),
+                        ([1, 2], ["A", "B"], ["X", "X"], [1.0, -1.0], [1, 1])):
+            with self.assertRaises(ValueError):
+                ProductStore.from_columns(*columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
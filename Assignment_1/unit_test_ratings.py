@@ -0,0 +1,126 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from Product import Product
+from Rating import Rating, InvalidRatingError
+from RatingJSONHandler import RatingJSONHandler
+from RatingSQLiteHandler import RatingSQLiteHandler
+from RatingXMLHandler import RatingXMLHandler
+from Review import Review
+from ReviewJSONHandler import ReviewJSONHandler
+from ReviewSQLiteHandler import ReviewSQLiteHandler
+
+LAPTOP = Product(1, "Laptop", "Electronics", 1000.0, 10)
+
+
+class TestRatingBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_every_vote_counts_towards_the_stored_average(self):
+        for open_handler in (lambda: RatingJSONHandler(self.path("ratings.json")),
+                             lambda: RatingSQLiteHandler(self.path("ratings.db"))):
+            open_handler().create(LAPTOP)
+            for vote in (4, 4, 5):
+                # A fresh handler each time, so every vote starts from what the last one stored.
+                open_handler().update(1, vote)
+            rating = open_handler().read(1)
+            self.assertEqual((rating.total_reviews, rating.rating_sum, rating.histogram), (3, 13, [0, 0, 0, 2, 1]))
+            self.assertAlmostEqual(rating.average_rating, 13 / 3)
+
+        RatingXMLHandler(self.path("ratings.xml")).create_rating(LAPTOP)
+        for vote in (4, 4, 5):
+            RatingXMLHandler(self.path("ratings.xml")).update_rating(1, vote)
+        rating = RatingXMLHandler(self.path("ratings.xml")).read_rating_by_product_id(1)
+        self.assertEqual((rating.product.name, rating.total_reviews, rating.histogram), ("Laptop", 3, [0, 0, 0, 2, 1]))
+        self.assertAlmostEqual(rating.average_rating, 13 / 3)
+
+    def test_older_aggregates_keep_their_sum(self):
+        with open(self.path("ratings.xml"), "w") as file:
+            file.write("<ratings><rating><product_id>1</product_id><total_reviews>2</total_reviews>"
+                       "<average_rating>4.5</average_rating></rating></ratings>")
+        RatingXMLHandler(self.path("ratings.xml")).update_rating(1, 3)
+        self.assertEqual(RatingXMLHandler(self.path("ratings.xml")).read_rating_by_product_id(1).average_rating, 4.0)
+
+        connection = sqlite3.connect(self.path("ratings.db"))
+        connection.execute("CREATE TABLE ratings (product_id INTEGER PRIMARY KEY, product_name TEXT, "
+                           "product_category TEXT, total_reviews INTEGER NOT NULL, average_rating REAL NOT NULL)")
+        connection.execute("INSERT INTO ratings VALUES (1, 'Laptop', 'Electronics', 2, 4.5)")
+        connection.commit()
+        connection.close()
+        ratings = RatingSQLiteHandler(self.path("ratings.db"))
+        self.assertEqual(ratings.read(1).rating_sum, 9)
+        # Without a histogram the votes cannot be told apart; the aggregate has to be rebuilt first.
+        self.assertIn("rebuild", ratings.update(1, 3))
+        self.assertEqual(ratings.read(1).total_reviews, 2)
+
+
+class TestReviewVotes(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def handler_factories(self):
+        yield lambda: ReviewJSONHandler(self.path("reviews.json"), ratings=RatingJSONHandler(self.path("ratings.json")))
+        yield lambda: ReviewSQLiteHandler(self.path("shop.db"), ratings=RatingSQLiteHandler(self.path("shop.db")))
+
+    def test_a_review_without_a_vote_leaves_the_aggregate_alone(self):
+        for open_handler in self.handler_factories():
+            reviews = open_handler()
+            unrated = Review(1, 1, LAPTOP, Rating(LAPTOP), "No stars given")
+            self.assertIsNone(unrated.stars)
+            reviews.create(unrated)
+            reviews.create(Review(2, 2, LAPTOP, Rating(LAPTOP), "Great", stars=5))
+
+            self.assertIsNone(reviews.read(1).stars)
+            self.assertEqual(reviews.read(1).rating.total_reviews, 0)
+            self.assertEqual(reviews.ratings.read(1).histogram, [0, 0, 0, 0, 1])
+            self.assertTrue(reviews.update(1, new_rating=3))
+            self.assertEqual(reviews.ratings.read(1).histogram, [0, 0, 1, 0, 1])
+            self.assertEqual(reviews.ratings.check_consistency(reviews), {})
+
+    def test_invalid_votes_are_refused_before_anything_is_written(self):
+        for open_handler in self.handler_factories():
+            reviews = open_handler()
+            reviews.create(Review(1, 1, LAPTOP, Rating(LAPTOP), "Good", stars=4))
+            self.assertFalse(reviews.update(1, new_comment="Changed", new_rating=7))
+            self.assertEqual((reviews.read(1).comment, reviews.read(1).stars), ("Good", 4))
+            with self.assertRaises(InvalidRatingError):
+                reviews.create(Review(2, 1, LAPTOP, Rating(LAPTOP), "Too many", stars=6))
+            self.assertIsNone(reviews.read(2))
+            self.assertEqual(reviews.ratings.read(1).histogram, [0, 0, 0, 1, 0])
+
+    def test_reviews_stored_with_a_zero_rating_still_load(self):
+        product = {"product_id": 1, "name": "Laptop", "category": "Electronics", "price": 1000.0, "stock": 10}
+        with open(self.path("reviews.json"), "w") as file:
+            json.dump({"reviews": [
+                {"review_id": 1, "user_id": 1, "product": product, "rating": 0.0, "comment": "Unrated"},
+                {"review_id": 2, "user_id": 2, "product": product, "rating": 4.0, "comment": "Good"},
+            ]}, file)
+        ratings = RatingJSONHandler(self.path("ratings.json"))
+        reviews = ReviewJSONHandler(self.path("reviews.json"), ratings=ratings)
+
+        self.assertIsNone(reviews.read(1).stars)
+        self.assertEqual(ratings.rebuild_from_reviews(reviews), 1)
+        self.assertEqual(ratings.read(1).histogram, [0, 0, 0, 1, 0])
+        self.assertTrue(reviews.delete(1))
+        self.assertEqual(ratings.check_consistency(reviews), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import random
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from Cart import Cart
+from Product import Product, InsufficientStockError
+from Reservation import (ReservationManager, ReservationExpiredError, ReservationNotFoundError,
+                         ReservationMismatchError)
+
+CARTS = 2000
+THREADS = 32
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReservations(unittest.TestCase):
+
+    def setUp(self):
+        self.products = {product_id: Product(product_id, f"Product {product_id}", "Category", 10.0, 5)
+                         for product_id in range(1, 4)}
+        self.clock = FakeClock()
+        self.reservations = ReservationManager(self.products, hold_seconds=60, clock=self.clock)
+
+    def test_reserve_is_all_or_nothing(self):
+        self.reservations.reserve(1, {1: 4})
+        with self.assertRaises(InsufficientStockError):
+            self.reservations.reserve(2, {2: 1, 1: 2})
+        self.assertNotIn(2, self.reservations.holds)
+        self.assertEqual(self.reservations.available(2), 5)
+        self.assertEqual(self.reservations.available(1), 1)
+
+    def test_commit_takes_stock_and_release_gives_it_back(self):
+        self.reservations.reserve(1, {1: 2, 2: 1})
+        self.reservations.reserve(2, {1: 3})
+        self.assertEqual(self.reservations.commit(1), {1: 2, 2: 1})
+        self.assertEqual((self.products[1].stock, self.products[2].stock), (3, 4))
+        self.reservations.release(2)
+        self.assertEqual(self.reservations.available(1), 3)
+        self.assertEqual(self.reservations.reserved, {})
+        with self.assertRaises(ReservationNotFoundError):
+            self.reservations.commit(2)
+
+    def test_expired_holds_are_swept_and_cannot_commit(self):
+        self.reservations.reserve(1, {1: 5})
+        self.clock.now = 61
+        with self.assertRaises(ReservationExpiredError):
+            self.reservations.commit(1)
+        self.assertEqual(self.products[1].stock, 5)
+
+        self.reservations.reserve(2, {1: 5})
+        self.clock.now = 200
+        # Stock is short only because of the lapsed hold, so the reserve sweeps it and succeeds.
+        self.reservations.reserve(3, {1: 5})
+        self.assertEqual(list(self.reservations.holds), [3])
+
+    def test_cart_places_holds_instead_of_taking_stock(self):
+        cart = Cart(1, 1, self.reservations)
+        cart.add_to_cart(self.products[1], 3)
+        self.assertEqual(self.products[1].stock, 5)
+        self.assertEqual(Cart(2, 2, self.reservations).add_to_cart(self.products[1], 3), "Not enough stock for Product 1.")
+        cart.remove_from_cart(self.products[1])
+        self.assertEqual(self.reservations.available(1), 5)
+        cart.add_to_cart(self.products[2], 2)
+        cart.checkout()
+        self.assertEqual(self.products[2].stock, 3)
+
+    def test_checkout_reserves_lapsed_lines_again(self):
+        cart = Cart(1, 1, self.reservations)
+        cart.add_to_cart(self.products[1], 3)
+        self.clock.now = 61
+        self.reservations.sweep_expired()
+        cart.add_to_cart(self.products[2], 1)
+        self.assertEqual(cart.checkout(), "Cart 1 checked out.")
+        self.assertEqual((self.products[1].stock, self.products[2].stock), (2, 4))
+
+    def test_checkout_never_sells_lines_whose_hold_is_gone(self):
+        cart = Cart(1, 1, self.reservations)
+        cart.add_to_cart(self.products[1], 3)
+        self.clock.now = 61
+        self.reservations.sweep_expired()
+        # Another cart buys the units the lapsed hold gave back.
+        Cart(2, 2, self.reservations).add_to_cart(self.products[1], 5)
+        cart.add_to_cart(self.products[2], 1)
+
+        self.assertNotEqual(cart.checkout(), "Cart 1 checked out.")
+        self.assertEqual(cart.view_cart(), {"Product 2": 1})
+        self.assertEqual(self.products[1].stock, 5)
+        self.assertEqual(cart.checkout(), "Cart 1 checked out.")
+        self.assertEqual(self.products[2].stock, 4)
+
+    def test_commit_rejects_a_hold_that_does_not_match_the_cart(self):
+        self.reservations.reserve(1, {2: 1})
+        with self.assertRaises(ReservationMismatchError):
+            self.reservations.commit(1, {1: 3, 2: 1})
+        self.assertEqual((self.products[1].stock, self.products[2].stock), (5, 5))
+        self.assertEqual(self.reservations.reserved, {})
+
+    def test_concurrent_carts_never_oversell(self):
+        random.seed(7)
+        products = {product_id: Product(product_id, f"Product {product_id}", "Category", 10.0, 40)
+                    for product_id in range(1, 11)}
+        initial = {product_id: product.stock for product_id, product in products.items()}
+        reservations = ReservationManager(products, hold_seconds=60, stripes=4)
+        plans = [(cart_id, {product_id: random.randint(1, 3) for product_id in random.sample(range(1, 11), 3)},
+                  random.random() < 0.8) for cart_id in range(1, CARTS + 1)]
+        sold = {product_id: 0 for product_id in products}
+        sold_lock = threading.Lock()
+
+        def checkout(plan):
+            cart_id, items, buys = plan
+            try:
+                reservations.reserve(cart_id, items)
+            except InsufficientStockError:
+                return
+            if not buys:
+                reservations.release(cart_id)
+                return
+            committed = reservations.commit(cart_id)
+            with sold_lock:
+                for product_id, quantity in committed.items():
+                    sold[product_id] += quantity
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(checkout, plans))
+
+        self.assertEqual(reservations.holds, {})
+        self.assertEqual(reservations.reserved, {})
+        for product_id, product in products.items():
+            self.assertGreaterEqual(product.stock, 0)
+            self.assertEqual(initial[product_id] - product.stock, sold[product_id])
+        # Demand far exceeds supply, so the scarce stock should actually sell out.
+        self.assertLess(sum(product.stock for product in products.values()), sum(initial.values()) // 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
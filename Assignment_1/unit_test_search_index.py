@@ -0,0 +1,94 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+from Product import Product
+from ProductJSONHandler import ProductJSONHandler
+from Rating import Rating
+from Review import Review
+from ReviewJSONHandler import ReviewJSONHandler
+from SearchIndex import SearchIndex, tokenize
+
+WORDS = ["red", "blue", "phone", "laptop", "case", "cable", "fast", "cheap", "ноутбук", "чехол", "быстрый"]
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.products = ProductJSONHandler(os.path.join(self.directory.name, "products.json"))
+        self.reviews = ReviewJSONHandler(os.path.join(self.directory.name, "reviews.json"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def add_review(self, review_id: int, product: Product, comment: str):
+        rating = Rating(product)
+        rating.update_rating(5)
+        self.reviews.create(Review(review_id, 1, product, rating, comment))
+
+    def brute_force_scores(self, index: SearchIndex, query: str, match_all: bool) -> dict:
+        documents = {product_data["product_id"]: tokenize(product_data["name"])
+                     for product_data in self.products.storage.load()["products"]}
+        for review_data in self.reviews.storage.load()["reviews"]:
+            documents[review_data["product"]["product_id"]] += tokenize(review_data["comment"])
+        average_length = sum(map(len, documents.values())) / len(documents)
+        terms = set(tokenize(query))
+        scores = {}
+        for product_id, words in documents.items():
+            if (match_all and not terms <= set(words)) or not terms & set(words):
+                continue
+            scores[product_id] = 0.0
+            for term in terms & set(words):
+                matching = sum(1 for other in documents.values() if term in other)
+                idf = math.log(1 + (len(documents) - matching + 0.5) / (matching + 0.5))
+                frequency = words.count(term)
+                scores[product_id] += idf * frequency * (index.k1 + 1) / (
+                    frequency + index.k1 * (1 - index.b + index.b * len(words) / average_length))
+        return scores
+
+    def test_tokenize_folds_case_stems_and_drops_stop_words(self):
+        self.assertEqual(tokenize("The Phones and Cases for Boxes of Glasses"), ["phone", "case", "box", "glass"])
+        self.assertEqual(tokenize("Ёлочные игрушки"), tokenize("елочная игрушка"))
+        self.assertEqual(tokenize(""), [])
+
+    def test_top_results_match_a_full_bm25_scan(self):
+        rng = random.Random(7)
+        products = [Product(product_id, " ".join(rng.choices(WORDS, k=rng.randint(1, 4))), "Category", 1.0, 1)
+                    for product_id in range(1, 201)]
+        self.products.create_many(products)
+        for review_id in range(1, 101):
+            self.add_review(review_id, rng.choice(products), " ".join(rng.choices(WORDS, k=rng.randint(1, 6))))
+        index = SearchIndex(self.products, self.reviews)
+
+        for query in ("phone", "red case", "ноутбук быстрый", "cable cheap fast"):
+            for match_all in (True, False):
+                expected = self.brute_force_scores(index, query, match_all)
+                found = index.search(query, limit=10, match_all=match_all)
+                best = sorted(expected.values(), reverse=True)[:10]
+                self.assertEqual([round(expected[product_id], 9) for product_id in found],
+                                 [round(score, 9) for score in best], (query, match_all))
+
+    def test_writes_through_the_handlers_keep_the_index_current(self):
+        laptop, phone = Product(1, "Gaming laptop", "Electronics", 1000.0, 5), Product(2, "Phone", "Electronics", 500.0, 5)
+        self.products.create_many([laptop, phone])
+        index = SearchIndex(self.products, self.reviews)
+        self.assertEqual(index.search("case"), [])
+
+        self.add_review(1, phone, "Great cases included")
+        self.products.update(1, name="Laptop case")
+        self.assertEqual(sorted(index.search("case")), [1, 2])
+        self.reviews.delete(1)
+        self.products.delete(1)
+        self.assertEqual(index.search("case"), [])
+        self.assertEqual(index.search("phone"), [2])
+
+        # A write made around the index is picked up by a rebuild on the next query.
+        ProductJSONHandler(self.products.filepath).create(Product(3, "Phone case", "Accessories", 9.0, 5))
+        self.assertEqual(index.search("phone case"), [3])
+        self.assertEqual(index.postings, SearchIndex(self.products, self.reviews).postings)
+
+
+if __name__ == "__main__":
+    unittest.main()
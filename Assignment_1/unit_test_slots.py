@@ -0,0 +1,62 @@
+import unittest
+from Address import Address
+from Cart import Cart
+from Category import Category
+from Inventory import Inventory
+from Order import Order
+from Payment import Payment
+from Product import Product
+from ProductStore import ProductStore
+from Rating import Rating
+from Reservation import Hold
+from Review import Review
+from Seller import Seller
+from User import User
+
+
+class TestSlots(unittest.TestCase):
+
+    def domain_objects(self) -> list:
+        """One of each slotted class, after the methods that set its private caches have run.
+
+        A cache missing from ``__slots__`` fails here with AttributeError before any assertion.
+        """
+        product = Product(1, "Laptop", "Electronics", 1000.0, 10)
+        phone = Product(2, "Phone", "Electronics", 500.0, 5)
+        cart = Cart(1, 1)
+        cart.add_to_cart(product, 2)
+        cart.add_to_cart(phone, 1)
+        phone.update_price(450.0)
+        self.assertEqual(cart.subtotal, 2450.0)
+        cart.remove_from_cart(phone)
+        address = Address(1, 1, "Moscow", "Arbat", 15, 1)
+        address.update_address("Kazan", "Baumana", 3, 7)
+        order = Order(1, 1, cart, address, "Card")
+        order.place_order()
+        payment = Payment(1, order, 2000, "Card")
+        payment.process_payment()
+        rating = Rating(product)
+        rating.update_rating(4)
+        rating.replace_rating(4, 5)
+        review = Review(1, 1, product, rating, "Great")
+        review.edit_review("Still great", rating)
+        category = Category(1, "Electronics", "Gadgets")
+        category.add_product_to_category(product)
+        inventory = Inventory()
+        inventory.add_product(product)
+        seller = Seller(1, "Shop", {})
+        seller.add_product(product)
+        return [product, cart, address, order, payment, rating, review, category, inventory, seller,
+                User(1, "user@example.com", "Ivan", "+7000", address), Hold(1, 0.0),
+                ProductStore([product]).get(1)]
+
+    def test_unknown_attributes_are_refused(self):
+        for instance in self.domain_objects():
+            with self.subTest(cls=type(instance).__name__):
+                self.assertFalse(hasattr(instance, "__dict__"))
+                with self.assertRaises(AttributeError):
+                    instance.unknown_attribute = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
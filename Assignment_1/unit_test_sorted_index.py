@@ -0,0 +1,121 @@
+import os
+import random
+import tempfile
+import unittest
+from Product import Product
+from ProductJSONHandler import ProductJSONHandler, CachedProductJSONHandler
+from ProductXMLHandler import ProductXMLHandler
+from SortedIndex import SortedIndex
+
+
+class TestSortedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.records = {}
+        self.version = 0
+        self.index = SortedIndex(("price", "stock"), lambda: list(self.records.items()), lambda: self.version,
+                                 partition="category")
+
+    def write(self, saved: dict = None, deleted: list = ()):
+        """Changes the records the way a handler's save would and reports it to the index."""
+        replaced = self.version
+        self.records.update(saved or {})
+        for key in deleted:
+            del self.records[key]
+        self.version += 1
+        self.index.apply(replaced, list((saved or {}).items()), deleted)
+
+    def expected(self, field, low=None, high=None, below=None, category=None) -> list:
+        matches = [(record[field], key) for key, record in self.records.items()
+                   if (category is None or record["category"] == category)
+                   and (low is None or record[field] >= low) and (high is None or record[field] <= high)
+                   and (below is None or record[field] < below)]
+        return [key for _, key in sorted(matches)]
+
+    def test_patched_lists_answer_like_a_full_sort(self):
+        rng = random.Random(3)
+
+        def record():
+            return {"price": rng.choice([5.0, 9.99, 10.0, 25.5, 100.0]), "stock": rng.randint(0, 8),
+                    "category": rng.choice(["Books", "Games", "Toys"])}
+
+        self.write({key: record() for key in range(1, 101)})
+        self.index.refresh()
+        for step in range(300):
+            key = rng.randint(1, 150)
+            if key in self.records and rng.random() < 0.3:
+                self.write(deleted=[key])
+            else:
+                self.write({key: record()})
+            if step % 30:
+                continue
+            for category in (None, "Games"):
+                self.assertEqual(self.index.range("price", 9.99, 25.5, partition_value=category),
+                                 self.expected("price", 9.99, 25.5, category=category))
+                self.assertEqual(self.index.range("stock", below=3, partition_value=category),
+                                 self.expected("stock", below=3, category=category))
+                self.assertEqual(self.index.count("stock", low=4, partition_value=category),
+                                 len(self.expected("stock", low=4, category=category)))
+            everything = self.expected("price")
+            self.assertEqual(self.index.range("price", offset=5, limit=10), everything[5:15])
+            self.assertEqual(self.index.range("price", offset=5, limit=10, descending=True),
+                             everything[::-1][5:15])
+            self.assertEqual(self.index.top("price", 3, largest=False), everything[:3])
+
+    def test_a_write_it_did_not_see_makes_it_rebuild(self):
+        self.write({1: {"price": 5.0, "stock": 1, "category": "Books"}})
+        self.assertEqual(self.index.range("price"), [1])
+        # Someone else's save: the file moved on without telling the index.
+        self.records[2] = {"price": 1.0, "stock": 1, "category": "Books"}
+        self.version += 1
+        self.write({3: {"price": 3.0, "stock": 1, "category": "Books"}})
+        self.assertIsNone(self.index.version)
+        self.assertEqual(self.index.range("price"), [2, 3, 1])
+
+
+class TestProductRangeQueries(unittest.TestCase):
+    PRODUCTS = [
+        Product(1, "Laptop", "Electronics", 1000.0, 10),
+        Product(2, "Phone", "Electronics", 500.0, 2),
+        Product(3, "Novel", "Books", 15.0, 0),
+        Product(4, "Atlas", "Books", 45.0, 7),
+        Product(5, "Cable", "Electronics", 15.0, 4),
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def handler_factories(self):
+        yield lambda: ProductJSONHandler(os.path.join(self.directory.name, "plain.json"))
+        yield lambda: ProductJSONHandler(os.path.join(self.directory.name, "journaled.json"), journaled=True)
+        yield lambda: CachedProductJSONHandler(os.path.join(self.directory.name, "cached.json"))
+        yield lambda: ProductXMLHandler(os.path.join(self.directory.name, "products.xml"))
+
+    def ids(self, products: list) -> list:
+        return [product.product_id for product in products]
+
+    def test_range_top_and_low_stock_queries_follow_writes(self):
+        for open_handler in self.handler_factories():
+            handler = open_handler()
+            handler.create_many(self.PRODUCTS)
+            self.assertEqual(self.ids(handler.get_products_by_price(15.0, 500.0)), [3, 5, 4, 2])
+            self.assertEqual(self.ids(handler.get_products_by_price(category="Books", descending=True)), [4, 3])
+            self.assertEqual(self.ids(handler.get_top_products("stock", 2)), [1, 4])
+            self.assertEqual(self.ids(handler.get_low_stock_products(threshold=5)), [3, 2, 5])
+
+            handler.update_price(2, 10.0)
+            handler.update_stock(3, 9)
+            self.assertEqual(self.ids(handler.get_products_by_price(max_price=15.0)), [2, 3, 5])
+            self.assertEqual(handler.count_low_stock(threshold=5), 2)
+
+            other = open_handler()
+            other.update_stock(1, -9)
+            self.assertEqual(self.ids(handler.get_low_stock_products(threshold=5)), [1, 2, 5])
+            self.assertEqual(self.ids(handler.get_products_by_stock(min_stock=5, category="Books")), [4, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from Address import Address
+from Cart import Cart
+from CartXMLHandler import CartXMLHandler
+from OrderXMLHandler import OrderXMLHandler
+from Product import Product
+from ProductXMLHandler import ProductXMLHandler
+from XMLIndex import IndexedXMLFile
+
+
+class TestXMLHandlers(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_index_serves_lookups_and_follows_other_writers(self):
+        handler = ProductXMLHandler(self.path("products.xml"))
+        for name in ("Laptop", "Phone", "Tablet"):
+            handler.create_product(name, "Electronics", 100.0, 5)
+        other = ProductXMLHandler(handler.filepath)
+        self.assertEqual(other.read_product_by_id(2).name, "Phone")
+
+        handler.update_product(2, name="Smartphone")
+        handler.delete_product(1)
+        self.assertEqual(other.read_product_by_id(2).name, "Smartphone")
+        self.assertIsNone(other.document.get(1))
+
+        document = IndexedXMLFile(handler.filepath, "product", "product_id")
+        root = document.load()
+        self.assertIs(document.load(), root)
+        self.assertEqual([int(element.findtext("product_id")) for element in document.page(after=2)], [3])
+        document.remove(3)
+        self.assertEqual((sorted(document.index), len(root.findall("product"))), ([2], 1))
+
+    def test_rejected_update_leaves_the_cached_document_alone(self):
+        handler = ProductXMLHandler(self.path("products.xml"))
+        handler.create_product("Laptop", "Electronics", 1000.0, 10)
+        handler.create_product("Phone", "Electronics", 500.0, 10)
+
+        with self.assertRaises(ValueError):
+            handler.update_product(1, name="RENAMED", category="Other", price=-1)
+        # Any later save writes the cached tree; the rejected edit must not be in it.
+        handler.update_stock(2, 1)
+        for reader in (handler, ProductXMLHandler(handler.filepath)):
+            product = reader.read_product_by_id(1)
+            self.assertEqual((product.name, product.category, product.price), ("Laptop", "Electronics", 1000.0))
+
+
+    def test_carts_round_trip_with_their_lines(self):
+        handler = CartXMLHandler(self.path("carts.xml"))
+        laptop, phone = Product(1, "Laptop", "Electronics", 1000.0, 10), Product(2, "Phone", "Electronics", 499.99, 10)
+        cart = Cart(7, 1)
+        cart.add_to_cart(laptop, 2)
+        handler.create(cart)
+        handler.create(Cart(8, 2))
+        handler.update(1, phone, 1, "add")
+
+        reader = CartXMLHandler(handler.filepath)
+        for carts in (reader.get_all_carts(), reader.get_all_carts(limit=1), list(reader.iter_carts())):
+            stored = carts[0]
+            self.assertEqual((stored.cart_id, stored.user_id), (1, 7))
+            self.assertEqual(stored.view_cart(), {"Laptop": 2, "Phone": 1})
+            self.assertEqual(stored.subtotal, 2499.99)
+        self.assertEqual(reader.read(2).view_cart(), {})
+
+
+    def test_orders_round_trip_through_paging_and_streaming(self):
+        handler = OrderXMLHandler(self.path("orders.xml"))
+        for user_id in (1, 2, 3):
+            cart = Cart(user_id, user_id)
+            cart.add_to_cart(Product(1, "Laptop", "Electronics", 1000.0, 10), user_id)
+            handler.create_order(user_id, cart, Address(user_id, user_id, "Moscow", "Arbat", 15, user_id), "Card")
+        handler.update_order(2, status="Placed")
+
+        reader = OrderXMLHandler(handler.filepath)
+        orders = reader.get_all_orders()
+        self.assertEqual([order.order_id for order in orders], [1, 2, 3])
+        self.assertEqual([order.total_amount for order in list(reader.iter_orders())], [1000.0, 2000.0, 3000.0])
+        second, = reader.get_all_orders(limit=1, after_id=1)
+        self.assertEqual((second.status, second.address.city, second.address.apartment), ("Placed", "Moscow", 2))
+        self.assertEqual(second.cart.view_cart(), {"Laptop": 2})
+
+    def test_orders_with_a_text_address_still_load(self):
+        handler = OrderXMLHandler(self.path("orders.xml"))
+        cart = Cart(1, 1)
+        cart.add_to_cart(Product(1, "Laptop", "Electronics", 1000.0, 10), 1)
+        address = Address(5, 1, "Moscow", "Arbat", 15, 1)
+        handler.create_order(1, cart, address, "Card")
+        # Earlier versions wrote repr(Address) as the element's text.
+        tree = ET.parse(handler.filepath)
+        address_element = tree.getroot().find("order/address")
+        address_element.clear()
+        address_element.text = repr(address)
+        tree.write(handler.filepath)
+
+        stored = OrderXMLHandler(handler.filepath).read_order_by_id(1).address
+        self.assertEqual((stored.address_id, stored.city, stored.street, stored.house), (5, "Moscow", "Arbat", 15))
+
+
+if __name__ == "__main__":
+    unittest.main()